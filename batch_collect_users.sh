@@ -38,6 +38,8 @@ while [[ "$current_date" < "$end_date" ]] || [[ "$current_date" == "$end_date" ]
     if ./scripts/daily_gpu_log_with_users.sh "$current_date"; then
         success_count=$((success_count + 1))
         echo "✅ $current_date 資料收集完成"
+        # 重新產生的平均檔需同步更新使用者索引
+        python3 python/user_index.py update "$current_date" --data-dir ./data || echo "⚠️ $current_date 使用者索引更新失敗"
     else
         echo "❌ $current_date 資料收集失敗"
     fi
@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+資料處理流程基準測試
+
+以 benchmarks/synthetic_data.py 產生不同規模的資料集，依序量測整條流程各階段的耗時：
+- collector: 收集器寫入 GPU CSV (write_gpu_csv) 與計算每日平均 (calculate_averages)
+- query: 使用者查詢掃描、索引重建、索引查詢與列出使用者
+- load: 各繪圖工具的資料載入（每日平均資料集、單張 GPU 的逐筆資料）
+- render: 各繪圖工具的出圖（節點趨勢、熱力圖、VRAM 熱力圖、單 GPU 趨勢、單日時間線）
+- archive: 月份封存掃描、保留政策壓縮與月份搬移（會改動資料，最後執行）
+
+預設矩陣為 4/32/128 節點 × 30/365/1095 天，每個規模在暫存目錄產生一份資料。
+繪圖工具固定繪製正式環境的 4 個節點 (colab-gpu1 ~ colab-gpu4)，較大規模主要影響
+收集、查詢與封存；繪圖階段量測的是天數增加的影響。
+
+每個階段重複執行 --repeat 次取中位數，執行前清除行程內的讀取快取（作業系統的檔案快取不清除）。
+結果寫成 JSON（含 git commit），可用 --compare 與另一次的結果逐項比較。
+
+使用範例:
+    python3 benchmarks/run_benchmarks.py --preset smoke
+    python3 benchmarks/run_benchmarks.py --nodes 4,32 --days 30,365 --json bench.json
+    python3 benchmarks/run_benchmarks.py --preset smoke --json new.json --compare bench.json
+    python3 benchmarks/run_benchmarks.py --stages query,render --preset smoke
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import contextlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS_DIR = os.path.join(REPO_ROOT, 'benchmarks')
+for _path in (REPO_ROOT, os.path.join(REPO_ROOT, 'python'), os.path.join(REPO_ROOT, 'scripts'),
+              os.path.join(REPO_ROOT, 'visualization'), BENCHMARKS_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+# 停用圖表快取，確保每次都實際出圖
+os.environ['GPU_PLOT_CACHE'] = '0'
+
+from synthetic_data import generate_dataset, DATE_FORMAT  # noqa: E402
+
+DEFAULT_NODES = [4, 32, 128]
+DEFAULT_DAYS = [30, 365, 1095]
+PRESETS = {
+    'smoke': ([4], [30]),
+    'default': (DEFAULT_NODES, DEFAULT_DAYS),
+}
+STAGE_GROUPS = ('collector', 'query', 'load', 'render', 'archive')
+# 繪圖工具使用的節點
+RENDER_NODES = ['colab-gpu1', 'colab-gpu2', 'colab-gpu3', 'colab-gpu4']
+# 比較時超過此比例視為變慢
+REGRESSION_RATIO = 1.10
+# 估算資料集大小用：每筆樣本約佔的位元組數
+BYTES_PER_SAMPLE = 45
+
+
+def parse_int_list(value):
+    return [int(item) for item in value.split(',') if item.strip()]
+
+
+def git_revision():
+    """
+    Returns:
+        dict: commit 與工作目錄是否有未提交的變更
+    """
+    def git(*args):
+        result = subprocess.run(['git', *args], cwd=REPO_ROOT, capture_output=True, text=True)
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    commit = git('rev-parse', '--short', 'HEAD')
+    status = git('status', '--porcelain', '--untracked-files=no')
+    return {'commit': commit, 'dirty': bool(status)}
+
+
+def clear_read_caches():
+    """清除行程內的檔案讀取快取，讓每次量測都重新讀檔"""
+    from heatmap_data import clear_partition_cache
+    from gpu_csv_reader import clear_schema_cache
+    clear_partition_cache()
+    clear_schema_cache()
+
+
+def close_figures():
+    import matplotlib.pyplot as plt
+    plt.close('all')
+
+
+class BenchmarkCase:
+    """單一規模的資料集與量測環境"""
+
+    def __init__(self, work_dir, nodes, days, gpus, users, interval, seed):
+        self.root = os.path.join(work_dir, f"n{nodes}_d{days}")
+        self.data_dir = os.path.join(self.root, 'data')
+        self.plots_dir = os.path.join(self.root, 'plots')
+        self.scratch_dir = os.path.join(self.root, 'scratch')
+        self.archive_dir = os.path.join(self.root, 'data_archive')
+        self.params = {'nodes': nodes, 'days': days, 'gpus': gpus, 'users': users,
+                       'interval': interval, 'seed': seed}
+        self.info = None
+
+    @property
+    def key(self):
+        p = self.params
+        return f"n{p['nodes']}_d{p['days']}_g{p['gpus']}_i{p['interval']}"
+
+    def generate(self):
+        p = self.params
+        os.makedirs(self.plots_dir, exist_ok=True)
+        self.info = generate_dataset(self.data_dir, p['nodes'], p['gpus'], p['days'], p['users'],
+                                     interval=p['interval'], seed=p['seed'], verbose=False)
+        return self.info
+
+    @property
+    def start_date(self):
+        return self.info['start_date']
+
+    @property
+    def end_date(self):
+        return self.info['end_date']
+
+    def dates(self):
+        start = datetime.strptime(self.start_date, DATE_FORMAT)
+        return [(start + timedelta(days=i)).strftime(DATE_FORMAT) for i in range(self.params['days'])]
+
+
+# ---------------------------------------------------------------------------
+# 各階段：setup(case) 回傳狀態（不計時），run(case, state) 回傳處理的項目數
+# ---------------------------------------------------------------------------
+
+def _collector(data_dir, nodes):
+    from daily_gpu_log import GPUDataCollector
+    with contextlib.redirect_stdout(io.StringIO()):
+        collector = GPUDataCollector(data_dir)
+    collector.ip_name_map = {f"node-{i}": node for i, node in enumerate(nodes)}
+    return collector
+
+
+def setup_collector_write(case):
+    """把第一天的資料轉回 Netdata API 回傳的 JSON 格式"""
+    from columnar_csv import read_gpu_columns
+    date_str = case.start_date
+    payloads = []
+    for node in case.info['nodes']:
+        for gpu_index in range(case.params['gpus']):
+            path = os.path.join(case.data_dir, node, date_str, f"gpu{gpu_index}_{date_str}.csv")
+            columns = read_gpu_columns(path)
+            timestamps = [int(ts) for ts in columns.timestamp]
+            usage = {'data': [[ts, value] for ts, value in zip(timestamps, columns.usage)]}
+            vram = {'data': [[ts, value] for ts, value in zip(timestamps, columns.vram)]}
+            payloads.append((node, gpu_index, usage, vram))
+    collector = _collector(case.scratch_dir, case.info['nodes'])
+    return collector, date_str, payloads
+
+
+def run_collector_write(case, state):
+    collector, date_str, payloads = state
+    for node, gpu_index, usage, vram in payloads:
+        outdir = Path(case.scratch_dir) / node / date_str
+        outdir.mkdir(parents=True, exist_ok=True)
+        final_csv = outdir / f"gpu{gpu_index}_{date_str}.csv"
+        collector.write_gpu_csv(usage, vram, outdir / f"gpu{gpu_index}_{date_str}.tmp", final_csv)
+    return len(payloads)
+
+
+def setup_collector_average(case):
+    # 在 scratch 目錄計算：calculate_averages 會以「未使用」覆寫使用者欄位
+    for node in case.info['nodes']:
+        source = os.path.join(case.data_dir, node, case.start_date)
+        target = os.path.join(case.scratch_dir, node, case.start_date)
+        if not os.path.isdir(target):
+            shutil.copytree(source, target)
+    return _collector(case.scratch_dir, case.info['nodes'])
+
+
+def run_collector_average(case, collector):
+    collector.calculate_averages(case.start_date)
+    return len(case.info['nodes'])
+
+
+def _query(case, use_index):
+    from get_user_gpu_usage import UserGPUUsageQuery
+    query = UserGPUUsageQuery(case.data_dir, case.plots_dir, use_index=use_index)
+    query.nodes = list(case.info['nodes'])
+    return query
+
+
+def run_query_scan(case, _state):
+    records = _query(case, False).query_user_gpu_usage(case.info['users'][0], case.start_date, case.end_date)
+    return len(records)
+
+
+def run_index_rebuild(case, _state):
+    from user_index import UserIndex
+    UserIndex(case.data_dir).rebuild()
+    return len(case.info['nodes']) * case.params['days']
+
+
+def run_query_indexed(case, _state):
+    records = _query(case, True).query_user_gpu_usage(case.info['users'][0], case.start_date, case.end_date)
+    return len(records)
+
+
+def run_list_users(case, _state):
+    _query(case, False).list_all_users(case.end_date)
+    return len(case.info['nodes'])
+
+
+def run_dataset_load(case, _state):
+    from gpu_dataset import GPUDataset
+    dataset = GPUDataset(case.data_dir, case.start_date, case.end_date, nodes=case.info['nodes'])
+    return len(dataset.date_strs) * len(dataset.nodes)
+
+
+def run_gpu_series_load(case, _state):
+    from gpu_trend_visualizer import GPUTrendVisualizer
+    visualizer = GPUTrendVisualizer(case.data_dir)
+    rows = 0
+    for date_str in case.dates():
+        df = visualizer.load_gpu_data(RENDER_NODES[0], 0, date_str)
+        rows += 0 if df is None else len(df)
+    return rows
+
+
+def setup_render_dataset(case):
+    from gpu_dataset import GPUDataset
+    return GPUDataset(case.data_dir, case.start_date, case.end_date, nodes=RENDER_NODES)
+
+
+def run_nodes_trend(case, dataset):
+    from quick_gpu_trend_plots import quick_nodes_trend
+    quick_nodes_trend(case.start_date, case.end_date, case.data_dir, case.plots_dir, dataset=dataset)
+    return 1
+
+
+def run_gpu_heatmap(case, dataset):
+    from quick_gpu_trend_plots import quick_gpu_heatmap
+    quick_gpu_heatmap(case.start_date, case.end_date, case.data_dir, case.plots_dir, dataset=dataset)
+    return 1
+
+
+def run_vram_heatmap(case, dataset):
+    from vram_monitor import VRAMMonitor
+    VRAMMonitor(case.data_dir, case.plots_dir).plot_vram_heatmap(case.start_date, case.end_date, dataset=dataset)
+    return 1
+
+
+def run_single_gpu_trend(case, _state):
+    from gpu_trend_visualizer import GPUTrendVisualizer
+    visualizer = GPUTrendVisualizer(case.data_dir)
+    save_path = os.path.join(case.plots_dir, 'bench_single_gpu_trend.png')
+    visualizer.plot_single_gpu_trend(RENDER_NODES[0], 0, case.start_date, case.end_date, save_path=save_path)
+    return 1
+
+
+def run_detailed_timeline(case, _state):
+    from advanced_gpu_trend_analyzer import GPUUsageTrendAnalyzer
+    GPUUsageTrendAnalyzer(case.data_dir, case.plots_dir).plot_detailed_timeline(RENDER_NODES[0], 0, case.end_date)
+    return 1
+
+
+def run_archive_scan(case, _state):
+    from archive_data import archive_node_data
+    archive_node_data(case.data_dir, case.archive_dir, case.end_date[:7], True)
+    return len(case.info['nodes'])
+
+
+def _raw_partitions(case):
+    return sum(len(os.listdir(os.path.join(case.data_dir, node))) for node in case.info['nodes'])
+
+
+def run_retention(case, _state):
+    import retention_policy
+    # 只保留最後一半的原始分區，其餘壓縮成 hourly/daily 彙整後封存
+    keep_days = max(1, case.params['days'] // 2)
+    today = (datetime.strptime(case.end_date, DATE_FORMAT) + timedelta(days=1)).strftime(DATE_FORMAT)
+    before = _raw_partitions(case)
+    retention_policy.main(['--data-dir', case.data_dir, '--archive-dir', case.archive_dir,
+                           '--policy', f"raw={keep_days}d", '--today', today])
+    return before - _raw_partitions(case)
+
+
+def run_archive_move(case, _state):
+    from archive_data import archive_node_data
+    # 保留政策執行後仍留在原始層的最後一個月份
+    before = _raw_partitions(case)
+    archive_node_data(case.data_dir, case.archive_dir, case.end_date[:7], False)
+    return before - _raw_partitions(case)
+
+
+# (名稱, 分組, setup, run, 是否可重複執行)
+STAGES = [
+    ('collector.write_gpu_csv', 'collector', setup_collector_write, run_collector_write, True),
+    ('collector.calculate_averages', 'collector', setup_collector_average, run_collector_average, True),
+    ('query.scan', 'query', None, run_query_scan, True),
+    ('query.index_rebuild', 'query', None, run_index_rebuild, True),
+    ('query.indexed', 'query', None, run_query_indexed, True),
+    ('query.list_users', 'query', None, run_list_users, True),
+    ('load.dataset', 'load', None, run_dataset_load, True),
+    ('load.gpu_series', 'load', None, run_gpu_series_load, True),
+    ('render.nodes_trend', 'render', setup_render_dataset, run_nodes_trend, True),
+    ('render.gpu_heatmap', 'render', setup_render_dataset, run_gpu_heatmap, True),
+    ('render.vram_heatmap', 'render', setup_render_dataset, run_vram_heatmap, True),
+    ('render.single_gpu_trend', 'render', None, run_single_gpu_trend, True),
+    ('render.detailed_timeline', 'render', None, run_detailed_timeline, True),
+    ('archive.scan_dry_run', 'archive', None, run_archive_scan, True),
+    # 以下會搬移或刪除資料，只執行一次
+    ('archive.retention', 'archive', None, run_retention, False),
+    ('archive.move_month', 'archive', None, run_archive_move, False),
+]
+
+
+def run_stage(case, setup, run, repeat):
+    """
+    Returns:
+        dict: 各次秒數的中位數、最小值、項目數；失敗時含 error
+    """
+    samples, items = [], 0
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            state = setup(case) if setup else None
+            for _ in range(repeat):
+                clear_read_caches()
+                start = time.perf_counter()
+                items = run(case, state)
+                samples.append(time.perf_counter() - start)
+                close_figures()
+    except Exception as e:
+        close_figures()
+        return {'error': f"{type(e).__name__}: {e}"}
+    return {'median_s': statistics.median(samples), 'min_s': min(samples), 'runs': len(samples), 'items': items}
+
+
+def run_case(case, stage_filter, repeat):
+    """
+    產生資料集並執行所選階段
+
+    Returns:
+        dict: 規模參數、資料集資訊與各階段結果
+    """
+    print(f"\n▶ {case.params['nodes']} 節點 × {case.params['days']} 天 × {case.params['gpus']} GPU")
+    info = case.generate()
+    print(f"  產生資料: {info['files']} 個檔案、{info['bytes'] / 1024 / 1024:.1f} MB，"
+          f"耗時 {info['seconds']:.1f}s")
+    result = {'key': case.key, 'params': case.params,
+              'dataset': {'files': info['files'], 'samples': info['samples'], 'bytes': info['bytes'],
+                          'generate_s': info['seconds']},
+              'stages': {}}
+
+    for name, group, setup, run, repeatable in STAGES:
+        if stage_filter and group not in stage_filter and name not in stage_filter:
+            continue
+        stage = run_stage(case, setup, run, repeat if repeatable else 1)
+        result['stages'][name] = stage
+        if 'error' in stage:
+            print(f"  {name:<32} 失敗: {stage['error']}")
+        else:
+            print(f"  {name:<32} {stage['median_s'] * 1000:>10.1f} ms  (最小 {stage['min_s'] * 1000:.1f} ms, "
+                  f"{stage['items']} 項)")
+    return result
+
+
+def compare_results(current, baseline):
+    """
+    逐項比較兩次結果（以規模與階段名稱對應）
+
+    Returns:
+        int: 變慢超過 REGRESSION_RATIO 的項目數
+    """
+    baseline_cases = {case['key']: case for case in baseline.get('cases', [])}
+    base_rev = baseline.get('meta', {}).get('git', {}).get('commit')
+    new_rev = current.get('meta', {}).get('git', {}).get('commit')
+    print(f"\n比較: {base_rev} → {new_rev}（比值 > {REGRESSION_RATIO:.2f} 標記為變慢）")
+    print("=" * 84)
+    print(f"{'規模':<22} {'階段':<30} {'基準(ms)':>10} {'目前(ms)':>10} {'比值':>7}")
+    print("-" * 84)
+    regressions = 0
+    for case in current.get('cases', []):
+        base_case = baseline_cases.get(case['key'])
+        if base_case is None:
+            print(f"{case['key']:<22} 基準結果中沒有此規模")
+            continue
+        for name, stage in case['stages'].items():
+            base_stage = base_case['stages'].get(name)
+            if not base_stage or 'median_s' not in base_stage or 'median_s' not in stage:
+                continue
+            ratio = stage['median_s'] / base_stage['median_s'] if base_stage['median_s'] > 0 else float('inf')
+            flag = ''
+            if ratio > REGRESSION_RATIO:
+                flag = '  ⚠ 變慢'
+                regressions += 1
+            print(f"{case['key']:<22} {name:<30} {base_stage['median_s'] * 1000:>10.1f} "
+                  f"{stage['median_s'] * 1000:>10.1f} {ratio:>7.2f}{flag}")
+    print("-" * 84)
+    print(f"變慢項目: {regressions}")
+    return regressions
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description='以合成資料量測收集、查詢、繪圖與封存各階段的耗時')
+    parser.add_argument('--preset', choices=sorted(PRESETS), help='預設規模 (smoke: 4 節點 × 30 天)')
+    parser.add_argument('--nodes', type=parse_int_list, help='節點數列表，逗號分隔 (預設: 4,32,128)')
+    parser.add_argument('--days', type=parse_int_list, help='天數列表，逗號分隔 (預設: 30,365,1095)')
+    parser.add_argument('--gpus', type=int, default=8, help='每個節點的 GPU 數 (預設: 8)')
+    parser.add_argument('--users', type=int, default=12, help='使用者人數 (預設: 12)')
+    parser.add_argument('--interval', type=int, default=600, help='取樣間隔秒數 (預設: 600)')
+    parser.add_argument('--seed', type=int, default=0, help='亂數種子 (預設: 0)')
+    parser.add_argument('--repeat', type=int, default=3, help='每個階段的重複次數（取中位數），預設 3')
+    parser.add_argument('--stages', help=f"只執行指定的分組或階段，逗號分隔 ({', '.join(STAGE_GROUPS)})")
+    parser.add_argument('--profile', default='preview', help='出圖設定檔 (預設: preview)')
+    parser.add_argument('--work-dir', help='資料集產生位置 (預設: 暫存目錄)')
+    parser.add_argument('--keep-data', action='store_true', help='保留產生的資料集')
+    parser.add_argument('--json', metavar='FILE', help='將結果寫入 JSON 檔')
+    parser.add_argument('--compare', metavar='FILE', help='與先前的 JSON 結果比較')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    preset_nodes, preset_days = PRESETS[args.preset or 'default']
+    node_counts = args.nodes or preset_nodes
+    day_counts = args.days or preset_days
+    stage_filter = set(s.strip() for s in args.stages.split(',')) if args.stages else None
+    if min(node_counts + day_counts + [args.gpus, args.users, args.repeat]) < 1:
+        print("錯誤: 節點數、天數、GPU 數、使用者人數與重複次數必須為正整數")
+        return 1
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"錯誤: 無法讀取基準結果 {args.compare}: {e}")
+            return 1
+
+    from render_profiles import set_profile
+    set_profile(args.profile)
+
+    samples_per_day = 86400 // args.interval
+    estimate = sum(n * d * args.gpus * samples_per_day * BYTES_PER_SAMPLE for n in node_counts for d in day_counts)
+    print(f"資料處理流程基準測試 (Python {sys.version.split()[0]}，每階段 {args.repeat} 次取中位數)")
+    print(f"規模: 節點 {node_counts} × 天數 {day_counts}，預估資料量 {estimate / 1024 ** 3:.1f} GB")
+
+    meta = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git': git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'profile': args.profile,
+    }
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='gpu_bench_')
+    cases = []
+    try:
+        for nodes in node_counts:
+            for days in day_counts:
+                case = BenchmarkCase(work_dir, nodes, days, args.gpus, args.users, args.interval, args.seed)
+                try:
+                    cases.append(run_case(case, stage_filter, args.repeat))
+                finally:
+                    if not args.keep_data:
+                        shutil.rmtree(case.root, ignore_errors=True)
+    finally:
+        if args.keep_data:
+            print(f"\n資料集保留於: {work_dir}")
+        elif not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    result = {'meta': meta, 'cases': cases}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n結果已寫入 {args.json}")
+    if baseline is not None:
+        compare_results(result, baseline)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
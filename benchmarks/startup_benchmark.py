@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+啟動時間基準測試
+
+在全新的 Python 行程中量測各進入點的匯入時間與文字命令的總執行時間，
+並列出該行程載入了哪些重量級套件（pandas、matplotlib、seaborn）。
+純文字命令（查詢、列出使用者、說明）不應載入繪圖套件。
+
+使用範例:
+    python3 benchmarks/startup_benchmark.py
+    python3 benchmarks/startup_benchmark.py --repeat 7 --data-dir ./data --date 2025-09-15
+    python3 benchmarks/startup_benchmark.py --json startup.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VISUALIZATION_DIR = os.path.join(REPO_ROOT, 'visualization')
+
+HEAVY_MODULES = ('pandas', 'matplotlib', 'matplotlib.pyplot', 'seaborn')
+
+# (名稱, 工作目錄, 模組名稱)
+IMPORT_TARGETS = [
+    ('import get_user_gpu_usage', REPO_ROOT, 'get_user_gpu_usage'),
+    ('import colab_gpu_stats', REPO_ROOT, 'colab_gpu_stats'),
+    ('import gpu_accounting', REPO_ROOT, 'gpu_accounting'),
+    ('import quick_gpu_trend_plots', VISUALIZATION_DIR, 'quick_gpu_trend_plots'),
+    ('import vram_monitor', VISUALIZATION_DIR, 'vram_monitor'),
+    ('import advanced_gpu_trend_analyzer', VISUALIZATION_DIR, 'advanced_gpu_trend_analyzer'),
+    ('import gpu_trend_visualizer', VISUALIZATION_DIR, 'gpu_trend_visualizer'),
+]
+
+IMPORT_PROBE = """
+import sys, time, json
+sys.path.insert(0, {cwd!r})
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def command_targets(data_dir, date_str):
+    """
+    文字命令（含直譯器啟動的總時間）
+
+    Returns:
+        list: (名稱, 工作目錄, argv)
+    """
+    query = [sys.executable, 'get_user_gpu_usage.py']
+    targets = [
+        ('get_user_gpu_usage.py --help', REPO_ROOT, query + ['--help']),
+        ('gpu_accounting.py --help', REPO_ROOT, [sys.executable, 'gpu_accounting.py', '--help']),
+    ]
+    if data_dir and date_str:
+        targets += [
+            ('get_user_gpu_usage.py --list-users', REPO_ROOT,
+             query + ['--list-users', date_str, '--data-dir', data_dir, '--plots-dir', os.devnull + '.d']),
+            ('colab_gpu_stats.py summary', REPO_ROOT,
+             [sys.executable, 'colab_gpu_stats.py', 'summary', date_str, '--data-dir', data_dir]),
+        ]
+    return targets
+
+
+def measure_import(cwd, module, repeat):
+    """
+    Returns:
+        tuple: (各次匯入秒數列表, 載入的重量級套件)
+    """
+    code = IMPORT_PROBE.format(cwd=cwd, module=module, heavy=HEAVY_MODULES)
+    samples, heavy = [], []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-c', code], cwd=cwd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else 'import failed')
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        samples.append(report['seconds'])
+        heavy = report['heavy']
+    return samples, heavy
+
+
+def measure_command(cwd, argv, repeat):
+    """
+    Returns:
+        list: 各次執行的總秒數（包含直譯器啟動）
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(argv, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='量測各進入點的匯入與啟動時間')
+    parser.add_argument('--repeat', type=int, default=5, help='每個項目的重複次數（取中位數），預設 5')
+    parser.add_argument('--data-dir', help='文字命令使用的資料目錄（未指定時略過需要資料的命令）')
+    parser.add_argument('--date', help='文字命令使用的日期 (YYYY-MM-DD)')
+    parser.add_argument('--json', metavar='FILE', help='另外將結果寫入 JSON 檔')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    env_note = f"Python {sys.version.split()[0]}，每項 {args.repeat} 次取中位數"
+    print(f"啟動時間基準測試 ({env_note})")
+    print("=" * 88)
+    print(f"{'項目':<40} {'中位數(ms)':>11} {'最小(ms)':>10}  載入的重量級套件")
+    print("-" * 88)
+
+    results = []
+    for name, cwd, module in IMPORT_TARGETS:
+        try:
+            samples, heavy = measure_import(cwd, module, args.repeat)
+        except RuntimeError as e:
+            print(f"{name:<40} {'失敗':>11}  {e}")
+            continue
+        results.append({'name': name, 'kind': 'import', 'median_ms': statistics.median(samples) * 1000,
+                        'min_ms': min(samples) * 1000, 'heavy_modules': heavy})
+
+    data_dir = os.path.abspath(args.data_dir) if args.data_dir else None
+    for name, cwd, argv in command_targets(data_dir, args.date):
+        samples = measure_command(cwd, argv, args.repeat)
+        results.append({'name': name, 'kind': 'command', 'median_ms': statistics.median(samples) * 1000,
+                        'min_ms': min(samples) * 1000, 'heavy_modules': None})
+
+    for r in results:
+        heavy = ', '.join(r['heavy_modules']) if r['heavy_modules'] else ('-' if r['heavy_modules'] is not None else '')
+        print(f"{r['name']:<40} {r['median_ms']:>11.1f} {r['min_ms']:>10.1f}  {heavy}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'repeat': args.repeat, 'results': results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\n結果已寫入 {args.json}")
+
+
+if __name__ == '__main__':
+    main()
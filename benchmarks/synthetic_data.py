@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成 GPU 資料產生器
+
+依收集器 (python/daily_gpu_log.py) 的輸出格式產生 data/<節點>/<日期>/ 分區：
+- gpu{i}_{date}.csv: 時間戳,日期時間,GPU使用率(%),VRAM使用率(%)（每 10 分鐘一筆，台灣時間）
+- average_{date}.csv: GPU編號,平均GPU使用率(%),平均VRAM使用率(%),使用者（含「全部平均」列）
+
+節點命名為 colab-gpu1 ~ colab-gpuN，與正式環境相同的前 4 個節點可直接被各繪圖工具讀取。
+每張 GPU 由使用者以數天為單位的任務輪流配置，任務期間的使用率有日夜週期與雜訊，
+閒置期間使用者為「未使用」、使用率接近 0。相同參數與 seed 產生的資料完全相同。
+
+使用範例:
+    python3 benchmarks/synthetic_data.py --output /tmp/gpu_data --nodes 4 --days 30
+    python3 benchmarks/synthetic_data.py --output /tmp/gpu_data --nodes 32 --days 365 --users 40 --seed 7
+"""
+
+import os
+import time
+import argparse
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+TAIWAN_TZ = timezone(timedelta(hours=8))
+DATE_FORMAT = '%Y-%m-%d'
+
+GPU_HEADER = "時間戳,日期時間,GPU使用率(%),VRAM使用率(%)\n"
+AVERAGE_HEADER = "GPU編號,平均GPU使用率(%),平均VRAM使用率(%),使用者\n"
+IDLE_USER = '未使用'
+
+USER_NAMES = ['alice', 'bob', 'carol', 'dave', 'erin', 'frank', 'grace', 'heidi',
+              'ivan', 'judy', 'mallory', 'niaj', 'olivia', 'peggy', 'rupert', 'sybil']
+
+# 任務長度（天）與任務之間的閒置天數
+JOB_DAYS = (1, 10)
+IDLE_DAYS = (0, 4)
+# 閒置機率：每個任務結束後有此機率進入閒置
+IDLE_PROBABILITY = 0.35
+
+
+def node_names(count):
+    """
+    Returns:
+        list: colab-gpu1 ~ colab-gpu{count}
+    """
+    return [f"colab-gpu{i}" for i in range(1, count + 1)]
+
+
+def user_names(count):
+    """
+    Returns:
+        list: 前 16 位使用固定名稱，其餘為 user017、user018 ...
+    """
+    return [USER_NAMES[i] if i < len(USER_NAMES) else f"user{i + 1:03d}" for i in range(count)]
+
+
+def date_strings(start_date, days):
+    start = datetime.strptime(start_date, DATE_FORMAT)
+    return [(start + timedelta(days=offset)).strftime(DATE_FORMAT) for offset in range(days)]
+
+
+def allocation_schedule(rng, days, users):
+    """
+    單張 GPU 每天的使用者與任務強度
+
+    Returns:
+        tuple: (使用者列表，閒置為 None；每天的任務平均使用率)
+    """
+    owners, levels = [], []
+    while len(owners) < days:
+        if owners and rng.random() < IDLE_PROBABILITY:
+            span = int(rng.integers(IDLE_DAYS[0], IDLE_DAYS[1] + 1))
+            owners += [None] * span
+            levels += [0.0] * span
+            continue
+        span = int(rng.integers(JOB_DAYS[0], JOB_DAYS[1] + 1))
+        owners += [users[int(rng.integers(len(users)))]] * span
+        levels += [float(rng.uniform(15, 95))] * span
+    return owners[:days], np.array(levels[:days])
+
+
+class DayClock:
+    """一天內每筆樣本的時間戳與日期時間字串（每個日期只計算一次）"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = 86400 // interval
+        self.offsets = np.arange(self.samples) * interval
+        self.time_labels = [f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}" for s in self.offsets]
+        # 日夜週期：台灣時間下午最忙、清晨最閒
+        self.diurnal = np.sin((self.offsets / 86400.0 - 0.375) * 2 * np.pi)
+
+    def day(self, date_str):
+        """
+        Returns:
+            tuple: (時間戳陣列, 日期時間字串列表)
+        """
+        start = int(datetime.strptime(date_str, DATE_FORMAT).replace(tzinfo=TAIWAN_TZ).timestamp())
+        return start + self.offsets, [f"{date_str} {label}" for label in self.time_labels]
+
+
+def gpu_samples(rng, clock, level, active):
+    """
+    Returns:
+        tuple: (GPU 使用率陣列, VRAM 使用率陣列)
+    """
+    n = clock.samples
+    if active:
+        usage = level + 15 * clock.diurnal + rng.normal(0, 8, n)
+        vram = min(95.0, level * 0.6 + 20) + rng.normal(0, 3, n)
+    else:
+        usage = np.where(rng.random(n) < 0.03, rng.uniform(0, 20, n), 0.0)
+        vram = rng.uniform(0, 2, n)
+    return np.clip(usage, 0, 100).round(2), np.clip(vram, 0, 100).round(2)
+
+
+def write_gpu_file(path, timestamps, labels, usage, vram):
+    rows = [f'{ts},"{label}",{u:.2f},{v:.2f}\n' for ts, label, u, v in zip(timestamps, labels, usage, vram)]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(GPU_HEADER)
+        f.writelines(rows)
+
+
+def write_average_file(path, averages):
+    """
+    Args:
+        averages (list): (GPU 索引, 平均使用率, 平均 VRAM 使用率, 使用者)
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(AVERAGE_HEADER)
+        for gpu_index, avg_gpu, avg_vram, user in averages:
+            f.write(f"GPU[{gpu_index}],{avg_gpu:.2f},{avg_vram:.2f},{user}\n")
+        overall_gpu = sum(a[1] for a in averages) / len(averages)
+        overall_vram = sum(a[2] for a in averages) / len(averages)
+        f.write(f"全部平均,{overall_gpu:.2f},{overall_vram:.2f},所有使用者\n")
+
+
+def generate_dataset(data_dir, nodes=4, gpus=8, days=30, users=12, start_date='2025-01-01',
+                     interval=600, seed=0, verbose=True):
+    """
+    產生合成資料集
+
+    Args:
+        data_dir (str): 輸出資料目錄（分區直接寫在其下）
+        nodes (int): 節點數
+        gpus (int): 每個節點的 GPU 數
+        days (int): 天數
+        users (int): 使用者人數
+        start_date (str): 第一天 (YYYY-MM-DD)
+        interval (int): 取樣間隔秒數（收集器為 600，即每天 144 筆）
+        seed (int): 亂數種子
+        verbose (bool): 是否顯示進度
+
+    Returns:
+        dict: 節點、日期範圍、使用者、檔案數、樣本數、位元組數與耗時
+    """
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    names = node_names(nodes)
+    dates = date_strings(start_date, days)
+    people = user_names(users)
+    clock = DayClock(interval)
+
+    schedules = {(node, gpu_index): allocation_schedule(rng, days, people)
+                 for node in names for gpu_index in range(gpus)}
+
+    files = size = 0
+    for day_pos, date_str in enumerate(dates):
+        timestamps, labels = clock.day(date_str)
+        for node in names:
+            partition = os.path.join(data_dir, node, date_str)
+            os.makedirs(partition, exist_ok=True)
+            averages = []
+            for gpu_index in range(gpus):
+                owners, levels = schedules[(node, gpu_index)]
+                owner = owners[day_pos]
+                usage, vram = gpu_samples(rng, clock, levels[day_pos], owner is not None)
+                path = os.path.join(partition, f"gpu{gpu_index}_{date_str}.csv")
+                write_gpu_file(path, timestamps, labels, usage, vram)
+                size += os.path.getsize(path)
+                averages.append((gpu_index, usage.mean(), vram.mean(), owner or IDLE_USER))
+            path = os.path.join(partition, f"average_{date_str}.csv")
+            write_average_file(path, averages)
+            size += os.path.getsize(path)
+            files += gpus + 1
+        if verbose and (day_pos + 1) % 30 == 0:
+            print(f"  已產生 {day_pos + 1}/{days} 天")
+
+    return {
+        'data_dir': data_dir,
+        'nodes': names,
+        'gpus': gpus,
+        'start_date': dates[0],
+        'end_date': dates[-1],
+        'users': people,
+        'files': files,
+        'samples': nodes * gpus * days * clock.samples,
+        'bytes': size,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description='產生與收集器格式相同的合成 GPU 資料')
+    parser.add_argument('--output', required=True, help='輸出資料目錄')
+    parser.add_argument('--nodes', type=int, default=4, help='節點數 (預設: 4)')
+    parser.add_argument('--gpus', type=int, default=8, help='每個節點的 GPU 數 (預設: 8)')
+    parser.add_argument('--days', type=int, default=30, help='天數 (預設: 30)')
+    parser.add_argument('--users', type=int, default=12, help='使用者人數 (預設: 12)')
+    parser.add_argument('--start-date', default='2025-01-01', help='第一天 (預設: 2025-01-01)')
+    parser.add_argument('--interval', type=int, default=600, help='取樣間隔秒數 (預設: 600)')
+    parser.add_argument('--seed', type=int, default=0, help='亂數種子 (預設: 0)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    try:
+        datetime.strptime(args.start_date, DATE_FORMAT)
+    except ValueError:
+        print(f"錯誤: 日期格式錯誤: {args.start_date}，請使用 YYYY-MM-DD")
+        return 1
+    if min(args.nodes, args.gpus, args.days, args.users) < 1 or not 0 < args.interval <= 86400:
+        print("錯誤: 節點、GPU、天數與使用者人數必須為正整數，取樣間隔需介於 1 到 86400 秒")
+        return 1
+
+    print(f"產生合成資料: {args.nodes} 節點 × {args.gpus} GPU × {args.days} 天 → {args.output}")
+    result = generate_dataset(args.output, args.nodes, args.gpus, args.days, args.users,
+                              args.start_date, args.interval, args.seed)
+    print(f"完成: {result['files']} 個檔案、{result['samples']} 筆樣本、"
+          f"{result['bytes'] / 1024 / 1024:.1f} MB，耗時 {result['seconds']:.1f}s")
+    print(f"日期範圍: {result['start_date']} 至 {result['end_date']}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,755 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GPU 容量預測工具
+
+以每日資料預測各節點與全部節點未來數週的 GPU 使用率與配置 GPU 數（有使用者的 GPU 數），
+並附上信賴區間，取代以 colab_gpu_stats 匯出檔人工判斷採購時機的作法。
+
+模型（所有序列共用同一組特徵，以遮罩最小平方法一次擬合）:
+    y = 截距 + 線性趨勢 + 星期效應 + 年週期與半年週期（上下學期）的傅立葉項
+- 資料少於 3 週時不估計星期效應，少於一年時不估計學期季節性
+- 預測區間以殘差變異數與參數不確定性計算，使用率限制在 0-100%，配置數限制在 0 到容量之間
+- 尖峰小時預估 = 每日預測 × 近 8 週該星期「尖峰小時 / 全日平均」的比例（每小時資料來自 trend_stats 的分區快取）
+
+增量更新：狀態檔保存歷史視窗內每個 (節點, 日期) 的數值、來源檔簽章與各序列的正規方程式累加量
+(XᵀX、Xᵀy)。每次執行只讀取新增或變動的檔案，只對變動的日期加減其貢獻，
+因此 collect 每晚更新預測只需讀取當天的平均檔。每 REFIT_INTERVAL 次增量更新會以保存的數值重新累加一次。
+
+資料來源：average_{date}.csv；已被保留政策移除的日期改讀 data/rollups/daily 的每日彙總。
+
+輸出（預設位於 <資料目錄>/forecast/）:
+- forecast_state.npz: 增量狀態
+- capacity_forecast.csv: 每個序列每天的預測值、信賴區間、尖峰小時預估與容量
+
+使用範例:
+    python3 capacity_forecast.py
+    python3 capacity_forecast.py --horizon 12w --level 80
+    python3 capacity_forecast.py --history 3y --until 2025-09-30 --rebuild
+"""
+
+import os
+import re
+import sys
+import csv
+import argparse
+from collections import namedtuple
+from datetime import datetime, timedelta
+from statistics import NormalDist
+
+import numpy as np
+
+from colab_gpu_stats import (
+    COLAB_NODES, DATE_FORMAT, DEFAULT_DATA_DIR, date_range,
+    print_info, print_success, print_error, print_warning,
+)
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'visualization'))
+from columnar_csv import read_average_columns
+from trend_stats import build_hourly_cube, hour_weekday_profile, nan_mean, display_ljust
+
+GPUS_PER_NODE = 8
+
+DEFAULT_HORIZON_DAYS = 56
+DEFAULT_HISTORY_DAYS = 730
+DEFAULT_LEVEL = 95.0
+
+# 估計星期效應與學期季節性所需的最短歷史天數
+WEEKLY_MIN_DAYS = 21
+ANNUAL_MIN_DAYS = 365
+# 年週期的諧波數：1 為一年一次的循環，2 加上半年一次（上下學期）
+ANNUAL_HARMONICS = 2
+YEAR_DAYS = 365.25
+
+# 增量更新累積的浮點誤差：每隔此次數以保存的數值重新累加
+REFIT_INTERVAL = 30
+# 數值穩定用的脊迴歸係數（相對於 XᵀX 對角線）
+RIDGE = 1e-8
+
+# 尖峰小時比例使用的近期週數
+PEAK_PROFILE_WEEKS = 8
+# 預估使用率達到此值時提示
+UTILIZATION_ALERT = 80.0
+# 報告中的「近期平均」天數
+RECENT_DAYS = 28
+
+# 不計入配置的使用者名稱
+INACTIVE_USERS = ('', '未使用', '未知', 'nan', 'N/A')
+
+STATE_VERSION = 1
+FORECAST_DIR = 'forecast'
+STATE_FILE = 'forecast_state.npz'
+FORECAST_FILE = 'capacity_forecast.csv'
+FORECAST_HEADER = ['日期', '序列', '指標', '預測值', '下界', '上界', '尖峰小時預估', '容量']
+
+METRICS = (('usage', 'GPU使用率(%)'), ('allocated', '配置GPU數'))
+FLEET_LABEL = '全部節點'
+
+GPU_LABEL_RE = re.compile(r'(\d+)')
+# 每日彙總: 日期,GPU編號,平均GPU使用率(%),平均VRAM使用率(%),最大GPU使用率(%),最大VRAM使用率(%),樣本數,使用者
+DAILY_ROLLUP_COLUMNS = {'date': 0, 'gpu': 1, 'usage': 2, 'user': 7}
+
+# 每日彙總檔 -> (簽章, {日期: (使用率加總, 使用率筆數, 配置 GPU 數)})
+_rollup_cache = {}
+
+# 各陣列的第一軸為序列（順序同 labels），第二軸為預測日期
+Forecast = namedtuple('Forecast', [
+    'history_start', 'history_end', 'spec', 'dates', 'labels', 'metrics', 'capacity',
+    'mean', 'lower', 'upper', 'peak', 'recent', 'slope_per_week', 'observations', 'level',
+])
+
+
+def parse_days(value):
+    """
+    解析天數
+
+    Args:
+        value (str): 數字（天）或加上單位 d/w/m/y，例如 56、8w、6m、2y
+
+    Returns:
+        int: 天數
+    """
+    text = str(value).strip().lower()
+    units = {'d': 1, 'w': 7, 'm': 30, 'y': 365}
+    scale = units.get(text[-1:], None)
+    number = text[:-1] if scale is not None else text
+    try:
+        days = int(round(float(number) * (scale or 1)))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"天數格式錯誤: {value}，請使用 56、8w、6m 或 2y")
+    if days <= 0:
+        raise argparse.ArgumentTypeError("天數必須大於 0")
+    return days
+
+
+def _shift_date(date_str, days):
+    return (datetime.strptime(date_str, DATE_FORMAT) + timedelta(days=days)).strftime(DATE_FORMAT)
+
+
+def _day_number(date_str, origin):
+    return (datetime.strptime(date_str, DATE_FORMAT) - datetime.strptime(origin, DATE_FORMAT)).days
+
+
+def _stat_signature(prefix, path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ''
+    return f"{prefix}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+# ---------------------------------------------------------------------------
+# 每日資料
+# ---------------------------------------------------------------------------
+
+def _average_path(data_dir, node, date_str):
+    return os.path.join(data_dir, node, date_str, f"average_{date_str}.csv")
+
+
+def _rollup_path(data_dir, node, date_str):
+    return os.path.join(data_dir, 'rollups', 'daily', node, f"daily_{date_str[:4]}.csv")
+
+
+def day_signature(data_dir, node, date_str):
+    """
+    Returns:
+        str: 該日資料來源的簽章（平均檔優先，其次為每日彙總），沒有資料時為空字串
+    """
+    signature = _stat_signature('avg', _average_path(data_dir, node, date_str))
+    if signature:
+        return signature
+    rollup = _stat_signature('rollup', _rollup_path(data_dir, node, date_str))
+    # 彙總檔涵蓋整年，只有檔案中確實有該日時才算有資料
+    if rollup and date_str in _read_rollup(_rollup_path(data_dir, node, date_str), rollup):
+        return rollup
+    return ''
+
+
+def _allocated(users):
+    return sum(1 for user in users if user not in INACTIVE_USERS)
+
+
+def _read_rollup(path, signature):
+    cached = _rollup_cache.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    days = {}
+    columns = DAILY_ROLLUP_COLUMNS
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if len(row) <= max(columns.values()) or not GPU_LABEL_RE.search(row[columns['gpu']]):
+                continue
+            try:
+                usage = float(row[columns['usage']])
+            except ValueError:
+                usage = np.nan
+            usage_sum, usage_count, allocated = days.get(row[columns['date']], (0.0, 0, 0))
+            if not np.isnan(usage):
+                usage_sum += usage
+                usage_count += 1
+            allocated += _allocated([row[columns['user']].strip()])
+            days[row[columns['date']]] = (usage_sum, usage_count, allocated)
+    _rollup_cache[path] = (signature, days)
+    return days
+
+
+def read_node_day(data_dir, node, date_str, signature):
+    """
+    讀取單一 (節點, 日期) 的 GPU 使用率加總、筆數與配置 GPU 數
+
+    Args:
+        signature (str): day_signature() 的結果，決定讀取平均檔或每日彙總
+
+    Returns:
+        tuple: (使用率加總, 使用率筆數, 配置 GPU 數)，沒有資料時為 None
+    """
+    if signature.startswith('avg:'):
+        columns = read_average_columns(_average_path(data_dir, node, date_str))
+        rows = [i for i, label in enumerate(columns.gpu) if GPU_LABEL_RE.search(label)]
+        usage = np.array([columns.usage[i] for i in rows], dtype=float)
+        valid = ~np.isnan(usage)
+        return float(usage[valid].sum()), int(valid.sum()), _allocated(columns.user[i] for i in rows)
+    if signature.startswith('rollup:'):
+        return _read_rollup(_rollup_path(data_dir, node, date_str), signature).get(date_str)
+    return None
+
+
+# ---------------------------------------------------------------------------
+# 模型
+# ---------------------------------------------------------------------------
+
+def choose_spec(span_days):
+    """
+    依歷史長度決定模型特徵
+
+    Returns:
+        tuple: (是否估計星期效應, 年週期諧波數)
+    """
+    return (span_days >= WEEKLY_MIN_DAYS, ANNUAL_HARMONICS if span_days >= ANNUAL_MIN_DAYS else 0)
+
+
+def design_matrix(day_numbers, origin_weekday, spec):
+    """
+    Args:
+        day_numbers (numpy.ndarray): 距離原點的天數
+        origin_weekday (int): 原點的星期（0 = 週一）
+        spec (tuple): choose_spec() 的結果
+
+    Returns:
+        numpy.ndarray: [天數, 特徵數] 的特徵矩陣：截距、趨勢（每年）、星期二至日、傅立葉項
+    """
+    t = np.asarray(day_numbers, dtype=float)
+    columns = [np.ones_like(t), t / YEAR_DAYS]
+    weekly, harmonics = spec
+    if weekly:
+        weekday = (origin_weekday + t.astype(int)) % 7
+        columns += [(weekday == w).astype(float) for w in range(1, 7)]
+    for k in range(1, harmonics + 1):
+        angle = 2 * np.pi * k * t / YEAR_DAYS
+        columns += [np.sin(angle), np.cos(angle)]
+    return np.column_stack(columns)
+
+
+def accumulate(stats, features, values, sign=1.0):
+    """
+    將多天的資料加入（或以 sign=-1 移除）各序列的正規方程式累加量
+
+    Args:
+        stats (dict): xtx [序列, p, p]、xty [序列, p]、yty [序列]、n [序列]
+        features (numpy.ndarray): [天數, p]
+        values (numpy.ndarray): [序列, 天數]，缺資料為 NaN
+        sign (float): 1 加入、-1 移除
+    """
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+    mask = present.astype(float)
+    stats['xtx'] += sign * np.einsum('sd,dp,dq->spq', mask, features, features)
+    stats['xty'] += sign * filled @ features
+    stats['yty'] += sign * (filled * filled).sum(axis=1)
+    stats['n'] += sign * mask.sum(axis=1)
+
+
+def solve(stats):
+    """
+    批次解各序列的正規方程式
+
+    Returns:
+        tuple: (係數 [序列, p]、(XᵀX)⁻¹ [序列, p, p]、殘差變異數 [序列])，資料不足的序列為 NaN
+    """
+    xtx = stats['xtx']
+    p = xtx.shape[1]
+    scale = np.maximum(np.einsum('spp->sp', xtx).max(axis=1), 1.0)
+    regularized = xtx + RIDGE * scale[:, None, None] * np.eye(p)
+    inverse = np.linalg.inv(regularized)
+    beta = np.einsum('spq,sq->sp', inverse, stats['xty'])
+    dof = stats['n'] - p
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sigma2 = np.maximum(stats['yty'] - np.einsum('sp,sp->s', beta, stats['xty']), 0.0) / dof
+    usable = dof >= 1
+    beta[~usable] = np.nan
+    sigma2 = np.where(usable, sigma2, np.nan)
+    return beta, inverse, sigma2
+
+
+def _empty_stats(series, p):
+    return {'xtx': np.zeros((series, p, p)), 'xty': np.zeros((series, p)),
+            'yty': np.zeros(series), 'n': np.zeros(series)}
+
+
+class CapacityForecaster:
+    """以增量累加的最小平方法預測各節點與全部節點的使用率與配置需求"""
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, nodes=None, history_days=DEFAULT_HISTORY_DAYS,
+                 output_dir=None, gpus_per_node=GPUS_PER_NODE):
+        """
+        Args:
+            data_dir (str): 資料目錄
+            nodes (list): 節點名稱列表，預設為所有節點
+            history_days (int): 擬合使用的歷史天數
+            output_dir (str): 狀態與結果目錄，預設為 <data_dir>/forecast
+            gpus_per_node (int): 每個節點的 GPU 數（配置數的容量上限）
+        """
+        self.data_dir = data_dir
+        self.nodes = list(nodes or COLAB_NODES)
+        self.history_days = history_days
+        self.gpus_per_node = gpus_per_node
+        self.output_dir = output_dir or os.path.join(data_dir, FORECAST_DIR)
+        self.state_path = os.path.join(self.output_dir, STATE_FILE)
+        self.state = self._load_state()
+
+    # ------------------------------------------------------------------
+    # 序列
+    # ------------------------------------------------------------------
+
+    @property
+    def labels(self):
+        """
+        Returns:
+            list: (指標, 序列名稱, 容量) 列表，依指標、節點、全部節點排序
+        """
+        labels = []
+        for metric, _ in METRICS:
+            for node in self.nodes:
+                labels.append((metric, node, 100.0 if metric == 'usage' else float(self.gpus_per_node)))
+            labels.append((metric, FLEET_LABEL,
+                           100.0 if metric == 'usage' else float(self.gpus_per_node * len(self.nodes))))
+        return labels
+
+    def series_values(self, state):
+        """
+        由 [節點, 日期] 的加總與配置數組成所有序列
+
+        Returns:
+            numpy.ndarray: [序列, 日期]，缺資料為 NaN
+        """
+        present = state['present']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            usage = np.where(state['usage_count'] > 0, state['usage_sum'] / state['usage_count'], np.nan)
+            fleet_count = state['usage_count'].sum(axis=0)
+            fleet_usage = np.where(fleet_count > 0, state['usage_sum'].sum(axis=0) / fleet_count, np.nan)
+        allocated = np.where(present, state['allocated'], np.nan)
+        # 視窗內有資料的節點在某日缺資料時，全部節點的配置數會被低估，該日不納入擬合
+        active = present.any(axis=1)
+        complete = present[active].all(axis=0) if active.any() else np.zeros(present.shape[1], dtype=bool)
+        fleet_allocated = np.where(complete, state['allocated'].sum(axis=0), np.nan)
+        return np.vstack([usage, fleet_usage[None, :], allocated, fleet_allocated[None, :]])
+
+    # ------------------------------------------------------------------
+    # 狀態
+    # ------------------------------------------------------------------
+
+    def _load_state(self):
+        if not os.path.exists(self.state_path):
+            return None
+        try:
+            with np.load(self.state_path) as saved:
+                state = {name: saved[name] for name in saved.files}
+        except (OSError, ValueError) as e:
+            print_warning(f"無法讀取預測狀態檔 {self.state_path}: {e}，將重新讀取全部資料")
+            return None
+        if int(state['version']) != STATE_VERSION or list(state['nodes']) != self.nodes:
+            print_warning("預測狀態檔的版本或節點與目前設定不同，將重新讀取全部資料")
+            return None
+        state['dates'] = [str(date_str) for date_str in state['dates']]
+        state['origin'] = str(state['origin'])
+        state['spec'] = (bool(state['spec'][0]), int(state['spec'][1]))
+        return state
+
+    def _save_state(self, state):
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp_path = self.state_path + '.tmp.npz'
+        arrays = dict(state)
+        arrays.update(version=np.array(STATE_VERSION), nodes=np.array(self.nodes), dates=np.array(state['dates']),
+                      origin=np.array(state['origin']), spec=np.array(state['spec'], dtype=int))
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, self.state_path)
+
+    def reset(self):
+        """捨棄狀態，下次 refresh() 重新讀取全部資料"""
+        self.state = None
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+    def latest_date(self):
+        """
+        Returns:
+            str: 任一節點有平均檔的最新日期，找不到時為空字串
+        """
+        latest = ''
+        for node in self.nodes:
+            node_dir = os.path.join(self.data_dir, node)
+            if not os.path.isdir(node_dir):
+                continue
+            for name in os.listdir(node_dir):
+                if name > latest and os.path.isfile(_average_path(self.data_dir, node, name)):
+                    latest = name
+        return latest
+
+    # ------------------------------------------------------------------
+    # 增量更新
+    # ------------------------------------------------------------------
+
+    def refresh(self, end_date=None):
+        """
+        對齊歷史視窗，只讀取新增或變動的 (節點, 日期)，並更新正規方程式累加量
+
+        Args:
+            end_date (str): 歷史視窗的最後一天，預設為最新資料日期
+
+        Returns:
+            tuple: (讀取的節點日數, 是否為增量更新)；沒有任何資料時回傳 (0, False)
+        """
+        end_date = end_date or self.latest_date()
+        if not end_date:
+            return 0, False
+        dates = date_range(_shift_date(end_date, -(self.history_days - 1)), end_date)
+        shape = (len(self.nodes), len(dates))
+        old = self.state
+        state = {
+            'signature': np.full(shape, '', dtype=object),
+            'usage_sum': np.zeros(shape), 'usage_count': np.zeros(shape),
+            'allocated': np.zeros(shape), 'present': np.zeros(shape, dtype=bool),
+        }
+
+        # 沿用狀態中仍在視窗內的日期
+        old_pos = {date_str: i for i, date_str in enumerate(old['dates'])} if old else {}
+        kept = [(d, old_pos[date_str]) for d, date_str in enumerate(dates) if date_str in old_pos]
+        if kept:
+            new_cols, old_cols = (np.array(cols) for cols in zip(*kept))
+            for name in ('usage_sum', 'usage_count', 'allocated', 'present'):
+                state[name][:, new_cols] = old[name][:, old_cols]
+            state['signature'][:, new_cols] = old['signature'][:, old_cols].astype(object)
+
+        # 以檔案簽章找出需要重新讀取的分區
+        reads = 0
+        changed_days = np.zeros(len(dates), dtype=bool)
+        for n, node in enumerate(self.nodes):
+            for d, date_str in enumerate(dates):
+                signature = day_signature(self.data_dir, node, date_str)
+                if signature == state['signature'][n, d]:
+                    continue
+                values = read_node_day(self.data_dir, node, date_str, signature) if signature else None
+                reads += 1 if signature else 0
+                state['signature'][n, d] = signature
+                state['present'][n, d] = values is not None
+                state['usage_sum'][n, d], state['usage_count'][n, d], state['allocated'][n, d] = values or (0, 0, 0)
+                changed_days[d] = True
+        state['signature'] = state['signature'].astype(str)
+
+        values = self.series_values(state)
+        present_days = np.flatnonzero(~np.isnan(values).all(axis=0))
+        span = int(present_days[-1] - present_days[0] + 1) if len(present_days) else 0
+        state['spec'] = choose_spec(span)
+        state['origin'] = old['origin'] if old else dates[0]
+        origin_weekday = datetime.strptime(state['origin'], DATE_FORMAT).weekday()
+        features = design_matrix([_day_number(date_str, state['origin']) for date_str in dates],
+                                 origin_weekday, state['spec'])
+
+        incremental = (old is not None and old['spec'] == state['spec'] and old['origin'] == state['origin']
+                       and int(old['updates']) < REFIT_INTERVAL)
+        if incremental:
+            stats = {name: old[name].copy() for name in ('xtx', 'xty', 'yty', 'n')}
+            # 移除離開視窗的日期與變動日期的舊貢獻，再加入變動日期的新貢獻
+            old_values = self.series_values(old)
+            removed = np.ones(len(old['dates']), dtype=bool)
+            if kept:
+                # 全部節點配置數的完整日期遮罩取決於視窗內有資料的節點，節點加入或離開視窗時
+                # 檔案未變動的日期數值也可能改變，因此以序列數值比對找出所有需要重新累加的日期
+                before, after = old_values[:, old_cols], values[:, new_cols]
+                same = ((before == after) | (np.isnan(before) & np.isnan(after))).all(axis=0)
+                changed_days[new_cols] |= ~same
+                removed[old_cols] = changed_days[new_cols]
+            if removed.any():
+                old_features = design_matrix([_day_number(date_str, state['origin'])
+                                              for date_str in np.array(old['dates'])[removed]],
+                                             origin_weekday, state['spec'])
+                accumulate(stats, old_features, old_values[:, removed], -1.0)
+            if changed_days.any():
+                accumulate(stats, features[changed_days], values[:, changed_days])
+            state['updates'] = np.array(int(old['updates']) + 1)
+        else:
+            stats = _empty_stats(len(values), features.shape[1])
+            accumulate(stats, features, values)
+            state['updates'] = np.array(0)
+
+        state.update(stats)
+        state['dates'] = dates
+        self.state = state
+        self._save_state(state)
+        return reads, incremental
+
+    # ------------------------------------------------------------------
+    # 預測
+    # ------------------------------------------------------------------
+
+    def peak_factors(self, end_date):
+        """
+        近 PEAK_PROFILE_WEEKS 週各星期「尖峰小時 / 全日平均」的比例
+
+        Returns:
+            numpy.ndarray: [節點 + 全部節點, 7]，沒有每小時資料時為 NaN
+        """
+        start_date = _shift_date(end_date, -(PEAK_PROFILE_WEEKS * 7 - 1))
+        cube = build_hourly_cube(self.data_dir, self.nodes, start_date, end_date)
+        sums = cube.usage_sum.sum(axis=1)        # [節點, 日期, 24]
+        counts = cube.usage_count.sum(axis=1)
+        sums = np.concatenate([sums, sums.sum(axis=0, keepdims=True)])
+        counts = np.concatenate([counts, counts.sum(axis=0, keepdims=True)])
+        profile, profile_counts = hour_weekday_profile(sums, counts, cube.dates)
+        total = profile_counts.sum(axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            daily = np.where(total > 0, (np.nan_to_num(profile) * profile_counts).sum(axis=-1) / total, np.nan)
+            peak = np.where(total > 0, np.nanmax(np.where(profile_counts > 0, profile, -np.inf), axis=-1), np.nan)
+            return np.where(daily > 0, peak / daily, np.nan)
+
+    def forecast(self, horizon_days=DEFAULT_HORIZON_DAYS, level=DEFAULT_LEVEL, peaks=True):
+        """
+        預測歷史視窗最後一天之後 horizon_days 天
+
+        Args:
+            horizon_days (int): 預測天數
+            level (float): 信賴水準 (%)
+            peaks (bool): 是否計算尖峰小時預估（需要讀取近期每小時資料）
+
+        Returns:
+            Forecast: 預測結果；尚未 refresh() 或沒有資料時為 None
+        """
+        state = self.state
+        if state is None:
+            return None
+        dates = state['dates']
+        end_date = dates[-1]
+        future = [_shift_date(end_date, offset) for offset in range(1, horizon_days + 1)]
+        origin_weekday = datetime.strptime(state['origin'], DATE_FORMAT).weekday()
+        features = design_matrix([_day_number(date_str, state['origin']) for date_str in future],
+                                 origin_weekday, state['spec'])
+
+        beta, inverse, sigma2 = solve(state)
+        mean = beta @ features.T
+        leverage = np.einsum('hp,spq,hq->sh', features, inverse, features)
+        z = NormalDist().inv_cdf(0.5 + level / 200.0)
+        margin = z * np.sqrt(sigma2[:, None] * (1.0 + leverage))
+
+        labels = self.labels
+        capacity = np.array([cap for _, _, cap in labels])
+        bound = capacity[:, None]
+        lower, upper, mean = (np.clip(values, 0.0, bound) for values in (mean - margin, mean + margin, mean))
+
+        peak = np.full(mean.shape, np.nan)
+        if peaks:
+            factors = self.peak_factors(end_date)
+            weekdays = np.array([datetime.strptime(date_str, DATE_FORMAT).weekday() for date_str in future])
+            usage_rows = [i for i, (metric, _, _) in enumerate(labels) if metric == 'usage']
+            peak[usage_rows] = np.clip(mean[usage_rows] * factors[:, weekdays], 0.0, 100.0)
+
+        values = self.series_values(state)
+        present_days = np.flatnonzero(~np.isnan(values).all(axis=0))
+        return Forecast(
+            history_start=dates[present_days[0]] if len(present_days) else end_date,
+            history_end=end_date,
+            spec=state['spec'],
+            dates=future,
+            labels=[label for _, label, _ in labels],
+            metrics=[metric for metric, _, _ in labels],
+            capacity=capacity,
+            mean=mean, lower=lower, upper=upper, peak=peak,
+            recent=nan_mean(values[:, -RECENT_DAYS:], axis=1),
+            slope_per_week=beta[:, 1] * 7 / YEAR_DAYS,
+            observations=state['n'].astype(int),
+            level=level,
+        )
+
+
+# ---------------------------------------------------------------------------
+# 報告
+# ---------------------------------------------------------------------------
+
+def describe_spec(spec):
+    weekly, harmonics = spec
+    parts = ['趨勢']
+    if weekly:
+        parts.append('星期效應')
+    if harmonics:
+        parts.append('學期季節性')
+    return ' + '.join(parts)
+
+
+def weekly_summary(forecast, week):
+    """
+    Returns:
+        tuple: 第 week 週（1 起算）的 (平均預測, 平均下界, 平均上界)，各為 [序列] 陣列
+    """
+    cols = slice((week - 1) * 7, week * 7)
+    return tuple(nan_mean(values[:, cols], axis=1) for values in (forecast.mean, forecast.lower, forecast.upper))
+
+
+def capacity_alerts(forecast):
+    """
+    Returns:
+        list: 提示訊息（配置數上界達到容量、預估使用率超過 UTILIZATION_ALERT）
+    """
+    alerts = []
+    for i, (metric, label) in enumerate(zip(forecast.metrics, forecast.labels)):
+        if metric == 'allocated':
+            # 預測值與上界都已限制在容量以內，達到容量即等於容量
+            reached = np.flatnonzero(forecast.upper[i] >= forecast.capacity[i])
+            likely = np.flatnonzero(forecast.mean[i] >= forecast.capacity[i])
+            if len(likely):
+                alerts.append(f"{label}: 預估 {forecast.dates[likely[0]]} 起配置需求達到容量 "
+                              f"({forecast.capacity[i]:.0f} 張 GPU)")
+            elif len(reached):
+                alerts.append(f"{label}: {forecast.dates[reached[0]]} 起配置需求的信賴區間上界達到容量 "
+                              f"({forecast.capacity[i]:.0f} 張 GPU)")
+        else:
+            high = np.flatnonzero(forecast.mean[i] >= UTILIZATION_ALERT)
+            if len(high):
+                alerts.append(f"{label}: 預估 {forecast.dates[high[0]]} 起平均使用率超過 {UTILIZATION_ALERT:.0f}%")
+    return alerts
+
+
+def print_report(forecast):
+    weeks = len(forecast.dates) // 7
+    shown = sorted({week for week in (1, 4, weeks) if 1 <= week <= weeks})
+    print("")
+    print("🔮 GPU 容量預測")
+    print("===============================")
+    print(f"📅 歷史資料: {forecast.history_start} 至 {forecast.history_end}（模型: {describe_spec(forecast.spec)}）")
+    print(f"📈 預測期間: {forecast.dates[0]} 至 {forecast.dates[-1]}，{forecast.level:g}% 信賴區間")
+
+    summaries = {week: weekly_summary(forecast, week) for week in shown}
+    for metric, title in METRICS:
+        print("")
+        print(f"{title}:")
+        header = display_ljust('序列', 14) + f"{f'近{RECENT_DAYS}日':>8}"
+        for week in shown:
+            header += f"  {f'第{week}週':>20}"
+        print(header + f"{'趨勢/週':>10}")
+        for i, label in enumerate(forecast.labels):
+            if forecast.metrics[i] != metric:
+                continue
+            name = label if metric == 'usage' else f"{label} ({forecast.capacity[i]:.0f})"
+            line = display_ljust(name, 14) + ("      --" if np.isnan(forecast.recent[i])
+                                              else f"{forecast.recent[i]:8.1f}")
+            for week in shown:
+                mean, lower, upper = (values[i] for values in summaries[week])
+                cell = '--' if np.isnan(mean) else f"{mean:.1f} [{lower:.1f}, {upper:.1f}]"
+                line += f"  {cell:>20}"
+            slope = forecast.slope_per_week[i]
+            print(line + ("        --" if np.isnan(slope) else f"{slope:+10.2f}"))
+
+    usage_rows = [i for i, metric in enumerate(forecast.metrics) if metric == 'usage']
+    if not np.isnan(forecast.peak[usage_rows]).all():
+        fleet = usage_rows[-1]
+        peak = np.nanmax(forecast.peak[fleet]) if not np.isnan(forecast.peak[fleet]).all() else np.nan
+        if not np.isnan(peak):
+            day = int(np.nanargmax(forecast.peak[fleet]))
+            print("")
+            print(f"🕒 {FLEET_LABEL}尖峰小時預估最高: {peak:.1f}% ({forecast.dates[day]})")
+
+    alerts = capacity_alerts(forecast)
+    print("")
+    if alerts:
+        for alert in alerts:
+            print_warning(alert)
+    else:
+        print_success("預測期間內沒有節點的配置需求達到容量上限")
+
+
+def export_forecast(forecast, output_file):
+    """
+    匯出每個序列每天的預測
+
+    Args:
+        forecast (Forecast): 預測結果
+        output_file (str): 輸出 CSV 路徑
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    titles = dict(METRICS)
+
+    def fmt(value):
+        return '' if np.isnan(value) else f"{value:.2f}"
+
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(FORECAST_HEADER)
+        for i, (metric, label) in enumerate(zip(forecast.metrics, forecast.labels)):
+            for d, date_str in enumerate(forecast.dates):
+                writer.writerow([date_str, label, titles[metric], fmt(forecast.mean[i, d]),
+                                 fmt(forecast.lower[i, d]), fmt(forecast.upper[i, d]),
+                                 fmt(forecast.peak[i, d]), f"{forecast.capacity[i]:g}"])
+    print_success(f"預測已匯出至: {output_file}")
+
+
+def _date_argument(date_str):
+    try:
+        datetime.strptime(date_str, DATE_FORMAT)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日期格式錯誤: {date_str}，請使用 YYYY-MM-DD")
+    return date_str
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='預測各節點與全部節點的 GPU 使用率與配置需求（含信賴區間）',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('使用範例:')[1] if '使用範例:' in __doc__ else None,
+    )
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='資料目錄路徑')
+    parser.add_argument('--output-dir', help='狀態與結果目錄，預設為 <資料目錄>/forecast')
+    parser.add_argument('--horizon', type=parse_days, default=DEFAULT_HORIZON_DAYS, metavar='DAYS',
+                        help=f'預測天數，例如 56、8w、3m，預設 {DEFAULT_HORIZON_DAYS // 7}w')
+    parser.add_argument('--history', type=parse_days, default=DEFAULT_HISTORY_DAYS, metavar='DAYS',
+                        help=f'擬合使用的歷史天數，例如 1y、2y，預設 {DEFAULT_HISTORY_DAYS} 天')
+    parser.add_argument('--level', type=float, default=DEFAULT_LEVEL, help=f'信賴水準 (%%)，預設 {DEFAULT_LEVEL:g}')
+    parser.add_argument('--until', type=_date_argument, help='歷史資料的最後一天，預設為最新資料日期')
+    parser.add_argument('--output', metavar='FILE', help='預測 CSV 路徑，預設為 <輸出目錄>/capacity_forecast.csv')
+    parser.add_argument('--no-peaks', action='store_true', help='不讀取每小時資料，略過尖峰小時預估')
+    parser.add_argument('--rebuild', action='store_true', help='捨棄狀態，重新讀取全部資料')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.data_dir):
+        print_error(f"找不到資料目錄: {args.data_dir}")
+        return 1
+    if not 0 < args.level < 100:
+        print_error("信賴水準必須介於 0 與 100 之間")
+        return 1
+
+    forecaster = CapacityForecaster(args.data_dir, history_days=args.history, output_dir=args.output_dir)
+    if args.rebuild:
+        forecaster.reset()
+    reads, incremental = forecaster.refresh(args.until)
+    if forecaster.state is None:
+        print_error("找不到任何節點的每日平均資料")
+        return 1
+    print_info(f"{'增量更新' if incremental else '重新擬合'}：讀取 {reads} 個節點日")
+
+    forecast = forecaster.forecast(args.horizon, args.level, peaks=not args.no_peaks)
+    print_report(forecast)
+    export_forecast(forecast, args.output or os.path.join(forecaster.output_dir, FORECAST_FILE))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,737 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+colab-gpu 1-4 節點 GPU 使用率和 VRAM 使用率統計工具
+
+colab_gpu_stats.sh 與 scripts/calculate_total_average.sh 的 Python 實作。
+一次讀入日期範圍內所有 average_{date}.csv，轉成 NumPy 陣列後以 bincount
+分組加總，不再對每個數值啟動一次 awk，多個月的報表可在一秒內完成。
+
+輸出格式與原 shell 版本相同，匯出檔仍為 colab_gpu_stats_{開始}_to_{結束}.csv。
+
+使用範例:
+    python3 colab_gpu_stats.py                               # 最新資料的簡潔總平均
+    python3 colab_gpu_stats.py detailed 2025-10-24           # 詳細節點分析
+    python3 colab_gpu_stats.py user 2025-10-20 2025-10-24    # 各使用者平均
+    python3 colab_gpu_stats.py trend 2025-09-01 2025-10-24   # 每日趨勢、移動平均與時段輪廓
+    python3 colab_gpu_stats.py export 2025-10-20 2025-10-24  # 匯出 CSV
+    python3 colab_gpu_stats.py total 2025-10-01 2025-10-07   # calculate_total_average.sh 相容模式
+"""
+
+import os
+import re
+import sys
+import csv
+import argparse
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(SCRIPT_DIR, 'visualization'))
+from lazy_imports import lazy_import
+
+# gpu_monitor.py 建立命令列時會匯入本模組的常數與輸出函數，NumPy 與 trend_stats 在第一次統計時才載入
+np = lazy_import('numpy')
+trend_stats = lazy_import('trend_stats')
+
+DEFAULT_DATA_DIR = os.path.join(SCRIPT_DIR, 'data')
+
+COLAB_NODES = ['colab-gpu1', 'colab-gpu2', 'colab-gpu3', 'colab-gpu4']
+NODE_IPS = ['192.168.10.103', '192.168.10.104', '192.168.10.105', '192.168.10.106']
+
+MODE_ALIASES = {
+    's': 'summary', 'd': 'detailed', 'i': 'individual', 'u': 'user',
+    't': 'trend', 'e': 'export',
+}
+SINGLE_DATE_MODES = ('summary', 'detailed')
+RANGE_MODES = ('individual', 'user', 'trend', 'export')
+
+EXPORT_HEADER = ['日期', 'GPU總平均(%)', 'VRAM總平均(%)', '活躍節點數'] + \
+    [f"{node}_{kind}" for node in COLAB_NODES for kind in ('GPU', 'VRAM')]
+
+# 與 shell 版本相同的數值判斷：清除非數字字元後須為非負小數
+NUMBER_PATTERN = re.compile(r'^[0-9]+\.?[0-9]*$')
+NON_NUMERIC_CHARS = re.compile(r'[^0-9.-]')
+GPU_LABEL_PATTERN = re.compile(r'^GPU\[[0-9]+\]$')
+
+# 使用率超過此值的 GPU 視為活躍
+ACTIVE_THRESHOLD = 1.0
+
+DATE_FORMAT = '%Y-%m-%d'
+DATE_PATTERN = re.compile(r'^[0-9]{4}-[0-9]{2}-[0-9]{2}$')
+
+# 日期範圍內所有 average 檔的列資料（每個欄位為一個 NumPy 陣列）
+AverageTable = namedtuple('AverageTable', [
+    'dates',     # 日期字串列表
+    'present',   # [節點, 日期] 是否有 average 檔
+    'day',       # 每列的日期索引
+    'node',      # 每列的節點索引
+    'gpu',       # GPU 使用率（清理後無效為 NaN）
+    'vram',      # VRAM 使用率（清理後無效為 NaN）
+    'strict',    # 是否為 GPU[n] 列且使用率欄位原本就是有效數字
+    'user',      # 使用者代碼（索引至 users）
+    'users',     # 使用者名稱列表
+])
+
+# 每個 [節點, 日期] 的加總
+NodeDayStats = namedtuple('NodeDayStats', [
+    'gpu_sum', 'gpu_count', 'vram_sum', 'vram_count', 'active_gpus',
+])
+
+
+def print_info(message):
+    print(f"\033[1;34m[INFO]\033[0m {message}")
+
+
+def print_success(message):
+    print(f"\033[1;32m[SUCCESS]\033[0m {message}")
+
+
+def print_error(message):
+    print(f"\033[1;31m[ERROR]\033[0m {message}")
+
+
+def print_warning(message):
+    print(f"\033[1;33m[WARNING]\033[0m {message}")
+
+
+def date_range(start_date, end_date):
+    """
+    產生日期範圍內的所有日期字串（包含首尾）
+
+    Args:
+        start_date (str): 開始日期 (YYYY-MM-DD)
+        end_date (str): 結束日期 (YYYY-MM-DD)
+
+    Returns:
+        list: 日期字串列表
+    """
+    current = datetime.strptime(start_date, DATE_FORMAT)
+    end = datetime.strptime(end_date, DATE_FORMAT)
+    dates = []
+    while current <= end:
+        dates.append(current.strftime(DATE_FORMAT))
+        current += timedelta(days=1)
+    return dates
+
+
+def _clean_number(value):
+    cleaned = NON_NUMERIC_CHARS.sub('', value)
+    return float(cleaned) if NUMBER_PATTERN.match(cleaned) else np.nan
+
+
+def load_average_table(data_dir, start_date, end_date, nodes=COLAB_NODES):
+    """
+    讀取日期範圍內所有節點的 average_{date}.csv
+
+    Args:
+        data_dir (str): 資料目錄
+        start_date (str): 開始日期 (YYYY-MM-DD)
+        end_date (str): 結束日期 (YYYY-MM-DD)
+        nodes (list): 節點列表
+
+    Returns:
+        AverageTable: 列資料
+    """
+    dates = date_range(start_date, end_date)
+    present = np.zeros((len(nodes), len(dates)), dtype=bool)
+    day, node, gpu, vram, strict, user = [], [], [], [], [], []
+    user_codes = {}
+
+    for n, node_name in enumerate(nodes):
+        for d, date_str in enumerate(dates):
+            avg_file = os.path.join(data_dir, node_name, date_str, f"average_{date_str}.csv")
+            if not os.path.isfile(avg_file):
+                continue
+            present[n, d] = True
+            with open(avg_file, 'r', encoding='utf-8', newline='') as f:
+                for row in csv.reader(f):
+                    if not row:
+                        continue
+                    gpu_label = row[0]
+                    if gpu_label == 'GPU編號' or '全部平均' in gpu_label:
+                        continue
+                    raw_gpu = row[1] if len(row) > 1 else ''
+                    raw_vram = row[2] if len(row) > 2 else ''
+                    user_name = row[3].strip() if len(row) > 3 else ''
+
+                    day.append(d)
+                    node.append(n)
+                    gpu.append(_clean_number(raw_gpu))
+                    vram.append(_clean_number(raw_vram))
+                    strict.append(bool(GPU_LABEL_PATTERN.match(gpu_label)
+                                       and NUMBER_PATTERN.match(raw_gpu)
+                                       and NUMBER_PATTERN.match(raw_vram)))
+                    user.append(user_codes.setdefault(user_name, len(user_codes)))
+
+    return AverageTable(
+        dates=dates,
+        present=present,
+        day=np.asarray(day, dtype=np.intp),
+        node=np.asarray(node, dtype=np.intp),
+        gpu=np.asarray(gpu, dtype=float),
+        vram=np.asarray(vram, dtype=float),
+        strict=np.asarray(strict, dtype=bool),
+        user=np.asarray(user, dtype=np.intp),
+        users=list(user_codes),
+    )
+
+
+def _grouped_sum(index, weights, size):
+    return np.bincount(index, weights=weights, minlength=size)
+
+
+def node_day_stats(table):
+    """
+    計算每個 [節點, 日期] 的 GPU / VRAM 加總、筆數與活躍 GPU 數
+
+    Args:
+        table (AverageTable): 列資料
+
+    Returns:
+        NodeDayStats: 各欄位皆為 [節點, 日期] 形狀的陣列
+    """
+    shape = table.present.shape
+    size = shape[0] * shape[1]
+    cell = table.node * shape[1] + table.day
+    gpu_valid = ~np.isnan(table.gpu)
+    vram_valid = ~np.isnan(table.vram)
+
+    def grouped(mask, values=None):
+        weights = np.where(mask, values, 0.0) if values is not None else mask.astype(float)
+        return _grouped_sum(cell, weights, size).reshape(shape)
+
+    return NodeDayStats(
+        gpu_sum=grouped(gpu_valid, table.gpu),
+        gpu_count=grouped(gpu_valid).astype(int),
+        vram_sum=grouped(vram_valid, table.vram),
+        vram_count=grouped(vram_valid).astype(int),
+        active_gpus=grouped(gpu_valid & (np.nan_to_num(table.gpu) > ACTIVE_THRESHOLD)).astype(int),
+    )
+
+
+def format_avg(total, count, empty='0.00'):
+    """
+    平均值格式化為兩位小數；沒有資料時回傳 empty
+
+    原始值為兩位小數，加總先四捨五入至 6 位小數以消除二進位累加誤差，
+    與 shell 版本（awk 以十進位字串累加）在 .xx5 邊界上的進位結果一致。
+    """
+    return f"{round(float(total), 6) / count:.2f}" if count > 0 else empty
+
+
+def find_latest_data_date(data_dir, nodes=COLAB_NODES):
+    """
+    找出任一節點有 average 檔的最新日期
+
+    Args:
+        data_dir (str): 資料目錄
+        nodes (list): 節點列表
+
+    Returns:
+        str: 最新日期，找不到時為空字串
+    """
+    latest = ''
+    for node in nodes:
+        node_dir = os.path.join(data_dir, node)
+        if not os.path.isdir(node_dir):
+            continue
+        for name in os.listdir(node_dir):
+            if name > latest and DATE_PATTERN.match(name) and \
+                    os.path.isfile(os.path.join(node_dir, name, f"average_{name}.csv")):
+                latest = name
+    return latest
+
+
+class ColabGPUStats:
+    """colab-gpu 節點統計（對應 colab_gpu_stats.sh 的各模式）"""
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, nodes=COLAB_NODES, node_ips=NODE_IPS):
+        self.data_dir = data_dir
+        self.nodes = nodes
+        self.node_ips = dict(zip(nodes, node_ips))
+
+    def _daily_totals(self, stats, d):
+        """單日所有節點合計（對應 calculate_daily_node_stats 的全域結果）"""
+        gpu_count = int(stats.gpu_count[:, d].sum())
+        vram_count = int(stats.vram_count[:, d].sum())
+        return {
+            'gpu_avg': format_avg(stats.gpu_sum[:, d].sum(), gpu_count, empty='0'),
+            'vram_avg': format_avg(stats.vram_sum[:, d].sum(), vram_count, empty='0'),
+            'gpu_count': gpu_count,
+            'vram_count': vram_count,
+        }
+
+    def show_summary(self, date):
+        table = load_average_table(self.data_dir, date, date, self.nodes)
+        stats = node_day_stats(table)
+        totals = self._daily_totals(stats, 0)
+        active_nodes = int(table.present[:, 0].sum())
+        total_active = int(stats.active_gpus[:, 0].sum())
+        gpu_count = totals['gpu_count']
+
+        print("🔥 colab-gpu 1-4 節點總平均摘要")
+        print("=================================")
+        print(f"📅 分析日期: {date}")
+        print("")
+        print("📊 總平均結果:")
+        print(f"  🔥 GPU使用率:  {totals['gpu_avg']}% ({gpu_count}個GPU)")
+        print(f"  💾 VRAM使用率: {totals['vram_avg']}% ({totals['vram_count']}個GPU)")
+        print(f"  🖥️  活躍節點:   {active_nodes}/{len(self.nodes)}")
+        print("")
+        utilization = total_active / gpu_count * 100 if gpu_count else 0.0
+        print("📈 快速統計:")
+        print(f"  ⚡ 活躍GPU:    {total_active}/{gpu_count} (使用率>1%)")
+        print(f"  💤 閒置GPU:    {gpu_count - total_active}/{gpu_count}")
+        print(f"  🔋 資源利用率: {utilization:.1f}%")
+        print("")
+
+    def show_detailed(self, date):
+        table = load_average_table(self.data_dir, date, date, self.nodes)
+        stats = node_day_stats(table)
+        totals = self._daily_totals(stats, 0)
+
+        print("🔥 colab-gpu 1-4 節點詳細分析")
+        print("===============================")
+        print(f"📅 分析日期: {date}")
+        print("")
+        print("📊 各節點詳細統計:")
+        print("節點          IP地址          GPU使用率  VRAM使用率  活躍GPU  狀態")
+        print("-----------------------------------------------------------------------")
+        for n, node in enumerate(self.nodes):
+            if table.present[n, 0]:
+                status, ip = '正常', self.node_ips.get(node, 'N/A')
+                gpu_avg = format_avg(stats.gpu_sum[n, 0], stats.gpu_count[n, 0])
+                vram_avg = format_avg(stats.vram_sum[n, 0], stats.vram_count[n, 0])
+                active, gpu_count = stats.active_gpus[n, 0], stats.gpu_count[n, 0]
+            else:
+                status, ip, gpu_avg, vram_avg, active, gpu_count = '無資料', 'N/A', '0.00', '0.00', 0, 8
+            print("%-12s  %-15s  %8s%%    %8s%%    %2s/%-2s    %s"
+                  % (node, ip, gpu_avg, vram_avg, active, gpu_count, status))
+        print("")
+        print("🎯 總平均結果:")
+        print(f"  🔥 GPU使用率總平均:  {totals['gpu_avg']}% (統計{totals['gpu_count']}個GPU)")
+        print(f"  💾 VRAM使用率總平均: {totals['vram_avg']}% (統計{totals['vram_count']}個GPU)")
+        print(f"  🖥️  正常運作節點:     {int(table.present[:, 0].sum())}/{len(self.nodes)}")
+        print("")
+
+    def show_individual(self, start_date, end_date):
+        table = load_average_table(self.data_dir, start_date, end_date, self.nodes)
+        num_nodes, num_days = table.present.shape
+        strict = table.strict
+        gpu_sum = _grouped_sum(table.node[strict], table.gpu[strict], num_nodes)
+        vram_sum = _grouped_sum(table.node[strict], table.vram[strict], num_nodes)
+        counts = np.bincount(table.node[strict], minlength=num_nodes)
+        valid_days = table.present.sum(axis=1)
+
+        print("🔥 colab-gpu 1-4 各節點個別總平均")
+        print("==================================")
+        if start_date == end_date:
+            print(f"📅 分析日期: {start_date}")
+        else:
+            print(f"📅 分析期間: {start_date} 至 {end_date}")
+        print("")
+        print("📊 各節點個別總平均統計:")
+        print("節點          GPU總平均(%)  VRAM總平均(%)  分析天數  資料完整度")
+        print("----------------------------------------------------------------")
+        for n, node in enumerate(self.nodes):
+            completeness = f"{valid_days[n] / num_days * 100:.0f}"
+            print("%-12s  %10s%%    %11s%%      %4d      %6s%%"
+                  % (node, format_avg(gpu_sum[n], counts[n]), format_avg(vram_sum[n], counts[n]),
+                     valid_days[n], completeness))
+
+        print("")
+        print("📈 總結:")
+        total_count = int(counts.sum())
+        if total_count > 0:
+            total_valid = int(valid_days.sum())
+            total_possible = num_nodes * num_days
+            print(f"  🎯 四節點整體總平均: GPU {format_avg(gpu_sum.sum(), total_count)}%, "
+                  f"VRAM {format_avg(vram_sum.sum(), total_count)}%")
+            print(f"  📊 資料完整度: {total_valid / total_possible * 100:.1f}% "
+                  f"({total_valid}/{total_possible} 節點×天數)")
+        else:
+            print("  ⚠️  無法計算整體總平均：缺少有效數據")
+        print("")
+
+    def show_user_analysis(self, start_date, end_date):
+        table = load_average_table(self.data_dir, start_date, end_date, self.nodes)
+        num_days = len(table.dates)
+        num_users = len(table.users)
+        excluded = {table.users.index(name) for name in ('所有使用者', '') if name in table.users}
+        mask = table.strict & ~np.isin(table.user, list(excluded))
+        user, day = table.user[mask], table.day[mask]
+        gpu, vram = table.gpu[mask], table.vram[mask]
+
+        gpu_sum = _grouped_sum(user, gpu, num_users)
+        vram_sum = _grouped_sum(user, vram, num_users)
+        gpu_count = np.bincount(user, minlength=num_users)
+        active_gpus = np.bincount(user[gpu > ACTIVE_THRESHOLD], minlength=num_users)
+        # 每位使用者每天在所有節點的 GPU 使用率合計，再對出現的天數取平均
+        user_day_total = _grouped_sum(user * num_days + day, gpu, num_users * num_days).reshape(num_users, num_days)
+        user_day_seen = np.bincount(user * num_days + day, minlength=num_users * num_days).reshape(num_users, num_days) > 0
+        valid_days = user_day_seen.sum(axis=1)
+        processed_days = int(table.present.any(axis=0).sum())
+
+        print("🔥 colab-gpu 1-4 各使用者平均 GPU 使用率分析")
+        print("==============================================")
+        if start_date == end_date:
+            print(f"📅 分析日期: {start_date}")
+        else:
+            print(f"📅 分析期間: {start_date} 至 {end_date}")
+        print("")
+
+        users = [u for u in range(num_users) if gpu_count[u] > 0]
+        daily_avg = {u: format_avg(user_day_total[u].sum(), valid_days[u]) for u in users}
+        user_avg = {u: format_avg(gpu_sum[u], gpu_count[u]) for u in users}
+        # 與 shell 版 sort -nr 相同：依每日總平均降序，同分時依名稱降序
+        ranked = sorted(users, key=lambda u: (float(daily_avg[u]), table.users[u].encode('utf-8')), reverse=True)
+
+        print("📊 各使用者平均 GPU 使用率統計 (按每日總平均GPU使用量排序):")
+        print("使用者          GPU平均(%)  VRAM平均(%)  總GPU數  活躍GPU  活躍率  每日總平均GPU")
+        print("--------------------------------------------------------------------------------")
+        for u in ranked:
+            name = table.users[u]
+            display_user = name if len(name) <= 12 else name[:9] + "..."
+            avg = float(user_avg[u])
+            if avg > 10:
+                status_emoji = "🔥"
+            elif avg > 1:
+                status_emoji = "⚡"
+            elif name == "admin":
+                status_emoji = "👑"
+            else:
+                status_emoji = "💤"
+            print("%s %-12s %7s%%    %8s%%   %6d    %6d   %6s%%      %8s%%"
+                  % (status_emoji, display_user, user_avg[u], format_avg(vram_sum[u], gpu_count[u]),
+                     gpu_count[u], active_gpus[u], f"{active_gpus[u] / gpu_count[u] * 100:.1f}", daily_avg[u]))
+
+        print("")
+        print("🏆 每日總平均 GPU 使用量排名 TOP 5:")
+        print("排名  使用者          每日總平均GPU(%)  分析天數")
+        print("------------------------------------------------")
+        medals = {1: "🥇", 2: "🥈", 3: "🥉"}
+        for rank, u in enumerate(ranked[:5], start=1):
+            name = table.users[u]
+            display_user = name if len(name) <= 15 else name[:12] + "..."
+            print("%s %2d  %-15s      %10s%%       %3d"
+                  % (medals.get(rank, "  "), rank, display_user, daily_avg[u], valid_days[u]))
+
+        print("")
+        print("📈 使用者統計總結:")
+        real_users = [u for u in users if table.users[u] != "未使用"]
+        if real_users:
+            avgs = np.array([float(user_avg[u]) for u in real_users])
+            vram_avgs = np.array([float(format_avg(vram_sum[u], gpu_count[u])) for u in real_users])
+            total_active = int(active_gpus[real_users].sum())
+            total_gpus = int(gpu_count[real_users].sum())
+            print(f"  👥 總使用者數: {len(real_users)} (活躍使用者: {int((avgs > ACTIVE_THRESHOLD).sum())})")
+            print(f"  📊 平均使用率: GPU {format_avg(avgs.sum(), len(avgs))}%, "
+                  f"VRAM {format_avg(vram_avgs.sum(), len(vram_avgs))}%")
+            print(f"  🔋 總體活躍率: {total_active / total_gpus * 100:.1f}% ({total_active}/{total_gpus} GPU)")
+            print(f"  📈 資料完整度: {processed_days / num_days * 100:.1f}% ({processed_days}/{num_days} 天)")
+        else:
+            print("  ⚠️  沒有找到有效的使用者數據")
+        print("")
+        print("💡 圖示說明:")
+        print("  🔥 高使用率 (>10%)  ⚡ 中等使用率 (1-10%)  💤 低使用率 (<1%)")
+        print("  👑 管理員帳號       💤 未使用GPU")
+        print("")
+
+    def show_trend(self, start_date, end_date):
+        table = load_average_table(self.data_dir, start_date, end_date, self.nodes)
+        stats = node_day_stats(table)
+        num_nodes = len(self.nodes)
+
+        print("🔥 colab-gpu 1-4 節點趨勢分析")
+        print("===============================")
+        print(f"📅 分析期間: {start_date} 至 {end_date}")
+        print("")
+        print("📈 每日總平均趨勢:")
+        print("日期          GPU平均(%)  VRAM平均(%)  活躍GPU  節點狀態")
+        print("-------------------------------------------------------")
+
+        gpu_avgs, vram_avgs, gpu_counts = [], [], []
+        for d, date_str in enumerate(table.dates):
+            active_nodes = int(table.present[:, d].sum())
+            if active_nodes > 0:
+                totals = self._daily_totals(stats, d)
+                gpu_avgs.append(float(totals['gpu_avg']))
+                vram_avgs.append(float(totals['vram_avg']))
+                gpu_counts.append(totals['gpu_count'])
+                print("%-12s  %8s     %8s      %2s/%d    %s/%d"
+                      % (date_str, totals['gpu_avg'], totals['vram_avg'], int(stats.active_gpus[:, d].sum()),
+                         num_nodes * 8, active_nodes, num_nodes))
+            else:
+                print("%-12s  %8s     %8s      %2s      %s"
+                      % (date_str, "無資料", "無資料", "--", f"0/{num_nodes}"))
+
+        print("")
+        if gpu_avgs:
+            print("🎯 期間總結:")
+            print(f"  📊 期間GPU平均:   {format_avg(sum(gpu_avgs), len(gpu_avgs))}%")
+            print(f"  💾 期間VRAM平均:  {format_avg(sum(vram_avgs), len(vram_avgs))}%")
+            print(f"  📅 有效資料天數:  {len(gpu_avgs)} 天")
+            print(f"  🔋 平均GPU數量:   {np.mean(gpu_counts):.0f} 個/天")
+            print("")
+            self._show_trend_statistics(stats)
+            self._show_hourly_profile(start_date, end_date)
+        print("")
+
+    def _show_trend_statistics(self, stats):
+        """各節點與全部節點的移動平均、週變化與趨勢斜率（[節點, 日期] 陣列一次計算）"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            node_series = np.where(stats.gpu_count > 0, stats.gpu_sum / stats.gpu_count, np.nan)
+            total_count = stats.gpu_count.sum(axis=0)
+            fleet_series = np.where(total_count > 0, stats.gpu_sum.sum(axis=0) / total_count, np.nan)
+        summary = trend_stats.summarize_series(np.vstack([node_series, fleet_series]))
+        labels = list(self.nodes) + ['全部節點']
+
+        def fmt(value, signed=False):
+            return "--" if np.isnan(value) else f"{value:{'+' if signed else ''}.2f}"
+
+        print(f"📉 移動平均與趨勢 ({trend_stats.DEFAULT_WINDOW} 日視窗):")
+        print("節點          期間平均  7日平均   EWMA    週變化   趨勢(%/週)")
+        print("--------------------------------------------------------------")
+        for i, label in enumerate(labels):
+            if summary.days[i] == 0:
+                continue
+            print("%s  %8s  %7s  %6s  %8s  %10s"
+                  % (trend_stats.display_ljust(label, 12), fmt(summary.mean[i]), fmt(summary.rolling[i]),
+                     fmt(summary.ewma[i]), fmt(summary.delta[i], True), fmt(summary.slope_per_week[i], True)))
+
+    def _show_hourly_profile(self, start_date, end_date):
+        """星期 × 小時輪廓的每日尖峰與離峰（每小時資料依分區快取於 data/trend_cache）"""
+        cube = trend_stats.build_hourly_cube(self.data_dir, self.nodes, start_date, end_date)
+        profile, counts = trend_stats.fleet_profile(cube)
+        if counts.sum() == 0:
+            return
+        print("")
+        print("🕒 時段輪廓 (星期 × 小時):")
+        print("星期   平均(%)  尖峰時段        離峰時段")
+        print("------------------------------------------")
+        for weekday, row in enumerate(profile):
+            if np.isnan(row).all():
+                continue
+            (_, peak_hour, peak), = trend_stats.peak_cells(row[None, :], top=1)
+            (_, low_hour, low), = trend_stats.peak_cells(row[None, :], top=1, lowest=True)
+            total = counts[weekday].sum()
+            mean = (np.nan_to_num(row) * counts[weekday]).sum() / total
+            print("%s   %6.2f   %02d:00 %6.2f%%  %02d:00 %6.2f%%" % (trend_stats.WEEKDAY_NAMES[weekday], mean,
+                                                                  peak_hour, peak, low_hour, low))
+
+    def export_csv(self, start_date, end_date, output_file=None):
+        """
+        匯出每日統計 CSV
+
+        Args:
+            start_date (str): 開始日期 (YYYY-MM-DD)
+            end_date (str): 結束日期 (YYYY-MM-DD)
+            output_file (str): 輸出檔案，預設為目前目錄下的 colab_gpu_stats_{開始}_to_{結束}.csv
+
+        Returns:
+            str: 輸出檔案路徑
+        """
+        output_file = output_file or f"colab_gpu_stats_{start_date}_to_{end_date}.csv"
+        table = load_average_table(self.data_dir, start_date, end_date, self.nodes)
+        stats = node_day_stats(table)
+
+        print("🔥 匯出 colab-gpu 1-4 節點統計數據")
+        print("====================================")
+        print(f"📅 期間: {start_date} 至 {end_date}")
+        print(f"📄 輸出檔案: {output_file}")
+        print("")
+
+        with open(output_file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(EXPORT_HEADER)
+            for d, date_str in enumerate(table.dates):
+                totals = self._daily_totals(stats, d)
+                row = [date_str, totals['gpu_avg'], totals['vram_avg'], int(table.present[:, d].sum())]
+                for n in range(len(self.nodes)):
+                    row.append(format_avg(stats.gpu_sum[n, d], stats.gpu_count[n, d]))
+                    row.append(format_avg(stats.vram_sum[n, d], stats.vram_count[n, d]))
+                writer.writerow(row)
+
+        print_success(f"CSV 檔案已匯出: {output_file}")
+        print("")
+        return output_file
+
+    def show_total_average(self, start_date, end_date):
+        """所有節點總平均（scripts/calculate_total_average.sh 的輸出格式）"""
+        print("🔥 GPU 和 VRAM 使用率總平均計算工具")
+        print("==========================================")
+        table = load_average_table(self.data_dir, start_date, end_date, self.nodes)
+        stats = node_day_stats(table)
+
+        if start_date == end_date:
+            print_info(f"分析日期: {start_date}")
+            print("========================================")
+            for n, node in enumerate(self.nodes):
+                if not table.present[n, 0]:
+                    avg_file = os.path.join(self.data_dir, node, start_date, f"average_{start_date}.csv")
+                    print_warning(f"{node}: 找不到資料檔案 {avg_file}")
+                    continue
+                print(f"{node}: GPU平均={format_avg(stats.gpu_sum[n, 0], stats.gpu_count[n, 0], '0')}% "
+                      f"({stats.gpu_count[n, 0]}個GPU), "
+                      f"VRAM平均={format_avg(stats.vram_sum[n, 0], stats.vram_count[n, 0], '0')}% "
+                      f"({stats.vram_count[n, 0]}個GPU)")
+            print("========================================")
+            totals = self._daily_totals(stats, 0)
+            print_success(f"所有節點總平均 ({start_date}):")
+            print(f"  🔥 GPU使用率總平均:  {totals['gpu_avg']}% (統計{totals['gpu_count']}個GPU)")
+            print(f"  💾 VRAM使用率總平均: {totals['vram_avg']}% (統計{totals['vram_count']}個GPU)")
+            print(f"  📊 活躍節點數量:      {int(table.present[:, 0].sum())}/{len(self.nodes)}")
+            print("")
+        else:
+            print_info(f"分析期間: {start_date} 至 {end_date}")
+            print("========================================")
+            gpu_count = int(stats.gpu_count.sum())
+            vram_count = int(stats.vram_count.sum())
+            valid_days = int(table.present.any(axis=0).sum())
+            print(f"期間統計: {valid_days}/{len(table.dates)} 天有資料")
+            print("========================================")
+            print_success(f"期間總平均 ({start_date} 至 {end_date}):")
+            print(f"  🔥 GPU使用率總平均:  {format_avg(stats.gpu_sum.sum(), gpu_count, '0')}% (統計{gpu_count}個GPU×天數)")
+            print(f"  💾 VRAM使用率總平均: {format_avg(stats.vram_sum.sum(), vram_count, '0')}% (統計{vram_count}個GPU×天數)")
+            print(f"  📅 有效數據天數:      {valid_days} 天")
+            print("")
+            print_info("每日總平均趨勢:")
+            print("日期          GPU平均(%)  VRAM平均(%)")
+            print("--------------------------------------")
+            for d, date_str in enumerate(table.dates):
+                totals = self._daily_totals(stats, d)
+                if totals['gpu_count'] > 0 or totals['vram_count'] > 0:
+                    print("%-12s  %8s    %8s" % (date_str, totals['gpu_avg'], totals['vram_avg']))
+                else:
+                    print("%-12s  %8s    %8s" % (date_str, "無資料", "無資料"))
+            print("")
+        print_success("分析完成！")
+
+
+def show_usage(prog):
+    print("🔥 colab-gpu 1-4 節點 GPU 和 VRAM 使用率總平均計算工具")
+    print("============================================================")
+    print("")
+    print("使用方法:")
+    print(f"  {prog} [模式] [開始日期] [結束日期]")
+    print("")
+    print("模式:")
+    print("  summary, s       顯示簡潔的總平均摘要（預設）")
+    print("  detailed, d      顯示詳細的節點分析")
+    print("  individual, i    顯示各節點各自的總平均")
+    print("  user, u          顯示各使用者的平均使用率")
+    print("  trend, t         顯示趨勢分析：每日平均、移動平均、週變化與時段輪廓（適用於日期範圍）")
+    print("  export, e        匯出CSV格式數據")
+    print("  total            所有節點總平均（單日或日期範圍，未指定日期時為今天）")
+    print("  help, -h         顯示此說明")
+    print("")
+    print("參數:")
+    print("  開始日期    分析的起始日期 (YYYY-MM-DD)，預設為最新資料日期")
+    print("  結束日期    分析的結束日期 (YYYY-MM-DD)，預設與開始日期相同")
+    print("  --data-dir  資料目錄，預設為腳本所在目錄下的 data/")
+    print("  --output    export 模式的輸出檔案")
+    print("")
+    print("範例:")
+    print(f"  {prog}                           # 最新資料的簡潔總平均")
+    print(f"  {prog} detailed                  # 最新資料的詳細分析")
+    print(f"  {prog} individual                # 最新資料的各節點總平均")
+    print(f"  {prog} summary 2025-10-24       # 指定日期的總平均")
+    print(f"  {prog} individual 2025-10-20 2025-10-24  # 各節點日期範圍總平均")
+    print(f"  {prog} trend 2025-10-20 2025-10-24  # 日期範圍的趨勢分析")
+    print(f"  {prog} export 2025-10-20 2025-10-24 # 匯出CSV數據")
+    print("")
+
+
+def _valid_date(date_str):
+    if not DATE_PATTERN.match(date_str or ''):
+        return False
+    try:
+        datetime.strptime(date_str, DATE_FORMAT)
+        return True
+    except ValueError:
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('args', nargs='*')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--prog', default=os.path.basename(sys.argv[0]))
+    parser.add_argument('-h', '--help', action='store_true')
+    options = parser.parse_args(argv)
+    args = options.args
+
+    if options.help or (args and args[0] == 'help'):
+        show_usage(options.prog)
+        return 0
+
+    mode = MODE_ALIASES.get(args[0], args[0]) if args else 'summary'
+    start_date = end_date = None
+
+    if mode in SINGLE_DATE_MODES:
+        if len(args) > 1:
+            start_date = end_date = args[1]
+    elif mode in RANGE_MODES or mode == 'total':
+        if mode == 'total' and len(args) > 3:
+            print_error("參數錯誤")
+            show_usage(options.prog)
+            return 1
+        if len(args) > 2:
+            start_date, end_date = args[1], args[2]
+        elif len(args) > 1:
+            start_date = end_date = args[1]
+    elif DATE_PATTERN.match(mode):
+        # 第一個參數是日期時視為 summary 模式
+        start_date, end_date = args[0], args[1] if len(args) > 1 else args[0]
+        mode = 'summary'
+    else:
+        print_error(f"未知的模式: {mode}")
+        show_usage(options.prog)
+        return 1
+
+    if start_date is None:
+        if mode == 'total':
+            start_date = end_date = datetime.now().strftime(DATE_FORMAT)
+        else:
+            start_date = end_date = find_latest_data_date(options.data_dir)
+            if not start_date:
+                print_error("找不到任何 colab-gpu 節點的資料")
+                return 1
+            print_info(f"自動選擇最新資料日期: {start_date}")
+            print("")
+
+    for date_str in (start_date, end_date):
+        if not _valid_date(date_str):
+            print_error(f"無效的日期格式: {date_str} (需要 YYYY-MM-DD 格式)")
+            return 1
+
+    if start_date > end_date:
+        print_error("開始日期不能晚於結束日期")
+        return 1
+
+    if not os.path.isdir(options.data_dir):
+        print_error(f"找不到資料目錄: {options.data_dir}")
+        return 1
+
+    stats = ColabGPUStats(options.data_dir)
+    if mode == 'summary':
+        stats.show_summary(start_date)
+    elif mode == 'detailed':
+        stats.show_detailed(start_date)
+    elif mode == 'individual':
+        stats.show_individual(start_date, end_date)
+    elif mode == 'user':
+        stats.show_user_analysis(start_date, end_date)
+    elif mode == 'trend':
+        stats.show_trend(start_date, end_date)
+    elif mode == 'export':
+        stats.export_csv(start_date, end_date, options.output)
+    elif mode == 'total':
+        stats.show_total_average(start_date, end_date)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -25,8 +25,14 @@ echo "-----------------------------------------------"
 python3 get_user_gpu_usage.py paslab_openai 2025-08-11 2025-08-15
 echo
 
-# 4. 顯示可用的命令格式
-echo "💡 4. 完整命令格式說明："
+# 4. 批次查詢多位使用者（只讀取一次資料）
+echo "👥 4. 批次查詢多位使用者 2025-08-11 至 2025-08-15 的使用情況："
+echo "-------------------------------------------------------------"
+python3 get_user_gpu_usage.py --users itrd,paslab_openai 2025-08-11 2025-08-15
+echo
+
+# 5. 顯示可用的命令格式
+echo "💡 5. 完整命令格式說明："
 echo "------------------------"
 echo "# 查詢特定使用者單日使用情況"
 echo "python3 get_user_gpu_usage.py <使用者名稱> <日期>"
@@ -36,13 +42,18 @@ echo "# 查詢特定使用者多日使用情況"
 echo "python3 get_user_gpu_usage.py <使用者名稱> <開始日期> <結束日期>"
 echo "範例: python3 get_user_gpu_usage.py paslab_openai 2025-08-10 2025-08-15"
 echo
+echo "# 批次查詢多位使用者或所有使用者（輸出摘要 CSV，加上 --plot 生成圖表）"
+echo "python3 get_user_gpu_usage.py --users <使用者1,使用者2> <開始日期> <結束日期>"
+echo "python3 get_user_gpu_usage.py --all-users <開始日期> <結束日期> [--plot]"
+echo "範例: python3 get_user_gpu_usage.py --all-users 2025-08-01 2025-08-31 --plot"
+echo
 echo "# 列出指定日期的所有使用者"
 echo "python3 get_user_gpu_usage.py --list-users <日期>"
 echo "範例: python3 get_user_gpu_usage.py --list-users 2025-09-15"
 echo
 
-# 5. 搜尋包含特定使用者的所有日期
-echo "🔎 5. 額外技巧：搜尋包含特定使用者的所有日期"
+# 6. 搜尋包含特定使用者的所有日期
+echo "🔎 6. 額外技巧：搜尋包含特定使用者的所有日期"
 echo "----------------------------------------------"
 echo "搜尋 'paslab_openai' 的使用記錄："
 echo "grep -r 'paslab_openai' data/*/*/average_*.csv | cut -d/ -f3 | sort -u"
@@ -17,33 +17,85 @@ import sys
 import argparse
 from datetime import datetime, timedelta
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 import csv
 
-# 嘗試導入可選的套件
-try:
-    import pandas as pd
-    HAS_PANDAS = True
-except ImportError:
-    HAS_PANDAS = False
+# 添加 visualization 目錄到 path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'visualization'))
+
+# 可選的套件只檢查是否已安裝，實際使用時才載入（查詢與列出使用者不需要繪圖套件）
+from lazy_imports import lazy_import, module_available
+
+HAS_PANDAS = module_available('pandas')
+if HAS_PANDAS:
+    pd = lazy_import('pandas')
+else:
     print("⚠️  未安裝 pandas，將使用基本功能")
 
-try:
-    import matplotlib.pyplot as plt
-    import seaborn as sns
-    HAS_PLOTTING = True
-    
-    # 添加 visualization 目錄到 path
-    sys.path.append(os.path.join(os.path.dirname(__file__), 'visualization'))
+# 不依賴 pandas 的欄式 CSV 讀取（僅使用標準函式庫）；平均檔的欄位別名也一律由此解析
+from columnar_csv import read_average_columns, resolve_columns
+
+# 批次摘要以 NumPy 依使用者分組累加（第一次使用時才載入）
+HAS_NUMPY = module_available('numpy')
+if HAS_NUMPY:
+    np = lazy_import('numpy')
+
+HAS_PLOTTING = module_available('matplotlib')
+if HAS_PLOTTING:
     try:
-        from font_config import setup_chinese_font
+        # 延遲載入的 pyplot，第一次繪圖時套用中文字體
+        from font_config import pyplot as plt
         HAS_FONT_CONFIG = True
     except ImportError:
+        plt = lazy_import('matplotlib.pyplot')
         HAS_FONT_CONFIG = False
-        
-except ImportError:
-    HAS_PLOTTING = False
+    try:
+        from render_profiles import save_figure, add_profile_argument, set_profile
+        HAS_RENDER_PROFILES = True
+    except ImportError:
+        HAS_RENDER_PROFILES = False
+else:
     HAS_FONT_CONFIG = False
+    HAS_RENDER_PROFILES = False
+
+# 以月為單位切分日期範圍（多年範圍的批次報表逐區塊折疊，記憶體不隨範圍成長）
+try:
+    from chunked_reader import chunk_ranges
+    HAS_CHUNKED_READER = True
+except ImportError:
+    HAS_CHUNKED_READER = False
+
+# 使用者反向索引（位於 python/，與資料收集器共用）
+sys.path.append(os.path.join(os.path.dirname(__file__), 'python'))
+try:
+    from user_index import UserIndex
+    HAS_USER_INDEX = True
+except ImportError:
+    HAS_USER_INDEX = False
+
+# 平均檔欄位對應，依欄位名稱組合快取
+# columns: 原始欄位名稱；mapped: 原始欄位 -> 邏輯欄位；missing: 找不到的邏輯欄位
+AverageFileSchema = namedtuple('AverageFileSchema', ['columns', 'mapped', 'missing'])
+
+# 查詢工具的邏輯欄位 -> columnar_csv 的邏輯欄位
+LOGICAL_COLUMNS = (('user', 'user'), ('gpu', 'gpu'), ('usage', 'usage'), ('vram_usage', 'vram'))
+
+# collect_users_columns 回傳的欄位
+USER_COLUMN_KEYS = ('date', 'node', 'gpu', 'usage', 'vram', 'user')
+
+
+def _factorize(values):
+    """
+    將字串序列編為整數代碼（以 dict 雜湊，比 numpy.unique 對 object 陣列排序快得多）
+
+    Returns:
+        tuple: (相異值的 object 陣列，依首次出現順序；與 values 等長的 int64 代碼陣列)
+    """
+    lookup = {}
+    codes = np.fromiter((lookup.setdefault(value, len(lookup)) for value in values),
+                        dtype=np.int64, count=len(values))
+    return np.array(list(lookup), dtype=object), codes
+
 
 class UserGPUUsageQuery:
     """查詢使用者 GPU 使用率的工具類"""
@@ -54,89 +106,104 @@ class UserGPUUsageQuery:
     GPU_USAGE_ALIASES = ['usage', '平均GPU使用率(%)', 'gpu_usage', 'GPU使用率', '平均GPU使用率']
     VRAM_USAGE_ALIASES = ['vram_usage', '平均VRAM使用率(%)', 'vram', 'VRAM使用率', '平均VRAM使用率']
 
-    def __init__(self, data_dir="./data", plots_dir="./plots"):
+    # columnar_csv 使用的欄位別名（與上方別名相同）
+    COLUMNAR_ALIASES = {'gpu': GPU_COL_ALIASES, 'usage': GPU_USAGE_ALIASES,
+                        'vram': VRAM_USAGE_ALIASES, 'user': USER_COL_ALIASES}
+
+    # 缺少欄位時的預設值
+    COLUMN_DEFAULTS = {'user': '未使用', 'gpu': '未知', 'usage': 0.0, 'vram_usage': 0.0}
+
+    # 欄位名稱組合 (tuple) -> AverageFileSchema，所有查詢實例共用
+    _schema_cache = {}
+
+    # 批次報表的摘要欄位
+    SUMMARY_COLUMNS = ['記錄數', '有活動記錄數', '使用天數', '使用節點數', '使用GPU數',
+                       '平均GPU使用率(%)', '平均VRAM使用率(%)', '最大GPU使用率(%)',
+                       '最大VRAM使用率(%)', 'GPU等效天數']
+    SUMMARY_COUNT_COLUMNS = ('記錄數', '有活動記錄數', '使用天數', '使用節點數', '使用GPU數')
+
+    # 每個節點的 GPU 數，以及 collect_users_columns 與 _fold_user_columns 每讀入一列的尖峰記憶體
+    # （暫存串列、float 物件與欄式陣列，以 tracemalloc 量測約 210 bytes），用於決定批次報表的分塊天數
+    GPUS_PER_NODE = 8
+    ROW_BYTES = 210
+
+    def __init__(self, data_dir="./data", plots_dir="./plots", use_index=True):
         self.data_dir = Path(data_dir)
+        self.use_index = use_index
         self.plots_dir = Path(plots_dir)
         self.plots_dir.mkdir(exist_ok=True)
         
         # 節點配置
         self.nodes = ['colab-gpu1', 'colab-gpu2', 'colab-gpu3', 'colab-gpu4']
         
-        # 設定中文字體
-        if HAS_FONT_CONFIG:
-            setup_chinese_font()
-        
         self._last_missing_user_column_warning_printed = False  # 避免重複刷屏
 
+    def _user_index(self):
+        """
+        取得可用的使用者索引
+
+        Returns:
+            UserIndex: 索引已建立時回傳，否則為 None（改為直接讀取平均檔）
+        """
+        if not (HAS_USER_INDEX and self.use_index):
+            return None
+        index = UserIndex(self.data_dir)
+        return index if index.exists() else None
+
+    @classmethod
+    def _resolve_schema(cls, columns):
+        """
+        依欄位名稱找出各邏輯欄位（與 columnar_csv 使用同一套別名解析），每種欄位名稱組合只計算一次
+
+        Args:
+            columns (iterable): 檔案標頭、DataFrame 或 dict 的欄位名稱
+
+        Returns:
+            AverageFileSchema: 欄位對應
+        """
+        columns = tuple(columns)
+        schema = cls._schema_cache.get(columns)
+        if schema is not None:
+            return schema
+
+        positions = resolve_columns([str(c) for c in columns], cls.COLUMNAR_ALIASES)
+        mapped, missing = {}, []
+        for logical, key in LOGICAL_COLUMNS:
+            if key in positions:
+                mapped[columns[positions[key]]] = logical
+            else:
+                missing.append(logical)
+        schema = AverageFileSchema(list(columns), mapped, missing)
+        cls._schema_cache[columns] = schema
+        return schema
+
     # 新增：欄位標準化工具
     def _standardize_columns(self, row_or_df):
         """將輸入的 dict 或 pandas.DataFrame 欄位標準化為統一命名。
         回傳 (standardized_object, success_bool, meta_info)
         meta_info: {'columns': [...], 'mapped': {...}, 'missing': [...]}"""
         if HAS_PANDAS and 'pandas' in str(type(row_or_df)):
-            columns = list(row_or_df.columns)
-            mapped = {}
-            # 建立對應
-            def find_alias(aliases):
-                for a in aliases:
-                    if a in row_or_df.columns:
-                        return a
-                return None
-            user_col = find_alias(self.USER_COL_ALIASES)
-            gpu_col = find_alias(self.GPU_COL_ALIASES)
-            gpu_usage_col = find_alias(self.GPU_USAGE_ALIASES)
-            vram_usage_col = find_alias(self.VRAM_USAGE_ALIASES)
-            rename_map = {}
-            if gpu_col and gpu_col != 'gpu':
-                rename_map[gpu_col] = 'gpu'
-            if gpu_usage_col and gpu_usage_col != 'usage':
-                rename_map[gpu_usage_col] = 'usage'
-            if vram_usage_col and vram_usage_col != 'vram_usage':
-                rename_map[vram_usage_col] = 'vram_usage'
-            if user_col and user_col != 'user':
-                rename_map[user_col] = 'user'
+            schema = self._resolve_schema(row_or_df.columns)
+            rename_map = {col: logical for col, logical in schema.mapped.items() if col != logical}
             std_df = row_or_df.rename(columns=rename_map)
-            missing = []
-            for logical, required in [('user','user'),('gpu','gpu'),('usage','usage'),('vram_usage','vram_usage')]:
-                if required not in std_df.columns:
-                    missing.append(required)
-            success = len(missing) == 0
-            return std_df, success, {'columns': columns, 'mapped': rename_map, 'missing': missing}
+            return std_df, not schema.missing, {'columns': schema.columns, 'mapped': rename_map,
+                                                 'missing': list(schema.missing)}
         else:
-            # 單行 dict 或 list[dict]
-            if isinstance(row_or_df, dict):
-                rows = [row_or_df]
-                single = True
-            else:
-                rows = row_or_df
-                single = False
-            columns = set()
-            for r in rows:
-                for k in r.keys():
-                    columns.add(k)
-            columns = list(columns)
-            # 為每列找 alias
-            def find_alias_in_row(r, aliases):
-                for a in aliases:
-                    if a in r:
-                        return a
-                return None
+            # 單行 dict 或 list[dict]；相同欄位組合的列共用同一個欄位對應
+            single = isinstance(row_or_df, dict)
+            rows = [row_or_df] if single else row_or_df
+            columns = []
             normalized = []
             mapped_global = {}
             missing_any = set()
             for r in rows:
-                gpu_key = find_alias_in_row(r, self.GPU_COL_ALIASES)
-                usage_key = find_alias_in_row(r, self.GPU_USAGE_ALIASES)
-                vram_key = find_alias_in_row(r, self.VRAM_USAGE_ALIASES)
-                user_key = find_alias_in_row(r, self.USER_COL_ALIASES)
-                new_r = {}
-                if gpu_key: new_r['gpu'] = r[gpu_key]; mapped_global[gpu_key] = 'gpu'
-                if usage_key: new_r['usage'] = r[usage_key]; mapped_global[usage_key] = 'usage'
-                if vram_key: new_r['vram_usage'] = r[vram_key]; mapped_global[vram_key] = 'vram_usage'
-                if user_key: new_r['user'] = r[user_key]; mapped_global[user_key] = 'user'
-                for required in ['gpu','usage','vram_usage','user']:
-                    if required not in new_r:
-                        missing_any.add(required)
+                schema = self._resolve_schema(r.keys())
+                for col in schema.columns:
+                    if col not in columns:
+                        columns.append(col)
+                mapped_global.update(schema.mapped)
+                missing_any.update(schema.missing)
+                new_r = {logical: r[col] for col, logical in schema.mapped.items()}
                 # 保留原始欄位以便除錯
                 new_r['_original'] = r
                 normalized.append(new_r)
@@ -145,47 +212,19 @@ class UserGPUUsageQuery:
             return (normalized[0] if single else normalized), success, meta
 
     def load_gpu_data_with_users_basic(self, csv_file):
-        """使用基本 csv 模組載入 GPU 數據（不依賴 pandas）"""
-        if not os.path.exists(csv_file):
-            return None
-            
-        try:
-            data = []
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # 標準化欄位名稱 (舊邏輯保留，但後續再統一標準化)
-                    if 'GPU編號' in row:
-                        standardized_row = {
-                            'gpu': row.get('GPU編號'),
-                            'usage': self._safe_float(row.get('平均GPU使用率(%)')),
-                            'vram_usage': self._safe_float(row.get('平均VRAM使用率(%)')),
-                            'user': row.get('使用者')
-                        }
-                    else:
-                        standardized_row = row
-                    data.append(standardized_row)
-            # 新增：再次通用標準化
-            data_std, success, meta = self._standardize_columns(data)
-            if not success and not self._last_missing_user_column_warning_printed:
-                print(f"⚠️  檔案 {csv_file} 缺少必要欄位: {meta['missing']} (實際欄位: {meta['columns']})")
-                if 'user' in meta['missing']:
-                    print("   ➜ 將把缺失使用者欄位視為 '未使用' 進行處理")
-                self._last_missing_user_column_warning_printed = True
-                # 填入預設
-                for r in data_std:
-                    if 'user' not in r:
-                        r['user'] = '未使用'
-                    if 'gpu' not in r:
-                        r['gpu'] = r['_original'].get('GPU編號', '未知')
-                    if 'usage' not in r:
-                        r['usage'] = self._safe_float(r['_original'].get('平均GPU使用率(%)', 0.0))
-                    if 'vram_usage' not in r:
-                        r['vram_usage'] = self._safe_float(r['_original'].get('平均VRAM使用率(%)', 0.0))
-            return data_std
-        except Exception as e:
-            print(f"載入檔案時發生錯誤 {csv_file}: {e}")
+        """使用欄式讀取載入 GPU 數據（不依賴 pandas），每列轉為標準 dict"""
+        columns = self._load_average_columns(csv_file)
+        if columns is None:
             return None
+        missing = [logical for logical, key in LOGICAL_COLUMNS if key in columns.missing]
+        if missing and not self._last_missing_user_column_warning_printed:
+            print(f"⚠️  檔案 {csv_file} 缺少必要欄位: {missing}")
+            if 'user' in missing:
+                print("   ➜ 將把缺失使用者欄位視為 '未使用' 進行處理")
+            self._last_missing_user_column_warning_printed = True
+        gpus = columns.gpu if 'gpu' not in columns.missing else [self.COLUMN_DEFAULTS['gpu']] * len(columns)
+        return [{'gpu': gpu, 'usage': self._safe_float(usage), 'vram_usage': self._safe_float(vram), 'user': user}
+                for gpu, usage, vram, user in zip(gpus, columns.usage, columns.vram, self._column_users(columns))]
 
     def load_gpu_data_with_users(self, csv_file):
         """載入包含使用者資訊的 GPU 數據"""
@@ -230,10 +269,36 @@ class UserGPUUsageQuery:
         try:
             if v is None or v == '':
                 return default
-            return float(v)
+            value = float(v)
+            return value if value == value else default  # NaN 視為無效值
         except Exception:
             return default
 
+    def _load_average_columns(self, avg_file, skip_summary=False):
+        """
+        以欄式讀取平均檔（不經 pandas，也不為每列建立 dict）
+
+        Args:
+            avg_file (Path): average_{date}.csv 路徑
+            skip_summary (bool): 是否略過「全部平均」列
+
+        Returns:
+            AverageColumns: 欄式資料，檔案不存在或無法讀取時為 None
+        """
+        if not os.path.exists(avg_file):
+            return None
+        try:
+            return read_average_columns(avg_file, self.COLUMNAR_ALIASES, skip_summary)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            print(f"載入檔案時發生錯誤 {avg_file}: {e}")
+            return None
+
+    def _column_users(self, columns):
+        """欄式資料的使用者欄位；缺少使用者欄位時視為 '未使用'"""
+        if 'user' in columns.missing:
+            return ['未使用'] * len(columns)
+        return columns.user
+
     def get_date_range(self, start_date, end_date=None):
         """取得日期範圍"""
         start = datetime.strptime(start_date, '%Y-%m-%d')
@@ -271,36 +336,35 @@ class UserGPUUsageQuery:
         print("=" * 60)
         
         missing_user_field_days = []  # 記錄缺少 user 欄位的日期
-        for node in self.nodes:
-            for date in dates:
-                date_str = date.strftime('%Y-%m-%d')
-                avg_file = self.data_dir / node / date_str / f"average_{date_str}.csv"
-                data = self.load_gpu_data_with_users(avg_file)
-                if data is None:
-                    continue
-                # 統一處理 pandas 或 list
-                if HAS_PANDAS and isinstance(data, pd.DataFrame):
-                    if 'user' not in data.columns:
-                        missing_user_field_days.append(date_str)
-                    user_rows = data[data.get('user') == username] if 'user' in data.columns else []
-                    user_rows = user_rows.to_dict('records') if hasattr(user_rows, 'to_dict') else []
-                else:
-                    if isinstance(data, list) and data and 'user' not in data[0]:
-                        missing_user_field_days.append(date_str)
-                        # 填補
-                        for r in data:
-                            r.setdefault('user', '未使用')
-                    user_rows = [row for row in data if row.get('user') == username]
-                for row in user_rows:
-                    record = {
-                        'date': date_str,
-                        'node': node,
-                        'gpu': row.get('gpu','未知'),
-                        'gpu_usage': self._safe_float(row.get('usage', 0.0)),
-                        'vram_usage': self._safe_float(row.get('vram_usage', 0.0)),
-                        'user': row.get('user','未使用')
-                    }
-                    user_records.append(record)
+        date_strs = [date.strftime('%Y-%m-%d') for date in dates]
+        partitions = [(node, date_str) for node in self.nodes for date_str in date_strs]
+
+        index = self._user_index()
+        if index is not None:
+            entries, fresh, stale = index.query(username, self.nodes, date_strs)
+            for date_str, node, gpu, usage, vram in entries:
+                user_records.append({
+                    'date': date_str,
+                    'node': node,
+                    'gpu': gpu,
+                    'gpu_usage': self._safe_float(usage),
+                    'vram_usage': self._safe_float(vram),
+                    'user': username
+                })
+            missing_user_field_days.extend(
+                key.split('/', 1)[1] for key, entry in fresh.items() if not entry['has_user_column'])
+            if stale and fresh:
+                print(f"⚠️  使用者索引中有 {len(stale)} 個分區已過期或尚未索引，將直接讀取其平均檔")
+            partitions = stale
+        elif HAS_USER_INDEX and self.use_index and len(partitions) > len(self.nodes):
+            print(f"💡 建立使用者索引可加速多日查詢: python3 python/user_index.py rebuild --data-dir {self.data_dir}")
+
+        for node, date_str in partitions:
+            user_records.extend(self._scan_user_records(username, node, date_str, missing_user_field_days))
+
+        # 依節點、日期排序（與逐檔讀取的順序相同）
+        node_order = {node: i for i, node in enumerate(self.nodes)}
+        user_records.sort(key=lambda r: (node_order[r['node']], r['date']))
         if missing_user_field_days:
             unique_days = sorted(set(missing_user_field_days))
             print(f"⚠️  下列日期的檔案缺少使用者欄位，已以 '未使用' 代替: {', '.join(unique_days)}")
@@ -309,6 +373,37 @@ class UserGPUUsageQuery:
             print(f"❌ 在指定日期範圍內未找到使用者 '{username}' 的任何記錄")
         return user_records
     
+    def _scan_user_records(self, username, node, date_str, missing_user_field_days):
+        """
+        直接讀取單一平均檔，取出指定使用者的紀錄
+
+        Args:
+            username (str): 使用者名稱
+            node (str): 節點名稱
+            date_str (str): 日期 (YYYY-MM-DD)
+            missing_user_field_days (list): 缺少使用者欄位的日期會加入此列表
+
+        Returns:
+            list: 使用者 GPU 使用紀錄
+        """
+        avg_file = self.data_dir / node / date_str / f"average_{date_str}.csv"
+        # 以欄式讀取（不需載入 pandas），只為符合的列建立紀錄
+        columns = self._load_average_columns(avg_file)
+        if columns is None:
+            return []
+        if 'user' in columns.missing:
+            missing_user_field_days.append(date_str)
+        return [{
+            'date': date_str,
+            'node': node,
+            'gpu': gpu,
+            'gpu_usage': self._safe_float(usage),
+            'vram_usage': self._safe_float(vram),
+            'user': user
+        } for gpu, usage, vram, user in zip(columns.gpu, columns.usage, columns.vram,
+                                            self._column_users(columns))
+            if user == username]
+
     def display_user_usage_summary(self, records):
         """顯示使用者 GPU 使用摘要"""
         if not records:
@@ -352,34 +447,41 @@ class UserGPUUsageQuery:
             print(f"   使用的 GPU: {len(gpus_used)} 個")
     
     def plot_user_gpu_trends(self, records, username):
-        """繪製使用者 GPU 使用趨勢圖"""
+        """繪製使用者 GPU 使用趨勢圖（records 為 query_user_gpu_usage 的紀錄列表）"""
+        columns = {key: [record[field] for record in records] for key, field in
+                   (('date', 'date'), ('node', 'node'), ('gpu', 'gpu'), ('usage', 'gpu_usage'), ('vram', 'vram_usage'))}
+        return self.plot_user_column_trends(columns, username)
+
+    def plot_user_column_trends(self, columns, username):
+        """
+        以欄式紀錄繪製使用者 GPU 使用趨勢圖
+
+        Args:
+            columns (dict): date/node/gpu/usage/vram 序列（collect_users_columns 格式的單一使用者紀錄）
+            username (str): 使用者名稱
+
+        Returns:
+            str: 圖表路徑，無法繪製時為 None
+        """
         if not HAS_PLOTTING:
             print("⚠️  未安裝 matplotlib/seaborn，無法生成圖表")
             return None
             
-        if not records:
+        dates = columns['date']
+        if not len(dates):
             print("❌ 沒有資料可繪製")
             return None
             
-        # 準備資料
-        if HAS_PANDAS:
-            df = pd.DataFrame(records)
-            df['datetime'] = pd.to_datetime(df['date'])
-            df['node_gpu'] = df['node'] + ':' + df['gpu']
-        else:
-            # 不使用 pandas 的基本處理
-            print("⚠️  建議安裝 pandas 以獲得更好的圖表功能")
-        
         # 創建圖表
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(15, 10))
         
         # 準備數據結構
         date_usage_map = defaultdict(lambda: defaultdict(list))
-        for record in records:
-            node_gpu = f"{record['node']}:{record['gpu']}"
-            date_usage_map[record['date']][node_gpu].append({
-                'gpu_usage': record['gpu_usage'],
-                'vram_usage': record['vram_usage']
+        for date_str, node, gpu, usage, vram in zip(dates, columns['node'], columns['gpu'],
+                                                    columns['usage'], columns['vram']):
+            date_usage_map[date_str][f"{node}:{gpu}"].append({
+                'gpu_usage': usage,
+                'vram_usage': vram
             })
         
         # 繪製 GPU 使用率趨勢
@@ -421,18 +523,350 @@ class UserGPUUsageQuery:
         plt.tight_layout()
         
         # 保存圖表
-        filename = f"user_gpu_trends_{username}_{records[0]['date']}"
-        if len(records) > 1:
-            filename += f"_to_{records[-1]['date']}"
+        filename = f"user_gpu_trends_{username}_{dates[0]}"
+        if len(dates) > 1:
+            filename += f"_to_{dates[-1]}"
         filename += ".png"
         
         output_path = self.plots_dir / filename
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
+        if HAS_RENDER_PROFILES:
+            output_path = save_figure(output_path)
+        else:
+            plt.savefig(output_path, dpi=300, bbox_inches='tight')
         print(f"📊 趨勢圖已保存至: {output_path}")
         
         plt.close()
         return str(output_path)
     
+    def _iter_partition_rows(self, wanted, date_strs):
+        """
+        逐分區取出平均檔的紀錄：只查詢部分使用者時由索引讀取這些使用者的檔案，
+        其餘分區直接讀取平均檔（不需要 pandas）
+
+        Args:
+            wanted (set): 使用者名稱集合，None 表示所有使用者
+            date_strs (list): 日期字串列表
+
+        Yields:
+            tuple: (節點, 日期, GPU編號序列, GPU使用率序列, VRAM使用率序列, 使用者序列)；
+                   使用率為 float，無效值為 0.0 或 NaN
+        """
+        partitions = [(node, date_str) for node in self.nodes for date_str in date_strs]
+
+        # '未使用' 不在索引中；所有使用者需要讀取每個分區的每一列，直接讀取平均檔較快
+        index = self._user_index() if wanted and '未使用' not in wanted else None
+        if index is not None:
+            fresh, partitions = index.classify_partitions(self.nodes, date_strs)
+            for key, rows in index.partition_rows(fresh, wanted).items():
+                if not rows:
+                    continue
+                node, date_str = key.split('/', 1)
+                gpus, usages, vrams, users = zip(*rows)
+                yield (node, date_str, gpus, [self._safe_float(v) for v in usages],
+                       [self._safe_float(v) for v in vrams], users)
+
+        for node, date_str in partitions:
+            avg_file = self.data_dir / node / date_str / f"average_{date_str}.csv"
+            columns = self._load_average_columns(avg_file, skip_summary=True)
+            if columns is not None:
+                yield node, date_str, columns.gpu, columns.usage, columns.vram, self._column_users(columns)
+
+    def collect_users_columns(self, usernames, start_date, end_date=None):
+        """
+        一次讀取日期範圍內的資料，以欄式 NumPy 陣列回傳（不為每筆紀錄建立 dict）
+
+        Args:
+            usernames (list): 使用者名稱列表，None 表示所有使用者（不含 '未使用'）
+            start_date (str): 開始日期 (YYYY-MM-DD)
+            end_date (str): 結束日期 (YYYY-MM-DD)，可選
+
+        Returns:
+            dict: date/node/gpu/user 為 object 陣列，usage/vram 為 float64 陣列（無效值為 0.0），
+                  依節點、日期排序
+        """
+        wanted = set(usernames) if usernames is not None else None
+        date_strs = [date.strftime('%Y-%m-%d') for date in self.get_date_range(start_date, end_date)]
+        parts = {key: [] for key in USER_COLUMN_KEYS}
+
+        for node, date_str, gpus, usages, vrams, users in self._iter_partition_rows(wanted, date_strs):
+            parts['date'].extend([date_str] * len(gpus))
+            parts['node'].extend([node] * len(gpus))
+            parts['gpu'].extend(gpus)
+            parts['usage'].extend(usages)
+            parts['vram'].extend(vrams)
+            parts['user'].extend(users)
+
+        columns = {key: np.array(parts[key], dtype=object) for key in ('date', 'node', 'gpu', 'user')}
+        for key in ('usage', 'vram'):
+            columns[key] = np.nan_to_num(np.array(parts[key], dtype=np.float64), nan=0.0)
+
+        if wanted is None:
+            keep = columns['user'] != '未使用'
+        else:
+            keep = np.isin(columns['user'], sorted(wanted))
+        node_order = {node: i for i, node in enumerate(self.nodes)}
+        node_rank = np.array([node_order[node] for node in parts['node']], dtype=np.int64)
+        order = np.flatnonzero(keep)
+        order = order[np.lexsort((columns['date'][order], node_rank[order]))]
+        return {key: values[order] for key, values in columns.items()}
+
+    @staticmethod
+    def _split_columns_by_user(columns):
+        """
+        將欄式紀錄依使用者切開
+
+        Returns:
+            dict: {使用者: 該使用者的欄式紀錄}，各使用者內保持原本的順序
+        """
+        if not len(columns['user']):
+            return {}
+        users, user_code = _factorize(columns['user'])
+        order = np.argsort(user_code, kind='stable')
+        bounds = np.cumsum(np.bincount(user_code, minlength=len(users)))[:-1]
+        return {user: {key: values[rows] for key, values in columns.items()}
+                for user, rows in zip(users, np.split(order, bounds))}
+
+    @staticmethod
+    def _new_fold():
+        return {
+            'count': 0, 'active': 0, 'dates': set(), 'nodes': set(), 'gpus': set(),
+            'gpu_sum': 0.0, 'vram_sum': 0.0, 'gpu_max': float('-inf'), 'vram_max': float('-inf'),
+        }
+
+    def _fold_user_columns(self, totals, columns):
+        """
+        以使用者分組一次累加欄式紀錄（可逐區塊呼叫，結果與一次處理所有紀錄相同）
+
+        Args:
+            totals (dict): {使用者: 累計值}，會就地更新
+            columns (dict): collect_users_columns 格式的欄式紀錄
+        """
+        if not len(columns['user']):
+            return
+        users, user_code = _factorize(columns['user'])
+        n_users = len(users)
+        usage, vram = columns['usage'], columns['vram']
+
+        count = np.bincount(user_code, minlength=n_users)
+        active = np.bincount(user_code, weights=usage > 1, minlength=n_users)
+        gpu_sum = np.bincount(user_code, weights=usage, minlength=n_users)
+        vram_sum = np.bincount(user_code, weights=vram, minlength=n_users)
+        gpu_max = np.full(n_users, -np.inf)
+        vram_max = np.full(n_users, -np.inf)
+        np.maximum.at(gpu_max, user_code, usage)
+        np.maximum.at(vram_max, user_code, vram)
+
+        # 使用天數、節點與 GPU 只需要每位使用者的相異組合，不必逐筆加入集合
+        # 把 (使用者, 日期) 與 (使用者, 節點, GPU) 打包成單一整數再取唯一值
+        dates, date_code = _factorize(columns['date'])
+        nodes, node_code = _factorize(columns['node'])
+        gpus, gpu_code = _factorize(columns['gpu'])
+        user_dates = np.unique(user_code * len(dates) + date_code)
+        user_gpus = np.unique((user_code * len(nodes) + node_code) * len(gpus) + gpu_code)
+
+        folds = [totals.setdefault(user, self._new_fold()) for user in users]
+        for i, fold in enumerate(folds):
+            fold['count'] += int(count[i])
+            fold['active'] += int(active[i])
+            fold['gpu_sum'] += float(gpu_sum[i])
+            fold['vram_sum'] += float(vram_sum[i])
+            fold['gpu_max'] = max(fold['gpu_max'], float(gpu_max[i]))
+            fold['vram_max'] = max(fold['vram_max'], float(vram_max[i]))
+        for i, d in zip((user_dates // len(dates)).tolist(), (user_dates % len(dates)).tolist()):
+            folds[i]['dates'].add(dates[d])
+        user_nodes, g_codes = user_gpus // len(gpus), user_gpus % len(gpus)
+        for i, n, g in zip((user_nodes // len(nodes)).tolist(), (user_nodes % len(nodes)).tolist(), g_codes.tolist()):
+            folds[i]['nodes'].add(nodes[n])
+            folds[i]['gpus'].add((nodes[n], gpus[g]))
+
+    def _summaries_from_totals(self, totals):
+        """
+        Returns:
+            list: 每位使用者一筆摘要（dict），依 GPU 等效天數由大到小排序
+        """
+        summary = []
+        for user, fold in totals.items():
+            summary.append({
+                '使用者': user,
+                '記錄數': fold['count'],
+                '有活動記錄數': fold['active'],
+                '使用天數': len(fold['dates']),
+                '使用節點數': len(fold['nodes']),
+                '使用GPU數': len(fold['gpus']),
+                '平均GPU使用率(%)': fold['gpu_sum'] / fold['count'],
+                '平均VRAM使用率(%)': fold['vram_sum'] / fold['count'],
+                '最大GPU使用率(%)': fold['gpu_max'],
+                '最大VRAM使用率(%)': fold['vram_max'],
+                'GPU等效天數': fold['gpu_sum'] / 100.0,
+            })
+        summary.sort(key=lambda item: (item['GPU等效天數'], item['記錄數']), reverse=True)
+        return summary
+
+    def summarize_users_range(self, usernames, start_date, end_date=None, keep_columns=False):
+        """
+        逐月分塊讀取並折疊為每位使用者的統計摘要：每次只保留一個區塊的紀錄，
+        區塊大小受 GPU_MEMORY_BUDGET_MB 限制
+
+        Args:
+            usernames (list): 使用者名稱列表，None 表示所有使用者
+            start_date (str): 開始日期 (YYYY-MM-DD)
+            end_date (str): 結束日期 (YYYY-MM-DD)，可選
+            keep_columns (bool): 是否保留每位使用者的欄式紀錄（繪製每位使用者的趨勢圖時需要）
+
+        Returns:
+            tuple: (摘要列表，每位使用者一筆 dict，依 GPU 等效天數由大到小排序；
+                    {使用者: 欄式紀錄}，依節點、日期排序，keep_columns 為 False 時為空)
+        """
+        end_date = end_date or start_date
+        if HAS_CHUNKED_READER:
+            bytes_per_day = len(self.nodes) * self.GPUS_PER_NODE * self.ROW_BYTES
+            ranges = chunk_ranges(start_date, end_date, bytes_per_day)
+        else:
+            ranges = [(start_date, end_date)]
+
+        totals = {}
+        kept = defaultdict(list)
+        for chunk_start, chunk_end in ranges:
+            columns = self.collect_users_columns(usernames, chunk_start, chunk_end)
+            self._fold_user_columns(totals, columns)
+            if keep_columns:
+                for user, user_columns in self._split_columns_by_user(columns).items():
+                    kept[user].append(user_columns)
+
+        # 每個區塊已依節點、日期排序且區塊依日期先後，依節點穩定排序即為整個範圍的順序
+        node_order = {node: i for i, node in enumerate(self.nodes)}
+        columns_by_user = {}
+        for user, parts in kept.items():
+            columns = {key: np.concatenate([part[key] for part in parts]) for key in USER_COLUMN_KEYS}
+            node_rank = np.array([node_order[node] for node in columns['node']], dtype=np.int64)
+            order = np.argsort(node_rank, kind='stable')
+            columns_by_user[user] = {key: values[order] for key, values in columns.items()}
+        return self._summaries_from_totals(totals), columns_by_user
+
+    def display_users_summary(self, summary, start_date, end_date=None):
+        """顯示多位使用者的統計摘要表"""
+        period = f"{start_date} 至 {end_date}" if end_date else start_date
+        print(f"\n👥 使用者 GPU 使用摘要 ({period})")
+        print("=" * 96)
+        if not summary:
+            print("❌ 在指定日期範圍內未找到任何使用者記錄")
+            return
+        print(f"{'使用者':<20} {'記錄數':>6} {'活動':>6} {'天數':>5} {'GPU數':>5} "
+              f"{'平均GPU%':>9} {'平均VRAM%':>10} {'最大GPU%':>9} {'GPU等效天數':>11}")
+        print("-" * 96)
+        for item in summary:
+            print(f"{item['使用者']:<20} {item['記錄數']:>6} {item['有活動記錄數']:>6} {item['使用天數']:>5} "
+                  f"{item['使用GPU數']:>5} {item['平均GPU使用率(%)']:>9.2f} {item['平均VRAM使用率(%)']:>10.2f} "
+                  f"{item['最大GPU使用率(%)']:>9.2f} {item['GPU等效天數']:>11.2f}")
+        total = sum(item['GPU等效天數'] for item in summary)
+        print("-" * 96)
+        print(f"📊 共 {len(summary)} 位使用者，合計 GPU 等效天數 {total:.2f}")
+
+    def write_users_summary_csv(self, summary, start_date, end_date=None, output_path=None):
+        """
+        將多位使用者的統計摘要寫入 CSV
+
+        Args:
+            summary (list): summarize_users_range 回傳的摘要列表
+            output_path (str): 輸出路徑，預設為圖表目錄下的 users_gpu_summary_<日期範圍>.csv
+
+        Returns:
+            str: CSV 檔案路徑
+        """
+        if output_path is None:
+            output_path = self.plots_dir / f"users_gpu_summary_{start_date}_to_{end_date or start_date}.csv"
+        with open(output_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['使用者'] + self.SUMMARY_COLUMNS)
+            for item in summary:
+                writer.writerow([item['使用者']] + [
+                    item[col] if col in self.SUMMARY_COUNT_COLUMNS else f"{item[col]:.2f}"
+                    for col in self.SUMMARY_COLUMNS
+                ])
+        print(f"💾 使用者摘要已保存至: {output_path}")
+        return str(output_path)
+
+    def plot_users_overview(self, summary, start_date, end_date=None):
+        """繪製多位使用者的平均使用率與 GPU 等效天數比較圖"""
+        if not HAS_PLOTTING:
+            print("⚠️  未安裝 matplotlib/seaborn，無法生成圖表")
+            return None
+        if not summary:
+            return None
+
+        users = [item['使用者'] for item in summary][::-1]
+        positions = range(len(users))
+        height = max(4, 0.4 * len(users) + 2)
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, height), sharey=True)
+
+        ax1.barh(positions, [item['GPU等效天數'] for item in summary][::-1], color='steelblue')
+        ax1.set_yticks(list(positions))
+        ax1.set_yticklabels(users)
+        ax1.set_xlabel("GPU 等效天數", fontsize=12)
+        ax1.set_title("使用者 GPU 等效天數", fontsize=14, fontweight='bold')
+        ax1.grid(True, axis='x', alpha=0.3)
+
+        offsets = [p - 0.2 for p in positions]
+        ax2.barh(offsets, [item['平均GPU使用率(%)'] for item in summary][::-1], height=0.4, label='GPU')
+        ax2.barh([p + 0.2 for p in positions], [item['平均VRAM使用率(%)'] for item in summary][::-1],
+                 height=0.4, label='VRAM')
+        ax2.set_xlim(0, 100)
+        ax2.set_xlabel("平均使用率 (%)", fontsize=12)
+        ax2.set_title("使用者平均 GPU / VRAM 使用率", fontsize=14, fontweight='bold')
+        ax2.grid(True, axis='x', alpha=0.3)
+        ax2.legend(loc='lower right')
+
+        fig.suptitle(f"使用者 GPU 使用摘要 ({start_date} ~ {end_date or start_date})", fontsize=16, fontweight='bold')
+        plt.tight_layout()
+
+        output_path = self.plots_dir / f"users_gpu_summary_{start_date}_to_{end_date or start_date}.png"
+        if HAS_RENDER_PROFILES:
+            output_path = save_figure(output_path)
+        else:
+            plt.savefig(output_path, dpi=300, bbox_inches='tight')
+        print(f"📊 使用者摘要圖已保存至: {output_path}")
+        plt.close()
+        return str(output_path)
+
+    def batch_user_report(self, usernames, start_date, end_date=None, plot=False, output_path=None):
+        """
+        多位使用者（或所有使用者）的批次報表：逐月分塊讀取資料（繪圖時只保留每位使用者的欄式紀錄），輸出摘要 CSV 與圖表
+
+        Args:
+            usernames (list): 使用者名稱列表，None 表示所有使用者
+            start_date (str): 開始日期 (YYYY-MM-DD)
+            end_date (str): 結束日期 (YYYY-MM-DD)，可選
+            plot (bool): 是否生成比較圖與每位使用者的趨勢圖
+            output_path (str): 摘要 CSV 輸出路徑，可選
+
+        Returns:
+            list: 每位使用者的統計摘要
+        """
+        if not HAS_NUMPY:
+            print("❌ 批次報表需要 NumPy，請先安裝: pip install numpy")
+            return []
+        target = '所有使用者' if usernames is None else ', '.join(usernames)
+        print(f"🔍 批次查詢 {target} 的 GPU 使用情況...")
+        print(f"📅 日期範圍: {start_date} 至 {end_date if end_date else start_date}")
+
+        summary, columns_by_user = self.summarize_users_range(usernames, start_date, end_date, keep_columns=plot)
+        if usernames is not None:
+            found = {item['使用者'] for item in summary}
+            missing = [u for u in usernames if u not in found]
+            if missing:
+                print(f"⚠️  在指定日期範圍內未找到下列使用者的記錄: {', '.join(missing)}")
+
+        self.display_users_summary(summary, start_date, end_date)
+        if not summary:
+            return summary
+
+        self.write_users_summary_csv(summary, start_date, end_date, output_path)
+        if plot:
+            self.plot_users_overview(summary, start_date, end_date)
+            for item in summary:
+                self.plot_user_column_trends(columns_by_user[item['使用者']], item['使用者'])
+        return summary
+
     def list_all_users(self, date):
         """列出指定日期所有使用 GPU 的使用者"""
         date_str = date
@@ -442,37 +876,36 @@ class UserGPUUsageQuery:
         print(f"📋 {date_str} 的所有 GPU 使用者:")
         print("=" * 50)
         
+        # 索引仍有效的分區直接使用索引中的紀錄
+        index = self._user_index()
+        fresh = index.classify_partitions(self.nodes, [date_str])[0] if index is not None else {}
+        fresh_rows = index.partition_rows(fresh) if fresh else {}
+        
         for node in self.nodes:
             avg_file = self.data_dir / node / date_str / f"average_{date_str}.csv"
-            data = self.load_gpu_data_with_users(avg_file)
-            if data is None:
-                continue
-            if HAS_PANDAS and isinstance(data, pd.DataFrame):
-                if 'user' not in data.columns:
-                    if not self._last_missing_user_column_warning_printed:
-                        print(f"⚠️  {avg_file} 缺少使用者欄位，跳過使用者統計")
-                        self._last_missing_user_column_warning_printed = True
-                    continue
-                # 過濾活動使用者 (處理 pandas DataFrame 或基本列表)
-                active_users = data[
-                    (data['user'] != '未使用') & 
-                    (~data['gpu'].str.contains('全部平均', na=False)) &
-                    (pd.to_numeric(data['usage'], errors='coerce') > 1)
+            entry = fresh.get(f"{node}/{date_str}")
+            if entry is not None and entry['has_user_column']:
+                data = [
+                    {'gpu': gpu, 'usage': self._safe_float(usage),
+                     'vram_usage': self._safe_float(vram), 'user': user}
+                    for gpu, usage, vram, user in fresh_rows[f"{node}/{date_str}"]
                 ]
-                active_rows = active_users.to_dict('records')
             else:
-                if isinstance(data, list) and data and 'user' not in data[0]:
+                columns = self._load_average_columns(avg_file, skip_summary=True)
+                if columns is None:
+                    continue
+                if 'user' in columns.missing:
                     if not self._last_missing_user_column_warning_printed:
                         print(f"⚠️  {avg_file} 缺少使用者欄位，跳過使用者統計")
                         self._last_missing_user_column_warning_printed = True
                     continue
-                active_rows = [
-                    row for row in data 
-                    if (row['user'] != '未使用' and 
-                        '全部平均' not in row['gpu'] and 
-                        float(row['usage']) > 1)
+                data = [
+                    {'gpu': gpu, 'usage': self._safe_float(usage),
+                     'vram_usage': self._safe_float(vram), 'user': user}
+                    for gpu, usage, vram, user in zip(columns.gpu, columns.usage, columns.vram, columns.user)
                 ]
-            
+            active_rows = [row for row in data if row['user'] != '未使用' and row['usage'] > 1]
+
             for row in active_rows:
                 username = row['user']
                 all_users.add(username)
@@ -508,7 +941,7 @@ class UserGPUUsageQuery:
         return sorted(all_users)
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(
         description="查詢特定使用者的 GPU 使用率",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -525,6 +958,15 @@ def main():
   
   # 生成使用者趨勢圖
   python3 get_user_gpu_usage.py paslab_openai 2025-09-10 2025-09-15 --plot
+  
+  # 批次查詢多位使用者（只讀取一次資料，輸出摘要 CSV）
+  python3 get_user_gpu_usage.py --users paslab_openai,itrd 2025-09-01 2025-09-30
+  
+  # 所有使用者的月報表（含比較圖與每位使用者的趨勢圖）
+  python3 get_user_gpu_usage.py --all-users 2025-09-01 2025-09-30 --plot
+  
+  # 建立使用者索引（之後的查詢只讀取該使用者的索引檔）
+  python3 python/user_index.py rebuild --data-dir ./data
         """
     )
     
@@ -533,14 +975,33 @@ def main():
     parser.add_argument('end_date', nargs='?', help='結束日期 (YYYY-MM-DD)，可選')
     parser.add_argument('--list-users', action='store_true', 
                        help='列出指定日期的所有使用者')
+    parser.add_argument('--users', action='append', metavar='USER[,USER...]',
+                       help='批次查詢多位使用者（以逗號分隔，可重複指定），只讀取一次資料')
+    parser.add_argument('--all-users', action='store_true',
+                       help='批次查詢日期範圍內的所有使用者')
+    parser.add_argument('--output', help='批次查詢摘要 CSV 的輸出路徑，預設存於圖表目錄')
     parser.add_argument('--plot', action='store_true', 
                        help='生成使用者 GPU 使用趨勢圖')
     parser.add_argument('--data-dir', default='./data', 
                        help='資料目錄路徑，預設為 ./data')
     parser.add_argument('--plots-dir', default='./plots', 
                        help='圖表輸出目錄，預設為 ./plots')
+    parser.add_argument('--no-index', action='store_true',
+                       help='不使用使用者索引，直接讀取所有平均檔')
+    if HAS_RENDER_PROFILES:
+        add_profile_argument(parser)
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if HAS_RENDER_PROFILES and args.profile:
+        set_profile(args.profile)
+    
+    batch_mode = bool(args.users) or args.all_users
+    if batch_mode and args.username:
+        # 批次模式沒有使用者名稱參數，位置參數依序為開始與結束日期
+        if args.end_date:
+            parser.error('批次模式只接受開始與結束日期兩個位置參數')
+        args.start_date, args.end_date = args.username, args.start_date
+        args.username = None
     
     # 驗證日期格式
     try:
@@ -552,9 +1013,17 @@ def main():
         return
     
     # 建立查詢工具
-    query_tool = UserGPUUsageQuery(args.data_dir, args.plots_dir)
+    query_tool = UserGPUUsageQuery(args.data_dir, args.plots_dir, use_index=not args.no_index)
     
-    if args.list_users:
+    if batch_mode:
+        usernames = None
+        if not args.all_users:
+            # 保持輸入順序並去除重複的使用者
+            usernames = list(dict.fromkeys(u.strip() for value in args.users for u in value.split(',') if u.strip()))
+        query_tool.batch_user_report(usernames, args.start_date, args.end_date,
+                                     plot=args.plot, output_path=args.output)
+        
+    elif args.list_users:
         # 列出所有使用者
         users = query_tool.list_all_users(args.start_date)
         print(f"\n📈 總共找到 {len(users)} 位使用者")
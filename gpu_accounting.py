@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GPU 時數計算工具
+
+以每張 GPU 每 10 分鐘一筆的原始樣本（gpu{idx}_{date}.csv）計算實際的 GPU 時數，
+而不是將每日平均值再平均。每個任務的配置時段（tasks_{date}.csv，由資料收集器寫入）
+內的樣本會被積分，得到:
+
+- 配置時數: 任務佔用 GPU 的時數
+- 忙碌時數: 配置期間 GPU 使用率超過門檻的時數
+- 閒置時數: 配置期間 GPU 未達門檻的時數（佔用但沒有使用）
+- 有效 GPU 時數: 以使用率加權的時數（100% 使用一小時 = 1）
+- VRAM-GB 時數: VRAM 使用量 (GB) 對時間的積分
+- 峰值 GPU 使用率
+
+沒有 tasks 檔的舊資料以 average 檔中的使用者視為整天配置。
+資料逐日讀取、累加後即丟棄，計算一整年的資料時記憶體用量不會隨天數增加。
+
+使用範例:
+    python3 gpu_accounting.py 2025-09-01 2025-09-30
+    python3 gpu_accounting.py 2025-09-01 2025-09-30 --by user --busy-threshold 10
+    python3 gpu_accounting.py 2025-09-01 2025-09-30 --export
+"""
+
+import os
+import sys
+import csv
+import argparse
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from colab_gpu_stats import (
+    COLAB_NODES, DATE_FORMAT, DEFAULT_DATA_DIR, date_range,
+    print_info, print_success, print_error, print_warning,
+)
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'visualization'))
+from columnar_csv import read_average_columns, read_gpu_columns
+
+TAIWAN_TZ = timezone(timedelta(hours=8))
+
+GPU_INDICES = list(range(8))
+
+# 使用率超過此值的樣本視為忙碌
+DEFAULT_BUSY_THRESHOLD = 5.0
+
+# 任務沒有記錄 GPU 記憶體時使用的 VRAM 總量 (GB)，與 vram_monitor.py 相同
+DEFAULT_VRAM_GB = 80.0
+
+# 取樣間隔無法由時間戳推算時使用的預設值（秒）
+DEFAULT_SAMPLE_SECONDS = 600
+
+UNUSED_USER = '未使用'
+NO_PROJECT = '(無專案)'
+
+DIMENSIONS = ('user', 'project', 'node')
+DIMENSION_LABELS = {'user': '使用者', 'project': '專案', 'node': '節點'}
+
+# 累加的數值欄位（時數皆為小時）
+METRICS = ('allocated', 'busy', 'idle', 'effective', 'vram_gb_hours')
+METRIC_LABELS = {
+    'allocated': '配置時數',
+    'busy': '忙碌時數',
+    'idle': '閒置時數',
+    'effective': '有效GPU時數',
+    'vram_gb_hours': 'VRAM-GB時數',
+}
+
+EXPORT_HEADER = ['維度', '名稱'] + [METRIC_LABELS[m] for m in METRICS] + \
+    ['閒置比例(%)', '峰值GPU使用率(%)', '任務數']
+
+
+def parse_task_time(value, default):
+    """
+    解析任務開始/結束時間
+
+    Args:
+        value (str): ISO 格式時間字串或 Unix 時間戳；沒有時區的時間視為台灣時間
+        default (float): 空值時使用的時間戳
+
+    Returns:
+        float: Unix 時間戳
+    """
+    value = (value or '').strip()
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return default
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=TAIWAN_TZ)
+    return dt.timestamp()
+
+
+def day_bounds(date_str):
+    """當天 00:00 與隔天 00:00（台灣時間）的時間戳"""
+    start = datetime.strptime(date_str, DATE_FORMAT).replace(tzinfo=TAIWAN_TZ)
+    return start.timestamp(), (start + timedelta(days=1)).timestamp()
+
+
+def load_day_samples(data_dir, node, date_str, gpu_indices=GPU_INDICES):
+    """
+    讀取某節點某一天所有 GPU 的原始樣本，對齊到共同的時間軸
+
+    Args:
+        data_dir (str): 資料目錄
+        node (str): 節點名稱
+        date_str (str): 日期 (YYYY-MM-DD)
+        gpu_indices (list): GPU 索引列表
+
+    Returns:
+        tuple: (timestamps [T], durations [T] 秒, usage [G, T], vram [G, T])，缺資料為 NaN；
+               當天沒有任何樣本時為 None
+    """
+    day_dir = os.path.join(data_dir, node, date_str)
+    series = {}
+    for gpu_index in gpu_indices:
+        path = os.path.join(day_dir, f"gpu{gpu_index}_{date_str}.csv")
+        if os.path.exists(path):
+            try:
+                columns = read_gpu_columns(path).numpy()
+                series[gpu_index] = (columns['timestamp'], columns['usage'], columns['vram'])
+            except (OSError, UnicodeDecodeError) as e:
+                print_warning(f"無法讀取 {path}: {e}")
+    if not series:
+        return None
+
+    timestamps = np.unique(np.concatenate([ts for ts, _, _ in series.values()]))
+    if timestamps.size == 0:
+        return None
+
+    usage = np.full((len(gpu_indices), timestamps.size), np.nan)
+    vram = np.full((len(gpu_indices), timestamps.size), np.nan)
+    for row, gpu_index in enumerate(gpu_indices):
+        if gpu_index in series:
+            ts, gpu_usage, gpu_vram = series[gpu_index]
+            cols = np.searchsorted(timestamps, ts)
+            usage[row, cols] = gpu_usage
+            vram[row, cols] = gpu_vram
+
+    # 每個樣本代表到下一個樣本為止的時段；最後一個樣本沿用一般的取樣間隔
+    gaps = np.diff(timestamps)
+    step = float(np.median(gaps)) if gaps.size else DEFAULT_SAMPLE_SECONDS
+    durations = np.append(np.minimum(gaps, step), step) if gaps.size else np.array([step])
+    return timestamps, durations, usage, vram
+
+
+def load_day_tasks(data_dir, node, date_str):
+    """
+    讀取某節點某一天的任務配置時段
+
+    tasks_{date}.csv 不存在時，以 average_{date}.csv 中每張 GPU 的使用者視為整天配置
+    （欄位依 columnar_csv 的別名辨識）。
+
+    Args:
+        data_dir (str): 資料目錄
+        node (str): 節點名稱
+        date_str (str): 日期 (YYYY-MM-DD)
+
+    Returns:
+        list: (使用者, 專案, GPU 索引, 開始時間戳, 結束時間戳, VRAM 總量 GB) 列表
+    """
+    day_start, day_end = day_bounds(date_str)
+    day_dir = os.path.join(data_dir, node, date_str)
+    tasks = []
+
+    tasks_file = os.path.join(day_dir, f"tasks_{date_str}.csv")
+    if os.path.exists(tasks_file):
+        with open(tasks_file, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                gpu_index = _gpu_index(row.get('GPU編號', ''))
+                user = (row.get('使用者') or '').strip()
+                if gpu_index is None or not user:
+                    continue
+                start = parse_task_time(row.get('開始時間'), day_start)
+                end = parse_task_time(row.get('結束時間'), day_end)
+                try:
+                    vram_gb = float(row.get('GPU記憶體(MB)') or 0) / 1024 or DEFAULT_VRAM_GB
+                except ValueError:
+                    vram_gb = DEFAULT_VRAM_GB
+                tasks.append((user, (row.get('專案') or '').strip() or NO_PROJECT,
+                              gpu_index, max(start, day_start), min(end, day_end), vram_gb))
+        return tasks
+
+    avg_file = os.path.join(day_dir, f"average_{date_str}.csv")
+    if os.path.exists(avg_file):
+        columns = read_average_columns(avg_file)
+        if 'user' in columns.missing:
+            return tasks
+        for label, user in zip(columns.gpu, columns.user):
+            gpu_index = _gpu_index(label)
+            if gpu_index is None or not user or user == UNUSED_USER:
+                continue
+            tasks.append((user, NO_PROJECT, gpu_index, day_start, day_end, DEFAULT_VRAM_GB))
+    return tasks
+
+
+def _gpu_index(label):
+    label = label.strip()
+    if label.startswith('GPU[') and label.endswith(']'):
+        label = label[4:-1]
+    try:
+        return int(label)
+    except ValueError:
+        return None
+
+
+def account_tasks(samples, tasks, busy_threshold=DEFAULT_BUSY_THRESHOLD, gpu_indices=GPU_INDICES):
+    """
+    對所有任務的配置時段一次積分（[任務, 樣本] 矩陣運算）
+
+    Args:
+        samples (tuple): load_day_samples 的回傳值
+        tasks (list): load_day_tasks 的回傳值
+        busy_threshold (float): 忙碌門檻 (%)
+        gpu_indices (list): samples 的 GPU 索引順序
+
+    Returns:
+        tuple: ({指標: [任務] 陣列}, 峰值 [任務])，時數單位為小時
+    """
+    timestamps, durations, usage, vram = samples
+    rows = np.array([gpu_indices.index(t[2]) if t[2] in gpu_indices else -1 for t in tasks])
+    starts = np.array([t[3] for t in tasks])
+    ends = np.array([t[4] for t in tasks])
+    vram_gb = np.array([t[5] for t in tasks])
+
+    known = rows >= 0
+    task_usage = np.where(known[:, None], usage[np.maximum(rows, 0)], np.nan)
+    task_vram = np.where(known[:, None], vram[np.maximum(rows, 0)], np.nan)
+
+    # 樣本落在配置時段內且有資料才計入
+    mask = (timestamps >= starts[:, None]) & (timestamps < ends[:, None]) & ~np.isnan(task_usage)
+    hours = np.where(mask, durations / 3600.0, 0.0)
+    usage_in = np.where(mask, task_usage, 0.0)
+    vram_in = np.where(mask & ~np.isnan(task_vram), task_vram, 0.0)
+
+    allocated = hours.sum(axis=1)
+    busy = (hours * (usage_in > busy_threshold)).sum(axis=1)
+    metrics = {
+        'allocated': allocated,
+        'busy': busy,
+        'idle': allocated - busy,
+        'effective': (hours * usage_in / 100.0).sum(axis=1),
+        'vram_gb_hours': (hours * vram_in / 100.0).sum(axis=1) * vram_gb,
+    }
+    peak = np.where(mask, task_usage, -np.inf).max(axis=1, initial=-np.inf)
+    return metrics, np.where(np.isfinite(peak), peak, 0.0)
+
+
+class GPUAccounting:
+    """逐日累加各使用者、專案與節點的 GPU 時數"""
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, nodes=None, busy_threshold=DEFAULT_BUSY_THRESHOLD):
+        self.data_dir = data_dir
+        self.nodes = list(nodes or COLAB_NODES)
+        self.busy_threshold = busy_threshold
+        self.totals = {dim: {} for dim in DIMENSIONS}
+        self.peaks = {dim: {} for dim in DIMENSIONS}
+        self.task_counts = {dim: {} for dim in DIMENSIONS}
+        self.days_with_tasks_file = 0
+        self.days_from_averages = 0
+
+    def add_day(self, date_str):
+        """
+        讀取並累加一天所有節點的資料
+
+        Args:
+            date_str (str): 日期 (YYYY-MM-DD)
+        """
+        for node in self.nodes:
+            tasks = load_day_tasks(self.data_dir, node, date_str)
+            if not tasks:
+                continue
+            samples = load_day_samples(self.data_dir, node, date_str)
+            if samples is None:
+                continue
+            if os.path.exists(os.path.join(self.data_dir, node, date_str, f"tasks_{date_str}.csv")):
+                self.days_with_tasks_file += 1
+            else:
+                self.days_from_averages += 1
+
+            metrics, peaks = account_tasks(samples, tasks, self.busy_threshold)
+            stacked = np.column_stack([metrics[m] for m in METRICS])
+            for k, (user, project, _, _, _, _) in enumerate(tasks):
+                for dim, key in (('user', user), ('project', project), ('node', node)):
+                    total = self.totals[dim].get(key)
+                    if total is None:
+                        self.totals[dim][key] = stacked[k].copy()
+                    else:
+                        total += stacked[k]
+                    self.peaks[dim][key] = max(self.peaks[dim].get(key, 0.0), float(peaks[k]))
+                    self.task_counts[dim][key] = self.task_counts[dim].get(key, 0) + 1
+
+    def run(self, start_date, end_date):
+        """累加日期範圍內每一天的資料"""
+        for date_str in date_range(start_date, end_date):
+            self.add_day(date_str)
+        return self
+
+    def report(self, dim):
+        """
+        Args:
+            dim (str): 'user'、'project' 或 'node'
+
+        Returns:
+            list: 每個名稱一筆 dict，依配置時數由大到小排序
+        """
+        rows = []
+        for key, total in self.totals[dim].items():
+            row = {'name': key, 'peak': self.peaks[dim][key], 'tasks': self.task_counts[dim][key]}
+            row.update(zip(METRICS, (float(v) for v in total)))
+            row['idle_ratio'] = row['idle'] / row['allocated'] * 100 if row['allocated'] > 0 else 0.0
+            rows.append(row)
+        rows.sort(key=lambda r: (r['allocated'], r['effective']), reverse=True)
+        return rows
+
+
+def print_report(accounting, dims, start_date, end_date):
+    print_info(f"GPU 時數統計 ({start_date} ~ {end_date})，忙碌門檻 {accounting.busy_threshold:.1f}%")
+    if accounting.days_from_averages:
+        print_warning(f"{accounting.days_from_averages} 個節點日沒有 tasks 檔，以 average 檔的使用者視為整天配置")
+    for dim in dims:
+        rows = accounting.report(dim)
+        label = DIMENSION_LABELS[dim]
+        print(f"\n===== 依{label} =====")
+        if not rows:
+            print("  (無資料)")
+            continue
+        print(f"{label:<24} {'配置h':>9} {'忙碌h':>9} {'閒置h':>9} {'閒置%':>7} "
+              f"{'有效GPU h':>10} {'VRAM-GB h':>11} {'峰值%':>7}")
+        print("-" * 96)
+        for r in rows:
+            print(f"{r['name']:<24} {r['allocated']:>9.1f} {r['busy']:>9.1f} {r['idle']:>9.1f} "
+                  f"{r['idle_ratio']:>7.1f} {r['effective']:>10.1f} {r['vram_gb_hours']:>11.1f} {r['peak']:>7.1f}")
+
+
+def export_report(accounting, dims, output_file):
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_HEADER)
+        for dim in dims:
+            for r in accounting.report(dim):
+                writer.writerow([DIMENSION_LABELS[dim], r['name']] +
+                                [f"{r[m]:.2f}" for m in METRICS] +
+                                [f"{r['idle_ratio']:.2f}", f"{r['peak']:.2f}", r['tasks']])
+    print_success(f"GPU 時數統計已匯出至: {output_file}")
+
+
+def _date_argument(date_str):
+    try:
+        datetime.strptime(date_str, DATE_FORMAT)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日期格式錯誤: {date_str}，請使用 YYYY-MM-DD")
+    return date_str
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='以原始樣本計算各使用者、專案與節點的 GPU 時數',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('使用範例:')[1] if '使用範例:' in __doc__ else None,
+    )
+    parser.add_argument('start_date', type=_date_argument, help='開始日期 (YYYY-MM-DD)')
+    parser.add_argument('end_date', nargs='?', type=_date_argument, help='結束日期 (YYYY-MM-DD)，預設與開始日期相同')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='資料目錄路徑')
+    parser.add_argument('--by', choices=DIMENSIONS, action='append',
+                        help='統計維度，可重複指定，預設為全部')
+    parser.add_argument('--busy-threshold', type=float, default=DEFAULT_BUSY_THRESHOLD,
+                        help=f'忙碌門檻 (%%)，預設 {DEFAULT_BUSY_THRESHOLD}')
+    parser.add_argument('--export', nargs='?', const='', metavar='FILE',
+                        help='匯出 CSV，未指定檔名時為 gpu_accounting_<開始>_to_<結束>.csv')
+    args = parser.parse_args(argv)
+
+    end_date = args.end_date or args.start_date
+    if end_date < args.start_date:
+        print_error("結束日期不能早於開始日期")
+        return 1
+    if not os.path.isdir(args.data_dir):
+        print_error(f"找不到資料目錄: {args.data_dir}")
+        return 1
+
+    dims = args.by or list(DIMENSIONS)
+    accounting = GPUAccounting(args.data_dir, busy_threshold=args.busy_threshold).run(args.start_date, end_date)
+    print_report(accounting, dims, args.start_date, end_date)
+    if args.export is not None:
+        export_report(accounting, dims, args.export or f"gpu_accounting_{args.start_date}_to_{end_date}.csv")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
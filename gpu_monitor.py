@@ -0,0 +1,663 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GPU 監控系統統一命令列入口
+
+run_internal.sh 與 run_gpu_visualization.sh 的每個命令原本都會啟動新的直譯器
+（多半是 python3 -c "from quick_gpu_trend_plots import ..."），每次都要重新載入
+pandas、matplotlib 與字體設定。這裡把所有命令放在同一個行程中執行，並可用 `+`
+串接多個命令：
+
+- pandas / matplotlib 只載入一次，字體只設定一次
+- 相同日期範圍的每日平均資料只讀取一次（共用 GPUDataset）
+- 使用者查詢工具與其索引在命令之間共用
+
+任何一個命令失敗時停止後續命令（與 shell 的 set -e 相同），可用 --keep-going 繼續執行。
+
+使用範例:
+    python3 gpu_monitor.py quick 2025-11-01 2025-11-07
+    python3 gpu_monitor.py vram-users 2025-11-01 2025-11-07 + vram-compare 2025-11-01 2025-11-07 + vram-heatmap 2025-11-01 2025-11-07
+    python3 gpu_monitor.py --data-dir ./data list-users 2025-11-07 + query-user alice 2025-11-01 2025-11-07
+    python3 gpu_monitor.py accounting 2025-11-01 2025-11-30 --by user + user-index status
+    python3 gpu_monitor.py idle --min-idle 4h --since 2025-11-01
+    python3 gpu_monitor.py correlation 2025-11-01 2025-11-30 --nodes all
+    python3 gpu_monitor.py serve --port 8050
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+for _subdir in ('visualization', 'python', 'scripts'):
+    sys.path.append(os.path.join(SCRIPT_DIR, _subdir))
+
+from colab_gpu_stats import COLAB_NODES, DATE_FORMAT, print_info, print_success, print_error, print_warning
+# 建立命令列只需要參數定義，兩者都不會載入 NumPy、pandas 或 matplotlib
+from render_profiles import add_profile_argument
+from correlation_options import add_analysis_arguments
+
+CHAIN_SEPARATOR = '+'
+
+# 在命令間共用狀態的命令會註冊於此；直接轉交參數給原工具的命令見 PASSTHROUGH_COMMANDS
+COMMAND_NAMES = []
+
+
+def _date_argument(date_str):
+    try:
+        datetime.strptime(date_str, DATE_FORMAT)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日期格式錯誤: {date_str}，請使用 YYYY-MM-DD")
+    return date_str
+
+
+class MonitorSession:
+    """串接命令之間共用的狀態"""
+
+    def __init__(self, data_dir, plots_dir):
+        self.data_dir = data_dir
+        self.plots_dir = plots_dir
+        self._datasets = {}      # (開始日期, 結束日期) -> GPUDataset
+        self._query_tools = {}   # use_index -> UserGPUUsageQuery
+        self.dataset_hits = 0
+
+    def dataset(self, start_date, end_date):
+        """
+        取得日期範圍內的每日平均資料，同一範圍只讀取一次
+
+        Returns:
+            GPUDataset: 共用的資料集
+        """
+        key = (start_date, end_date)
+        dataset = self._datasets.get(key)
+        if dataset is None:
+            from gpu_dataset import GPUDataset
+            dataset = self._datasets[key] = GPUDataset(self.data_dir, start_date, end_date)
+        else:
+            self.dataset_hits += 1
+        return dataset
+
+    def query_tool(self, use_index=True):
+        """
+        Returns:
+            UserGPUUsageQuery: 共用的使用者查詢工具
+        """
+        tool = self._query_tools.get(use_index)
+        if tool is None:
+            from get_user_gpu_usage import UserGPUUsageQuery
+            tool = self._query_tools[use_index] = UserGPUUsageQuery(self.data_dir, self.plots_dir,
+                                                                    use_index=use_index)
+        return tool
+
+    def plot_dirs(self):
+        """繪圖函數共用的資料與輸出目錄參數"""
+        os.makedirs(self.plots_dir, exist_ok=True)
+        return {'data_dir': self.data_dir, 'plots_dir': self.plots_dir}
+
+
+def _plot_status(path, description):
+    """繪圖函數回傳路徑，None 表示失敗"""
+    if not path:
+        print_error(f"{description}生成失敗")
+        return 1
+    return 0
+
+
+def _plots_status(paths):
+    return 0 if paths else 1
+
+
+# ---------------------------------------------------------------------------
+# 資料收集
+# ---------------------------------------------------------------------------
+
+def cmd_collect(session, args):
+    from daily_gpu_log import main as collect_main
+    argv = [args.date or datetime.now().strftime(DATE_FORMAT), '--data-dir', session.data_dir]
+    if args.skip_task_info:
+        argv.append('--skip-task-info')
+    if args.user_report:
+        argv.append('--user-report')
+    collect_main(argv)
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# 圖組
+# ---------------------------------------------------------------------------
+
+def _plot_workers(args):
+    from plot_scheduler import default_workers
+    return args.workers if args.workers else default_workers()
+
+
+def cmd_quick(session, args):
+    from quick_gpu_trend_plots import generate_all_quick_plots, get_available_dates
+    from plot_cache import cache_enabled
+
+    start_date, end_date = args.start_date, args.end_date
+    if not (start_date and end_date):
+        available_dates = get_available_dates(session.data_dir)
+        if not available_dates:
+            print_error("未找到任何可用的 GPU 數據")
+            return 1
+        start_date, end_date = available_dates[0], available_dates[-1]
+        print_info(f"自動選擇日期範圍: {start_date} 至 {end_date}")
+
+    # 平行繪製時共用資料集同樣交給各 worker，不再各自讀取每日平均檔
+    paths = generate_all_quick_plots(start_date, end_date, show_users=not args.no_users, workers=_plot_workers(args),
+                                     use_cache=cache_enabled(), dataset=session.dataset(start_date, end_date),
+                                     **session.plot_dirs())
+    return _plots_status(paths)
+
+
+def cmd_plots(session, args):
+    from plot_scheduler import run_plot_jobs, report_plot_jobs
+    jobs = report_plot_jobs(args.start_date, args.end_date, show_users=not args.no_users, **session.plot_dirs())
+    results = run_plot_jobs(jobs, args.workers, use_cache=False if args.no_cache else None,
+                            dataset=session.dataset(args.start_date, args.end_date))
+    return 1 if any(r.error for r in results) else 0
+
+
+def cmd_weekly_plot(session, args):
+    end_date = datetime.now()
+    args.start_date = (end_date - timedelta(days=7)).strftime(DATE_FORMAT)
+    args.end_date = end_date.strftime(DATE_FORMAT)
+    print_info(f"生成最近 7 天的圖表: {args.start_date} 至 {args.end_date}")
+    return cmd_quick(session, args)
+
+
+# ---------------------------------------------------------------------------
+# GPU 使用率圖表
+# ---------------------------------------------------------------------------
+
+def cmd_nodes(session, args):
+    from quick_gpu_trend_plots import quick_nodes_trend
+    path = quick_nodes_trend(args.start_date, args.end_date, show_users=not args.no_users,
+                             dataset=session.dataset(args.start_date, args.end_date), **session.plot_dirs())
+    return _plot_status(path, "節點對比圖")
+
+
+def cmd_node(session, args):
+    from quick_gpu_trend_plots import quick_single_node_gpus
+    path = quick_single_node_gpus(args.node, args.start_date, args.end_date, show_users=not args.no_users,
+                                  dataset=session.dataset(args.start_date, args.end_date), **session.plot_dirs())
+    return _plot_status(path, f"{args.node} 所有 GPU 趨勢圖")
+
+
+def cmd_gpu(session, args):
+    from quick_gpu_trend_plots import quick_gpu_across_nodes
+    path = quick_gpu_across_nodes(args.gpu_id, args.start_date, args.end_date, show_users=not args.no_users,
+                                  dataset=session.dataset(args.start_date, args.end_date), **session.plot_dirs())
+    return _plot_status(path, f"GPU {args.gpu_id} 跨節點對比圖")
+
+
+def cmd_stacked(session, args):
+    from quick_gpu_trend_plots import quick_nodes_stacked_utilization
+    path = quick_nodes_stacked_utilization(args.start_date, args.end_date, show_users=not args.no_users,
+                                           dataset=session.dataset(args.start_date, args.end_date),
+                                           **session.plot_dirs())
+    return _plot_status(path, "各節點堆疊區域圖")
+
+
+def cmd_heatmap(session, args):
+    from quick_gpu_trend_plots import quick_gpu_heatmap
+    path = quick_gpu_heatmap(args.start_date, args.end_date, show_users=not args.no_users, freq=args.freq,
+                             dataset=session.dataset(args.start_date, args.end_date), **session.plot_dirs())
+    return _plot_status(path, "GPU 使用率熱力圖")
+
+
+def cmd_correlation(session, args):
+    from correlation_options import check_analysis_arguments, parse_nodes
+    from quick_gpu_trend_plots import quick_gpu_correlation
+    error = check_analysis_arguments(args)
+    if error:
+        print_error(error)
+        return 1
+    path = quick_gpu_correlation(args.start_date, args.end_date, nodes=parse_nodes(args.nodes),
+                                 resolution=args.resolution, busy_threshold=args.busy_threshold,
+                                 min_correlation=args.min_corr, **session.plot_dirs())
+    return _plot_status(path, "GPU 相關性與同時忙碌分析圖")
+
+
+def cmd_users(session, args):
+    from quick_gpu_trend_plots import quick_user_activity_summary
+    path = quick_user_activity_summary(args.start_date, args.end_date,
+                                       dataset=session.dataset(args.start_date, args.end_date),
+                                       **session.plot_dirs())
+    return _plot_status(path, "使用者活動摘要圖")
+
+
+def cmd_timeline(session, args):
+    # 與進階分析器的 timeline 模式相同（含摘要報告）
+    return run_advanced(session, ['--mode', 'timeline', '--node', args.node, '--gpu-id', str(args.gpu_id),
+                                  '--date', args.date, '--start-date', args.date, '--end-date', args.date])
+
+
+# ---------------------------------------------------------------------------
+# VRAM 圖表
+# ---------------------------------------------------------------------------
+
+def cmd_vram_users(session, args):
+    from quick_gpu_trend_plots import quick_vram_user_activity_summary
+    path = quick_vram_user_activity_summary(args.start_date, args.end_date,
+                                            dataset=session.dataset(args.start_date, args.end_date),
+                                            **session.plot_dirs())
+    return _plot_status(path, "VRAM 使用者活動摘要圖")
+
+
+def cmd_vram_compare(session, args):
+    from quick_gpu_trend_plots import quick_vram_nodes_comparison_with_users
+    path = quick_vram_nodes_comparison_with_users(args.start_date, args.end_date, gpu_id=args.gpu_id,
+                                                  show_users=not args.no_users,
+                                                  dataset=session.dataset(args.start_date, args.end_date),
+                                                  **session.plot_dirs())
+    return _plot_status(path, "VRAM 節點對比圖")
+
+
+def cmd_vram_nodes(session, args):
+    from quick_gpu_trend_plots import quick_vram_nodes_comparison
+    path = quick_vram_nodes_comparison(args.start_date, args.end_date, gpu_id=args.gpu_id, **session.plot_dirs())
+    return _plot_status(path, "VRAM 節點對比圖")
+
+
+def cmd_vram_stacked(session, args):
+    from quick_gpu_trend_plots import quick_nodes_vram_stacked_utilization
+    path = quick_nodes_vram_stacked_utilization(args.start_date, args.end_date, show_users=not args.no_users,
+                                                dataset=session.dataset(args.start_date, args.end_date),
+                                                **session.plot_dirs())
+    return _plot_status(path, "各節點 VRAM 堆疊區域圖")
+
+
+def cmd_vram_heatmap(session, args):
+    from quick_gpu_trend_plots import quick_vram_heatmap
+    path = quick_vram_heatmap(args.start_date, args.end_date, show_users=not args.no_users, freq=args.freq,
+                              dataset=session.dataset(args.start_date, args.end_date), **session.plot_dirs())
+    return _plot_status(path, "VRAM 熱力圖")
+
+
+def cmd_vram_timeline(session, args):
+    from quick_gpu_trend_plots import quick_vram_timeline
+    path = quick_vram_timeline(args.node, args.gpu_id, args.date, **session.plot_dirs())
+    return _plot_status(path, "VRAM 時間序列圖")
+
+
+def cmd_vram_all(session, args):
+    from quick_gpu_trend_plots import generate_all_vram_plots
+    from plot_cache import cache_enabled
+    paths = generate_all_vram_plots(args.start_date, args.end_date, show_users=not args.no_users,
+                                    workers=_plot_workers(args), use_cache=cache_enabled(),
+                                    dataset=session.dataset(args.start_date, args.end_date), **session.plot_dirs())
+    return _plots_status(paths)
+
+
+# ---------------------------------------------------------------------------
+# 使用者查詢
+# ---------------------------------------------------------------------------
+
+def cmd_query_user(session, args):
+    query_tool = session.query_tool(use_index=not args.no_index)
+    records = query_tool.query_user_gpu_usage(args.username, args.start_date, args.end_date)
+    query_tool.display_user_usage_summary(records)
+    if args.plot and records:
+        query_tool.plot_user_gpu_trends(records, args.username)
+    return 0
+
+
+def cmd_list_users(session, args):
+    users = session.query_tool(use_index=not args.no_index).list_all_users(args.date)
+    print(f"\n📈 總共找到 {len(users)} 位使用者")
+    return 0
+
+
+def cmd_user_report(session, args):
+    usernames = None
+    if args.users:
+        usernames = list(dict.fromkeys(u.strip() for u in args.users.split(',') if u.strip()))
+    query_tool = session.query_tool(use_index=not args.no_index)
+    query_tool.batch_user_report(usernames, args.start_date, args.end_date,
+                                 plot=not args.no_plot, output_path=args.output)
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# 儀表板
+# ---------------------------------------------------------------------------
+
+def cmd_serve(session, args):
+    from dashboard_server import serve
+    return serve(session.data_dir, args.host, args.port, args.cache_size, args.quiet)
+
+
+# ---------------------------------------------------------------------------
+# 直接轉交參數給原工具的命令
+# ---------------------------------------------------------------------------
+
+def _with_option(argv, option, value):
+    """argv 沒有指定 option 時補上預設值"""
+    if any(arg == option or arg.startswith(option + '=') for arg in argv):
+        return list(argv)
+    return list(argv) + [option, value]
+
+
+def run_accounting(session, argv):
+    from gpu_accounting import main as accounting_main
+    return accounting_main(_with_option(argv, '--data-dir', session.data_dir))
+
+
+def run_idle(session, argv):
+    from idle_detector import main as idle_main
+    return idle_main(_with_option(argv, '--data-dir', session.data_dir))
+
+
+def run_user_index(session, argv):
+    from user_index import main as user_index_main
+    argv = list(argv) if argv and not argv[0].startswith('-') else ['rebuild'] + list(argv)
+    user_index_main(_with_option(argv, '--data-dir', session.data_dir))
+    return 0
+
+
+def run_sketch(session, argv):
+    from quantile_sketch import main as sketch_main
+    argv = list(argv) if argv and not argv[0].startswith('-') else ['build'] + list(argv)
+    return sketch_main(_with_option(argv, '--data-dir', session.data_dir))
+
+
+def run_trend_stats(session, argv):
+    from trend_stats import main as trend_stats_main
+    return trend_stats_main(_with_option(argv, '--data-dir', session.data_dir))
+
+
+def run_forecast(session, argv):
+    from capacity_forecast import main as forecast_main
+    return forecast_main(_with_option(argv, '--data-dir', session.data_dir))
+
+
+def run_archive(session, argv):
+    from archive_data import main as archive_main
+    archive_main(argv)
+    return 0
+
+
+def run_retention(session, argv):
+    from retention_policy import main as retention_main
+    return retention_main(argv)
+
+
+def run_advanced(session, argv):
+    from advanced_gpu_trend_analyzer import main as advanced_main
+    argv = _with_option(argv, '--data-dir', session.data_dir)
+    advanced_main(_with_option(argv, '--plots-dir', session.plot_dirs()['plots_dir']))
+    return 0
+
+
+# 命令名稱 -> (處理函數, 說明)
+PASSTHROUGH_COMMANDS = {
+    'accounting': (run_accounting, '依原始樣本計算 GPU 時數（參數同 gpu_accounting.py）'),
+    'idle': (run_idle, '偵測已配置但長時間閒置的 GPU（參數同 idle_detector.py）'),
+    'user-index': (run_user_index, '重建或查看使用者索引: [rebuild|update DATE|status]'),
+    'sketch': (run_sketch, '分位數摘要: [build [開始 [結束]]|query 開始 [結束] --by user ...]'),
+    'trend-stats': (run_trend_stats, '移動平均、週變化、趨勢斜率與時段輪廓: 開始 結束 [--by node|gpu|fleet] [--profile]'),
+    'forecast': (run_forecast, '預測各節點與全部節點的使用率與配置需求（參數同 capacity_forecast.py）'),
+    'archive': (run_archive, '歸檔資料（參數同 scripts/archive_data.py）'),
+    'retention': (run_retention, '資料保留政策（參數同 scripts/retention_policy.py）'),
+    'advanced': (run_advanced, '進階趨勢分析（參數同 advanced_gpu_trend_analyzer.py）'),
+}
+
+
+# ---------------------------------------------------------------------------
+# 命令列
+# ---------------------------------------------------------------------------
+
+def _add_command(subparsers, name, handler, help_text, dates='range'):
+    """
+    註冊命令
+
+    Args:
+        dates (str): 'range' 需要開始與結束日期；'optional-range' 日期可省略；None 不加日期參數
+
+    Returns:
+        argparse.ArgumentParser: 命令的 parser
+    """
+    command = subparsers.add_parser(name, help=help_text, description=help_text)
+    if dates == 'range':
+        command.add_argument('start_date', type=_date_argument, help='開始日期 (YYYY-MM-DD)')
+        command.add_argument('end_date', type=_date_argument, help='結束日期 (YYYY-MM-DD)')
+    elif dates == 'optional-range':
+        command.add_argument('start_date', nargs='?', type=_date_argument, help='開始日期 (YYYY-MM-DD)')
+        command.add_argument('end_date', nargs='?', type=_date_argument, help='結束日期 (YYYY-MM-DD)')
+    command.set_defaults(handler=handler)
+    COMMAND_NAMES.append(name)
+    return command
+
+
+def _add_users_flag(command):
+    command.add_argument('--no-users', action='store_true', help='不顯示使用者資訊')
+
+
+def _add_workers_flag(command):
+    command.add_argument('--workers', type=int, help='平行繪圖的行程數 (預設: GPU_PLOT_WORKERS 或 CPU 數量)')
+
+
+def _add_freq_flag(command):
+    command.add_argument('--freq', choices=['auto', 'D', 'W', 'M'], default='auto',
+                         help='熱力圖欄位彙整 (預設: auto)')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description='GPU 監控系統統一命令列（多個命令以 + 串接，在同一個行程中執行）',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('使用範例:')[1],
+    )
+    parser.add_argument('--data-dir', default='./data', help='資料目錄路徑，預設為 ./data')
+    parser.add_argument('--plots-dir', default='./plots', help='圖表輸出目錄，預設為 ./plots')
+    parser.add_argument('--keep-going', action='store_true', help='命令失敗時繼續執行後續命令')
+    add_profile_argument(parser)
+
+    subparsers = parser.add_subparsers(dest='command', metavar='<command>')
+    COMMAND_NAMES.clear()
+
+    command = _add_command(subparsers, 'collect', cmd_collect, '收集 GPU 數據 (預設: 今天)', dates=None)
+    command.add_argument('date', nargs='?', type=_date_argument, help='日期 (YYYY-MM-DD)')
+    command.add_argument('--skip-task-info', action='store_true', help='跳過 GPU 使用者任務資訊的獲取')
+    command.add_argument('--user-report', action='store_true', help='只顯示 GPU 使用者任務報告')
+
+    # 圖組
+    command = _add_command(subparsers, 'quick', cmd_quick, '快速生成所有常用圖表（未指定日期時使用所有可用資料）',
+                           dates='optional-range')
+    _add_users_flag(command)
+    _add_workers_flag(command)
+    command = _add_command(subparsers, 'plots', cmd_plots, '平行生成完整報表圖組')
+    _add_users_flag(command)
+    _add_workers_flag(command)
+    command.add_argument('--no-cache', action='store_true', help='忽略圖表快取，全部重新繪製')
+    command = _add_command(subparsers, 'weekly-plot', cmd_weekly_plot, '生成最近 7 天的圖表', dates=None)
+    _add_users_flag(command)
+    _add_workers_flag(command)
+
+    # GPU 使用率
+    _add_users_flag(_add_command(subparsers, 'nodes', cmd_nodes, '節點對比趨勢圖'))
+    command = _add_command(subparsers, 'node', cmd_node, '單一節點所有 GPU 趨勢圖', dates=None)
+    command.add_argument('node', choices=COLAB_NODES, help='節點名稱')
+    command.add_argument('start_date', type=_date_argument, help='開始日期 (YYYY-MM-DD)')
+    command.add_argument('end_date', type=_date_argument, help='結束日期 (YYYY-MM-DD)')
+    _add_users_flag(command)
+    command = _add_command(subparsers, 'gpu', cmd_gpu, '特定 GPU 跨節點對比圖', dates=None)
+    command.add_argument('gpu_id', type=int, help='GPU 索引')
+    command.add_argument('start_date', type=_date_argument, help='開始日期 (YYYY-MM-DD)')
+    command.add_argument('end_date', type=_date_argument, help='結束日期 (YYYY-MM-DD)')
+    _add_users_flag(command)
+    _add_users_flag(_add_command(subparsers, 'stacked', cmd_stacked, '各節點 GPU 使用率堆疊區域圖'))
+    command = _add_command(subparsers, 'heatmap', cmd_heatmap, 'GPU 使用率熱力圖')
+    _add_users_flag(command)
+    _add_freq_flag(command)
+    _add_command(subparsers, 'users', cmd_users, '使用者活動摘要圖')
+    command = _add_command(subparsers, 'correlation', cmd_correlation, '跨 GPU / 跨節點相關性與同時忙碌分析圖')
+    add_analysis_arguments(command)
+    for name, handler, help_text in (('timeline', cmd_timeline, '單一 GPU 詳細時間序列圖'),
+                                     ('vram-timeline', cmd_vram_timeline, '單一 GPU VRAM 時間序列圖')):
+        command = _add_command(subparsers, name, handler, help_text, dates=None)
+        command.add_argument('node', choices=COLAB_NODES, help='節點名稱')
+        command.add_argument('gpu_id', type=int, help='GPU 索引')
+        command.add_argument('date', type=_date_argument, help='日期 (YYYY-MM-DD)')
+
+    # VRAM
+    _add_command(subparsers, 'vram-users', cmd_vram_users, 'VRAM 使用者活動摘要圖')
+    command = _add_command(subparsers, 'vram-compare', cmd_vram_compare, '各節點 VRAM 對比圖（含使用者資訊）')
+    command.add_argument('--gpu-id', type=int, help='指定 GPU，預設為所有 GPU 平均')
+    _add_users_flag(command)
+    command = _add_command(subparsers, 'vram-nodes', cmd_vram_nodes, '各節點 VRAM 對比圖')
+    command.add_argument('gpu_id', nargs='?', type=int, help='指定 GPU，預設為所有 GPU 平均')
+    _add_users_flag(_add_command(subparsers, 'vram-stacked', cmd_vram_stacked, '各節點 VRAM 使用率堆疊區域圖'))
+    command = _add_command(subparsers, 'vram-heatmap', cmd_vram_heatmap, 'VRAM 使用率熱力圖')
+    _add_users_flag(command)
+    _add_freq_flag(command)
+    command = _add_command(subparsers, 'vram-all', cmd_vram_all, '所有 VRAM 圖表')
+    _add_users_flag(command)
+    _add_workers_flag(command)
+
+    # 使用者查詢
+    command = _add_command(subparsers, 'query-user', cmd_query_user, '查詢使用者 GPU 使用情況', dates=None)
+    command.add_argument('username', help='使用者名稱')
+    command.add_argument('start_date', type=_date_argument, help='開始日期 (YYYY-MM-DD)')
+    command.add_argument('end_date', nargs='?', type=_date_argument, help='結束日期 (YYYY-MM-DD)，可選')
+    command.add_argument('--plot', action='store_true', help='生成使用者 GPU 使用趨勢圖')
+    command.add_argument('--no-index', action='store_true', help='不使用使用者索引')
+    command = _add_command(subparsers, 'list-users', cmd_list_users, '列出指定日期的所有使用者', dates=None)
+    command.add_argument('date', type=_date_argument, help='日期 (YYYY-MM-DD)')
+    command.add_argument('--no-index', action='store_true', help='不使用使用者索引')
+    command = _add_command(subparsers, 'user-report', cmd_user_report, '批次使用者摘要（預設為所有使用者）')
+    command.add_argument('users', nargs='?', help='以逗號分隔的使用者名稱')
+    command.add_argument('--output', help='摘要 CSV 的輸出路徑，預設存於圖表目錄')
+    command.add_argument('--no-plot', action='store_true', help='不生成比較圖與趨勢圖')
+    command.add_argument('--no-index', action='store_true', help='不使用使用者索引')
+
+    # 儀表板（參數與 dashboard_server.py 相同，這裡不匯入該模組以免拖慢 --help）
+    command = _add_command(subparsers, 'serve', cmd_serve, '啟動本機儀表板伺服器（JSON API 與互動圖表頁面）',
+                           dates=None)
+    command.add_argument('--host', default='127.0.0.1', help='監聽位址 (預設: 127.0.0.1，僅限本機)')
+    command.add_argument('--port', type=int, default=8050, help='連接埠 (預設: 8050)')
+    command.add_argument('--cache-size', type=int, default=256, help='行程內快取的回應數量上限 (預設: 256)')
+    command.add_argument('--quiet', action='store_true', help='不輸出每個請求的記錄')
+
+    for name, (_, help_text) in PASSTHROUGH_COMMANDS.items():
+        subparsers.add_parser(name, help=help_text, add_help=False)
+
+    return parser
+
+
+def split_chain(argv):
+    """
+    以 + 分隔串接的命令
+
+    Returns:
+        list: 每個命令的參數列表
+    """
+    segments = [[]]
+    for arg in argv:
+        if arg == CHAIN_SEPARATOR:
+            segments.append([])
+        else:
+            segments[-1].append(arg)
+    return segments
+
+
+def plan_commands(parser, segments):
+    """
+    先解析所有命令，參數錯誤時在執行任何命令之前就結束
+
+    Returns:
+        list: (顯示名稱, 執行函數) 列表，執行函數接受 session 並回傳結束碼
+    """
+    steps = []
+    for segment in segments:
+        if not segment:
+            parser.error(f"'{CHAIN_SEPARATOR}' 前後都需要命令")
+        name = segment[0]
+        if name in PASSTHROUGH_COMMANDS:
+            handler = PASSTHROUGH_COMMANDS[name][0]
+            steps.append((' '.join(segment), lambda session, h=handler, a=segment[1:]: h(session, a)))
+            continue
+        if name not in COMMAND_NAMES:
+            parser.error(f"未知的命令: {name}")
+        args = parser.parse_args(segment)
+        steps.append((' '.join(segment), lambda session, a=args: a.handler(session, a)))
+    return steps
+
+
+def _exit_code(value):
+    if value is None:
+        return 0
+    return value if isinstance(value, int) else 1
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    parser = build_parser()
+    segments = split_chain(argv)
+
+    # 全域選項位於第一個命令之前
+    first = segments[0]
+    known = COMMAND_NAMES + list(PASSTHROUGH_COMMANDS)
+    position = next((i for i, arg in enumerate(first) if arg in known), len(first))
+    options = parser.parse_args(first[:position])
+    segments[0] = first[position:]
+    if len(segments) == 1 and not segments[0]:
+        parser.print_help()
+        return 1
+
+    steps = plan_commands(parser, segments)
+    if options.profile:
+        from render_profiles import set_profile
+        set_profile(options.profile)
+    session = MonitorSession(options.data_dir, options.plots_dir)
+
+    timings = []
+    failed = 0
+    for index, (label, run) in enumerate(steps, 1):
+        if len(steps) > 1:
+            print_info(f"[{index}/{len(steps)}] {label}")
+        start = time.perf_counter()
+        try:
+            code = _exit_code(run(session))
+        except SystemExit as e:
+            code = _exit_code(e.code)
+        except KeyboardInterrupt:
+            print_error("使用者中斷操作")
+            return 130
+        except Exception as e:
+            # 單一命令的例外視為該步驟失敗，仍依 --keep-going 決定是否繼續並列出耗時
+            print_error(f"{label} 發生例外: {type(e).__name__}: {e}")
+            code = 1
+        timings.append((label, time.perf_counter() - start, code))
+        if code:
+            failed += 1
+            print_error(f"命令失敗 (結束碼 {code}): {label}")
+            if not options.keep_going:
+                break
+
+    if len(steps) > 1:
+        print("\n" + "=" * 60)
+        print("串接命令耗時")
+        print("=" * 60)
+        for label, seconds, code in timings:
+            status = '✓' if code == 0 else '✗'
+            print(f"  {status} {seconds:7.2f}s  {label}")
+        skipped = len(steps) - len(timings)
+        if skipped:
+            print_warning(f"因前一個命令失敗而略過 {skipped} 個命令（可使用 --keep-going）")
+        if session.dataset_hits:
+            print(f"  共用每日平均資料: {session.dataset_hits} 次")
+        print("=" * 60)
+    if failed:
+        return 1
+    if len(steps) > 1:
+        print_success(f"已完成 {len(steps)} 個命令")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+閒置配置偵測工具
+
+找出「GPU 已配置給使用者，但使用率長時間接近 0%」的時段。與 list_all_users 以每日平均
+判斷不同，這裡逐筆掃描原始樣本（gpu{idx}_{date}.csv），配置時段取自 tasks_{date}.csv，
+沒有 tasks 檔的舊資料以 average 檔中的使用者視為整天配置（與 gpu_accounting.py 相同）。
+
+同一使用者在同一張 GPU 上連續閒置（使用率不超過門檻）的樣本合併為一個閒置區段，
+跨日延續的區段會接續計算；持續時間達到下限的區段記錄於 idle_spans.csv。
+
+以串流方式處理：狀態檔 (idle_state.json) 記錄每個節點處理到的最後一筆樣本與尚未結束的區段，
+每次執行只讀取新的樣本，已處理過的日期不會再讀取。門檻或時間下限變更時自動重新掃描全部資料；
+補收集早於上次處理日期的資料後，請以 --rebuild 重新掃描。
+
+輸出（預設位於 <資料目錄>/idle/）:
+- idle_state.json: 串流狀態
+- idle_spans.csv: 所有已結束的閒置區段
+- idle_report.csv: 依閒置時數排序的使用者報告
+
+使用範例:
+    python3 idle_detector.py
+    python3 idle_detector.py --min-idle 4h --idle-threshold 1
+    python3 idle_detector.py --since 2025-09-01 --until 2025-09-30 --top 20
+    python3 idle_detector.py --no-update --report idle_2025-09.csv
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+from colab_gpu_stats import (
+    COLAB_NODES, DATE_FORMAT, DEFAULT_DATA_DIR,
+    print_info, print_success, print_error, print_warning,
+)
+from gpu_accounting import (
+    GPU_INDICES, TAIWAN_TZ, load_day_samples, load_day_tasks,
+)
+
+# 使用率不超過此值的樣本視為閒置
+DEFAULT_IDLE_THRESHOLD = 1.0
+
+# 閒置區段至少持續的時數
+DEFAULT_MIN_IDLE_HOURS = 2.0
+
+# 相鄰樣本間隔超過取樣間隔的倍數時視為資料中斷，區段在此結束
+MAX_GAP_FACTOR = 2.0
+
+STATE_VERSION = 1
+IDLE_DIR = 'idle'
+STATE_FILE = 'idle_state.json'
+SPANS_FILE = 'idle_spans.csv'
+REPORT_FILE = 'idle_report.csv'
+
+SPANS_HEADER = ['節點', 'GPU編號', '使用者', '專案', '開始時間', '結束時間', '閒置時數', '樣本數',
+                '平均GPU使用率(%)', '平均VRAM使用率(%)', '最大GPU使用率(%)']
+REPORT_HEADER = ['排名', '使用者', '閒置時數', '閒置區段數', '最長區段時數', 'GPU數', '進行中區段數', '最近閒置結束時間']
+
+DATE_DIR_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+def parse_hours(value):
+    """
+    解析時間長度
+
+    Args:
+        value (str): 數字（小時）或加上單位 m/h/d，例如 90m、4h、1d
+
+    Returns:
+        float: 小時
+    """
+    text = str(value).strip().lower()
+    units = {'m': 1 / 60, 'h': 1.0, 'd': 24.0}
+    scale = units.get(text[-1:], None)
+    number = text[:-1] if scale is not None else text
+    try:
+        hours = float(number) * (scale or 1.0)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"時間長度格式錯誤: {value}，請使用 90m、4h 或 1d")
+    if hours <= 0:
+        raise argparse.ArgumentTypeError("時間長度必須大於 0")
+    return hours
+
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=TAIWAN_TZ).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def idle_runs(timestamps, usage, owners, idle_threshold, max_gap):
+    """
+    單張 GPU 的閒置連續區間
+
+    Args:
+        timestamps (numpy.ndarray): 樣本時間戳 [T]
+        usage (numpy.ndarray): 使用率 [T]，缺資料為 NaN（視為中斷）
+        owners (numpy.ndarray): 每筆樣本的配置者代碼 [T]，未配置為 -1
+        idle_threshold (float): 閒置門檻 (%)
+        max_gap (float): 相鄰樣本的最大間隔秒數
+
+    Returns:
+        tuple: (起始索引, 結束索引（不含）, 配置者代碼) 三個陣列
+    """
+    with np.errstate(invalid='ignore'):
+        key = np.where((owners >= 0) & (usage <= idle_threshold), owners, -1)
+    breaks = np.flatnonzero((np.diff(key) != 0) | (np.diff(timestamps) > max_gap)) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [key.size]))
+    keep = key[starts] >= 0
+    return starts[keep], ends[keep], key[starts[keep]]
+
+
+def new_span(user, project, timestamps, durations, usage, vram, start, end):
+    """以 [start, end) 的樣本建立閒置區段"""
+    span = {'user': user, 'project': project, 'start': float(timestamps[start]),
+            'hours': 0.0, 'samples': 0, 'usage_sum': 0.0, 'usage_max': 0.0, 'vram_sum': 0.0, 'vram_count': 0}
+    return extend_span(span, timestamps, durations, usage, vram, start, end)
+
+
+def extend_span(span, timestamps, durations, usage, vram, start, end):
+    """把 [start, end) 的樣本併入區段"""
+    span_vram = vram[start:end]
+    known_vram = span_vram[~np.isnan(span_vram)]
+    span['hours'] += float(durations[start:end].sum()) / 3600.0
+    span['samples'] += int(end - start)
+    span['usage_sum'] += float(usage[start:end].sum())
+    span['usage_max'] = max(span['usage_max'], float(usage[start:end].max()))
+    span['vram_sum'] += float(known_vram.sum())
+    span['vram_count'] += int(known_vram.size)
+    span['last_ts'] = float(timestamps[end - 1])
+    span['end'] = float(timestamps[end - 1] + durations[end - 1])
+    return span
+
+
+def span_row(node, gpu_index, span):
+    avg_vram = span['vram_sum'] / span['vram_count'] if span['vram_count'] else 0.0
+    return [node, f"GPU[{gpu_index}]", span['user'], span['project'],
+            format_time(span['start']), format_time(span['end']), f"{span['hours']:.2f}", span['samples'],
+            f"{span['usage_sum'] / max(span['samples'], 1):.2f}", f"{avg_vram:.2f}", f"{span['usage_max']:.2f}"]
+
+
+class IdleDetector:
+    """逐節點串流掃描原始樣本，累積閒置配置區段"""
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, nodes=None, idle_threshold=DEFAULT_IDLE_THRESHOLD,
+                 min_idle_hours=DEFAULT_MIN_IDLE_HOURS, output_dir=None):
+        """
+        Args:
+            data_dir (str): 資料目錄
+            nodes (list): 節點名稱列表，預設為所有節點
+            idle_threshold (float): 閒置門檻 (%)
+            min_idle_hours (float): 記錄區段的最短時數
+            output_dir (str): 狀態與結果目錄，預設為 <data_dir>/idle
+        """
+        self.data_dir = data_dir
+        self.nodes = list(nodes or COLAB_NODES)
+        self.idle_threshold = idle_threshold
+        self.min_idle_hours = min_idle_hours
+        self.output_dir = output_dir or os.path.join(data_dir, IDLE_DIR)
+        self.state_path = os.path.join(self.output_dir, STATE_FILE)
+        self.spans_path = os.path.join(self.output_dir, SPANS_FILE)
+        self.state = self._load_state()
+
+    @property
+    def params(self):
+        return {'idle_threshold': self.idle_threshold, 'min_idle_hours': self.min_idle_hours}
+
+    def _empty_state(self):
+        return {'version': STATE_VERSION, 'params': self.params, 'nodes': {}}
+
+    def _load_state(self):
+        state = None
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except (OSError, ValueError) as e:
+                print_warning(f"無法讀取狀態檔 {self.state_path}: {e}，將重新掃描全部資料")
+            else:
+                if state.get('version') != STATE_VERSION or state.get('params') != self.params:
+                    print_warning("閒置門檻或時間下限與上次不同，將重新掃描全部資料")
+                    state = None
+        # 沒有有效的狀態時，已記錄的區段無法接續，於下次 update 時捨棄
+        self.stale = state is None
+        return state or self._empty_state()
+
+    def _remove_spans(self):
+        if os.path.exists(self.spans_path):
+            os.remove(self.spans_path)
+
+    def reset(self):
+        """捨棄狀態，下次 update 時清除已記錄的區段並重新掃描全部資料"""
+        self.state = self._empty_state()
+        self.stale = True
+
+    def save(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.state['updated'] = datetime.now(TAIWAN_TZ).strftime('%Y-%m-%d %H:%M:%S')
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    def _pending_dates(self, node, last_date):
+        """節點目錄中上次處理日期（含）之後的日期"""
+        node_dir = os.path.join(self.data_dir, node)
+        if not os.path.isdir(node_dir):
+            return []
+        return sorted(d for d in os.listdir(node_dir)
+                      if DATE_DIR_RE.match(d) and (last_date is None or d >= last_date))
+
+    def update(self):
+        """
+        處理所有節點的新樣本
+
+        Returns:
+            tuple: (處理的節點日數, 新記錄的閒置區段數)
+        """
+        if self.stale:
+            self._remove_spans()
+            self.stale = False
+        rows, days = [], 0
+        for node in self.nodes:
+            node_state = self.state['nodes'].setdefault(node, {'last_date': None, 'last_ts': None, 'open': {}})
+            for date_str in self._pending_dates(node, node_state['last_date']):
+                if self._process_day(node, date_str, node_state, rows):
+                    days += 1
+                node_state['last_date'] = date_str
+
+        if rows:
+            os.makedirs(self.output_dir, exist_ok=True)
+            write_header = not os.path.exists(self.spans_path)
+            with open(self.spans_path, 'a', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                if write_header:
+                    writer.writerow(SPANS_HEADER)
+                writer.writerows(rows)
+        self.save()
+        return days, len(rows)
+
+    def _process_day(self, node, date_str, node_state, rows):
+        """
+        掃描一個節點日中尚未處理的樣本
+
+        Returns:
+            bool: 是否有新樣本
+        """
+        samples = load_day_samples(self.data_dir, node, date_str)
+        if samples is None:
+            return False
+        timestamps, durations, usage, vram = samples
+        if node_state['last_ts'] is not None:
+            fresh = timestamps > node_state['last_ts']
+            if not fresh.any():
+                return False
+            timestamps, durations, usage, vram = timestamps[fresh], durations[fresh], usage[:, fresh], vram[:, fresh]
+
+        # 配置者代碼矩陣 [GPU, 樣本]，代碼對應 (使用者, 專案)
+        owners = np.full(usage.shape, -1, dtype=np.int64)
+        allocations = []
+        for user, project, gpu_index, start, end, _ in load_day_tasks(self.data_dir, node, date_str):
+            if gpu_index not in GPU_INDICES:
+                continue
+            if (user, project) not in allocations:
+                allocations.append((user, project))
+            in_task = (timestamps >= start) & (timestamps < end)
+            owners[GPU_INDICES.index(gpu_index), in_task] = allocations.index((user, project))
+
+        step = float(np.median(durations))
+        max_gap = step * MAX_GAP_FACTOR
+        open_spans = node_state['open']
+        for row, gpu_index in enumerate(GPU_INDICES):
+            key = str(gpu_index)
+            span = open_spans.pop(key, None)
+            starts, ends, codes = idle_runs(timestamps, usage[row], owners[row], self.idle_threshold, max_gap)
+            for start, end, code in zip(starts, ends, codes):
+                user, project = allocations[code]
+                if (span is not None and start == 0 and (span['user'], span['project']) == (user, project)
+                        and timestamps[0] - span['last_ts'] <= max_gap):
+                    extend_span(span, timestamps, durations, usage[row], vram[row], start, end)
+                    continue
+                self._close(node, gpu_index, span, rows)
+                span = new_span(user, project, timestamps, durations, usage[row], vram[row], start, end)
+                if end < timestamps.size:
+                    self._close(node, gpu_index, span, rows)
+                    span = None
+            # 區段延續到最後一筆樣本時保留，下一批樣本可能接續
+            if span is not None and span['last_ts'] == float(timestamps[-1]):
+                open_spans[key] = span
+            else:
+                self._close(node, gpu_index, span, rows)
+
+        node_state['last_ts'] = float(timestamps[-1])
+        return True
+
+    def _close(self, node, gpu_index, span, rows):
+        if span is not None and span['hours'] >= self.min_idle_hours:
+            rows.append(span_row(node, gpu_index, span))
+
+    def open_spans(self):
+        """
+        Returns:
+            list: (節點, GPU 索引, 區段) 尚未結束且已達時間下限的區段
+        """
+        return [(node, int(gpu), span)
+                for node, node_state in self.state['nodes'].items()
+                for gpu, span in node_state['open'].items()
+                if span['hours'] >= self.min_idle_hours]
+
+    def read_spans(self, since=None, until=None):
+        """
+        讀取已記錄的區段（含進行中區段），依開始日期篩選
+
+        Args:
+            since (str): 開始日期下限 (YYYY-MM-DD)
+            until (str): 開始日期上限 (YYYY-MM-DD)
+
+        Returns:
+            list: 每個區段一筆 dict，依閒置時數由大到小排序
+        """
+        spans = {}
+        if not self.stale and os.path.exists(self.spans_path):
+            with open(self.spans_path, 'r', encoding='utf-8', newline='') as f:
+                for row in csv.DictReader(f):
+                    spans[(row['節點'], row['GPU編號'], row['開始時間'])] = dict(row, ongoing=False)
+        for node, gpu_index, span in self.open_spans():
+            row = dict(zip(SPANS_HEADER, span_row(node, gpu_index, span)), ongoing=True)
+            spans[(row['節點'], row['GPU編號'], row['開始時間'])] = row
+
+        result = []
+        for row in spans.values():
+            day = row['開始時間'][:10]
+            if (since and day < since) or (until and day > until):
+                continue
+            row['hours'] = float(row['閒置時數'])
+            result.append(row)
+        result.sort(key=lambda r: r['hours'], reverse=True)
+        return result
+
+
+def rank_users(spans):
+    """
+    依使用者彙整閒置區段
+
+    Returns:
+        list: 每位使用者一筆 dict，依閒置時數由大到小排序
+    """
+    users = {}
+    for span in spans:
+        entry = users.setdefault(span['使用者'], {'user': span['使用者'], 'hours': 0.0, 'spans': 0,
+                                                  'longest': 0.0, 'gpus': set(), 'ongoing': 0, 'last_end': ''})
+        entry['hours'] += span['hours']
+        entry['spans'] += 1
+        entry['longest'] = max(entry['longest'], span['hours'])
+        entry['gpus'].add((span['節點'], span['GPU編號']))
+        entry['ongoing'] += span['ongoing']
+        entry['last_end'] = max(entry['last_end'], span['結束時間'])
+    return sorted(users.values(), key=lambda u: u['hours'], reverse=True)
+
+
+def print_report(detector, ranking, spans, top):
+    print_info(f"閒置配置報告（使用率 ≤ {detector.idle_threshold:g}% 且持續 ≥ {detector.min_idle_hours:g} 小時）")
+    if not ranking:
+        print("  (沒有符合條件的閒置區段)")
+        return
+    print(f"\n{'排名':<4} {'使用者':<20} {'閒置h':>9} {'區段數':>6} {'最長h':>8} {'GPU數':>6} {'進行中':>6}  最近結束")
+    print("-" * 88)
+    for rank, u in enumerate(ranking, 1):
+        print(f"{rank:<4} {u['user']:<20} {u['hours']:>9.1f} {u['spans']:>6} {u['longest']:>8.1f} "
+              f"{len(u['gpus']):>6} {u['ongoing']:>6}  {u['last_end']}")
+
+    print(f"\n最長的 {min(top, len(spans))} 個閒置區段:")
+    for span in spans[:top]:
+        flag = '（進行中）' if span['ongoing'] else ''
+        print(f"  {span['使用者']:<16} {span['節點']} {span['GPU編號']:<7} {span['開始時間']} ~ {span['結束時間']} "
+              f"{span['hours']:>7.1f}h  平均 {float(span['平均GPU使用率(%)']):.1f}%{flag}")
+
+
+def export_report(ranking, output_file):
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(REPORT_HEADER)
+        for rank, u in enumerate(ranking, 1):
+            writer.writerow([rank, u['user'], f"{u['hours']:.2f}", u['spans'], f"{u['longest']:.2f}",
+                             len(u['gpus']), u['ongoing'], u['last_end']])
+    print_success(f"閒置配置報告已匯出至: {output_file}")
+
+
+def _date_argument(date_str):
+    try:
+        datetime.strptime(date_str, DATE_FORMAT)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日期格式錯誤: {date_str}，請使用 YYYY-MM-DD")
+    return date_str
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='逐筆掃描原始樣本，找出已配置但長時間閒置的 GPU 並依使用者排名',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('使用範例:')[1] if '使用範例:' in __doc__ else None,
+    )
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='資料目錄路徑')
+    parser.add_argument('--output-dir', help='狀態與結果目錄，預設為 <資料目錄>/idle')
+    parser.add_argument('--idle-threshold', type=float, default=DEFAULT_IDLE_THRESHOLD,
+                        help=f'使用率不超過此值視為閒置 (%%)，預設 {DEFAULT_IDLE_THRESHOLD}')
+    parser.add_argument('--min-idle', type=parse_hours, default=DEFAULT_MIN_IDLE_HOURS, metavar='DURATION',
+                        help=f'閒置區段的最短持續時間，例如 90m、4h、1d，預設 {DEFAULT_MIN_IDLE_HOURS:g}h')
+    parser.add_argument('--since', type=_date_argument, help='報告只包含此日期（含）之後開始的區段')
+    parser.add_argument('--until', type=_date_argument, help='報告只包含此日期（含）之前開始的區段')
+    parser.add_argument('--top', type=int, default=10, help='列出最長的區段數，預設 10')
+    parser.add_argument('--report', metavar='FILE', help='報告 CSV 路徑，預設為 <輸出目錄>/idle_report.csv')
+    parser.add_argument('--rebuild', action='store_true', help='捨棄狀態，重新掃描全部資料')
+    parser.add_argument('--no-update', action='store_true', help='不掃描新樣本，只以已記錄的區段產生報告')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.data_dir):
+        print_error(f"找不到資料目錄: {args.data_dir}")
+        return 1
+
+    detector = IdleDetector(args.data_dir, idle_threshold=args.idle_threshold,
+                            min_idle_hours=args.min_idle, output_dir=args.output_dir)
+    if args.rebuild:
+        detector.reset()
+    if not args.no_update:
+        days, found = detector.update()
+        print_info(f"已處理 {days} 個節點日的新樣本，新增 {found} 個閒置區段")
+
+    spans = detector.read_spans(args.since, args.until)
+    ranking = rank_users(spans)
+    print_report(detector, ranking, spans, args.top)
+    export_report(ranking, args.report or os.path.join(detector.output_dir, REPORT_FILE))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
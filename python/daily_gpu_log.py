@@ -58,6 +58,7 @@ class GPUDataCollector:
         
         # GPU 使用者任務資訊
         self.gpu_task_info = {}
+        self.gpu_task_allocations = []
         
         print(f"GPU 硬體對應: Card {self.gpu_card_ids} -> Index {self.gpu_indices}")
         print(f"使用 Card IDs 進行 API 查詢，檔案以 GPU Index 命名")
@@ -142,6 +143,8 @@ class GPUDataCollector:
             
             # 解析任務資訊，建立 GPU UUID 到使用者的對應
             gpu_usage_map = {}
+            # 所有任務 × GPU 的配置紀錄（同一張 GPU 一天內可能有多個任務，供 GPU 時數計算使用）
+            task_allocations = []
             
             for task_id, task_info in task_data.items():
                 username = task_info.get('username', 'unknown')
@@ -171,8 +174,10 @@ class GPUDataCollector:
                         'end': task_info.get('end', ''),
                         'total_seconds': task_info.get('total_seconds', 0)
                     }
+                    task_allocations.append(gpu_usage_map[gpu_uuid])
             
             self.gpu_task_info = gpu_usage_map
+            self.gpu_task_allocations = task_allocations
             print(f"成功獲取 {len(gpu_usage_map)} 個 GPU 的使用者任務資訊")
             
             # 顯示摘要資訊
@@ -415,6 +420,9 @@ class GPUDataCollector:
                 f.write(f"全部平均,{overall_avg_gpu:.2f},{overall_avg_vram:.2f},所有使用者\n")
                 print(f"結果已保存至 {avg_csv}")
             
+            # 建立分位數摘要（需在平均檔寫入後，才能記錄使用者）
+            self.write_quantile_sketch(name, date_str)
+            
             # 生成摘要報告 (確保 CSV 檔案已完全寫入)
             self.generate_summary_report(colab_outdir, date_str, name, overall_avg_gpu, overall_avg_vram)
     
@@ -495,10 +503,37 @@ class GPUDataCollector:
             
             f.write(f"\n整體平均 GPU 使用率: {overall_avg_gpu:.2f}%\n")
             f.write(f"整體平均 VRAM 使用率: {overall_avg_vram:.2f}%\n")
+            self.write_percentile_section(f, name, date_str)
             f.write("================================\n")
         
         print(f"摘要報告已保存至 {summary_file}")
         
+    def write_quantile_sketch(self, name, date_str):
+        """建立節點當日每張 GPU 的分位數摘要 (sketch_{date}.json)"""
+        try:
+            from quantile_sketch import write_day_sketch
+            if write_day_sketch(str(self.data_dir), name, date_str) is not None:
+                print(f"分位數摘要已保存至 {self.data_dir / name / date_str / f'sketch_{date_str}.json'}")
+        except Exception as e:
+            print(f"警告：建立 {name} 的分位數摘要時發生錯誤: {e}")
+    
+    def write_percentile_section(self, f, name, date_str):
+        """在摘要報告中加入各 GPU 使用率的 p50/p95/p99"""
+        try:
+            from quantile_sketch import load_day_sketch, TDigest
+            sketch = load_day_sketch(str(self.data_dir), name, date_str)
+        except Exception:
+            sketch = None
+        if not sketch:
+            return
+        f.write("\n各 GPU 使用率分位數 (p50 / p95 / p99):\n")
+        for gpu, entry in sorted(sketch['gpus'].items(), key=lambda item: int(item[0])):
+            digest = TDigest.from_dict(entry.get('usage'), sketch['compression'])
+            if not digest.count:
+                continue
+            p = digest.percentiles()
+            f.write(f"GPU[{gpu}]: {p['p50']:.2f}% / {p['p95']:.2f}% / {p['p99']:.2f}%\n")
+    
     def generate_gpu_usage_report(self, date_str):
         """生成包含使用者資訊的 GPU 使用報告"""
         if not self.gpu_task_info:
@@ -572,9 +607,100 @@ class GPUDataCollector:
             self.calculate_averages(date_str)
         except Exception as e:
             print(f"錯誤：計算平均值時發生錯誤: {e}")
+        
+        # 保存任務配置時段（供 gpu_accounting.py 計算 GPU 時數）
+        try:
+            self.write_task_files(date_str)
+        except Exception as e:
+            print(f"警告：寫入任務配置檔時發生錯誤: {e}")
+        
+        # 更新使用者索引
+        self.update_user_index(date_str)
+        
+        # 掃描新樣本中的閒置配置區段
+        self.update_idle_spans()
+        
+        # 以當天的平均檔增量更新容量預測
+        self.update_capacity_forecast()
+    
+    def write_task_files(self, date_str):
+        """將各節點當日的任務配置時段寫入 tasks_{date}.csv"""
+        if not self.gpu_task_allocations:
+            return
+        
+        for name in self.ip_name_map.values():
+            colab_outdir = self.data_dir / name / date_str
+            if not colab_outdir.exists():
+                continue
+            
+            rows = []
+            for task_info in self.gpu_task_allocations:
+                if task_info['hostname'] != name:
+                    continue
+                try:
+                    card_id = self.map_absolute_gpu_to_card_id(int(task_info['gpu_id']), name)
+                except (TypeError, ValueError):
+                    card_id = None
+                if card_id is None:
+                    continue
+                rows.append([
+                    task_info['task_id'], task_info['username'], task_info['project_uuid'],
+                    f"GPU[{self.gpu_card_to_index[card_id]}]", task_info['start'] or '',
+                    task_info['end'] or '', task_info['gpu_memory'] or '', task_info['task_type']
+                ])
+            
+            tasks_csv = colab_outdir / f"tasks_{date_str}.csv"
+            pd.DataFrame(rows, columns=['任務ID', '使用者', '專案', 'GPU編號', '開始時間', '結束時間',
+                                        'GPU記憶體(MB)', '任務類型']).to_csv(tasks_csv, index=False)
+            print(f"任務配置時段已保存至 {tasks_csv} ({len(rows)} 筆)")
+    
+    def update_user_index(self, date_str):
+        """以剛寫入的平均檔更新使用者反向索引"""
+        try:
+            from user_index import UserIndex
+            index = UserIndex(self.data_dir)
+            users = index.update_partitions([(name, date_str) for name in self.ip_name_map.values()])
+            print(f"使用者索引已更新 ({users} 位使用者)")
+        except Exception as e:
+            print(f"警告：更新使用者索引時發生錯誤: {e}")
+            print(f"可稍後執行 python3 user_index.py rebuild --data-dir {self.data_dir} 重建索引")
+    
+    def update_idle_spans(self):
+        """以串流狀態只掃描新收集的樣本，更新閒置配置區段"""
+        try:
+            repo_root = str(Path(__file__).resolve().parent.parent)
+            if repo_root not in sys.path:
+                sys.path.append(repo_root)
+            from idle_detector import IdleDetector
+            detector = IdleDetector(str(self.data_dir), nodes=list(self.ip_name_map.values()))
+            days, found = detector.update()
+            print(f"閒置配置偵測已更新 ({days} 個節點日，新增 {found} 個閒置區段)")
+        except Exception as e:
+            print(f"警告：更新閒置配置偵測時發生錯誤: {e}")
+            print(f"可稍後執行 python3 idle_detector.py --data-dir {self.data_dir}")
+    
+    def update_capacity_forecast(self):
+        """增量更新容量預測（只讀取新增或變動的平均檔）並匯出預測 CSV"""
+        try:
+            repo_root = str(Path(__file__).resolve().parent.parent)
+            if repo_root not in sys.path:
+                sys.path.append(repo_root)
+            from capacity_forecast import CapacityForecaster, export_forecast, capacity_alerts, FORECAST_FILE
+            forecaster = CapacityForecaster(str(self.data_dir), nodes=list(self.ip_name_map.values()))
+            reads, incremental = forecaster.refresh()
+            forecast = forecaster.forecast()
+            if forecast is None:
+                return
+            export_forecast(forecast, os.path.join(forecaster.output_dir, FORECAST_FILE))
+            print(f"容量預測已{'增量更新' if incremental else '重新擬合'} (讀取 {reads} 個節點日)")
+            for alert in capacity_alerts(forecast):
+                print(f"容量提示：{alert}")
+        except Exception as e:
+            print(f"警告：更新容量預測時發生錯誤: {e}")
+            print(f"可稍後執行 python3 capacity_forecast.py --data-dir {self.data_dir}")
 
 
-def main():
+def main(argv=None):
     """主程式"""
     parser = argparse.ArgumentParser(
         description='AMD GPU 每日數據收集工具 (Python 版本)',
@@ -612,7 +738,7 @@ def main():
         help='跳過 GPU 使用者任務資訊的獲取'
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     try:
         # 創建數據收集器
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GPU 使用率分位數摘要 (t-digest)
+
+每日平均檔只保留算術平均，突發型的工作負載（短時間滿載、其餘閒置）在平均值中看不出來；
+從原始樣本重新計算一季的百分位數又需要讀取所有 gpu{idx}_{date}.csv。
+這裡為每個節點每天的每張 GPU 建立可合併的 t-digest 摘要，存放在平均檔旁：
+
+    data/<節點>/<日期>/sketch_{date}.json
+
+每張 GPU 的 GPU 使用率與 VRAM 使用率各一份摘要（約 50 個 centroid），並記錄當天平均檔中的使用者。
+查詢時把日期範圍內符合節點、GPU、使用者條件的摘要合併，即可回答 p50/p95/p99 等問題，
+不需讀取原始樣本。t-digest 在分布兩端較精確，p99 的誤差通常在 1 個百分點以內。
+
+收集器在計算平均值後會自動寫入當天的摘要；既有資料可用 build 補建。
+
+使用方式:
+    python3 quantile_sketch.py build --data-dir ../data
+    python3 quantile_sketch.py build 2025-08-01 2025-08-31 --data-dir ../data --force
+    python3 quantile_sketch.py query 2025-07-01 2025-09-30 --data-dir ../data
+    python3 quantile_sketch.py query 2025-07-01 2025-09-30 --by user --percentiles 50,90,99
+    python3 quantile_sketch.py query 2025-09-01 2025-09-30 --node colab-gpu1 --gpu 0 --metric vram
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'visualization'))
+from columnar_csv import read_average_columns, read_gpu_columns
+
+SKETCH_VERSION = 1
+DEFAULT_COMPRESSION = 100
+DEFAULT_PERCENTILES = (50, 95, 99)
+METRICS = ('usage', 'vram')
+GROUP_BY = ('node', 'gpu', 'user', 'date')
+
+NODES = ['colab-gpu1', 'colab-gpu2', 'colab-gpu3', 'colab-gpu4']
+GPU_INDICES = list(range(8))
+
+GPU_LABEL_RE = re.compile(r'^GPU\[?(\d+)\]?$')
+
+UNUSED_USER = '未使用'
+DATE_FORMAT = '%Y-%m-%d'
+DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+class TDigest:
+    """合併式 t-digest（k1 尺度函數），centroid 以平均值排序保存"""
+
+    def __init__(self, compression=DEFAULT_COMPRESSION, means=(), weights=(), min_value=math.inf,
+                 max_value=-math.inf):
+        self.compression = compression
+        self.means = np.asarray(means, dtype=np.float64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.min = min_value
+        self.max = max_value
+
+    @classmethod
+    def from_values(cls, values, compression=DEFAULT_COMPRESSION):
+        """
+        由樣本建立摘要（NaN 會被忽略）
+
+        Args:
+            values (array-like): 樣本值
+            compression (int): 壓縮參數，越大越精確、centroid 越多
+
+        Returns:
+            TDigest: 摘要
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        digest = cls(compression)
+        if values.size:
+            # 相同的值先合併（閒置 GPU 多為 0），再壓縮
+            means, weights = np.unique(values, return_counts=True)
+            digest._compress(means, weights.astype(np.float64))
+            digest.min, digest.max = float(values.min()), float(values.max())
+        return digest
+
+    @classmethod
+    def merge_all(cls, digests, compression=None):
+        """
+        合併多個摘要
+
+        Returns:
+            TDigest: 合併後的摘要
+        """
+        digests = [d for d in digests if d.count]
+        merged = cls(compression or (digests[0].compression if digests else DEFAULT_COMPRESSION))
+        if digests:
+            merged._compress(np.concatenate([d.means for d in digests]),
+                             np.concatenate([d.weights for d in digests]))
+            merged.min = min(d.min for d in digests)
+            merged.max = max(d.max for d in digests)
+        return merged
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def mean(self):
+        total = self.count
+        return float((self.means * self.weights).sum() / total) if total else math.nan
+
+    def _k(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _k_inverse(self, k):
+        return (math.sin(k * 2 * math.pi / self.compression) + 1) / 2
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind='mergesort')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        out_means, out_weights = [], []
+        cur_mean, cur_weight = float(means[0]), float(weights[0])
+        done = 0.0
+        q_limit = self._k_inverse(self._k(0.0) + 1) * total
+        for mean, weight in zip(means[1:].tolist(), weights[1:].tolist()):
+            if done + cur_weight + weight <= q_limit:
+                cur_weight += weight
+                cur_mean += (mean - cur_mean) * weight / cur_weight
+                continue
+            out_means.append(cur_mean)
+            out_weights.append(cur_weight)
+            done += cur_weight
+            q_limit = self._k_inverse(self._k(min(done / total, 1.0)) + 1) * total
+            cur_mean, cur_weight = mean, weight
+        out_means.append(cur_mean)
+        out_weights.append(cur_weight)
+        self.means = np.array(out_means)
+        self.weights = np.array(out_weights)
+
+    def quantile(self, q):
+        """
+        Args:
+            q (float or array-like): 0~1 之間的分位
+
+        Returns:
+            float or numpy.ndarray: 估計值；空摘要為 NaN
+        """
+        if not self.count:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else math.nan
+        # centroid 的中心位於累積權重的中點，兩端以最小值與最大值補齊後線性內插
+        cumulative = np.cumsum(self.weights)
+        centers = cumulative - self.weights / 2
+        # 平均值等於最小（大）值的端點 centroid 全部是同一個值（例如閒置 GPU 的 0），
+        # 整段權重都對應該值，只在最內側的一個樣本與下一個 centroid 內插
+        if self.means[0] == self.min:
+            centers[0] = max(centers[0], cumulative[0] - 0.5)
+        if self.means[-1] == self.max and len(centers) > 1:
+            centers[-1] = min(centers[-1], cumulative[-2] + 0.5)
+        positions = np.concatenate(([0.0], centers, [self.count]))
+        values = np.concatenate(([self.min], self.means, [self.max]))
+        result = np.interp(np.asarray(q, dtype=np.float64) * self.count, positions, values)
+        return result if np.ndim(q) else float(result)
+
+    def percentiles(self, percentiles=DEFAULT_PERCENTILES):
+        """
+        Returns:
+            dict: {'p50': 值, ...}
+        """
+        values = self.quantile(np.asarray(percentiles, dtype=np.float64) / 100.0)
+        return {f"p{p:g}": float(v) for p, v in zip(percentiles, values)}
+
+    def to_dict(self):
+        return {'n': int(round(self.count)), 'min': _round(self.min), 'max': _round(self.max),
+                'means': [_round(m) for m in self.means.tolist()],
+                'weights': [int(round(w)) for w in self.weights.tolist()]}
+
+    @classmethod
+    def from_dict(cls, data, compression=DEFAULT_COMPRESSION):
+        if not data or not data.get('n'):
+            return cls(compression)
+        return cls(compression, data['means'], data['weights'], data['min'], data['max'])
+
+
+def _round(value):
+    return round(float(value), 3) if math.isfinite(value) else None
+
+
+def sketch_path(data_dir, node, date_str):
+    return os.path.join(data_dir, node, date_str, f"sketch_{date_str}.json")
+
+
+def read_gpu_users(data_dir, node, date_str):
+    """
+    Returns:
+        dict: GPU 索引 -> 平均檔中的使用者（沒有使用者欄位時為空）
+    """
+    avg_path = os.path.join(data_dir, node, date_str, f"average_{date_str}.csv")
+    if not os.path.exists(avg_path):
+        return {}
+    columns = read_average_columns(avg_path)
+    users = {}
+    for gpu, user in zip(columns.gpu, columns.user):
+        match = GPU_LABEL_RE.match(gpu)
+        if match and user:
+            users[int(match.group(1))] = user
+    return users
+
+
+def build_day_sketch(data_dir, node, date_str, gpu_indices=GPU_INDICES, compression=DEFAULT_COMPRESSION):
+    """
+    由原始樣本建立一個節點一天的摘要
+
+    Returns:
+        dict: 可寫入 sketch_{date}.json 的內容；當天沒有任何樣本時為 None
+    """
+    users = read_gpu_users(data_dir, node, date_str)
+    gpus = {}
+    for gpu_index in gpu_indices:
+        csv_path = os.path.join(data_dir, node, date_str, f"gpu{gpu_index}_{date_str}.csv")
+        if not os.path.exists(csv_path):
+            continue
+        samples = read_gpu_columns(csv_path).numpy()
+        usage, vram = samples['usage'], samples['vram']
+        gpus[str(gpu_index)] = {
+            'user': users.get(gpu_index, ''),
+            'usage': TDigest.from_values(usage, compression).to_dict(),
+            'vram': TDigest.from_values(vram, compression).to_dict(),
+        }
+    if not gpus:
+        return None
+    return {'version': SKETCH_VERSION, 'node': node, 'date': date_str, 'compression': compression, 'gpus': gpus}
+
+
+def write_day_sketch(data_dir, node, date_str, compression=DEFAULT_COMPRESSION):
+    """
+    建立並寫入一個節點一天的摘要
+
+    Returns:
+        dict: 寫入的內容；沒有樣本時為 None
+    """
+    sketch = build_day_sketch(data_dir, node, date_str, compression=compression)
+    if sketch is None:
+        return None
+    path = sketch_path(data_dir, node, date_str)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(sketch, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    return sketch
+
+
+def load_day_sketch(data_dir, node, date_str):
+    """
+    Returns:
+        dict: 摘要內容；檔案不存在或版本不符時為 None
+    """
+    path = sketch_path(data_dir, node, date_str)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            sketch = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return sketch if sketch.get('version') == SKETCH_VERSION else None
+
+
+def sketch_is_current(data_dir, node, date_str):
+    """摘要存在且不早於當天的原始樣本與平均檔"""
+    path = sketch_path(data_dir, node, date_str)
+    if not os.path.exists(path):
+        return False
+    day_dir = os.path.dirname(path)
+    built = os.path.getmtime(path)
+    return all(os.path.getmtime(os.path.join(day_dir, name)) <= built for name in os.listdir(day_dir)
+               if name.endswith('.csv') and (name.startswith('gpu') or name.startswith('average_')))
+
+
+def date_range(start_date, end_date):
+    start = datetime.strptime(start_date, DATE_FORMAT)
+    end = datetime.strptime(end_date, DATE_FORMAT)
+    return [(start + timedelta(days=i)).strftime(DATE_FORMAT) for i in range((end - start).days + 1)]
+
+
+def partition_dates(data_dir, node, start_date=None, end_date=None):
+    node_dir = os.path.join(data_dir, node)
+    if not os.path.isdir(node_dir):
+        return []
+    return sorted(d for d in os.listdir(node_dir) if DATE_RE.match(d)
+                  and (start_date is None or d >= start_date) and (end_date is None or d <= end_date))
+
+
+def backfill(data_dir, nodes=None, start_date=None, end_date=None, force=False, compression=DEFAULT_COMPRESSION):
+    """
+    為缺少或過期的分區補建摘要
+
+    Returns:
+        tuple: (建立的分區數, 略過的分區數)
+    """
+    built = skipped = 0
+    for node in nodes or NODES:
+        for date_str in partition_dates(data_dir, node, start_date, end_date):
+            if not force and sketch_is_current(data_dir, node, date_str):
+                skipped += 1
+                continue
+            if write_day_sketch(data_dir, node, date_str, compression) is not None:
+                built += 1
+    return built, skipped
+
+
+def query_percentiles(data_dir, start_date, end_date, nodes=None, gpus=None, users=None, metric='usage',
+                      group_by=None, percentiles=DEFAULT_PERCENTILES):
+    """
+    合併日期範圍內符合條件的摘要並計算百分位數
+
+    Args:
+        data_dir (str): 資料目錄
+        start_date (str): 開始日期 (YYYY-MM-DD)
+        end_date (str): 結束日期 (YYYY-MM-DD)
+        nodes (list): 節點篩選，None 表示所有節點
+        gpus (list): GPU 索引篩選
+        users (list): 使用者篩選（依當天平均檔中的使用者）
+        metric (str): 'usage' 或 'vram'
+        group_by (str): None 或 'node'、'gpu'、'user'、'date'，分組後各自合併
+        percentiles (tuple): 要計算的百分位數
+
+    Returns:
+        tuple: ({分組: {'p50': ..., 'mean': ..., 'samples': ..., 'gpu_days': ...}}, 缺少摘要的分區數)
+    """
+    groups = {}
+    missing = 0
+    gpu_filter = None if gpus is None else {str(g) for g in gpus}
+    user_filter = None if users is None else set(users)
+    for node in nodes or NODES:
+        for date_str in date_range(start_date, end_date):
+            if not os.path.isdir(os.path.join(data_dir, node, date_str)):
+                continue
+            sketch = load_day_sketch(data_dir, node, date_str)
+            if sketch is None:
+                missing += 1
+                continue
+            for gpu, entry in sketch['gpus'].items():
+                if gpu_filter is not None and gpu not in gpu_filter:
+                    continue
+                user = entry.get('user') or UNUSED_USER
+                if user_filter is not None and user not in user_filter:
+                    continue
+                key = {'node': node, 'gpu': f"GPU[{gpu}]", 'user': user, 'date': date_str}.get(group_by, '全部')
+                digest = TDigest.from_dict(entry.get(metric), sketch.get('compression', DEFAULT_COMPRESSION))
+                groups.setdefault(key, []).append(digest)
+
+    results = {}
+    for key, digests in groups.items():
+        merged = TDigest.merge_all(digests)
+        if not merged.count:
+            continue
+        row = merged.percentiles(percentiles)
+        row.update({'mean': merged.mean(), 'max': merged.max, 'samples': int(round(merged.count)),
+                    'gpu_days': len(digests)})
+        results[key] = row
+    return results, missing
+
+
+def _parse_percentiles(value):
+    try:
+        percentiles = tuple(float(p) for p in value.split(',') if p.strip())
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"百分位數格式錯誤: {value}，例如 50,95,99")
+    if not percentiles or any(not 0 <= p <= 100 for p in percentiles):
+        raise argparse.ArgumentTypeError("百分位數需介於 0 到 100")
+    return percentiles
+
+
+def _date_argument(value):
+    if not DATE_RE.match(value):
+        raise argparse.ArgumentTypeError(f"日期格式錯誤: {value}，請使用 YYYY-MM-DD")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='GPU 使用率分位數摘要 (t-digest) 維護與查詢工具')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='為缺少或過期的分區建立摘要')
+    build.add_argument('start_date', nargs='?', type=_date_argument, help='開始日期 (YYYY-MM-DD)，預設為所有日期')
+    build.add_argument('end_date', nargs='?', type=_date_argument, help='結束日期 (YYYY-MM-DD)')
+    build.add_argument('--force', action='store_true', help='重建所有分區的摘要')
+    build.add_argument('--compression', type=int, default=DEFAULT_COMPRESSION,
+                       help=f't-digest 壓縮參數，預設 {DEFAULT_COMPRESSION}')
+
+    query = subparsers.add_parser('query', help='合併摘要計算百分位數')
+    query.add_argument('start_date', type=_date_argument, help='開始日期 (YYYY-MM-DD)')
+    query.add_argument('end_date', nargs='?', type=_date_argument, help='結束日期 (YYYY-MM-DD)，預設與開始日期相同')
+    query.add_argument('--node', action='append', choices=NODES, help='節點篩選，可重複指定')
+    query.add_argument('--gpu', action='append', type=int, help='GPU 索引篩選，可重複指定')
+    query.add_argument('--user', action='append', help='使用者篩選，可重複指定')
+    query.add_argument('--metric', choices=METRICS, default='usage', help='usage: GPU 使用率；vram: VRAM 使用率')
+    query.add_argument('--by', choices=GROUP_BY, help='分組方式，預設合併為一組')
+    query.add_argument('--percentiles', type=_parse_percentiles, default=DEFAULT_PERCENTILES,
+                       help='百分位數，逗號分隔，預設 50,95,99')
+
+    for command in (build, query):
+        command.add_argument('--data-dir', default='../data', help='資料目錄路徑，預設為 ../data')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        end_date = args.end_date or args.start_date
+        built, skipped = backfill(args.data_dir, start_date=args.start_date, end_date=end_date,
+                                  force=args.force, compression=args.compression)
+        print(f"✅ 已建立 {built} 個分區的分位數摘要，{skipped} 個分區已是最新")
+        return 0
+
+    end_date = args.end_date or args.start_date
+    results, missing = query_percentiles(args.data_dir, args.start_date, end_date, args.node, args.gpu, args.user,
+                                         args.metric, args.by, args.percentiles)
+    label = 'GPU 使用率' if args.metric == 'usage' else 'VRAM 使用率'
+    print(f"📊 {label}分位數 ({args.start_date} ~ {end_date})")
+    if missing:
+        print(f"⚠️  {missing} 個分區沒有摘要，請執行: python3 quantile_sketch.py build --data-dir {args.data_dir}")
+    if not results:
+        print("  (無資料)")
+        return 0
+    columns = [f"p{p:g}" for p in args.percentiles]
+    name_label = {'node': '節點', 'gpu': 'GPU', 'user': '使用者', 'date': '日期'}.get(args.by, '範圍')
+    print(f"{name_label:<20} " + ' '.join(f"{c:>8}" for c in columns) + f" {'平均':>8} {'最大':>8} {'GPU日':>7} {'樣本數':>9}")
+    print("-" * (20 + 9 * len(columns) + 37))
+    # 依日期分組時按日期排列，其餘依最高百分位數由大到小
+    order = sorted(results) if args.by == 'date' else sorted(results, key=lambda k: (-results[k][columns[-1]], -results[k]['mean']))
+    for key in order:
+        row = results[key]
+        print(f"{key:<20} " + ' '.join(f"{row[c]:>8.2f}" for c in columns) +
+              f" {row['mean']:>8.2f} {row['max']:>8.2f} {row['gpu_days']:>7} {row['samples']:>9}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
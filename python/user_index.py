@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+使用者反向索引
+
+將每個節點每日的平均檔（average_{date}.csv）反向整理成「使用者 → 使用紀錄」，
+查詢單一使用者時只需讀取該使用者的索引檔，不必逐一解析所有節點、所有日期的平均檔。
+
+索引目錄結構（位於資料目錄下）:
+    data/user_index/
+    ├── meta.json           # 已索引的分區：檔案 mtime/大小與該分區出現的使用者名稱
+    ├── paslab_openai.csv   # 每位使用者一個檔案（檔名經 URL 編碼）
+    └── ...
+
+使用者檔案欄位: 日期,節點,GPU編號,平均GPU使用率(%),平均VRAM使用率(%)
+數值保留平均檔中的原始字串（包含 N/A），由查詢端決定如何轉換。
+'未使用' 與 '全部平均' 列不會被索引。
+
+使用紀錄只存在使用者檔案中，meta.json 每個分區只記錄平均檔的 mtime、大小與
+使用者名稱。查詢時逐一比對範圍內每個分區平均檔的 mtime/大小（每個分區一次 os.stat），
+平均檔之後被重新產生（例如 daily_gpu_log_with_users.sh 不經過索引改寫）或尚未索引時，
+查詢端改為直接讀取該平均檔，結果不會因索引過期而缺漏。daily_gpu_log.py 在寫入平均檔時
+會同步更新索引；在收集流程之外改寫平均檔後，可執行 update 或 rebuild 讓查詢重新使用索引
+（status 會列出過期的分區）。
+
+欄位名稱以 columnar_csv.resolve_columns（AVERAGE_ALIASES）解析，與直接讀取平均檔的查詢相同。
+
+使用方式:
+    python3 user_index.py rebuild --data-dir ../data
+    python3 user_index.py update 2025-08-01 --data-dir ../data
+    python3 user_index.py status --data-dir ../data
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import argparse
+from urllib.parse import quote
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'visualization'))
+from columnar_csv import resolve_columns, SUMMARY_ROW
+
+INDEX_DIRNAME = 'user_index'
+META_FILENAME = 'meta.json'
+INDEX_VERSION = 1
+
+INDEX_HEADER = ['日期', '節點', 'GPU編號', '平均GPU使用率(%)', '平均VRAM使用率(%)']
+
+UNUSED_USER = '未使用'
+
+DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+def average_file(data_dir, node, date_str):
+    """平均檔路徑"""
+    return os.path.join(str(data_dir), node, date_str, f"average_{date_str}.csv")
+
+
+def partition_key(node, date_str):
+    return f"{node}/{date_str}"
+
+
+def file_signature(path):
+    """
+    Returns:
+        tuple: (mtime_ns, size)，檔案不存在時為 None
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def read_partition(path):
+    """
+    讀取單一平均檔中需要索引的列
+
+    Args:
+        path (str): average_{date}.csv 路徑
+
+    Returns:
+        tuple: (rows, has_user_column)，rows 為 [GPU編號, GPU使用率, VRAM使用率, 使用者] 列表；
+               檔案無法讀取時為 (None, False)
+    """
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            positions = resolve_columns(next(reader, []))
+            gpu_col = positions.get('gpu')
+            usage_col = positions.get('usage')
+            vram_col = positions.get('vram')
+            user_col = positions.get('user')
+            if user_col is None or gpu_col is None:
+                return [], False
+
+            def cell(row, col):
+                return row[col].strip() if col is not None and col < len(row) else ''
+
+            rows = []
+            for row in reader:
+                gpu = cell(row, gpu_col)
+                user = cell(row, user_col)
+                if not gpu or SUMMARY_ROW in gpu or not user or user == UNUSED_USER:
+                    continue
+                rows.append([gpu, cell(row, usage_col), cell(row, vram_col), user])
+            return rows, True
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        print(f"警告：無法讀取 {path}: {e}")
+        return None, False
+
+
+def _partition_meta(signature, has_user_column, rows):
+    """meta.json 中的分區項目：平均檔簽章與出現的使用者（紀錄本身只寫入使用者檔案）"""
+    return {
+        'mtime_ns': signature[0],
+        'size': signature[1],
+        'has_user_column': has_user_column,
+        'users': sorted({row[3] for row in rows}),
+    }
+
+
+def _is_current(entry, signature):
+    return signature is not None and (entry['mtime_ns'], entry['size']) == signature
+
+
+def _atomic_write(path, write):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+class UserIndex:
+    """使用者 → (日期, 節點, GPU, GPU使用率, VRAM使用率) 的持久化反向索引"""
+
+    def __init__(self, data_dir):
+        self.data_dir = str(data_dir)
+        self.index_dir = os.path.join(self.data_dir, INDEX_DIRNAME)
+        self.meta_path = os.path.join(self.index_dir, META_FILENAME)
+        self._meta = None
+
+    def exists(self):
+        return os.path.exists(self.meta_path)
+
+    # ------------------------------------------------------------------
+    # meta 與使用者檔案
+    # ------------------------------------------------------------------
+    def load_meta(self):
+        """
+        Returns:
+            dict: {'version': int, 'partitions': {'node/date': {'mtime_ns', 'size', 'has_user_column', 'users'}}}
+        """
+        if self._meta is None:
+            meta = None
+            if os.path.exists(self.meta_path):
+                try:
+                    with open(self.meta_path, 'r', encoding='utf-8') as f:
+                        meta = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"警告：使用者索引 {self.meta_path} 無法讀取，請重建索引: {e}")
+            if not meta or meta.get('version') != INDEX_VERSION:
+                meta = {'version': INDEX_VERSION, 'partitions': {}}
+            self._meta = meta
+        return self._meta
+
+    def _save_meta(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        _atomic_write(self.meta_path,
+                      lambda f: json.dump(self._meta, f, ensure_ascii=False, separators=(',', ':')))
+
+    def user_path(self, username):
+        return os.path.join(self.index_dir, quote(username, safe='') + '.csv')
+
+    def read_user_entries(self, username):
+        """
+        Returns:
+            list: 使用者檔案中的 [日期, 節點, GPU編號, GPU使用率, VRAM使用率] 列表
+        """
+        path = self.user_path(username)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            return [row for row in reader if len(row) >= len(INDEX_HEADER)]
+
+    def _write_user_entries(self, username, entries):
+        path = self.user_path(username)
+        if not entries:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+
+        def write(f):
+            writer = csv.writer(f)
+            writer.writerow(INDEX_HEADER)
+            writer.writerows(entries)
+        _atomic_write(path, write)
+
+    # ------------------------------------------------------------------
+    # 寫入
+    # ------------------------------------------------------------------
+    def update_partitions(self, partitions):
+        """
+        重新索引指定的分區（平均檔重新產生或刪除後呼叫）
+
+        Args:
+            partitions (list): (節點, 日期) 列表
+
+        Returns:
+            int: 更新的使用者檔案數
+        """
+        meta = self.load_meta()
+        changed = {}
+        affected_users = set()
+
+        for node, date_str in partitions:
+            key = partition_key(node, date_str)
+            old = meta['partitions'].get(key)
+            if old:
+                affected_users.update(old['users'])
+
+            path = average_file(self.data_dir, node, date_str)
+            signature = file_signature(path)
+            rows, has_user_column = read_partition(path) if signature else (None, False)
+            if rows is None:
+                meta['partitions'].pop(key, None)
+                changed[key] = []
+                continue
+
+            meta['partitions'][key] = _partition_meta(signature, has_user_column, rows)
+            changed[key] = rows
+            affected_users.update(row[3] for row in rows)
+
+        for username in affected_users:
+            entries = [e for e in self.read_user_entries(username)
+                       if partition_key(e[1], e[0]) not in changed]
+            for key, rows in changed.items():
+                node, date_str = key.split('/', 1)
+                entries.extend([date_str, node, gpu, usage, vram]
+                               for gpu, usage, vram, user in rows if user == username)
+            # 依日期、節點排序；同一分區內保持平均檔的列順序
+            entries.sort(key=lambda e: (e[0], e[1]))
+            self._write_user_entries(username, entries)
+
+        self._save_meta()
+        return len(affected_users)
+
+    def update_date(self, date_str, nodes=None):
+        """
+        重新索引某一天所有節點的平均檔
+
+        Args:
+            date_str (str): 日期 (YYYY-MM-DD)
+            nodes (list): 節點名稱列表，預設為資料目錄下的所有節點
+        """
+        nodes = nodes if nodes is not None else self.discover_nodes()
+        return self.update_partitions([(node, date_str) for node in nodes])
+
+    def discover_nodes(self):
+        """資料目錄下所有包含日期分區的節點目錄"""
+        nodes = []
+        if not os.path.isdir(self.data_dir):
+            return nodes
+        for name in sorted(os.listdir(self.data_dir)):
+            node_path = os.path.join(self.data_dir, name)
+            if name == INDEX_DIRNAME or not os.path.isdir(node_path):
+                continue
+            if any(DATE_RE.match(d) for d in os.listdir(node_path)):
+                nodes.append(name)
+        return nodes
+
+    def rebuild(self):
+        """
+        掃描整個資料目錄重建索引
+
+        Returns:
+            tuple: (分區數, 使用者數)
+        """
+        partitions = {}
+        entries_by_user = {}
+        for node in self.discover_nodes():
+            node_path = os.path.join(self.data_dir, node)
+            for date_str in sorted(os.listdir(node_path)):
+                if not DATE_RE.match(date_str):
+                    continue
+                path = average_file(self.data_dir, node, date_str)
+                signature = file_signature(path)
+                if signature is None:
+                    continue
+                rows, has_user_column = read_partition(path)
+                if rows is None:
+                    continue
+                partitions[partition_key(node, date_str)] = _partition_meta(signature, has_user_column, rows)
+                for gpu, usage, vram, user in rows:
+                    entries_by_user.setdefault(user, []).append([date_str, node, gpu, usage, vram])
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        for filename in os.listdir(self.index_dir):
+            if filename.endswith('.csv'):
+                os.remove(os.path.join(self.index_dir, filename))
+        for username, entries in entries_by_user.items():
+            entries.sort(key=lambda e: (e[0], e[1]))
+            self._write_user_entries(username, entries)
+
+        self._meta = {'version': INDEX_VERSION, 'partitions': partitions}
+        self._save_meta()
+        return len(partitions), len(entries_by_user)
+
+    # ------------------------------------------------------------------
+    # 查詢
+    # ------------------------------------------------------------------
+    def classify_partitions(self, nodes, date_strs):
+        """
+        比對平均檔與索引，將分區分為可直接使用索引與需要直接讀取平均檔兩類
+
+        Args:
+            nodes (list): 節點名稱列表
+            date_strs (list): 日期字串列表
+
+        Returns:
+            tuple: (fresh, stale)，fresh 為 {'node/date': meta 項目}，stale 為 (節點, 日期) 列表；
+                   平均檔不存在的分區兩者皆不包含
+        """
+        indexed = self.load_meta()['partitions']
+        fresh, stale = {}, []
+        for node in nodes:
+            for date_str in date_strs:
+                signature = file_signature(average_file(self.data_dir, node, date_str))
+                if signature is None:
+                    continue
+                key = partition_key(node, date_str)
+                entry = indexed.get(key)
+                if entry and _is_current(entry, signature):
+                    fresh[key] = entry
+                else:
+                    stale.append((node, date_str))
+        return fresh, stale
+
+    def partition_rows(self, partitions, usernames=None):
+        """
+        由使用者檔案組回分區的紀錄
+
+        Args:
+            partitions (dict): {'node/date': meta 項目}，通常為 classify_partitions 的 fresh
+            usernames (iterable): 只組回這些使用者的紀錄，None 表示分區中的所有使用者
+
+        Returns:
+            dict: {'node/date': [[GPU編號, GPU使用率, VRAM使用率, 使用者], ...]}，
+                  同一使用者的紀錄保持平均檔的列順序
+        """
+        rows = {key: [] for key in partitions}
+        users = set()
+        for entry in partitions.values():
+            users.update(entry['users'])
+        if usernames is not None:
+            users.intersection_update(usernames)
+        for username in sorted(users):
+            for date_str, node, gpu, usage, vram in self.read_user_entries(username):
+                key = partition_key(node, date_str)
+                if key in rows:
+                    rows[key].append([gpu, usage, vram, username])
+        return rows
+
+    def query(self, username, nodes, date_strs):
+        """
+        從索引查詢使用者的紀錄
+
+        範圍內每個分區都比對平均檔的 mtime/大小：未列出該使用者的分區也可能在索引之後
+        被改寫而新增該使用者，因此不能只驗證使用者紀錄所在的分區。
+
+        Args:
+            username (str): 使用者名稱
+            nodes (list): 節點名稱列表
+            date_strs (list): 日期字串列表
+
+        Returns:
+            tuple: (entries, fresh, stale)；entries 為 [日期, 節點, GPU編號, GPU使用率, VRAM使用率] 列表，
+                   只包含索引仍有效的分區，stale 分區須由呼叫端直接讀取平均檔
+        """
+        fresh, stale = self.classify_partitions(nodes, date_strs)
+        if username == UNUSED_USER:
+            # '未使用' 不在索引中，全部改為直接讀取
+            stale = [tuple(key.split('/', 1)) for key in fresh] + stale
+            return [], {}, stale
+        entries = [e for e in self.read_user_entries(username) if partition_key(e[1], e[0]) in fresh]
+        return entries, fresh, stale
+
+    def status(self):
+        """
+        Returns:
+            dict: 分區數、使用者數、過期與未索引的分區數
+        """
+        indexed = self.load_meta()['partitions']
+        users = set()
+        stale = missing = 0
+        for key, entry in indexed.items():
+            users.update(entry['users'])
+            node, date_str = key.split('/', 1)
+            signature = file_signature(average_file(self.data_dir, node, date_str))
+            if signature is None:
+                missing += 1
+            elif not _is_current(entry, signature):
+                stale += 1
+        unindexed = 0
+        for node in self.discover_nodes():
+            for date_str in os.listdir(os.path.join(self.data_dir, node)):
+                if (DATE_RE.match(date_str) and partition_key(node, date_str) not in indexed
+                        and os.path.exists(average_file(self.data_dir, node, date_str))):
+                    unindexed += 1
+        return {'partitions': len(indexed), 'users': len(users),
+                'stale': stale, 'missing': missing, 'unindexed': unindexed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='使用者反向索引維護工具')
+    parser.add_argument('command', choices=['rebuild', 'update', 'status'],
+                        help='rebuild: 由現有資料重建索引；update: 重新索引指定日期；status: 顯示索引狀態')
+    parser.add_argument('date', nargs='?', help='update 使用的日期 (YYYY-MM-DD)')
+    parser.add_argument('--data-dir', default='../data', help='資料目錄路徑，預設為 ../data')
+    args = parser.parse_args(argv)
+
+    index = UserIndex(args.data_dir)
+    if args.command == 'rebuild':
+        partitions, users = index.rebuild()
+        print(f"✅ 使用者索引已重建: {partitions} 個分區、{users} 位使用者 ({index.index_dir})")
+    elif args.command == 'update':
+        if not args.date or not DATE_RE.match(args.date):
+            parser.error('update 需要日期參數 (YYYY-MM-DD)')
+        users = index.update_date(args.date)
+        print(f"✅ 已更新 {args.date} 的使用者索引 ({users} 位使用者)")
+    else:
+        if not index.exists():
+            print(f"❌ 尚未建立使用者索引，請執行: python3 user_index.py rebuild --data-dir {args.data_dir}")
+            return
+        info = index.status()
+        print(f"📇 使用者索引: {index.index_dir}")
+        print(f"   分區: {info['partitions']}，使用者: {info['users']}")
+        print(f"   過期分區: {info['stale']}，平均檔已刪除: {info['missing']}，未索引分區: {info['unindexed']}")
+        if info['stale'] or info['unindexed']:
+            print("   ➜ 查詢時會直接讀取這些分區；執行 rebuild 可重新整理索引")
+
+
+if __name__ == "__main__":
+    main()
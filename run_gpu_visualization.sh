@@ -52,7 +52,8 @@ check_requirements() {
     fi
     
     # 檢查必要的 Python 套件
-    $PYTHON_CMD -c "import pandas, matplotlib, numpy, seaborn" 2>/dev/null || {
+    # 只檢查套件是否已安裝，不實際匯入（匯入 pandas/matplotlib 需要數秒）
+    $PYTHON_CMD -c "import importlib.util, sys; sys.exit(any(importlib.util.find_spec(m) is None for m in ('pandas', 'matplotlib', 'numpy', 'seaborn')))" 2>/dev/null || {
         print_warning "缺少必要的 Python 套件，正在安裝..."
         
         # 如果使用虛擬環境，直接安裝；否則提示用戶
@@ -155,195 +156,126 @@ show_usage() {
     echo ""
 }
 
+# 所有圖表命令都交由 gpu_monitor.py 在單一 Python 行程中執行
+run_monitor() {
+    $PYTHON_CMD "$SCRIPT_DIR/gpu_monitor.py" --data-dir "$DATA_DIR" --plots-dir "$PLOTS_DIR" "$@"
+}
+
+# 將舊版的 [顯示使用者] 參數 (true/false) 轉換為 --no-users 旗標
+users_flag() {
+    if [ "$1" = "false" ] || [ "$1" = "0" ] || [ "$1" = "no" ]; then
+        echo "--no-users"
+    fi
+}
+
+# 檢查日期參數
+require_dates() {
+    if [ -z "$1" ] || [ -z "$2" ]; then
+        print_error "缺少日期參數"
+        show_usage
+        exit 1
+    fi
+}
+
 # 快速生成所有圖表
 run_quick() {
     local start_date=$1
     local end_date=$2
-    local show_users=${3:-"true"}  # 預設顯示使用者資訊
-    
-    # 轉換字串為 Python boolean
-    local python_show_users
-    if [ "$show_users" = "false" ] || [ "$show_users" = "0" ] || [ "$show_users" = "no" ]; then
-        python_show_users="False"
+    local no_users
+    no_users=$(users_flag "$3")
+
+    if [ -n "$no_users" ]; then
         print_info "快速生成所有常用 GPU 趨勢圖（不顯示使用者資訊）..."
     else
-        python_show_users="True"
         print_info "快速生成所有常用 GPU 趨勢圖（包含使用者資訊）..."
     fi
-    
+
     if [ -z "$start_date" ] || [ -z "$end_date" ]; then
-        $PYTHON_CMD -c "
-import sys
-sys.path.append('$VISUALIZATION_DIR')
-from quick_gpu_trend_plots import generate_all_quick_plots
-generate_all_quick_plots(data_dir='$DATA_DIR', plots_dir='$PLOTS_DIR', show_users=$python_show_users)
-"
+        run_monitor quick $no_users
     else
-        $PYTHON_CMD -c "
-import sys
-sys.path.append('$VISUALIZATION_DIR')
-from quick_gpu_trend_plots import generate_all_quick_plots
-generate_all_quick_plots('$start_date', '$end_date', data_dir='$DATA_DIR', plots_dir='$PLOTS_DIR', show_users=$python_show_users)
-"
+        run_monitor quick "$start_date" "$end_date" $no_users
     fi
-    
+
     print_success "快速圖表生成完成"
 }
 
 # 生成節點對比圖
 run_nodes() {
-    local start_date=$1
-    local end_date=$2
-    local show_users=${3:-"true"}  # 預設顯示使用者資訊
-    
-    if [ -z "$start_date" ] || [ -z "$end_date" ]; then
-        print_error "缺少日期參數"
-        show_usage
-        exit 1
-    fi
-    
-    # 轉換字串為 Python boolean
-    local python_show_users
-    if [ "$show_users" = "false" ] || [ "$show_users" = "0" ] || [ "$show_users" = "no" ]; then
-        python_show_users="False"
+    require_dates "$1" "$2"
+    local no_users
+    no_users=$(users_flag "$3")
+
+    if [ -n "$no_users" ]; then
         print_info "生成節點對比趨勢圖（不顯示使用者資訊）..."
     else
-        python_show_users="True"
         print_info "生成節點對比趨勢圖（包含使用者資訊）..."
     fi
-    
-    $PYTHON_CMD -c "
-import sys
-sys.path.append('$VISUALIZATION_DIR')
-from quick_gpu_trend_plots import quick_nodes_trend
-quick_nodes_trend('$start_date', '$end_date', data_dir='$DATA_DIR', plots_dir='$PLOTS_DIR', show_users=$python_show_users)
-"
-    
+
+    run_monitor nodes "$1" "$2" $no_users
+
     print_success "節點對比圖生成完成"
 }
 
 # 生成單一節點所有 GPU 圖
 run_node() {
     local node=$1
-    local start_date=$2
-    local end_date=$3
-    
-    if [ -z "$node" ] || [ -z "$start_date" ] || [ -z "$end_date" ]; then
+
+    if [ -z "$node" ] || [ -z "$2" ] || [ -z "$3" ]; then
         print_error "缺少參數"
         show_usage
         exit 1
     fi
-    
+
     print_info "生成 $node 所有 GPU 趨勢圖..."
-    
-    $PYTHON_CMD -c "
-import sys
-sys.path.append('$VISUALIZATION_DIR')
-from quick_gpu_trend_plots import quick_single_node_gpus
-quick_single_node_gpus('$node', '$start_date', '$end_date', data_dir='$DATA_DIR', plots_dir='$PLOTS_DIR')
-"
-    
+    run_monitor node "$node" "$2" "$3"
     print_success "$node 所有 GPU 趨勢圖生成完成"
 }
 
 # 生成特定 GPU 跨節點圖
 run_gpu() {
     local gpu_id=$1
-    local start_date=$2
-    local end_date=$3
-    
-    if [ -z "$gpu_id" ] || [ -z "$start_date" ] || [ -z "$end_date" ]; then
+
+    if [ -z "$gpu_id" ] || [ -z "$2" ] || [ -z "$3" ]; then
         print_error "缺少參數"
         show_usage
         exit 1
     fi
-    
+
     print_info "生成 GPU $gpu_id 跨節點對比圖..."
-    
-    $PYTHON_CMD -c "
-import sys
-sys.path.append('$VISUALIZATION_DIR')
-from quick_gpu_trend_plots import quick_gpu_across_nodes
-quick_gpu_across_nodes($gpu_id, '$start_date', '$end_date', data_dir='$DATA_DIR', plots_dir='$PLOTS_DIR')
-"
-    
+    run_monitor gpu "$gpu_id" "$2" "$3"
     print_success "GPU $gpu_id 跨節點對比圖生成完成"
 }
 
 # 生成各節點堆疊區域圖
 run_stacked() {
-    local start_date=$1
-    local end_date=$2
-    
-    if [ -z "$start_date" ] || [ -z "$end_date" ]; then
-        print_error "缺少日期參數"
-        show_usage
-        exit 1
-    fi
-    
+    require_dates "$1" "$2"
     print_info "生成各節點 GPU 使用率堆疊區域圖..."
-    
-    $PYTHON_CMD -c "
-import sys
-sys.path.append('$VISUALIZATION_DIR')
-from quick_gpu_trend_plots import quick_nodes_stacked_utilization
-quick_nodes_stacked_utilization('$start_date', '$end_date', data_dir='$DATA_DIR', plots_dir='$PLOTS_DIR')
-"
-    
+    run_monitor stacked "$1" "$2"
     print_success "各節點堆疊區域圖生成完成"
 }
 
 # 生成各節點 VRAM 使用率堆疊區域圖
 run_vram_stacked() {
-    local start_date=$1
-    local end_date=$2
-    local show_users=${3:-"true"}  # 預設顯示使用者資訊
-    
-    if [ -z "$start_date" ] || [ -z "$end_date" ]; then
-        print_error "缺少日期參數"
-        show_usage
-        exit 1
-    fi
-    
-    # 轉換字串為 Python boolean
-    local python_show_users
-    if [ "$show_users" = "false" ] || [ "$show_users" = "0" ] || [ "$show_users" = "no" ]; then
-        python_show_users="False"
+    require_dates "$1" "$2"
+    local no_users
+    no_users=$(users_flag "$3")
+
+    if [ -n "$no_users" ]; then
         print_info "生成各節點 VRAM 使用率堆疊區域圖（不顯示使用者資訊）..."
     else
-        python_show_users="True"
         print_info "生成各節點 VRAM 使用率堆疊區域圖（包含使用者資訊）..."
     fi
-    
-    $PYTHON_CMD -c "
-import sys
-sys.path.append('$VISUALIZATION_DIR')
-from quick_gpu_trend_plots import quick_nodes_vram_stacked_utilization
-quick_nodes_vram_stacked_utilization('$start_date', '$end_date', data_dir='$DATA_DIR', plots_dir='$PLOTS_DIR', show_users=$python_show_users)
-"
-    
+
+    run_monitor vram-stacked "$1" "$2" $no_users
+
     print_success "各節點 VRAM 堆疊區域圖生成完成"
 }
 
 # 生成進階分析圖表
 run_advanced() {
-    local start_date=$1
-    local end_date=$2
-    local mode=$3
-    
-    if [ -z "$start_date" ] || [ -z "$end_date" ]; then
-        print_error "缺少日期參數"
-        show_usage
-        exit 1
-    fi
-    
+    require_dates "$1" "$2"
     print_info "生成進階分析圖表..."
-    
-    python3 "$VISUALIZATION_DIR/advanced_gpu_trend_analyzer.py" \
-        --start-date "$start_date" \
-        --end-date "$end_date" \
-        --mode "${mode:-all}"
-    
+    run_monitor advanced --start-date "$1" --end-date "$2" --mode "${3:-all}"
     print_success "進階分析圖表生成完成"
 }
 
@@ -360,70 +292,24 @@ run_examples() {
 # 自動模式
 run_auto() {
     print_info "自動模式：偵測可用數據並生成所有圖表..."
-    
-    $PYTHON_CMD -c "
-import sys
-sys.path.append('$VISUALIZATION_DIR')
-from quick_gpu_trend_plots import generate_all_quick_plots
-generate_all_quick_plots(data_dir='$DATA_DIR', plots_dir='$PLOTS_DIR')
-"
-    
+    run_monitor quick
     print_success "自動模式完成"
 }
 
 # VRAM 各節點對比
 run_vram_nodes() {
-    local start_date=$1
-    local end_date=$2
-    local gpu_id=$3
-    
-    if [ -z "$start_date" ] || [ -z "$end_date" ]; then
-        print_error "缺少日期參數"
-        show_usage
-        exit 1
-    fi
-    
+    require_dates "$1" "$2"
     print_info "生成各節點 VRAM 使用量對比圖..."
-    
-    if [ -n "$gpu_id" ]; then
-        python3 -c "
-import sys
-sys.path.append('$VISUALIZATION_DIR')
-from quick_gpu_trend_plots import quick_vram_nodes_comparison
-quick_vram_nodes_comparison('$start_date', '$end_date', data_dir='$DATA_DIR', plots_dir='$PLOTS_DIR', gpu_id=$gpu_id)
-"
-    else
-        python3 -c "
-import sys
-sys.path.append('$VISUALIZATION_DIR')
-from quick_gpu_trend_plots import quick_vram_nodes_comparison
-quick_vram_nodes_comparison('$start_date', '$end_date', data_dir='$DATA_DIR', plots_dir='$PLOTS_DIR')
-"
-    fi
-    
+    # GPU_ID 未指定時為空字串，不傳給 gpu_monitor.py
+    run_monitor vram-nodes "$1" "$2" ${3:+"$3"}
     print_success "VRAM 節點對比圖生成完成"
 }
 
 # VRAM 熱力圖
 run_vram_heatmap() {
-    local start_date=$1
-    local end_date=$2
-    
-    if [ -z "$start_date" ] || [ -z "$end_date" ]; then
-        print_error "缺少日期參數"
-        show_usage
-        exit 1
-    fi
-    
+    require_dates "$1" "$2"
     print_info "生成 VRAM 使用率熱力圖..."
-    
-    python3 -c "
-import sys
-sys.path.append('$VISUALIZATION_DIR')
-from quick_gpu_trend_plots import quick_vram_heatmap
-quick_vram_heatmap('$start_date', '$end_date', data_dir='$DATA_DIR', plots_dir='$PLOTS_DIR')
-"
-    
+    run_monitor vram-heatmap "$1" "$2"
     print_success "VRAM 熱力圖生成完成"
 }
 
@@ -432,54 +318,32 @@ run_vram_timeline() {
     local node=$1
     local gpu_id=$2
     local date=$3
-    
+
     if [ -z "$node" ] || [ -z "$gpu_id" ] || [ -z "$date" ]; then
         print_error "vram-timeline 模式需要 [節點] [GPU_ID] [日期] 參數"
         show_usage
         exit 1
     fi
-    
+
     print_info "生成 $node GPU $gpu_id 的 VRAM 時間序列圖..."
-    
-    python3 -c "
-import sys
-sys.path.append('$VISUALIZATION_DIR')
-from quick_gpu_trend_plots import quick_vram_timeline
-quick_vram_timeline('$node', $gpu_id, '$date', data_dir='$DATA_DIR', plots_dir='$PLOTS_DIR')
-"
-    
+    run_monitor vram-timeline "$node" "$gpu_id" "$date"
     print_success "VRAM 時間序列圖生成完成"
 }
 
 # 生成所有 VRAM 圖表
 run_vram_all() {
-    local start_date=$1
-    local end_date=$2
-    local show_users=${3:-"true"}  # 預設顯示使用者資訊
-    
-    if [ -z "$start_date" ] || [ -z "$end_date" ]; then
-        print_error "缺少日期參數"
-        show_usage
-        exit 1
-    fi
-    
-    # 轉換字串為 Python boolean
-    local python_show_users
-    if [ "$show_users" = "false" ] || [ "$show_users" = "0" ] || [ "$show_users" = "no" ]; then
-        python_show_users="False"
+    require_dates "$1" "$2"
+    local no_users
+    no_users=$(users_flag "$3")
+
+    if [ -n "$no_users" ]; then
         print_info "生成所有 VRAM 監控圖表（不顯示使用者資訊）..."
     else
-        python_show_users="True"
         print_info "生成所有 VRAM 監控圖表（包含使用者資訊）..."
     fi
-    
-    python3 -c "
-import sys
-sys.path.append('$VISUALIZATION_DIR')
-from quick_gpu_trend_plots import generate_all_vram_plots
-generate_all_vram_plots('$start_date', '$end_date', data_dir='$DATA_DIR', plots_dir='$PLOTS_DIR', show_users=$python_show_users)
-"
-    
+
+    run_monitor vram-all "$1" "$2" $no_users
+
     print_success "所有 VRAM 圖表生成完成"
 }
 
@@ -604,13 +468,7 @@ main() {
                 show_usage
                 exit 1
             fi
-            python3 "$VISUALIZATION_DIR/advanced_gpu_trend_analyzer.py" \
-                --mode timeline \
-                --node "$2" \
-                --gpu-id "$3" \
-                --date "$4" \
-                --start-date "$4" \
-                --end-date "$4"
+            run_monitor timeline "$2" "$3" "$4"
             ;;
         "vram-stacked")
             run_vram_stacked "$2" "$3" "$4"
@@ -23,6 +23,9 @@ docker run --rm -it \
     -e GROUP_ID=$(id -g) \
     -e USER=$(whoami) \
     -e MPLCONFIGDIR=/tmp/matplotlib_cache \
+    -e GPU_PLOT_WORKERS="${GPU_PLOT_WORKERS:-}" \
+    -e GPU_PLOT_CACHE="${GPU_PLOT_CACHE:-1}" \
+    -e GPU_PLOT_PROFILE="${GPU_PLOT_PROFILE:-}" \
     -v "$(pwd)/data:/app/data" \
     -v "$(pwd)/plots:/app/plots" \
     -v "$(pwd)/data_archive:/app/data_archive" \
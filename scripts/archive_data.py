@@ -5,11 +5,11 @@ from datetime import datetime, timedelta
 import re
 from pathlib import Path
 
-def parse_arguments():
+def parse_arguments(argv=None):
     parser = argparse.ArgumentParser(description='Archive data for a specific month.')
     parser.add_argument('--month', type=str, help='Target month to archive (YYYY-MM). Defaults to previous month.')
     parser.add_argument('--dry-run', action='store_true', help='Simulate the archive process without moving files.')
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 def get_previous_month():
     today = datetime.today()
@@ -93,8 +93,8 @@ def archive_reports(reports_dir, archive_reports_dir, target_month, dry_run):
                 print(f"Moving {file_path} to {target_path}")
                 shutil.move(file_path, target_path)
 
-def main():
-    args = parse_arguments()
+def main(argv=None):
+    args = parse_arguments(argv)
     
     target_month = args.month if args.month else get_previous_month()
     
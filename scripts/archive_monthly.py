@@ -6,7 +6,10 @@ import re
 from pathlib import Path
 
 def parse_arguments():
-    parser = argparse.ArgumentParser(description='Archive data collected before October 2025.')
+    parser = argparse.ArgumentParser(description='Archive data collected before a cutoff date (default: October 2025).')
+    parser.add_argument('--before', type=str, default='2025-10-01',
+                        help='Archive dates strictly before this date (YYYY-MM-DD). Defaults to 2025-10-01. '
+                             'For rolling retention use scripts/retention_policy.py instead.')
     parser.add_argument('--dry-run', action='store_true', help='Simulate the archive process without moving files.')
     return parser.parse_args()
 
@@ -17,14 +20,14 @@ def get_month_str(date_str):
     except ValueError:
         return None
 
-def is_pre_october(date_str):
+def is_before_cutoff(date_str, cutoff):
     try:
         date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-        return date_obj < datetime(2025, 10, 1)
+        return date_obj < cutoff
     except ValueError:
         return False
 
-def archive_node_data(base_dir, archive_base, dry_run):
+def archive_node_data(base_dir, archive_base, cutoff, dry_run):
     print(f"Scanning node data in {base_dir}...")
     colab_dirs = [d for d in os.listdir(base_dir) if d.startswith('colab-gpu')]
     
@@ -43,7 +46,7 @@ def archive_node_data(base_dir, archive_base, dry_run):
             if not re.match(r'\d{4}-\d{2}-\d{2}', date_dir):
                 continue
                 
-            if is_pre_october(date_dir):
+            if is_before_cutoff(date_dir, cutoff):
                 month_str = get_month_str(date_dir)
                 if not month_str:
                     continue
@@ -58,7 +61,7 @@ def archive_node_data(base_dir, archive_base, dry_run):
                     print(f"Moving {date_path} to {target_path}")
                     shutil.move(date_path, target_path)
 
-def archive_reports(reports_dir, archive_reports_dir, dry_run):
+def archive_reports(reports_dir, archive_reports_dir, cutoff, dry_run):
     print(f"Scanning reports in {reports_dir}...")
     if not os.path.exists(reports_dir):
         print(f"Reports directory {reports_dir} does not exist.")
@@ -78,7 +81,7 @@ def archive_reports(reports_dir, archive_reports_dir, dry_run):
             # If range, check the end date. If single date, check that date.
             # We use the last date found in the filename.
             last_date = dates[-1]
-            if is_pre_october(last_date):
+            if is_before_cutoff(last_date, cutoff):
                 should_move = True
         
         if should_move:
@@ -92,16 +95,17 @@ def archive_reports(reports_dir, archive_reports_dir, dry_run):
 
 def main():
     args = parse_arguments()
+    cutoff = datetime.strptime(args.before, '%Y-%m-%d')
     
     base_dir = '/home/amditri/data_collection/data'
     archive_base = '/home/amditri/data_collection/data_archive'
     
-    print(f"Starting archive process (Dry Run: {args.dry_run})")
+    print(f"Starting archive process for data before {args.before} (Dry Run: {args.dry_run})")
     print(f"Source: {base_dir}")
     print(f"Destination: {archive_base}")
     
-    archive_node_data(base_dir, archive_base, args.dry_run)
-    archive_reports(os.path.join(base_dir, 'reports'), os.path.join(archive_base, 'reports'), args.dry_run)
+    archive_node_data(base_dir, archive_base, cutoff, args.dry_run)
+    archive_reports(os.path.join(base_dir, 'reports'), os.path.join(archive_base, 'reports'), cutoff, args.dry_run)
     
     print("Archive process completed.")
 
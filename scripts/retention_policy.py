@@ -0,0 +1,422 @@
+import os
+import re
+import csv
+import json
+import shutil
+import argparse
+from datetime import datetime, timedelta, timezone
+from collections import defaultdict
+
+# Retention tiers, finest first. A value of None keeps the tier forever.
+DEFAULT_POLICY = {'raw': 90, 'hourly': 730, 'daily': None}
+TIERS = ('raw', 'hourly', 'daily')
+
+TAIWAN_TZ = timezone(timedelta(hours=8))
+
+HOURLY_HEADER = ['時間戳', '日期時間', 'GPU編號', '平均GPU使用率(%)', '平均VRAM使用率(%)',
+                 '最大GPU使用率(%)', '樣本數']
+DAILY_HEADER = ['日期', 'GPU編號', '平均GPU使用率(%)', '平均VRAM使用率(%)',
+                '最大GPU使用率(%)', '最大VRAM使用率(%)', '樣本數', '使用者']
+
+GPU_FILE_RE = re.compile(r'^gpu(\d+)_(\d{4}-\d{2}-\d{2})\.csv$')
+DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# Rollup means are written with two decimals, so verification allows that much drift.
+VERIFY_TOLERANCE = 0.01
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Apply the retention policy: compact aging raw partitions into '
+                    'hourly/daily rollups, verify them, then archive or drop the raw files.')
+    parser.add_argument('--policy', type=str,
+                        help='Retention per tier, e.g. "raw=90d,hourly=2y,daily=forever". '
+                             'Missing tiers use the defaults (raw=90d, hourly=2y, daily=forever).')
+    parser.add_argument('--policy-file', type=str,
+                        help='JSON file with the same keys as --policy, e.g. {"raw": "90d", "hourly": "2y"}.')
+    parser.add_argument('--mode', choices=['archive', 'drop'], default='archive',
+                        help='What to do with verified raw partitions (default: archive).')
+    parser.add_argument('--today', type=str, help='Reference date (YYYY-MM-DD). Defaults to today.')
+    parser.add_argument('--data-dir', type=str, help='Data directory. Defaults to /app/data or ./data.')
+    parser.add_argument('--archive-dir', type=str, help='Archive directory. Defaults to /app/data_archive or ./data_archive.')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be done without changing files.')
+    return parser.parse_args(argv)
+
+
+def parse_duration(value):
+    """Turn '90d', '12w', '6m', '2y', a bare number of days or 'forever' into days (None = forever)."""
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    text = str(value).strip().lower()
+    if text in ('forever', 'inf', 'none', ''):
+        return None
+    match = re.match(r'^(\d+)\s*([dwmy]?)$', text)
+    if not match:
+        raise ValueError(f"Invalid retention duration: {value}")
+    amount, unit = int(match.group(1)), match.group(2) or 'd'
+    return amount * {'d': 1, 'w': 7, 'm': 30, 'y': 365}[unit]
+
+
+def load_policy(policy_str=None, policy_file=None):
+    policy = dict(DEFAULT_POLICY)
+    overrides = {}
+    if policy_file:
+        with open(policy_file, 'r', encoding='utf-8') as f:
+            overrides.update(json.load(f))
+    if policy_str:
+        for item in policy_str.split(','):
+            if not item.strip():
+                continue
+            key, _, value = item.partition('=')
+            overrides[key.strip()] = value.strip()
+
+    for key, value in overrides.items():
+        if key not in TIERS:
+            raise ValueError(f"Unknown retention tier: {key} (expected one of {', '.join(TIERS)})")
+        policy[key] = parse_duration(value)
+
+    # A coarser tier must outlive the finer one, otherwise data would vanish before it is rolled up.
+    previous = 0
+    for tier in TIERS:
+        days = policy[tier]
+        if days is not None and days < previous:
+            raise ValueError(f"Tier '{tier}' ({days}d) must be kept at least as long as the finer tier ({previous}d)")
+        previous = days if days is not None else float('inf')
+    return policy
+
+
+def cutoff_date(today, days):
+    """Dates strictly before the returned string are past the tier's retention."""
+    if days is None:
+        return None
+    return (today - timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+def read_gpu_samples(csv_path):
+    """Read one per-GPU sample file. Returns a list of (timestamp, gpu_usage, vram_usage or None)."""
+    samples = []
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.reader(f):
+            if len(row) < 3 or not row[0].strip().isdigit():
+                continue  # header or broken line
+            try:
+                gpu_usage = float(row[2])
+                vram_usage = float(row[3]) if len(row) > 3 and row[3] != '' else None
+            except ValueError:
+                continue
+            samples.append((int(row[0]), gpu_usage, vram_usage))
+    return samples
+
+
+def read_partition_users(date_path, date_str):
+    users = {}
+    avg_file = os.path.join(date_path, f"average_{date_str}.csv")
+    if not os.path.exists(avg_file):
+        return users
+    with open(avg_file, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if '使用者' not in header:
+            return users
+        user_col = header.index('使用者')
+        for row in reader:
+            if row and row[0].startswith('GPU[') and len(row) > user_col:
+                users[row[0]] = row[user_col]
+    return users
+
+
+def summarize(samples):
+    count = len(samples)
+    vram_values = [s[2] for s in samples if s[2] is not None]
+    return {
+        'gpu_mean': sum(s[1] for s in samples) / count,
+        'vram_mean': sum(vram_values) / len(vram_values) if vram_values else None,
+        'gpu_max': max(s[1] for s in samples),
+        'vram_max': max(vram_values) if vram_values else None,
+        'count': count,
+    }
+
+
+def fmt(value):
+    return 'N/A' if value is None else f"{value:.2f}"
+
+
+def partition_gpu_files(date_path, date_str):
+    """Return the (gpu_index, filename) pairs of the partition's per-GPU sample files."""
+    return sorted(
+        (int(m.group(1)), name) for name in os.listdir(date_path)
+        for m in [GPU_FILE_RE.match(name)] if m and m.group(2) == date_str
+    )
+
+
+def compact_partition(date_path, date_str):
+    """Build hourly and daily rollup rows for one node/date partition."""
+    users = read_partition_users(date_path, date_str)
+    hourly_rows, daily_rows, raw_stats = [], [], {}
+
+    for gpu_index, name in partition_gpu_files(date_path, date_str):
+        samples = read_gpu_samples(os.path.join(date_path, name))
+        if not samples:
+            continue
+        gpu_label = f"GPU[{gpu_index}]"
+
+        buckets = defaultdict(list)
+        for sample in samples:
+            buckets[sample[0] - sample[0] % 3600].append(sample)
+        for hour_ts in sorted(buckets):
+            stats = summarize(buckets[hour_ts])
+            hour_str = datetime.fromtimestamp(hour_ts, tz=TAIWAN_TZ).strftime('%Y-%m-%d %H:%M:%S')
+            hourly_rows.append([str(hour_ts), hour_str, gpu_label, fmt(stats['gpu_mean']),
+                                fmt(stats['vram_mean']), fmt(stats['gpu_max']), str(stats['count'])])
+
+        stats = summarize(samples)
+        raw_stats[gpu_label] = stats
+        daily_rows.append([date_str, gpu_label, fmt(stats['gpu_mean']), fmt(stats['vram_mean']),
+                           fmt(stats['gpu_max']), fmt(stats['vram_max']), str(stats['count']),
+                           users.get(gpu_label, '未使用')])
+    return hourly_rows, daily_rows, raw_stats
+
+
+def read_rollup(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return [row for row in reader if row]
+
+
+def write_rollup(path, header, rows):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    os.replace(tmp_path, path)
+
+
+def upsert_rollup(path, header, date_of, date_str, new_rows):
+    """Replace every row of date_str in the rollup file with new_rows, keeping the file sorted."""
+    rows = [row for row in read_rollup(path) if date_of(row) != date_str]
+    rows.extend(new_rows)
+    rows.sort(key=lambda row: row[:3])
+    write_rollup(path, header, rows)
+
+
+def hourly_path(rollup_dir, node, date_str):
+    return os.path.join(rollup_dir, 'hourly', node, f"hourly_{date_str[:7]}.csv")
+
+
+def daily_path(rollup_dir, node, date_str):
+    return os.path.join(rollup_dir, 'daily', node, f"daily_{date_str[:4]}.csv")
+
+
+def hourly_row_date(row):
+    return row[1][:10]
+
+
+def daily_row_date(row):
+    return row[0]
+
+
+def verify_rollups(rollup_dir, node, date_str, raw_stats, with_hourly):
+    """Re-read the written rollups and check them against the raw statistics."""
+    daily = {row[1]: row for row in read_rollup(daily_path(rollup_dir, node, date_str))
+             if daily_row_date(row) == date_str}
+    hourly = defaultdict(list)
+    if with_hourly:
+        for row in read_rollup(hourly_path(rollup_dir, node, date_str)):
+            if hourly_row_date(row) == date_str:
+                hourly[row[2]].append(row)
+
+    for gpu_label, stats in raw_stats.items():
+        row = daily.get(gpu_label)
+        if row is None:
+            return f"missing daily rollup for {gpu_label}"
+        if int(row[6]) != stats['count']:
+            return f"daily sample count mismatch for {gpu_label}: {row[6]} != {stats['count']}"
+        if abs(float(row[2]) - stats['gpu_mean']) > VERIFY_TOLERANCE:
+            return f"daily GPU mean mismatch for {gpu_label}"
+        if not with_hourly:
+            continue
+        rows = hourly.get(gpu_label, [])
+        counts = [int(r[6]) for r in rows]
+        if sum(counts) != stats['count']:
+            return f"hourly sample count mismatch for {gpu_label}: {sum(counts)} != {stats['count']}"
+        weighted = sum(float(r[3]) * c for r, c in zip(rows, counts)) / sum(counts)
+        # Each hourly mean is rounded to two decimals, so the weighted mean can drift by that much.
+        if abs(weighted - stats['gpu_mean']) > VERIFY_TOLERANCE:
+            return f"hourly GPU mean mismatch for {gpu_label}"
+    return None
+
+
+def dispose_raw(date_path, archive_base, node, date_str, mode, dry_run):
+    if mode == 'drop':
+        if dry_run:
+            print(f"[DRY RUN] Would delete {date_path}")
+        else:
+            print(f"Deleting {date_path}")
+            shutil.rmtree(date_path)
+        return
+
+    target_dir = os.path.join(archive_base, date_str[:7], node)
+    target_path = os.path.join(target_dir, date_str)
+    if dry_run:
+        print(f"[DRY RUN] Would move {date_path} to {target_path}")
+    else:
+        os.makedirs(target_dir, exist_ok=True)
+        print(f"Moving {date_path} to {target_path}")
+        shutil.move(date_path, target_path)
+
+
+def apply_raw_tier(base_dir, archive_base, rollup_dir, policy, today, mode, dry_run):
+    """Compact and dispose expired raw partitions. Returns the number of partitions kept because of errors."""
+    raw_cutoff = cutoff_date(today, policy['raw'])
+    if raw_cutoff is None:
+        print("Raw tier is kept forever, nothing to compact.")
+        return 0
+    hourly_cutoff = cutoff_date(today, policy['hourly'])
+    print(f"Compacting raw partitions older than {raw_cutoff}...")
+
+    failures = 0
+    colab_dirs = sorted(d for d in os.listdir(base_dir) if d.startswith('colab-gpu'))
+    for node in colab_dirs:
+        node_path = os.path.join(base_dir, node)
+        if not os.path.isdir(node_path):
+            continue
+
+        for date_str in sorted(os.listdir(node_path)):
+            date_path = os.path.join(node_path, date_str)
+            if not os.path.isdir(date_path) or not DATE_RE.match(date_str) or date_str >= raw_cutoff:
+                continue
+
+            # Partitions already past the hourly tier go straight to daily rollups.
+            with_hourly = hourly_cutoff is None or date_str >= hourly_cutoff
+            if dry_run:
+                tiers = 'hourly+daily' if with_hourly else 'daily'
+                print(f"[DRY RUN] Would compact {node}/{date_str} into {tiers} rollups")
+                dispose_raw(date_path, archive_base, node, date_str, mode, dry_run)
+                continue
+
+            hourly_rows, daily_rows, raw_stats = compact_partition(date_path, date_str)
+            # Without a daily row per GPU file the rollups would not cover the partition, and
+            # disposing of it would lose its samples and the users in its average file.
+            gpu_files = partition_gpu_files(date_path, date_str)
+            unparsed = [name for gpu_index, name in gpu_files if f"GPU[{gpu_index}]" not in raw_stats]
+            if not gpu_files or unparsed:
+                reason = f"unreadable {', '.join(unparsed)}" if unparsed else "no gpu*.csv files"
+                print(f"Error: cannot compact {node}/{date_str} ({reason}). Keeping raw files.")
+                failures += 1
+                continue
+            if with_hourly:
+                upsert_rollup(hourly_path(rollup_dir, node, date_str), HOURLY_HEADER,
+                              hourly_row_date, date_str, hourly_rows)
+            upsert_rollup(daily_path(rollup_dir, node, date_str), DAILY_HEADER,
+                          daily_row_date, date_str, daily_rows)
+
+            error = verify_rollups(rollup_dir, node, date_str, raw_stats, with_hourly)
+            if error:
+                print(f"Error: verification failed for {node}/{date_str}: {error}. Keeping raw files.")
+                failures += 1
+                continue
+
+            dispose_raw(date_path, archive_base, node, date_str, mode, dry_run)
+    return failures
+
+
+def expire_hourly_tier(rollup_dir, policy, today, dry_run):
+    hourly_cutoff = cutoff_date(today, policy['hourly'])
+    hourly_root = os.path.join(rollup_dir, 'hourly')
+    if hourly_cutoff is None or not os.path.isdir(hourly_root):
+        return
+    print(f"Expiring hourly rollups older than {hourly_cutoff}...")
+
+    for node in sorted(os.listdir(hourly_root)):
+        node_path = os.path.join(hourly_root, node)
+        for filename in sorted(os.listdir(node_path)):
+            match = re.match(r'^hourly_(\d{4}-\d{2})\.csv$', filename)
+            # Only whole months are dropped; the month must end before the cutoff.
+            if not match or f"{match.group(1)}-31" >= hourly_cutoff:
+                continue
+            path = os.path.join(node_path, filename)
+            hourly_dates = {hourly_row_date(row) for row in read_rollup(path)}
+            daily_dates = set()
+            for year in {d[:4] for d in hourly_dates}:
+                daily_dates.update(daily_row_date(row) for row in
+                                   read_rollup(daily_path(rollup_dir, node, f"{year}-01-01")))
+            missing = sorted(hourly_dates - daily_dates)
+            if missing:
+                print(f"Keeping {path}: daily rollups missing for {', '.join(missing[:3])}...")
+                continue
+            if dry_run:
+                print(f"[DRY RUN] Would delete {path}")
+            else:
+                print(f"Deleting {path}")
+                os.remove(path)
+
+
+def expire_daily_tier(rollup_dir, policy, today, dry_run):
+    daily_cutoff = cutoff_date(today, policy['daily'])
+    daily_root = os.path.join(rollup_dir, 'daily')
+    if daily_cutoff is None or not os.path.isdir(daily_root):
+        return
+    print(f"Expiring daily rollups older than {daily_cutoff}...")
+
+    for node in sorted(os.listdir(daily_root)):
+        node_path = os.path.join(daily_root, node)
+        for filename in sorted(os.listdir(node_path)):
+            match = re.match(r'^daily_(\d{4})\.csv$', filename)
+            if not match or f"{match.group(1)}-12-31" >= daily_cutoff:
+                continue
+            path = os.path.join(node_path, filename)
+            if dry_run:
+                print(f"[DRY RUN] Would delete {path}")
+            else:
+                print(f"Deleting {path}")
+                os.remove(path)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+
+    try:
+        policy = load_policy(args.policy, args.policy_file)
+        today = datetime.strptime(args.today, '%Y-%m-%d') if args.today else datetime.today()
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    base_dir = args.data_dir or '/app/data'  # Inside Docker container
+    archive_base = args.archive_dir or '/app/data_archive'  # Inside Docker container
+
+    # Fallback to local paths if not in Docker (for testing)
+    if not args.data_dir and not os.path.exists(base_dir):
+        base_dir = os.path.join(os.getcwd(), 'data')
+        if not args.archive_dir:
+            archive_base = os.path.join(os.getcwd(), 'data_archive')
+
+    rollup_dir = os.path.join(base_dir, 'rollups')
+
+    describe = ', '.join(f"{tier}={'forever' if policy[tier] is None else str(policy[tier]) + 'd'}"
+                         for tier in TIERS)
+    print(f"Starting retention run (Policy: {describe}, Mode: {args.mode}, Dry Run: {args.dry_run})")
+    print(f"Source: {base_dir}")
+    print(f"Rollups: {rollup_dir}")
+    print(f"Archive: {archive_base}")
+
+    failures = apply_raw_tier(base_dir, archive_base, rollup_dir, policy, today, args.mode, args.dry_run)
+    expire_hourly_tier(rollup_dir, policy, today, args.dry_run)
+    expire_daily_tier(rollup_dir, policy, today, args.dry_run)
+
+    if failures:
+        print(f"Retention run completed with errors: {failures} partition(s) kept, see above.")
+        return 1
+    print("Retention run completed.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""
+pytest 共用設定
+
+各模組以裸名稱互相匯入（與 gpu_monitor.py 相同），因此把 visualization/、
+python/、scripts/ 與專案根目錄加入模組搜尋路徑。
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for sub in ('', 'visualization', 'python', 'scripts'):
+    path = os.path.join(ROOT, sub) if sub else ROOT
+    if path not in sys.path:
+        sys.path.insert(0, path)
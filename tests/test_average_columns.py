@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""平均檔欄位別名解析測試（查詢工具與 columnar_csv 共用同一套解析）"""
+
+from columnar_csv import read_average_columns
+from get_user_gpu_usage import UserGPUUsageQuery
+
+
+def test_resolve_schema_maps_aliases():
+    schema = UserGPUUsageQuery._resolve_schema(['﻿gpu_id', 'GPU使用率', 'vram', '使用者名稱'])
+    assert schema.mapped == {'﻿gpu_id': 'gpu', 'GPU使用率': 'usage',
+                             'vram': 'vram_usage', '使用者名稱': 'user'}
+    assert schema.missing == []
+    assert UserGPUUsageQuery._resolve_schema(['GPU編號', '平均GPU使用率(%)']).missing == ['user', 'vram_usage']
+
+
+def test_basic_loader_fills_defaults(tmp_path):
+    path = tmp_path / 'average_2025-01-01.csv'
+    path.write_text('GPU編號,平均GPU使用率(%),平均VRAM使用率(%)\nGPU[1],N/A,20.5\n全部平均,0,20.5\n',
+                    encoding='utf-8')
+    query = UserGPUUsageQuery(str(tmp_path), str(tmp_path / 'plots'), use_index=False)
+    rows = query.load_gpu_data_with_users_basic(str(path))
+    assert rows[0] == {'gpu': 'GPU[1]', 'usage': 0.0, 'vram_usage': 20.5, 'user': '未使用'}
+    assert len(rows) == 2
+    assert read_average_columns(str(path)).missing == ('user',)
+    assert query.load_gpu_data_with_users_basic(str(tmp_path / 'missing.csv')) is None
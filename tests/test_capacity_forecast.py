@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""capacity_forecast 增量更新與重新擬合的一致性測試"""
+
+import numpy as np
+import pytest
+
+import capacity_forecast
+from capacity_forecast import CapacityForecaster, _shift_date
+
+NODES = ['colab-gpu1', 'colab-gpu2', 'colab-gpu3', 'colab-gpu4']
+START = '2025-01-01'
+# colab-gpu4 從這天才開始有資料
+LATE_NODE_START = '2025-02-05'
+
+
+def _write_average(data_dir, node, date_str, rng):
+    day_dir = data_dir / node / date_str
+    day_dir.mkdir(parents=True)
+    lines = ['GPU編號,平均GPU使用率(%),平均VRAM使用率(%),使用者']
+    for gpu_index in range(8):
+        user = f"user{rng.integers(0, 5)}" if rng.random() < 0.6 else '未使用'
+        lines.append(f"GPU[{gpu_index}],{rng.uniform(0, 100):.2f},{rng.uniform(0, 100):.2f},{user}")
+    (day_dir / f"average_{date_str}.csv").write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+def _make_data_dir(tmp_path, days=70):
+    rng = np.random.default_rng(5)
+    data_dir = tmp_path / 'data'
+    for offset in range(days):
+        date_str = _shift_date(START, offset)
+        for node in NODES:
+            if node == NODES[-1] and date_str < LATE_NODE_START:
+                continue
+            _write_average(data_dir, node, date_str, rng)
+    return str(data_dir)
+
+
+def _assert_same_fit(incremental, rebuilt):
+    for name in ('n', 'yty'):
+        np.testing.assert_allclose(incremental.state[name], rebuilt.state[name], rtol=1e-9, atol=1e-6)
+    # 重新擬合以視窗第一天為原點，與增量狀態的原點不同，預測只在正則化項的誤差內相同
+    a = incremental.forecast(14, peaks=False)
+    b = rebuilt.forecast(14, peaks=False)
+    np.testing.assert_allclose(a.mean, b.mean, atol=0.01)
+    np.testing.assert_allclose(a.upper, b.upper, atol=0.01)
+
+
+@pytest.mark.parametrize('history', [30, 45])
+def test_incremental_updates_match_rebuild(tmp_path, monkeypatch, history):
+    # 不在測試期間定期重新累加，每一步都走增量路徑
+    monkeypatch.setattr(capacity_forecast, 'REFIT_INTERVAL', 1000)
+    data_dir = _make_data_dir(tmp_path)
+    incremental = CapacityForecaster(data_dir, nodes=NODES, history_days=history,
+                                     output_dir=str(tmp_path / 'incremental'))
+    # 視窗先完全在 colab-gpu4 開始之前，之後每晚前進一天：該節點加入後、以及
+    # 早期缺資料的日期離開視窗時，全部節點配置數的完整日期遮罩都會改變
+    end_date = _shift_date(LATE_NODE_START, -3)
+    assert incremental.refresh(end_date)[1] is False
+    for _ in range(history + 5):
+        end_date = _shift_date(end_date, 1)
+        reads, was_incremental = incremental.refresh(end_date)
+        assert was_incremental and reads <= len(NODES)
+
+        rebuilt = CapacityForecaster(data_dir, nodes=NODES, history_days=history,
+                                     output_dir=str(tmp_path / 'rebuilt'))
+        rebuilt.reset()
+        rebuilt.refresh(end_date)
+        _assert_same_fit(incremental, rebuilt)
+
+
+def _allocated_forecast(mean, upper, capacity=8.0):
+    dates = [_shift_date('2025-03-01', offset) for offset in range(len(mean))]
+    mean, upper = np.array([mean], dtype=float), np.array([upper], dtype=float)
+    return capacity_forecast.Forecast(
+        history_start='2025-01-01', history_end='2025-02-28', spec=(True, 0), dates=dates,
+        labels=['colab-gpu1'], metrics=['allocated'], capacity=np.array([capacity]),
+        mean=mean, lower=mean - 1, upper=upper, peak=np.full(mean.shape, np.nan),
+        recent=np.array([6.0]), slope_per_week=np.array([0.1]), observations=np.array([60]), level=95.0)
+
+
+def test_capacity_alerts_compare_with_capacity():
+    # 預測值 7.5 / 8 只是上界達到容量，不是預估需求達到容量
+    alerts = capacity_forecast.capacity_alerts(_allocated_forecast([7.1, 7.5, 7.6], [7.9, 8.0, 8.0]))
+    assert alerts == ['colab-gpu1: 2025-03-02 起配置需求的信賴區間上界達到容量 (8 張 GPU)']
+
+    alerts = capacity_forecast.capacity_alerts(_allocated_forecast([7.5, 8.0, 8.0], [8.0, 8.0, 8.0]))
+    assert alerts == ['colab-gpu1: 預估 2025-03-02 起配置需求達到容量 (8 張 GPU)']
+
+    assert capacity_forecast.capacity_alerts(_allocated_forecast([6.0, 7.0], [7.5, 7.9])) == []
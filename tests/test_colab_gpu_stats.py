@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""colab_gpu_stats 摘要、詳細與使用者報表的已知值測試"""
+
+import pytest
+
+from colab_gpu_stats import ColabGPUStats
+
+NODES = ['colab-gpu1', 'colab-gpu2']
+HEADER = 'GPU編號,平均GPU使用率(%),平均VRAM使用率(%),使用者'
+
+# 2025-10-02 的 colab-gpu2 沒有資料；N/A 列只計入 VRAM，不計入使用者報表
+AVERAGES = {
+    ('colab-gpu1', '2025-10-01'): ['GPU[0],50.00,20.00,alice', 'GPU[1],0.50,10.00,未使用',
+                                   'GPU[2],12.50,30.00,bob', '全部平均,21.00,20.00,所有使用者'],
+    ('colab-gpu2', '2025-10-01'): ['GPU[0],30.00,40.00,alice', 'GPU[1],N/A,5.00,bob'],
+    ('colab-gpu1', '2025-10-02'): ['GPU[0],11.00,20.00,alice', 'GPU[1],80.00,60.00,bob'],
+}
+
+
+@pytest.fixture
+def stats(tmp_path):
+    for (node, date_str), rows in AVERAGES.items():
+        day_dir = tmp_path / node / date_str
+        day_dir.mkdir(parents=True)
+        (day_dir / f"average_{date_str}.csv").write_text('\n'.join([HEADER] + rows) + '\n', encoding='utf-8')
+    return ColabGPUStats(str(tmp_path), nodes=NODES, node_ips=['10.0.0.1', '10.0.0.2'])
+
+
+def _output(capsys):
+    return [line.strip() for line in capsys.readouterr().out.splitlines()]
+
+
+def _row(lines, first_tokens):
+    # 以開頭的欄位找出表格列，回傳以空白分隔的欄位
+    for line in lines:
+        tokens = line.split()
+        if tokens[:len(first_tokens)] == first_tokens:
+            return tokens
+    raise AssertionError(f"找不到 {first_tokens}")
+
+
+def test_summary(stats, capsys):
+    stats.show_summary('2025-10-01')
+    lines = _output(capsys)
+    # GPU: (50 + 0.5 + 12.5 + 30) / 4；VRAM 含 N/A 列: (20 + 10 + 30 + 40 + 5) / 5
+    assert '🔥 GPU使用率:  23.25% (4個GPU)' in lines
+    assert '💾 VRAM使用率: 21.00% (5個GPU)' in lines
+    assert '🖥️  活躍節點:   2/2' in lines
+    assert '⚡ 活躍GPU:    3/4 (使用率>1%)' in lines
+    assert '💤 閒置GPU:    1/4' in lines
+    assert '🔋 資源利用率: 75.0%' in lines
+
+
+def test_detailed(stats, capsys):
+    stats.show_detailed('2025-10-01')
+    lines = _output(capsys)
+    assert _row(lines, ['colab-gpu1']) == ['colab-gpu1', '10.0.0.1', '21.00%', '20.00%', '2/3', '正常']
+    assert _row(lines, ['colab-gpu2']) == ['colab-gpu2', '10.0.0.2', '30.00%', '22.50%', '1/1', '正常']
+    assert '🔥 GPU使用率總平均:  23.25% (統計4個GPU)' in lines
+    assert '💾 VRAM使用率總平均: 21.00% (統計5個GPU)' in lines
+
+    stats.show_detailed('2025-10-02')
+    lines = _output(capsys)
+    assert _row(lines, ['colab-gpu2']) == ['colab-gpu2', 'N/A', '0.00%', '0.00%', '0/8', '無資料']
+    assert '🖥️  正常運作節點:     1/2' in lines
+
+
+def test_user_analysis_resets_daily_totals(stats, capsys):
+    stats.show_user_analysis('2025-10-01', '2025-10-02')
+    lines = _output(capsys)
+    # 每日總平均GPU = 各天在所有節點的合計再對天數平均：
+    # alice (50 + 30, 11) -> 45.50，若不逐日歸零會變成 (80 + 91) / 2
+    assert _row(lines, ['🔥', 'bob']) == ['🔥', 'bob', '46.25%', '45.00%', '2', '2', '100.0%', '46.25%']
+    assert _row(lines, ['🔥', 'alice']) == ['🔥', 'alice', '30.33%', '26.67%', '3', '3', '100.0%', '45.50%']
+    assert _row(lines, ['💤', '未使用']) == ['💤', '未使用', '0.50%', '10.00%', '1', '0', '0.0%', '0.50%']
+
+    assert _row(lines, ['🥇']) == ['🥇', '1', 'bob', '46.25%', '2']
+    assert _row(lines, ['🥈']) == ['🥈', '2', 'alice', '45.50%', '2']
+    assert _row(lines, ['🥉']) == ['🥉', '3', '未使用', '0.50%', '1']
+    assert '👥 總使用者數: 2 (活躍使用者: 2)' in lines
+    assert '🔋 總體活躍率: 100.0% (5/5 GPU)' in lines
+    assert '📈 資料完整度: 100.0% (2/2 天)' in lines
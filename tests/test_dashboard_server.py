@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""dashboard_server 每小時序列測試（原始分區與每小時彙總）"""
+
+import shutil
+
+import numpy as np
+
+from dashboard_server import DashboardStore
+from retention_policy import HOURLY_HEADER, compact_partition, hourly_path, write_rollup
+
+NODE = 'colab-gpu1'
+DATE = '2025-01-02'
+# 台灣時間 2025-01-02 00:00（UTC 2025-01-01 16:00）
+DAY_START = 1735747200
+
+
+def _write_gpu_file(partition, gpu_index, rows):
+    lines = ['時間戳,日期時間,GPU使用率(%),VRAM使用率(%)']
+    lines += [f"{ts},-,{usage},{vram}" for ts, usage, vram in rows]
+    (partition / f"gpu{gpu_index}_{DATE}.csv").write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+def _make_data_dir(tmp_path):
+    data_dir = tmp_path / 'data'
+    partition = data_dir / NODE / DATE
+    partition.mkdir(parents=True)
+    _write_gpu_file(partition, 0, [
+        (DAY_START + 60, 10, 20),
+        (DAY_START + 120, 30, 40),
+        (DAY_START + 5 * 3600, 50, 60),
+        (DAY_START + 23 * 3600 + 59, 70, 80),
+    ])
+    _write_gpu_file(partition, 1, [(DAY_START + 3600, 90, 95)])
+    return data_dir
+
+
+def test_hourly_series_from_raw_partition(tmp_path, monkeypatch):
+    monkeypatch.setenv('GPU_TREND_CACHE', '0')
+    data_dir = _make_data_dir(tmp_path)
+    store = DashboardStore(str(data_dir), nodes=[NODE], gpu_indices=[0, 1])
+
+    timestamps, usage, vram = store.hourly_series(NODE, 0, DATE, DATE)
+    assert timestamps == [DAY_START, DAY_START + 5 * 3600, DAY_START + 23 * 3600]
+    assert usage == [20.0, 50.0, 70.0]
+    assert vram == [30.0, 60.0, 80.0]
+
+    assert store.hourly_series(NODE, 1, DATE, DATE) == ([DAY_START + 3600], [90.0], [95.0])
+    assert store.hourly_series(NODE, 5, DATE, DATE) == ([], [], [])
+
+
+def test_hourly_series_matches_after_compaction(tmp_path, monkeypatch):
+    monkeypatch.setenv('GPU_TREND_CACHE', '0')
+    data_dir = _make_data_dir(tmp_path)
+    partition = data_dir / NODE / DATE
+    raw = DashboardStore(str(data_dir), nodes=[NODE], gpu_indices=[0, 1]).hourly_series(NODE, 0, DATE, DATE)
+
+    hourly_rows, _, _ = compact_partition(str(partition), DATE)
+    write_rollup(hourly_path(str(data_dir / 'rollups'), NODE, DATE), HOURLY_HEADER, hourly_rows)
+    shutil.rmtree(partition)
+
+    rollup = DashboardStore(str(data_dir), nodes=[NODE], gpu_indices=[0, 1]).hourly_series(NODE, 0, DATE, DATE)
+    assert rollup[0] == raw[0]
+    np.testing.assert_allclose(rollup[1], raw[1])
+    np.testing.assert_allclose(rollup[2], raw[2])
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""LTTB 降採樣與分塊折疊測試"""
+
+import numpy as np
+
+from chunked_reader import SampleChunk, fold_downsampled
+from downsample import downsample_indices, lttb_indices
+
+
+def _reference_lttb(x, y, n_out):
+    # 逐點計算三角形面積的直譯版本，區段切分與 lttb_indices 相同
+    n = len(y)
+    edges = [int(edge) for edge in np.linspace(1, n - 1, n_out - 1)]
+    selected = [0]
+    for bucket in range(n_out - 2):
+        if bucket + 2 < len(edges):
+            span = range(edges[bucket + 1], edges[bucket + 2])
+            next_x = sum(x[i] for i in span) / len(span)
+            next_y = sum(y[i] for i in span) / len(span)
+        else:
+            next_x, next_y = x[-1], y[-1]
+        px, py = x[selected[-1]], y[selected[-1]]
+        best, best_area = None, -1.0
+        for i in range(edges[bucket], edges[bucket + 1]):
+            area = abs((px - next_x) * (y[i] - py) - (px - x[i]) * (next_y - py))
+            if area > best_area:
+                best, best_area = i, area
+        selected.append(best)
+    selected.append(n - 1)
+    return selected
+
+
+def test_lttb_matches_reference():
+    rng = np.random.default_rng(0)
+    x = np.cumsum(rng.uniform(1, 60, 2000))
+    y = rng.normal(50, 20, 2000)
+    for n_out in (3, 10, 157, 500):
+        indices = lttb_indices(x, y, n_out)
+        assert len(indices) == n_out
+        assert indices[0] == 0 and indices[-1] == len(y) - 1
+        assert (np.diff(indices) > 0).all()
+        assert indices.tolist() == _reference_lttb(x, y, n_out)
+
+
+def test_lttb_keeps_spike_and_short_input():
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[437] = 100.0
+    assert 437 in lttb_indices(x, y, 20)
+    assert lttb_indices(x[:5], y[:5], 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_downsample_indices_keeps_nan_gap():
+    x = np.arange(300, dtype=float)
+    y = np.sin(x / 10)
+    y[100:150] = np.nan
+    indices = downsample_indices(x, y, 30, 'lttb')
+    assert np.isnan(y[indices]).sum() == 1
+    assert {0, 99, 150, 299} <= set(indices.tolist())
+
+
+def test_fold_downsampled_selects_points_per_layer():
+    timestamp = np.arange(2000, dtype=float) * 60
+    usage = np.zeros(2000)
+    usage[500] = 100.0
+    vram = np.full(2000, 10.0)
+    vram[1517] = 90.0
+    chunks = [SampleChunk('2025-01-01', '2025-01-01', timestamp[:1000], usage[:1000], vram[:1000]),
+              SampleChunk('2025-01-02', '2025-01-02', timestamp[1000:], usage[1000:], vram[1000:])]
+
+    folded = fold_downsampled(chunks, 40, 2, 'lttb')
+    usage_ts, usage_values = folded['usage']
+    vram_ts, vram_values = folded['vram']
+    assert usage_values.max() == 100.0 and 500 * 60 in usage_ts
+    # VRAM 的峰值不在使用率選出的點中，依 VRAM 本身降採樣才會保留
+    assert vram_values.max() == 90.0 and 1517 * 60 in vram_ts
+    assert vram[(usage_ts // 60).astype(int)].max() == 10.0
+
+    usage_only = fold_downsampled(chunks, 40, 2, 'lttb', layers=('usage',))
+    assert list(usage_only) == ['usage']
+    assert fold_downsampled([], 40, 2, 'lttb') is None
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""gpu_accounting 依原始樣本積分 GPU 時數的測試"""
+
+import pytest
+
+from gpu_accounting import GPUAccounting, day_bounds, load_day_tasks
+
+NODE = 'colab-gpu1'
+STEP = 600
+
+
+def _write_samples(day_dir, date_str, gpu_index, usage_at):
+    # 整天每 10 分鐘一筆；usage_at(小時) 回傳 (GPU 使用率, VRAM 使用率)
+    day_start, _ = day_bounds(date_str)
+    lines = ['時間戳,日期時間,GPU使用率(%),VRAM使用率(%)']
+    for k in range(24 * 3600 // STEP):
+        usage, vram = usage_at(k * STEP / 3600)
+        lines.append(f"{int(day_start) + k * STEP},-,{usage},{vram}")
+    (day_dir / f"gpu{gpu_index}_{date_str}.csv").write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+def _make_day(data_dir, date_str):
+    day_dir = data_dir / NODE / date_str
+    day_dir.mkdir(parents=True)
+    # GPU 0: 02:00-05:00 使用率 50%，其餘時間閒置；VRAM 固定 40%
+    _write_samples(day_dir, date_str, 0, lambda hour: (50 if 2 <= hour < 5 else 0, 40))
+    # GPU 1: 整天 20%
+    _write_samples(day_dir, date_str, 1, lambda hour: (20, 10))
+    return day_dir
+
+
+def test_task_window_hours(tmp_path):
+    data_dir = tmp_path / 'data'
+    day_dir = _make_day(data_dir, '2025-01-01')
+    (day_dir / 'tasks_2025-01-01.csv').write_text(
+        'GPU編號,使用者,專案,開始時間,結束時間,GPU記憶體(MB)\n'
+        'GPU[0],alice,vision,2025-01-01T02:00:00,2025-01-01T08:00:00,16384\n', encoding='utf-8')
+
+    accounting = GPUAccounting(str(data_dir), nodes=[NODE], busy_threshold=5.0).run('2025-01-01', '2025-01-01')
+    (row,) = accounting.report('user')
+    assert row['name'] == 'alice' and row['tasks'] == 1
+    assert row['allocated'] == pytest.approx(6.0)
+    assert row['busy'] == pytest.approx(3.0)
+    assert row['idle'] == pytest.approx(3.0)
+    assert row['effective'] == pytest.approx(1.5)
+    assert row['vram_gb_hours'] == pytest.approx(6.0 * 0.4 * 16)
+    assert row['peak'] == 50.0
+    assert accounting.report('project')[0]['name'] == 'vision'
+    assert accounting.days_with_tasks_file == 1 and accounting.days_from_averages == 0
+
+
+def test_average_file_fallback_uses_column_aliases(tmp_path):
+    data_dir = tmp_path / 'data'
+    day_dir = _make_day(data_dir, '2025-01-02')
+    # 沒有 tasks 檔；平均檔使用別名欄位，使用者不在第 4 欄
+    (day_dir / 'average_2025-01-02.csv').write_text(
+        'username,GPU,GPU使用率,VRAM使用率\n'
+        'bob,GPU[1],20,10\n'
+        '未使用,GPU[0],8,40\n'
+        ',全部平均,14,25\n', encoding='utf-8')
+
+    day_start, day_end = day_bounds('2025-01-02')
+    assert load_day_tasks(str(data_dir), NODE, '2025-01-02') == [
+        ('bob', '(無專案)', 1, day_start, day_end, 80.0)]
+
+    accounting = GPUAccounting(str(data_dir), nodes=[NODE], busy_threshold=5.0).run('2025-01-02', '2025-01-02')
+    (row,) = accounting.report('user')
+    assert row['name'] == 'bob'
+    assert row['allocated'] == pytest.approx(24.0)
+    assert row['busy'] == pytest.approx(24.0) and row['idle'] == pytest.approx(0.0)
+    assert row['effective'] == pytest.approx(24.0 * 0.2)
+    assert accounting.days_from_averages == 1
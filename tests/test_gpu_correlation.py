@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""gpu_correlation.average_linkage 與逐步重算的 UPGMA 對照測試"""
+
+import numpy as np
+import pytest
+
+from gpu_correlation import average_linkage
+
+
+def _brute_force_upgma(distance, cut):
+    # 每一步以原始距離重新計算所有群對的平均距離；群以最小的原始索引識別
+    n = len(distance)
+    clusters = {i: [i] for i in range(n)}
+    groups = None
+    while len(clusters) > 1:
+        best = None
+        keys = sorted(clusters)
+        for x, a in enumerate(keys):
+            for b in keys[x + 1:]:
+                average = np.mean([distance[p][q] for p in clusters[a] for q in clusters[b]])
+                if best is None or average < best[0]:
+                    best = (average, a, b)
+        height, a, b = best
+        if groups is None and height > cut:
+            groups = [list(members) for members in clusters.values()]
+        clusters[a] = clusters[a] + clusters.pop(b)
+    order = next(iter(clusters.values()))
+    if groups is None:
+        groups = [order]
+    return order, groups
+
+
+def _partition(clusters):
+    groups = {}
+    for i, label in enumerate(clusters):
+        groups.setdefault(int(label), []).append(i)
+    return sorted(sorted(group) for group in groups.values())
+
+
+def _random_distance(n, seed):
+    rng = np.random.default_rng(seed)
+    points = rng.normal(size=(n, 3))
+    points[: n // 2] += 3.0   # 兩團明顯分開的點
+    distance = np.sqrt(((points[:, None] - points[None]) ** 2).sum(axis=-1))
+    return distance / distance.max()
+
+
+@pytest.mark.parametrize('n,seed', [(2, 0), (5, 1), (12, 2), (32, 3)])
+@pytest.mark.parametrize('cut', [-1.0, 0.2, 0.4, 2.0])
+def test_average_linkage_matches_brute_force(n, seed, cut):
+    distance = _random_distance(n, seed)
+    order, clusters = average_linkage(distance, cut)
+    expected_order, expected_groups = _brute_force_upgma(distance.tolist(), cut)
+
+    assert order.tolist() == expected_order
+    assert _partition(clusters) == sorted(sorted(group) for group in expected_groups)
+    # 群編號依葉序由 0 起算
+    assert list(dict.fromkeys(clusters[order].tolist())) == list(range(clusters.max() + 1))
+
+
+def test_average_linkage_cut_extremes():
+    distance = _random_distance(10, 4)
+    _, clusters = average_linkage(distance, 2.0)
+    assert (clusters == 0).all()
+    _, clusters = average_linkage(distance, -1.0)
+    assert sorted(clusters.tolist()) == list(range(10))
+
+    order, clusters = average_linkage(np.zeros((1, 1)), 0.5)
+    assert order.tolist() == [0] and clusters.tolist() == [0]
+    order, clusters = average_linkage(np.zeros((0, 0)), 0.5)
+    assert len(order) == 0 and len(clusters) == 0
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""gpu_csv_reader 與分塊讀取的格式相容性測試"""
+
+import numpy as np
+import pytest
+
+from gpu_csv_reader import read_gpu_csv, clear_schema_cache
+from chunked_reader import iter_gpu_samples
+from lazy_imports import module_available
+
+V2_HEADER = '時間戳,日期時間,GPU使用率(%),VRAM使用率(%)\n'
+
+# 安裝 pyarrow 時它是預設引擎，兩種引擎都要得到相同的結果
+ENGINES = ['c', pytest.param('pyarrow', marks=pytest.mark.skipif(
+    not module_available('pyarrow'), reason='未安裝 pyarrow'))]
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding='utf-8')
+    clear_schema_cache()
+    return str(path)
+
+
+def _assert_dtypes(df):
+    assert df['timestamp'].dtype == np.int64
+    for name in ('usage', 'vram'):
+        if name in df:
+            assert df[name].dtype == np.float64, name
+
+
+@pytest.mark.parametrize('engine', ENGINES + [None])
+def test_v2_rows(tmp_path, engine):
+    path = _write(tmp_path / 'gpu0.csv',
+                  V2_HEADER + '1735660800,2025-01-01 00:00:00,10.5,20\n'
+                              '1735660860,2025-01-01 00:01:00,N/A,30\n')
+    df = read_gpu_csv(path, engine=engine)
+    assert list(df.columns) == ['timestamp', 'datetime', 'usage', 'vram']
+    assert df['timestamp'].tolist() == [1735660800, 1735660860]
+    assert df['usage'].iloc[0] == 10.5 and np.isnan(df['usage'].iloc[1])
+    _assert_dtypes(df)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_non_numeric_fallback_keeps_column_dtypes(tmp_path, engine):
+    # 使用率全是整數、VRAM 有 N/A、最後一列被截斷：寬鬆模式也要回傳固定型別
+    path = _write(tmp_path / 'gpu0.csv',
+                  V2_HEADER + '1735660800,2025-01-01 00:00:00,10,N/A\n'
+                              '1735660860,2025-01-01 00:01:00,30,40\n'
+                              'oops,2025-01-01 00:02:00,50,60\n')
+    df = read_gpu_csv(path, columns=('vram', 'usage'), engine=engine)
+    assert list(df.columns) == ['timestamp', 'datetime', 'usage', 'vram']
+    assert df['timestamp'].tolist() == [1735660800, 1735660860]
+    assert df['usage'].tolist() == [10.0, 30.0]
+    assert np.isnan(df['vram'].iloc[0]) and df['vram'].iloc[1] == 40.0
+    _assert_dtypes(df)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_v1_headerless(tmp_path, engine):
+    path = _write(tmp_path / 'gpu0.csv', '1735660800,2025-01-01 00:00:00,42\n')
+    df = read_gpu_csv(path, engine=engine)
+    assert list(df.columns) == ['timestamp', 'datetime', 'usage']
+    assert df['usage'].tolist() == [42.0]
+    _assert_dtypes(df)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_header_only_file_is_empty_typed_frame(tmp_path, engine):
+    path = _write(tmp_path / 'gpu0.csv', V2_HEADER)
+    df = read_gpu_csv(path, columns=('vram', 'usage'), engine=engine)
+    assert df.empty
+    assert list(df.columns) == ['timestamp', 'datetime', 'usage', 'vram']
+    assert df['timestamp'].dtype == np.int64
+    assert df['usage'].dtype == np.float64 and df['vram'].dtype == np.float64
+
+
+def test_iter_gpu_samples_skips_header_only_day(tmp_path):
+    node_dir = tmp_path / 'colab-gpu1'
+    _write(node_dir / '2025-01-01' / 'gpu0_2025-01-01.csv',
+           V2_HEADER + '1735660800,2025-01-01 00:00:00,50,25\n')
+    _write(node_dir / '2025-01-02' / 'gpu0_2025-01-02.csv', V2_HEADER)
+
+    chunks = list(iter_gpu_samples(str(tmp_path), 'colab-gpu1', 0, '2025-01-01', '2025-01-02'))
+    timestamps = np.concatenate([c.timestamp for c in chunks])
+    usage = np.concatenate([c.usage for c in chunks])
+    assert timestamps.tolist() == [1735660800]
+    assert usage.tolist() == [50.0]
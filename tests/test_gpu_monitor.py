@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""gpu_monitor 串接命令的失敗處理與命令列載入測試"""
+
+import subprocess
+import sys
+
+import gpu_monitor
+
+
+def _boom(session):
+    raise ValueError('bad data')
+
+
+def _steps(calls):
+    def ok(session):
+        calls.append('ok')
+        return 0
+    return [('boom', _boom), ('ok', ok)]
+
+
+def test_exception_stops_chain_with_exit_code_1(monkeypatch, capsys):
+    calls = []
+    monkeypatch.setattr(gpu_monitor, 'plan_commands', lambda parser, segments: _steps(calls))
+    assert gpu_monitor.main(['nodes', '+', 'nodes']) == 1
+    out = capsys.readouterr().out
+    assert calls == []
+    assert 'ValueError: bad data' in out
+    assert '✗' in out and '略過 1 個命令' in out
+
+
+def test_exception_with_keep_going_runs_remaining_steps(monkeypatch, capsys):
+    calls = []
+    monkeypatch.setattr(gpu_monitor, 'plan_commands', lambda parser, segments: _steps(calls))
+    assert gpu_monitor.main(['--keep-going', 'nodes', '+', 'nodes']) == 1
+    out = capsys.readouterr().out
+    assert calls == ['ok']
+    assert '✓' in out and '✗' in out
+
+
+def test_build_parser_does_not_load_analysis_modules():
+    # 測試行程已載入 NumPy，需在新的直譯器中檢查
+    script = ("import sys, gpu_monitor; gpu_monitor.build_parser(); "
+              "print(sorted(m for m in ('numpy', 'pandas', 'matplotlib', 'gpu_correlation', 'trend_stats') "
+              "if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', script], cwd=gpu_monitor.SCRIPT_DIR,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
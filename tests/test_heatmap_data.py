@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""熱力圖矩陣建構與週 / 月彙整的測試"""
+
+import numpy as np
+
+from heatmap_data import build_heatmap_data, aggregate_columns
+
+NAN = np.nan
+
+# 2025-01-31 (週五) ~ 2025-02-03 (週一)：跨兩週、兩個月
+AVERAGES = {
+    # 新版格式，含 N/A、'nan' 使用者與全部平均列
+    ('colab-gpu1', '2025-01-31'): ['GPU編號,平均GPU使用率(%),平均VRAM使用率(%),使用者',
+                                   'GPU[0],40,20,alice', 'GPU[1],N/A,10,nan', '全部平均,40,15,'],
+    # 舊版格式：沒有 VRAM 與使用者欄位
+    ('colab-gpu1', '2025-02-01'): ['GPU卡號,平均使用率(%)', 'GPU[0],60', 'GPU[1],10'],
+    # 別名欄位且 GPU 不在第一欄；GPU[9] 不在 gpu_indices 中
+    ('colab-gpu1', '2025-02-02'): ['username,GPU,GPU使用率,VRAM使用率',
+                                   'bob,GPU[1],30,50', 'alice,GPU[0],20,40', 'dave,GPU[9],99,99'],
+    # 帶 BOM 的標頭；colab-gpu1 的 2025-02-03 沒有檔案
+    ('colab-gpu2', '2025-02-03'): ['﻿GPU編號,平均GPU使用率(%),平均VRAM使用率(%),使用者',
+                                   'GPU[0],80,70,carol'],
+}
+
+
+def _build(tmp_path):
+    for (node, date_str), lines in AVERAGES.items():
+        day_dir = tmp_path / node / date_str
+        day_dir.mkdir(parents=True)
+        (day_dir / f"average_{date_str}.csv").write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return build_heatmap_data(str(tmp_path), ['colab-gpu1', 'colab-gpu2'], '2025-01-31', '2025-02-03',
+                              gpu_indices=[0, 1], cache=False)
+
+
+def test_build_heatmap_data(tmp_path):
+    data = _build(tmp_path)
+    assert data.dates == ['2025-01-31', '2025-02-01', '2025-02-02', '2025-02-03']
+    assert data.freq == 'D'
+    # 列順序: (gpu1, 0), (gpu1, 1), (gpu2, 0), (gpu2, 1)
+    np.testing.assert_array_equal(data.usage, [[40, 60, 20, NAN],
+                                               [NAN, 10, 30, NAN],
+                                               [NAN, NAN, NAN, 80],
+                                               [NAN, NAN, NAN, NAN]])
+    np.testing.assert_array_equal(data.vram, [[20, NAN, 40, NAN],
+                                              [10, NAN, 50, NAN],
+                                              [NAN, NAN, NAN, 70],
+                                              [NAN, NAN, NAN, NAN]])
+    assert data.users.tolist() == [['alice', '', 'alice', ''],
+                                   ['', '', 'bob', ''],
+                                   ['', '', '', 'carol'],
+                                   ['', '', '', '']]
+
+
+def test_aggregate_columns(tmp_path):
+    data = _build(tmp_path)
+
+    weekly = aggregate_columns(data, 'W')
+    assert weekly.freq == 'W' and weekly.dates == ['2025-01-27', '2025-02-03']
+    np.testing.assert_array_equal(weekly.usage, [[40, NAN], [20, NAN], [NAN, 80], [NAN, NAN]])
+    np.testing.assert_array_equal(weekly.vram, [[30, NAN], [30, NAN], [NAN, 70], [NAN, NAN]])
+    assert weekly.users.tolist() == [['alice', ''], ['bob', ''], ['', 'carol'], ['', '']]
+
+    monthly = aggregate_columns(data, 'M')
+    assert monthly.freq == 'M' and monthly.dates == ['2025-01', '2025-02']
+    np.testing.assert_array_equal(monthly.usage, [[40, 40], [NAN, 20], [NAN, 80], [NAN, NAN]])
+    np.testing.assert_array_equal(monthly.vram, [[20, 40], [10, 50], [NAN, 70], [NAN, NAN]])
+    assert monthly.users.tolist() == [['alice', 'alice'], ['', 'bob'], ['', 'carol'], ['', '']]
+
+    # 四天不超過欄位上限，auto 維持逐日；已彙整的資料不再重複彙整
+    assert aggregate_columns(data) is data
+    assert aggregate_columns(weekly, 'M') is weekly
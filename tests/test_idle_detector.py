@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""idle_detector 串流掃描與一次掃描的一致性測試"""
+
+import numpy as np
+
+from gpu_accounting import day_bounds
+from idle_detector import IdleDetector, SPANS_HEADER
+from colab_gpu_stats import date_range
+
+NODES = ['colab-gpu1', 'colab-gpu2']
+DATES = date_range('2025-03-01', '2025-03-08')
+STEP = 600
+SAMPLES_PER_DAY = 24 * 3600 // STEP
+USERS = ['alice', 'bob', 'carol']
+
+
+def _day_usage(seed):
+    # 每張 GPU 以長短不一的閒置 / 忙碌段落組成，偶爾缺一段樣本
+    rng = np.random.default_rng(seed)
+    usage = np.empty((8, SAMPLES_PER_DAY))
+    for row in range(8):
+        k = 0
+        while k < SAMPLES_PER_DAY:
+            length = int(rng.integers(1, 40))
+            usage[row, k:k + length] = 0.5 if rng.random() < 0.6 else round(float(rng.uniform(5, 100)), 1)
+            k += length
+        if rng.random() < 0.2:
+            gap = int(rng.integers(0, SAMPLES_PER_DAY - 6))
+            usage[row, gap:gap + 4] = np.nan
+    return usage
+
+
+def _write_day(data_dir, node, day, date_str, limit=SAMPLES_PER_DAY):
+    """寫入一個節點日；limit 只寫入前幾筆樣本（模擬當天尚未收集完）"""
+    seed = NODES.index(node) * 100 + day
+    usage = _day_usage(seed)
+    day_start, _ = day_bounds(date_str)
+    day_dir = data_dir / node / date_str
+    day_dir.mkdir(parents=True, exist_ok=True)
+    for row in range(8):
+        lines = ['時間戳,日期時間,GPU使用率(%),VRAM使用率(%)']
+        for k in range(limit):
+            if not np.isnan(usage[row, k]):
+                lines.append(f"{int(day_start) + k * STEP},-,{usage[row, k]},{(k * 7 + row) % 50}")
+        (day_dir / f"gpu{row}_{date_str}.csv").write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    rng = np.random.default_rng(seed + 50)
+    if day % 2:
+        # 沒有 tasks 檔：平均檔中的使用者視為整天配置
+        lines = ['GPU編號,平均GPU使用率(%),平均VRAM使用率(%),使用者']
+        for row in range(8):
+            user = USERS[rng.integers(len(USERS))] if rng.random() < 0.7 else '未使用'
+            lines.append(f"GPU[{row}],1,1,{user}")
+        (day_dir / f"average_{date_str}.csv").write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        return
+    # 任務時段；空白的開始或結束時間表示延續自前一天或到隔天
+    lines = ['GPU編號,使用者,專案,開始時間,結束時間,GPU記憶體(MB)']
+    for row in range(8):
+        hours = sorted(rng.choice(np.arange(1, 24), size=2, replace=False).tolist())
+        user = USERS[rng.integers(len(USERS))]
+        start = '' if rng.random() < 0.5 else f"{date_str}T{hours[0]:02d}:00:00"
+        end = '' if rng.random() < 0.5 else f"{date_str}T{hours[1]:02d}:00:00"
+        lines.append(f"GPU[{row}],{user},p{row % 2},{start},{end},16384")
+    (day_dir / f"tasks_{date_str}.csv").write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+def _spans(detector):
+    return sorted(tuple(span[name] for name in SPANS_HEADER) + (span['ongoing'],)
+                  for span in detector.read_spans())
+
+
+def _detector(data_dir, output_dir):
+    return IdleDetector(str(data_dir), nodes=NODES, idle_threshold=1.0, min_idle_hours=1.0,
+                        output_dir=str(output_dir))
+
+
+def test_batched_updates_match_full_scan(tmp_path):
+    full_dir = tmp_path / 'full'
+    for node in NODES:
+        for day, date_str in enumerate(DATES):
+            _write_day(full_dir, node, day, date_str)
+    full = _detector(full_dir, tmp_path / 'idle_full')
+    full.update()
+    expected = _spans(full)
+    assert any(not span[-1] for span in expected) and any(span[-1] for span in expected)
+
+    # 四批：第三批結束時 2025-03-06 只收集了一半，第四批補齊後再接續
+    batch_dir = tmp_path / 'batch'
+    batches = [(0, 2, None), (2, 4, None), (4, 6, SAMPLES_PER_DAY // 2), (5, 8, None)]
+    for first, last, partial in batches:
+        for node in NODES:
+            for day in range(first, last):
+                limit = partial if partial is not None and day == last - 1 else SAMPLES_PER_DAY
+                _write_day(batch_dir, node, day, DATES[day], limit)
+        # 每批以新的實例讀取上一批的狀態檔
+        _detector(batch_dir, tmp_path / 'idle_batch').update()
+
+    assert _spans(_detector(batch_dir, tmp_path / 'idle_batch')) == expected
+
+
+def test_span_continues_across_day_boundary(tmp_path):
+    data_dir = tmp_path / 'data'
+    node = NODES[0]
+    detector = None
+    for date_str, task in (('2025-03-01', 'GPU[0],alice,vision,2025-03-01T20:00:00,,'),
+                           ('2025-03-02', 'GPU[0],alice,vision,,2025-03-02T06:00:00,')):
+        day_start, _ = day_bounds(date_str)
+        day_dir = data_dir / node / date_str
+        day_dir.mkdir(parents=True)
+        lines = ['時間戳,日期時間,GPU使用率(%),VRAM使用率(%)']
+        for k in range(SAMPLES_PER_DAY):
+            hour = k * STEP / 3600
+            # 03-01 20:00 之前與 03-02 06:00 之後忙碌，之間閒置
+            idle = hour >= 20 if date_str == '2025-03-01' else hour < 6
+            lines.append(f"{int(day_start) + k * STEP},-,{0 if idle else 60},10")
+        (day_dir / f"gpu0_{date_str}.csv").write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        (day_dir / f"tasks_{date_str}.csv").write_text(
+            'GPU編號,使用者,專案,開始時間,結束時間,GPU記憶體(MB)\n' + task + '\n', encoding='utf-8')
+
+        # 每天收集完後執行一次；03-01 結束時區段仍在進行中
+        detector = _detector(data_dir, tmp_path / 'idle')
+        detector.update()
+        if date_str == '2025-03-01':
+            (span,) = detector.read_spans()
+            assert span['ongoing'] and span['hours'] == 4.0
+
+    (span,) = detector.read_spans()
+    assert span['使用者'] == 'alice' and span['GPU編號'] == 'GPU[0]'
+    assert span['開始時間'] == '2025-03-01 20:00:00'
+    assert span['結束時間'] == '2025-03-02 06:00:00'
+    assert span['hours'] == 10.0 and not span['ongoing']
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""plot_cache 輸入分區推算與分區指紋測試"""
+
+import pytest
+
+from plot_cache import PlotCache, node_dirs
+from plot_scheduler import PlotJob
+
+
+def _make_data_dir(tmp_path):
+    data_dir = tmp_path / 'data'
+    for node in ('colab-gpu1', 'colab-gpu2'):
+        (data_dir / node / '2025-01-01').mkdir(parents=True)
+    # 衍生資料目錄不是節點
+    (data_dir / 'rollups' / 'daily' / 'colab-gpu1').mkdir(parents=True)
+    (data_dir / 'user_index').mkdir()
+    (data_dir / 'user_index' / 'meta.json').write_text('{}', encoding='utf-8')
+    (data_dir / 'trend_cache').mkdir()
+    return str(data_dir)
+
+
+def test_node_dirs_skips_derived_directories(tmp_path):
+    assert node_dirs(_make_data_dir(tmp_path)) == ['colab-gpu1', 'colab-gpu2']
+    assert node_dirs(str(tmp_path / 'missing')) == []
+
+
+def test_job_inputs_only_lists_node_partitions(tmp_path):
+    data_dir = _make_data_dir(tmp_path)
+    cache = PlotCache(str(tmp_path / 'plots'))
+
+    job = PlotJob('nodes_trend', 'quick_nodes_trend', ('2025-01-01', '2025-01-02'), {'data_dir': data_dir})
+    assert cache.job_inputs(job) == ['colab-gpu1/2025-01-01', 'colab-gpu1/2025-01-02',
+                                     'colab-gpu2/2025-01-01', 'colab-gpu2/2025-01-02']
+
+    job = PlotJob('node', 'quick_single_node_gpus', ('colab-gpu2', '2025-01-01', '2025-01-01'),
+                  {'data_dir': data_dir})
+    assert cache.job_inputs(job) == ['colab-gpu2/2025-01-01']
+
+
+@pytest.mark.parametrize('hash_mode', ['stat', 'content'])
+def test_partition_fingerprint_only_covers_input_files(tmp_path, hash_mode):
+    partition = tmp_path / 'data' / 'colab-gpu1' / '2025-01-01'
+    partition.mkdir(parents=True)
+    (partition / 'gpu0_2025-01-01.csv').write_text('1,-,10,20\n', encoding='utf-8')
+    (partition / 'average_2025-01-01.csv').write_text('GPU[0],10,20,alice\n', encoding='utf-8')
+
+    def fingerprint():
+        return PlotCache(str(tmp_path / 'plots'), hash_mode=hash_mode).partition_fingerprint(str(partition))
+
+    before = fingerprint()
+    # 同一分區中的衍生檔案與暫存檔不影響指紋
+    (partition / 'sketch_2025-01-01.json').write_text('{}', encoding='utf-8')
+    (partition / 'tasks_2025-01-01.csv').write_text('x\n', encoding='utf-8')
+    (partition / 'gpu1_2025-01-01.csv.tmp').write_text('x\n', encoding='utf-8')
+    assert fingerprint() == before
+
+    for name in ('gpu0_2025-01-01.csv', 'average_2025-01-01.csv'):
+        original = (partition / name).read_text(encoding='utf-8')
+        (partition / name).write_text(original + original, encoding='utf-8')
+        assert fingerprint() != before
+        (partition / name).write_text(original, encoding='utf-8')
+    (partition / 'gpu7_2025-01-01.csv').write_text('1,-,10,20\n', encoding='utf-8')
+    assert fingerprint() != before
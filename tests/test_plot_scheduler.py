@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""plot_scheduler 共用資料集傳遞測試"""
+
+import sys
+
+from plot_scheduler import PlotJob, run_plot_jobs
+
+PLOT_MODULE = '''
+def with_dataset(label, dataset=None):
+    return f'{label}:{dataset}'
+
+def without_dataset(label):
+    return label
+'''
+
+
+def test_shared_dataset_is_passed_only_to_functions_that_accept_it(tmp_path, monkeypatch):
+    (tmp_path / 'fake_plots.py').write_text(PLOT_MODULE, encoding='utf-8')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'fake_plots', raising=False)
+
+    jobs = [
+        PlotJob('a', 'with_dataset', ('a',), {}),
+        PlotJob('b', 'without_dataset', ('b',), {}),
+        PlotJob('c', 'with_dataset', ('c',), {'dataset': 'own'}),
+    ]
+    results = run_plot_jobs(jobs, workers=1, module_name='fake_plots', use_cache=False, dataset='shared')
+    assert [r.error for r in results] == [None, None, None]
+    assert [r.path for r in results] == ['a:shared', 'b', 'c:own']
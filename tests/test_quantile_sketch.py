@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""quantile_sketch 的 t-digest 與摘要新舊判斷測試"""
+
+import math
+import os
+
+import numpy as np
+import pytest
+
+from quantile_sketch import TDigest, sketch_is_current, sketch_path, write_day_sketch
+
+QUANTILES = np.array([0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99])
+
+
+def _samples():
+    rng = np.random.default_rng(7)
+    n = 50000
+    return {
+        'uniform': rng.uniform(0, 100, n),
+        'normal': np.clip(rng.normal(40, 15, n), 0, 100),
+        # 大部分時間閒置、偶爾接近滿載
+        'bursty': np.where(rng.random(n) < 0.8, 0.0, rng.uniform(80, 100, n)),
+        'integer': rng.integers(0, 101, n).astype(float),
+    }
+
+
+def test_compress_preserves_weight_and_respects_k_limit():
+    rng = np.random.default_rng(3)
+    means = rng.uniform(0, 100, 20000)
+    weights = rng.integers(1, 5, 20000).astype(float)
+    digest = TDigest(compression=100)
+    digest._compress(means, weights)
+
+    assert digest.count == pytest.approx(weights.sum())
+    assert digest.mean() == pytest.approx((means * weights).sum() / weights.sum())
+    assert (np.diff(digest.means) >= 0).all()
+    assert len(digest.means) <= 100
+
+    # 合併超過一個輸入的 centroid，其 k 尺度跨度不超過 1
+    total = digest.count
+    right = np.cumsum(digest.weights) / total
+    left = right - digest.weights / total
+    k_span = np.array([digest._k(min(r, 1.0)) - digest._k(l) for l, r in zip(left, right)])
+    assert (k_span[digest.weights > 4] <= 1 + 1e-9).all()
+
+
+@pytest.mark.parametrize('name', ['uniform', 'normal', 'bursty', 'integer'])
+def test_quantile_matches_numpy_percentile(name):
+    values = _samples()[name]
+    digest = TDigest.from_values(values)
+    expected = np.percentile(values, QUANTILES * 100)
+    np.testing.assert_allclose(digest.quantile(QUANTILES), expected, atol=1.0)
+    assert digest.quantile(0.0) == values.min()
+    assert digest.quantile(1.0) == values.max()
+    assert digest.count == len(values)
+
+
+def test_quantile_of_idle_gpu_is_exact_at_zero():
+    values = np.concatenate([np.zeros(900), np.linspace(80, 100, 100)])
+    digest = TDigest.from_values(values)
+    assert digest.quantile(0.5) == 0.0
+    assert digest.quantile(0.85) == 0.0
+    assert digest.percentiles((50, 99)) == {'p50': 0.0, 'p99': pytest.approx(np.percentile(values, 99), abs=0.5)}
+
+
+def test_merge_all_matches_single_digest():
+    for values in _samples().values():
+        parts = [TDigest.from_values(part) for part in np.array_split(values, 31)]
+        merged = TDigest.merge_all(parts + [TDigest()])
+        assert merged.count == len(values)
+        assert merged.min == values.min() and merged.max == values.max()
+        assert merged.mean() == pytest.approx(values.mean())
+        np.testing.assert_allclose(merged.quantile(QUANTILES), np.percentile(values, QUANTILES * 100), atol=1.5)
+
+
+def test_empty_and_round_trip():
+    empty = TDigest.merge_all([TDigest(), TDigest.from_values([np.nan])])
+    assert empty.count == 0
+    assert math.isnan(empty.quantile(0.5))
+    assert np.isnan(empty.quantile([0.5, 0.9])).all()
+
+    digest = TDigest.from_values(_samples()['integer'])
+    restored = TDigest.from_dict(digest.to_dict())
+    np.testing.assert_allclose(restored.quantile(QUANTILES), digest.quantile(QUANTILES), atol=0.01)
+    assert TDigest.from_dict({'n': 0}).count == 0
+
+
+def _write_day(data_dir, node, date_str):
+    day_dir = data_dir / node / date_str
+    day_dir.mkdir(parents=True)
+    (day_dir / f"gpu0_{date_str}.csv").write_text(
+        '時間戳,日期時間,GPU使用率(%),VRAM使用率(%)\n1,-,10,20\n2,-,30,40\n', encoding='utf-8')
+    (day_dir / f"average_{date_str}.csv").write_text(
+        'GPU編號,平均GPU使用率(%),平均VRAM使用率(%),使用者\nGPU[0],20,30,alice\n', encoding='utf-8')
+    return day_dir
+
+
+def test_sketch_is_current(tmp_path):
+    node, date_str = 'colab-gpu1', '2025-01-01'
+    day_dir = _write_day(tmp_path, node, date_str)
+    data_dir = str(tmp_path)
+    assert not sketch_is_current(data_dir, node, date_str)
+
+    sketch = write_day_sketch(data_dir, node, date_str)
+    assert sketch['gpus']['0']['user'] == 'alice'
+    built = os.path.getmtime(sketch_path(data_dir, node, date_str))
+    for name in os.listdir(day_dir):
+        if name.endswith('.csv'):
+            os.utime(day_dir / name, (built - 10, built - 10))
+    assert sketch_is_current(data_dir, node, date_str)
+
+    # 非樣本或平均檔的新檔案不影響判斷
+    (day_dir / 'note.txt').write_text('x', encoding='utf-8')
+    os.utime(day_dir / 'note.txt', (built + 10, built + 10))
+    assert sketch_is_current(data_dir, node, date_str)
+
+    for name in (f"gpu0_{date_str}.csv", f"average_{date_str}.csv"):
+        os.utime(day_dir / name, (built + 10, built + 10))
+        assert not sketch_is_current(data_dir, node, date_str)
+        os.utime(day_dir / name, (built - 10, built - 10))
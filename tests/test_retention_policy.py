@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""retention_policy 壓縮後處置原始分區的測試"""
+
+import os
+
+from retention_policy import main
+
+NODE = 'colab-gpu1'
+# 台灣時間 2025-01-02 00:00
+DAY_START = 1735747200
+
+
+def _write_partition(data_dir, date_str, gpu_rows):
+    partition = data_dir / NODE / date_str
+    partition.mkdir(parents=True)
+    for gpu_index, rows in gpu_rows.items():
+        (partition / f"gpu{gpu_index}_{date_str}.csv").write_text(
+            '時間戳,日期時間,GPU使用率(%),VRAM使用率(%)\n' + ''.join(rows), encoding='utf-8')
+    (partition / f"average_{date_str}.csv").write_text(
+        'GPU編號,平均GPU使用率(%),平均VRAM使用率(%),使用者\nGPU[0],20.00,30.00,alice\n', encoding='utf-8')
+    return partition
+
+
+def _run(tmp_path):
+    data_dir = tmp_path / 'data'
+    return main(['--data-dir', str(data_dir), '--archive-dir', str(tmp_path / 'archive'),
+                 '--policy', 'raw=30d', '--today', '2025-03-01', '--mode', 'drop'])
+
+
+def test_partition_without_parseable_gpu_files_is_kept(tmp_path):
+    data_dir = tmp_path / 'data'
+    good = _write_partition(data_dir, '2025-01-02', {0: [f"{DAY_START + 60},-,10,20\n",
+                                                         f"{DAY_START + 120},-,30,40\n"]})
+    # 只有標頭或無法解析的樣本檔：不會產生彙總，刪除會遺失平均檔中的使用者
+    empty = _write_partition(data_dir, '2025-01-03', {0: []})
+    partial = _write_partition(data_dir, '2025-01-04', {0: [f"{DAY_START + 2 * 86400},-,10,20\n"],
+                                                        1: ['broken,-,x\n']})
+    no_gpu = _write_partition(data_dir, '2025-01-05', {})
+
+    assert _run(tmp_path) == 1
+    assert not good.exists()
+    for partition in (empty, partial, no_gpu):
+        assert os.path.exists(partition / f"average_{partition.name}.csv")
+
+    daily = (data_dir / 'rollups' / 'daily' / NODE / 'daily_2025.csv').read_text(encoding='utf-8')
+    assert '2025-01-02,GPU[0],20.00' in daily and 'alice' in daily
+    # 保留的分區不寫入部分彙總
+    assert '2025-01-04' not in daily
+    assert not (data_dir / 'rollups' / 'retention_state.json').exists()
+
+
+def test_clean_run_succeeds(tmp_path):
+    _write_partition(tmp_path / 'data', '2025-01-02', {0: [f"{DAY_START + 60},-,10,20\n"]})
+    assert _run(tmp_path) == 0
+    assert not (tmp_path / 'data' / NODE / '2025-01-02').exists()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""trend_stats 的 ewma / rolling_mean 與 pandas 對照測試"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trend_stats import ewma, period_delta, rolling_mean
+
+
+def _series(length=3000, nan_ratio=0.2, seed=11):
+    rng = np.random.default_rng(seed)
+    values = rng.uniform(0, 100, (3, length))
+    values[rng.random(values.shape) < nan_ratio] = np.nan
+    values[1, :40] = np.nan      # 開頭沒有資料
+    values[2, 500:900] = np.nan  # 長時間缺資料
+    return values
+
+
+def _pandas_rows(values, apply):
+    return np.vstack([apply(pd.Series(row)).to_numpy() for row in values])
+
+
+@pytest.mark.parametrize('window,min_periods', [(1, 1), (7, 1), (7, 4), (30, 10), (5000, 1)])
+def test_rolling_mean_matches_pandas(window, min_periods):
+    values = _series()
+    expected = _pandas_rows(values, lambda s: s.rolling(window, min_periods=min_periods).mean())
+    np.testing.assert_allclose(rolling_mean(values, window, min_periods), expected, rtol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize('span', [1.5, 7, 30, 365])
+def test_ewma_matches_pandas(span):
+    # 長度超過 ewma() 的分段長度，涵蓋段與段之間的傳遞
+    values = _series()
+    expected = _pandas_rows(values, lambda s: s.ewm(span=span, adjust=True, ignore_na=False).mean())
+    np.testing.assert_allclose(ewma(values, span), expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize('alpha', [0.01, 0.5, 1.0])
+def test_ewma_alpha_matches_pandas(alpha):
+    values = _series(length=400)
+    expected = _pandas_rows(values, lambda s: s.ewm(alpha=alpha, adjust=True, ignore_na=False).mean())
+    np.testing.assert_allclose(ewma(values, alpha=alpha), expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_edge_cases():
+    assert ewma(np.empty((2, 0))).shape == (2, 0)
+    assert np.isnan(ewma(np.full(5, np.nan))).all()
+    assert np.isnan(rolling_mean(np.full(5, np.nan), 3)).all()
+
+    values = _series(length=60)
+    current = _pandas_rows(values, lambda s: s.rolling(7, min_periods=1).mean())
+    expected = current - np.hstack([np.full((3, 7), np.nan), current[:, :-7]])
+    np.testing.assert_allclose(period_delta(values, 7), expected, rtol=1e-9, equal_nan=True)
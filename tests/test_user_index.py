@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""使用者反向索引測試"""
+
+import os
+import json
+
+from get_user_gpu_usage import UserGPUUsageQuery
+from user_index import UserIndex, INDEX_VERSION
+
+HEADER = 'GPU編號,平均GPU使用率(%),平均VRAM使用率(%),使用者\n'
+
+
+def _write_average(data_dir, node, date_str, rows):
+    path = data_dir / node / date_str / f'average_{date_str}.csv'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    body = ''.join(f'{gpu},{usage},{vram},{user}\n' for gpu, usage, vram, user in rows)
+    path.write_text(HEADER + body + '全部平均,10.00,10.00,\n', encoding='utf-8')
+    return path
+
+
+def _make_index(tmp_path):
+    _write_average(tmp_path, 'colab-gpu1', '2025-01-01', [(0, '50.00', '20.00', 'alice'), (1, '0.00', '0.00', '未使用')])
+    _write_average(tmp_path, 'colab-gpu1', '2025-01-02', [(0, '30.00', '10.00', 'bob')])
+    _write_average(tmp_path, 'colab-gpu2', '2025-01-01', [(3, '70.00', '40.00', 'alice'), (4, '5.00', '1.00', 'bob')])
+    index = UserIndex(tmp_path)
+    assert index.rebuild() == (3, 2)
+    return index
+
+
+def test_meta_keeps_signatures_and_users_only(tmp_path):
+    _make_index(tmp_path)
+    with open(tmp_path / 'user_index' / 'meta.json', encoding='utf-8') as f:
+        meta = json.load(f)
+    assert meta['version'] == INDEX_VERSION
+    entry = meta['partitions']['colab-gpu2/2025-01-01']
+    assert set(entry) == {'mtime_ns', 'size', 'has_user_column', 'users'}
+    assert entry['users'] == ['alice', 'bob']
+
+
+def test_query_and_partition_rows(tmp_path):
+    index = _make_index(tmp_path)
+    nodes, dates = ['colab-gpu1', 'colab-gpu2'], ['2025-01-01', '2025-01-02', '2025-01-03']
+
+    entries, fresh, stale = index.query('alice', nodes, dates)
+    assert entries == [['2025-01-01', 'colab-gpu1', '0', '50.00', '20.00'],
+                       ['2025-01-01', 'colab-gpu2', '3', '70.00', '40.00']]
+    assert stale == [] and sorted(fresh) == ['colab-gpu1/2025-01-01', 'colab-gpu1/2025-01-02',
+                                             'colab-gpu2/2025-01-01']
+
+    fresh, stale = index.classify_partitions(nodes, dates)
+    rows = index.partition_rows(fresh)
+    assert rows['colab-gpu2/2025-01-01'] == [['3', '70.00', '40.00', 'alice'], ['4', '5.00', '1.00', 'bob']]
+    assert rows['colab-gpu1/2025-01-02'] == [['0', '30.00', '10.00', 'bob']]
+    rows = index.partition_rows(fresh, ['bob'])
+    assert rows['colab-gpu2/2025-01-01'] == [['4', '5.00', '1.00', 'bob']]
+    assert rows['colab-gpu1/2025-01-01'] == []
+
+
+def test_rewritten_partition_of_user_is_stale(tmp_path):
+    index = _make_index(tmp_path)
+    path = _write_average(tmp_path, 'colab-gpu2', '2025-01-01', [(3, '99.00', '40.00', 'alice')])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    entries, fresh, stale = UserIndex(tmp_path).query('alice', ['colab-gpu1', 'colab-gpu2'], ['2025-01-01'])
+    assert [e[1] for e in entries] == ['colab-gpu1']
+    assert stale == [('colab-gpu2', '2025-01-01')]
+    assert index.status()['stale'] == 1
+
+
+def test_unindexed_partition_is_stale_and_update_moves_rows(tmp_path):
+    index = _make_index(tmp_path)
+    _write_average(tmp_path, 'colab-gpu1', '2025-01-03', [(2, '40.00', '5.00', 'alice')])
+    assert index.query('alice', ['colab-gpu1'], ['2025-01-03'])[2] == [('colab-gpu1', '2025-01-03')]
+
+    # 重新產生的分區不再有 bob：bob 的使用者檔案中的舊紀錄需一併移除
+    _write_average(tmp_path, 'colab-gpu1', '2025-01-02', [(0, '30.00', '10.00', 'carol')])
+    index = UserIndex(tmp_path)
+    index.update_partitions([('colab-gpu1', '2025-01-02'), ('colab-gpu1', '2025-01-03')])
+    assert [e[1] for e in index.read_user_entries('bob')] == ['colab-gpu2']
+    assert index.read_user_entries('carol') == [['2025-01-02', 'colab-gpu1', '0', '30.00', '10.00']]
+    entries, _, stale = UserIndex(tmp_path).query('alice', ['colab-gpu1'], ['2025-01-03'])
+    assert stale == [] and entries == [['2025-01-03', 'colab-gpu1', '2', '40.00', '5.00']]
+
+
+def _query_both_ways(tmp_path, username, start_date, end_date):
+    results = []
+    for use_index in (True, False):
+        query = UserGPUUsageQuery(tmp_path, plots_dir=tmp_path / 'plots', use_index=use_index)
+        results.append([(r['date'], r['node'], r['gpu'], r['gpu_usage'], r['vram_usage'])
+                        for r in query.query_user_gpu_usage(username, start_date, end_date)])
+    return results
+
+
+def test_index_accepts_short_column_aliases(tmp_path):
+    path = tmp_path / 'colab-gpu1' / '2025-01-01' / 'average_2025-01-01.csv'
+    path.parent.mkdir(parents=True)
+    path.write_text('GPU編號,GPU使用率,VRAM使用率,使用者\nGPU[0],55.5,40.0,alice\nGPU[1],0,0,未使用\n',
+                    encoding='utf-8')
+    UserIndex(tmp_path).rebuild()
+    assert UserIndex(tmp_path).read_user_entries('alice') == [['2025-01-01', 'colab-gpu1', 'GPU[0]', '55.5', '40.0']]
+
+    indexed, scanned = _query_both_ways(tmp_path, 'alice', '2025-01-01', '2025-01-01')
+    assert indexed == scanned == [('2025-01-01', 'colab-gpu1', 'GPU[0]', 55.5, 40.0)]
+
+
+def test_partition_rewritten_outside_the_index_is_stale(tmp_path):
+    _make_index(tmp_path)
+    # 不經過索引改寫平均檔（例如 daily_gpu_log_with_users.sh），carol 只出現在新的平均檔中
+    path = _write_average(tmp_path, 'colab-gpu1', '2025-01-02',
+                          [(0, '30.00', '10.00', 'bob'), (1, '80.00', '60.00', 'carol')])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    entries, _, stale = UserIndex(tmp_path).query('carol', ['colab-gpu1', 'colab-gpu2'], ['2025-01-02'])
+    assert entries == [] and stale == [('colab-gpu1', '2025-01-02')]
+    indexed, scanned = _query_both_ways(tmp_path, 'carol', '2025-01-01', '2025-01-02')
+    assert indexed == scanned == [('2025-01-02', 'colab-gpu1', '1', 80.0, 60.0)]
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""使用者批次摘要的欄式分組累加測試"""
+
+import numpy as np
+
+from get_user_gpu_usage import UserGPUUsageQuery
+
+NODES = ['colab-gpu1', 'colab-gpu2', 'colab-gpu3']
+DATES = [f"2025-01-{day:02d}" for day in range(20, 32)] + [f"2025-02-{day:02d}" for day in range(1, 11)]
+
+
+def _write_tree(data_dir, seed=0):
+    # 每個分區 8 張 GPU，約一半未使用；回傳寫入的逐筆紀錄
+    rng = np.random.default_rng(seed)
+    records = []
+    for node in NODES:
+        for date_str in DATES:
+            day_dir = data_dir / node / date_str
+            day_dir.mkdir(parents=True)
+            lines = ['GPU編號,平均GPU使用率(%),平均VRAM使用率(%),使用者']
+            for gpu in range(8):
+                user = f"user{rng.integers(5)}" if rng.random() < 0.5 else '未使用'
+                usage = float(rng.choice([0.0, 0.5, round(rng.uniform(0, 100), 2)]))
+                vram = round(float(rng.uniform(0, 100)), 2)
+                lines.append(f"GPU[{gpu}],{usage},{vram},{user}")
+                if user != '未使用':
+                    records.append({'date': date_str, 'node': node, 'gpu': f"GPU[{gpu}]",
+                                    'gpu_usage': usage, 'vram_usage': vram, 'user': user})
+            lines.append('全部平均,0,0,')
+            (day_dir / f"average_{date_str}.csv").write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return records
+
+
+def _reference(records):
+    summary = {}
+    for user in {r['user'] for r in records}:
+        rows = [r for r in records if r['user'] == user]
+        usage = [r['gpu_usage'] for r in rows]
+        vram = [r['vram_usage'] for r in rows]
+        summary[user] = {
+            '記錄數': len(rows),
+            '有活動記錄數': sum(u > 1 for u in usage),
+            '使用天數': len({r['date'] for r in rows}),
+            '使用節點數': len({r['node'] for r in rows}),
+            '使用GPU數': len({(r['node'], r['gpu']) for r in rows}),
+            '平均GPU使用率(%)': sum(usage) / len(rows),
+            '最大VRAM使用率(%)': max(vram),
+            'GPU等效天數': sum(usage) / 100.0,
+        }
+    return summary
+
+
+def test_chunked_summary_matches_per_record_reference(tmp_path, monkeypatch):
+    records = _write_tree(tmp_path / 'data')
+    query = UserGPUUsageQuery(str(tmp_path / 'data'), str(tmp_path / 'plots'), use_index=False)
+    # 每個區塊只有幾天，並跨越月份
+    monkeypatch.setattr(UserGPUUsageQuery, 'ROW_BYTES', 10 ** 6)
+    monkeypatch.setenv('GPU_MEMORY_BUDGET_MB', '100')
+
+    summary, columns_by_user = query.summarize_users_range(None, DATES[0], DATES[-1], keep_columns=True)
+    expected = _reference(records)
+    assert sorted(item['使用者'] for item in summary) == sorted(expected)
+    for item in summary:
+        for key, value in expected[item['使用者']].items():
+            assert np.isclose(item[key], value), (item['使用者'], key)
+
+    # 保留的欄式紀錄依節點、日期排序，與逐筆紀錄相同
+    node_order = {node: i for i, node in enumerate(NODES)}
+    for user, columns in columns_by_user.items():
+        rows = sorted((r for r in records if r['user'] == user), key=lambda r: (node_order[r['node']], r['date']))
+        assert columns['date'].tolist() == [r['date'] for r in rows]
+        assert columns['node'].tolist() == [r['node'] for r in rows]
+        assert columns['gpu'].tolist() == [r['gpu'] for r in rows]
+        np.testing.assert_allclose(columns['usage'], [r['gpu_usage'] for r in rows])
+        np.testing.assert_allclose(columns['vram'], [r['vram_usage'] for r in rows])
+        assert set(columns['user'].tolist()) == {user}
+
+    summary_only, kept = query.summarize_users_range(['user1', 'user3'], DATES[0], DATES[-1])
+    assert kept == {}
+    assert [item['使用者'] for item in summary_only] == [item['使用者'] for item in summary
+                                                        if item['使用者'] in ('user1', 'user3')]
+
+
+def test_fold_by_chunks_equals_single_fold(tmp_path):
+    _write_tree(tmp_path / 'data', seed=1)
+    query = UserGPUUsageQuery(str(tmp_path / 'data'), str(tmp_path / 'plots'), use_index=False)
+    columns = query.collect_users_columns(None, DATES[0], DATES[-1])
+
+    chunked = {}
+    for part in np.array_split(np.arange(len(columns['user'])), 4):
+        query._fold_user_columns(chunked, {key: values[part] for key, values in columns.items()})
+    query._fold_user_columns(chunked, {key: values[:0] for key, values in columns.items()})
+    single = {}
+    query._fold_user_columns(single, columns)
+    chunked, single = query._summaries_from_totals(chunked), query._summaries_from_totals(single)
+    assert [item['使用者'] for item in chunked] == [item['使用者'] for item in single]
+    for a, b in zip(chunked, single):
+        assert all(np.isclose(a[key], b[key]) for key in a if key != '使用者')
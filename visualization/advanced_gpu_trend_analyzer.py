@@ -11,10 +11,6 @@ GPU 使用率趨勢視覺化工具
 5. 詳細時間序列分析
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import seaborn as sns
 import numpy as np
 from datetime import datetime, timedelta
 import os
@@ -25,10 +21,22 @@ import warnings
 warnings.filterwarnings('ignore')
 
 # 導入字體配置模組
-from font_config import setup_chinese_font
+from font_config import pyplot as plt
+from lazy_imports import lazy_import
+from render_profiles import save_figure, add_profile_argument, set_profile
+from downsample import plot_timeline
+from gpu_csv_reader import read_gpu_csv
+from gpu_dataset import ensure_dataset, heatmap_columns
+from heatmap_data import (row_keys, latest_users, layer_frame,
+                          heatmap_layout, column_axis_label, title_note, tile_ranges, add_heatmap_arguments,
+                          DEFAULT_TILE_DAYS)
+from trend_stats import (daily_cube, nan_mean, summarize_series, build_hourly_cube, fleet_profile, peak_cells,
+                         DEFAULT_WINDOW, WEEKDAY_NAMES)
 
-# 設定中文字體
-setup_chinese_font()
+# pandas 在第一次讀取資料時、matplotlib 與 seaborn 在第一次繪圖時才載入，中文字體隨 pyplot 一併套用
+pd = lazy_import('pandas')
+mdates = lazy_import('matplotlib.dates')
+sns = lazy_import('seaborn')
 
 class GPUUsageTrendAnalyzer:
     def __init__(self, data_dir="../data", plots_dir="../plots"):
@@ -94,13 +102,8 @@ class GPUUsageTrendAnalyzer:
             return None
             
         try:
-            # 讀取 CSV 數據，根據實際格式調整
-            df = pd.read_csv(file_path, header=None, 
-                           names=['timestamp', 'datetime', 'usage'])
-            
-            # 處理日期時間
-            df['datetime'] = pd.to_datetime(df['datetime'], format='%Y-%m-%d %H:%M:%S')
-            df['usage'] = pd.to_numeric(df['usage'], errors='coerce')
+            # 讀取 CSV 數據 (自動判斷新舊格式，datetime 由時間戳計算)
+            df = read_gpu_csv(file_path)
             df['date'] = date
             df['node'] = node
             df['gpu_id'] = gpu_id
@@ -224,7 +227,7 @@ class GPUUsageTrendAnalyzer:
         
         if save_plot:
             save_path = os.path.join(self.plots_dir, f'nodes_comparison_{start_date}_to_{end_date}.png')
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            save_path = save_figure(save_path)
             print(f"節點對比趨勢圖已保存至: {save_path}")
         
         plt.show()
@@ -260,12 +263,12 @@ class GPUUsageTrendAnalyzer:
                         gpu_dates.append(date)
             
             if gpu_data:
-                ax.plot(gpu_dates, gpu_data, 
-                       label=f'GPU {gpu_id}', 
-                       marker='o', 
-                       linewidth=2, 
-                       markersize=4,
-                       color=self.colors[i])
+                plot_timeline(ax, gpu_dates, gpu_data,
+                              label=f'GPU {gpu_id}',
+                              marker='o',
+                              linewidth=2,
+                              markersize=4,
+                              color=self.colors[i])
         
         # 設定圖表
         ax.set_title(f'{node} 所有 GPU 使用率趨勢對比\n期間: {start_date} 至 {end_date}', 
@@ -286,7 +289,7 @@ class GPUUsageTrendAnalyzer:
         
         if save_plot:
             save_path = os.path.join(self.plots_dir, f'{node}_all_gpus_{start_date}_to_{end_date}.png')
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            save_path = save_figure(save_path)
             print(f"{node} 所有 GPU 趨勢圖已保存至: {save_path}")
         
         plt.show()
@@ -348,13 +351,14 @@ class GPUUsageTrendAnalyzer:
         
         if save_plot:
             save_path = os.path.join(self.plots_dir, f'gpu{gpu_id}_across_nodes_{start_date}_to_{end_date}.png')
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            save_path = save_figure(save_path)
             print(f"GPU {gpu_id} 跨節點趨勢圖已保存至: {save_path}")
         
         plt.show()
         plt.close()
     
-    def plot_heatmap(self, start_date, end_date, save_plot=True, show_users=True):
+    def plot_heatmap(self, start_date, end_date, save_plot=True, show_users=True, freq='auto', annotate=None,
+                     dataset=None):
         """
         繪製 GPU 使用率熱力圖
         
@@ -363,74 +367,47 @@ class GPUUsageTrendAnalyzer:
             end_date (str): 結束日期
             save_plot (bool): 是否保存圖表
             show_users (bool): 是否顯示使用者資訊
+            freq (str): 欄位彙整 'auto'、'D'、'W' 或 'M'（auto: 長區間自動改為每週/每月平均）
+            annotate (bool): 是否標註數值，None 表示格子數不多時才標註
+            dataset (GPUDataset): 已載入的資料集，None 表示自行載入
         """
-        # 收集所有數據
-        all_data = []
-        user_info = {}  # 儲存使用者資訊
-        dates = pd.date_range(start=start_date, end=end_date, freq='D')
-        
-        for node in self.nodes:
-            for date in dates:
-                date_str = date.strftime('%Y-%m-%d')
-                daily_avg = self.load_daily_average_data(node, date_str)
-                
-                if daily_avg is not None:
-                    for _, row in daily_avg.iterrows():
-                        gpu_key = f"{node}-GPU{row['gpu_id']}"
-                        
-                        all_data.append({
-                            'node': node,
-                            'gpu': f'GPU{row["gpu_id"]}',
-                            'gpu_key': gpu_key,
-                            'date': date_str,
-                            'usage': row['usage']
-                        })
-                        
-                        # 收集使用者資訊
-                        if show_users and 'user' in row and pd.notna(row['user']):
-                            user_val = str(row['user']).strip()
-                            if user_val and user_val.lower() != 'nan':
-                                user_info[gpu_key] = user_val
-        
-        if not all_data:
-            print("未找到數據進行熱力圖繪製")
-            return
+        # 每個分區只讀取一次；沒有共用資料集時逐月分塊讀取並直接彙整為熱力圖欄位
+        data = heatmap_columns(dataset, self.data_dir, start_date, end_date, self.nodes, freq=freq)
+        user_info = {}  # 儲存每個 GPU 期間內最後出現的使用者
         
-        df = pd.DataFrame(all_data)
-        
-        # 創建樞紐表：行為節點+GPU，列為日期
         if show_users:
             # 為每個 GPU 添加使用者資訊到標籤
-            df['gpu_label'] = df.apply(lambda x: 
-                f"{x['node']} {x['gpu']} ({user_info.get(x['gpu_key'], '未知')})" 
-                if x['gpu_key'] in user_info else f"{x['node']} {x['gpu']}", axis=1)
-            
-            pivot_table = df.pivot_table(
-                values='usage', 
-                index='gpu_label', 
-                columns='date', 
-                aggfunc='mean'
-            )
+            labels = []
+            for (node, gpu_id), user in zip(row_keys(data), latest_users(data)):
+                if user:
+                    user_info[f"{node}-GPU{gpu_id}"] = user
+                    labels.append(f"{node} GPU{gpu_id} ({user})")
+                else:
+                    labels.append(f"{node} GPU{gpu_id}")
+            pivot_table = layer_frame(data, 'usage', pd.Index(labels, name='gpu_label')).sort_index()
         else:
-            pivot_table = df.pivot_table(
-                values='usage', 
-                index=['node', 'gpu'], 
-                columns='date', 
-                aggfunc='mean'
-            )
+            index = pd.MultiIndex.from_tuples(
+                [(node, f'GPU{gpu_id}') for node, gpu_id in row_keys(data)], names=['node', 'gpu'])
+            pivot_table = layer_frame(data, 'usage', index)
         
-        # 繪製熱力圖
-        fig, ax = plt.subplots(figsize=(max(12, len(dates) * 0.8), max(10, len(pivot_table) * 0.4)))
+        if pivot_table.empty:
+            print("未找到數據進行熱力圖繪製")
+            return
+        
+        # 繪製熱力圖：尺寸有上限，格子過多時不標註數值
+        layout = heatmap_layout(len(pivot_table), len(pivot_table.columns), 0.8, 0.4, 12, 10, annotate)
+        fig, ax = plt.subplots(figsize=layout.figsize)
         
         sns.heatmap(pivot_table, 
-                   annot=True, 
+                   annot=layout.annotate, 
                    fmt='.2f', 
+                   annot_kws={'size': layout.fontsize},
                    cmap='YlOrRd', 
                    cbar_kws={'label': 'GPU 使用率 (%)'},
                    ax=ax)
         
         # 創建標題
-        title = f'GPU 使用率熱力圖\n期間: {start_date} 至 {end_date}'
+        title = f'GPU 使用率熱力圖{title_note(data)}\n期間: {start_date} 至 {end_date}'
         if show_users and user_info:
             # 統計使用者資訊
             user_counts = {}
@@ -443,7 +420,7 @@ class GPUUsageTrendAnalyzer:
                 title += f'\n使用者: {user_summary}'
         
         ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
-        ax.set_xlabel('日期', fontsize=12)
+        ax.set_xlabel(column_axis_label(data), fontsize=12)
         ax.set_ylabel('節點 & GPU' + (' (使用者)' if show_users else ''), fontsize=12)
         
         plt.xticks(rotation=45)
@@ -452,11 +429,32 @@ class GPUUsageTrendAnalyzer:
         if save_plot:
             suffix = '_with_users' if show_users else ''
             save_path = os.path.join(self.plots_dir, f'heatmap_{start_date}_to_{end_date}{suffix}.png')
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            save_path = save_figure(save_path)
             print(f"熱力圖已保存至: {save_path}")
         
         plt.show()
         plt.close()
+        return save_path if save_plot else None
+    
+    def plot_heatmap_tiles(self, start_date, end_date, tile_days=DEFAULT_TILE_DAYS, show_users=True):
+        """
+        將長日期範圍切成多張逐日熱力圖，每張最多 tile_days 天
+        
+        Args:
+            start_date (str): 開始日期
+            end_date (str): 結束日期
+            tile_days (int): 每張熱力圖的天數
+            show_users (bool): 是否顯示使用者資訊
+            
+        Returns:
+            list: 各分頁的圖片路徑
+        """
+        paths = []
+        for tile_start, tile_end in tile_ranges(start_date, end_date, tile_days):
+            path = self.plot_heatmap(tile_start, tile_end, show_users=show_users, freq='D')
+            if path:
+                paths.append(path)
+        return paths
     
     def plot_detailed_timeline(self, node, gpu_id, date, save_plot=True):
         """
@@ -476,9 +474,9 @@ class GPUUsageTrendAnalyzer:
         
         fig, ax = plt.subplots(figsize=(15, 8))
         
-        # 繪製時間序列
-        ax.plot(data['datetime'], data['usage'], 
-                linewidth=1.5, alpha=0.8, color=self.colors[0])
+        # 繪製時間序列（點數超過圖表像素寬度時降採樣，平均線仍以完整資料計算）
+        plot_timeline(ax, data['datetime'], data['usage'],
+                      linewidth=1.5, alpha=0.8, color=self.colors[0])
         
         # 添加平均線
         avg_usage = data['usage'].mean()
@@ -504,67 +502,89 @@ class GPUUsageTrendAnalyzer:
         
         if save_plot:
             save_path = os.path.join(self.plots_dir, f'{node}_gpu{gpu_id}_timeline_{date}.png')
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            save_path = save_figure(save_path)
             print(f"詳細時間序列圖已保存至: {save_path}")
         
         plt.show()
         plt.close()
     
-    def generate_summary_report(self, start_date, end_date):
+    def generate_summary_report(self, start_date, end_date, dataset=None):
         """
         生成 GPU 使用率摘要統計報告
         
+        統計量直接在 [節點, GPU, 日期] 陣列上計算，另外列出移動平均、週變化、
+        趨勢斜率與星期 × 小時的尖峰時段（每小時資料依分區快取，見 trend_stats.py）
+        
         Args:
             start_date (str): 開始日期
             end_date (str): 結束日期
+            dataset (GPUDataset): 已載入的資料集，None 表示自行載入
         """
         print(f"\n=== GPU 使用率摘要報告 ===")
         print(f"分析期間: {start_date} 至 {end_date}")
         print("=" * 50)
         
-        dates = pd.date_range(start=start_date, end=end_date, freq='D')
-        all_data = []
+        dataset = ensure_dataset(dataset, self.data_dir, start_date, end_date, self.nodes)
+        cube = daily_cube(dataset.data)  # [節點, GPU, 日期]
+        present = ~np.isnan(cube)
         
-        # 收集所有數據
-        for node in self.nodes:
-            for date in dates:
-                date_str = date.strftime('%Y-%m-%d')
-                daily_avg = self.load_daily_average_data(node, date_str)
-                
-                if daily_avg is not None:
-                    all_data.append(daily_avg)
-        
-        if not all_data:
+        if not present.any():
             print("未找到任何數據")
             return
         
-        combined_data = pd.concat(all_data, ignore_index=True)
+        def describe(values, axis):
+            """忽略缺值的平均、最高與最低（全為缺值的項目為 NaN）"""
+            count = present.sum(axis=axis)
+            filled = np.where(present, values, 0.0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.where(count > 0, filled.sum(axis=axis) / count, np.nan)
+            high = np.where(present, values, -np.inf).max(axis=axis)
+            low = np.where(present, values, np.inf).min(axis=axis)
+            return mean, high, low, count
         
         # 各節點統計
         print("\n各節點平均 GPU 使用率:")
-        for node in self.nodes:
-            node_data = combined_data[combined_data['node'] == node]['usage']
-            if len(node_data) > 0:
-                print(f"  {node}: {node_data.mean():.2f}% (最高: {node_data.max():.2f}%, 最低: {node_data.min():.2f}%)")
+        for node, mean, high, low, count in zip(self.nodes, *describe(cube, (1, 2))):
+            if count > 0:
+                print(f"  {node}: {mean:.2f}% (最高: {high:.2f}%, 最低: {low:.2f}%)")
         
         # 各 GPU 統計
         print("\n各 GPU 平均使用率:")
-        for gpu_id in self.gpu_ids:
-            gpu_data = combined_data[combined_data['gpu_id'] == gpu_id]['usage']
-            if len(gpu_data) > 0:
-                print(f"  GPU {gpu_id}: {gpu_data.mean():.2f}% (最高: {gpu_data.max():.2f}%, 最低: {gpu_data.min():.2f}%)")
+        for gpu_id, mean, high, low, count in zip(dataset.gpu_indices, *describe(cube, (0, 2))):
+            if count > 0:
+                print(f"  GPU {gpu_id}: {mean:.2f}% (最高: {high:.2f}%, 最低: {low:.2f}%)")
         
         # 整體統計
-        overall_avg = combined_data['usage'].mean()
-        overall_max = combined_data['usage'].max()
-        overall_min = combined_data['usage'].min()
+        values = cube[present]
         print(f"\n整體統計:")
-        print(f"  平均使用率: {overall_avg:.2f}%")
-        print(f"  最高使用率: {overall_max:.2f}%")
-        print(f"  最低使用率: {overall_min:.2f}%")
+        print(f"  平均使用率: {values.mean():.2f}%")
+        print(f"  最高使用率: {values.max():.2f}%")
+        print(f"  最低使用率: {values.min():.2f}%")
+        
+        # 趨勢：各節點與全部節點的每日平均序列一次計算
+        node_series = nan_mean(cube, axis=1)
+        fleet_series = nan_mean(cube.reshape(-1, cube.shape[-1]), axis=0)
+        summary = summarize_series(np.vstack([node_series, fleet_series]))
+        print(f"\n趨勢統計 ({DEFAULT_WINDOW} 日移動平均 / EWMA / 週變化 / 每週斜率):")
+        for i, label in enumerate(list(self.nodes) + ['全部節點']):
+            if summary.days[i] == 0:
+                continue
+            delta = '--' if np.isnan(summary.delta[i]) else f"{summary.delta[i]:+.2f}"
+            slope = '--' if np.isnan(summary.slope_per_week[i]) else f"{summary.slope_per_week[i]:+.2f}"
+            print(f"  {label}: {summary.rolling[i]:.2f}% / {summary.ewma[i]:.2f}% / {delta} / {slope} %/週")
+        
+        hourly = build_hourly_cube(self.data_dir, self.nodes, start_date, end_date, dataset.gpu_indices)
+        profile, counts = fleet_profile(hourly)
+        if counts.sum() > 0:
+            peaks = ', '.join(f"{WEEKDAY_NAMES[w]} {h:02d}:00 ({v:.1f}%)" for w, h, v in peak_cells(profile))
+            quiet = ', '.join(f"{WEEKDAY_NAMES[w]} {h:02d}:00 ({v:.1f}%)"
+                              for w, h, v in peak_cells(profile, lowest=True))
+            print(f"\n時段輪廓:")
+            print(f"  尖峰時段: {peaks}")
+            print(f"  離峰時段: {quiet}")
         print("=" * 50)
 
-def main():
+def main(argv=None):
     """主函數：命令列介面"""
     parser = argparse.ArgumentParser(description='GPU 使用率趨勢視覺化工具')
     parser.add_argument('--data-dir', default='./data', help='資料目錄路徑')
@@ -577,7 +597,12 @@ def main():
     parser.add_argument('--gpu-id', type=int, help='指定 GPU ID (用於 specific-gpu 或 timeline 模式)')
     parser.add_argument('--date', help='指定日期 (用於 timeline 模式, YYYY-MM-DD)')
     
-    args = parser.parse_args()
+    add_profile_argument(parser)
+    add_heatmap_arguments(parser)
+    
+    args = parser.parse_args(argv)
+    if args.profile:
+        set_profile(args.profile)
     
     # 初始化分析器
     analyzer = GPUUsageTrendAnalyzer(args.data_dir, args.plots_dir)
@@ -603,7 +628,10 @@ def main():
     
     if args.mode == 'heatmap' or args.mode == 'all':
         print("\n繪製熱力圖...")
-        analyzer.plot_heatmap(args.start_date, args.end_date)
+        if args.tile_days:
+            analyzer.plot_heatmap_tiles(args.start_date, args.end_date, args.tile_days)
+        else:
+            analyzer.plot_heatmap(args.start_date, args.end_date, freq=args.heatmap_freq)
     
     if args.mode == 'timeline':
         node = args.node if args.node else 'colab-gpu1'
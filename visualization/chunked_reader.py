@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分塊讀取模組：以固定的記憶體上限處理多年日期範圍
+
+逐日讀取後 pd.concat 全部資料的作法，記憶體隨日期範圍與節點數線性成長。
+這裡把日期範圍切成以月為單位的區塊（單月估計超過記憶體上限時再細分），
+每次只讀取一個區塊，由彙整函數把區塊逐一折疊進固定大小的結果：
+
+- iter_gpu_samples(): 單一 GPU 的原始樣本，每個區塊為 NumPy 陣列
+- iter_heatmap_chunks(): 每日平均檔建構的 HeatmapData，每個區塊為該月的 [節點·GPU, 日期] 矩陣
+- fold_downsampled(): 每個區塊先依圖表點數降採樣，只保留足以繪製的點
+- fold_heatmap_data(): 逐區塊累加每週/每月的總和與筆數，不建構完整的逐日矩陣
+
+記憶體上限選擇順序: 呼叫參數 > 環境變數 GPU_MEMORY_BUDGET_MB > 256 MB
+
+使用方式:
+    for chunk in iter_gpu_samples('data', 'colab-gpu1', 0, '2023-01-01', '2025-12-31'):
+        ...
+    data = fold_heatmap_data('data', nodes, '2023-01-01', '2025-12-31', freq='M')
+"""
+
+import os
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from lazy_imports import module_available
+
+# 有 pandas 時以其 C 解析器讀取原始樣本，否則使用標準函式庫的欄式讀取
+HAS_PANDAS = module_available('pandas')
+
+DATE_FORMAT = '%Y-%m-%d'
+MEMORY_BUDGET_ENV = 'GPU_MEMORY_BUDGET_MB'
+DEFAULT_MEMORY_BUDGET_MB = 256
+
+# 解析後的資料與 CSV 文字大小的估計倍數（欄式陣列加上排序、遮罩等暫存陣列）
+PARSED_BYTES_PER_FILE_BYTE = 2
+# 每日平均檔每格估計的位元組（usage/vram 兩個 float64 與一個使用者字串參照）
+HEATMAP_BYTES_PER_CELL = 32
+
+# 單一 GPU 在 [start_date, end_date] 期間的樣本，依時間排序；timestamp 為 Unix 秒數
+SampleChunk = namedtuple('SampleChunk', ['start_date', 'end_date', 'timestamp', 'usage', 'vram'])
+
+
+def memory_budget(budget_mb=None):
+    """
+    取得記憶體上限
+
+    Args:
+        budget_mb (float): 指定上限 (MB)，None 表示依環境變數 GPU_MEMORY_BUDGET_MB
+
+    Returns:
+        int: 記憶體上限（位元組）
+    """
+    if budget_mb is None:
+        value = os.environ.get(MEMORY_BUDGET_ENV)
+        try:
+            budget_mb = float(value) if value else DEFAULT_MEMORY_BUDGET_MB
+        except ValueError:
+            print(f"警告: {MEMORY_BUDGET_ENV}={value} 不是有效的數字，改用 {DEFAULT_MEMORY_BUDGET_MB} MB")
+            budget_mb = DEFAULT_MEMORY_BUDGET_MB
+    if budget_mb <= 0:
+        print(f"警告: 記憶體上限必須大於 0，改用 {DEFAULT_MEMORY_BUDGET_MB} MB")
+        budget_mb = DEFAULT_MEMORY_BUDGET_MB
+    return int(budget_mb * 1024 * 1024)
+
+
+def _parse(date_str):
+    return datetime.strptime(date_str, DATE_FORMAT)
+
+
+def date_strings(start_date, end_date):
+    """
+    Returns:
+        list: start_date 至 end_date（含）的日期字串
+    """
+    start = _parse(start_date)
+    return [(start + timedelta(days=offset)).strftime(DATE_FORMAT)
+            for offset in range((_parse(end_date) - start).days + 1)]
+
+
+def month_ranges(start_date, end_date):
+    """
+    將日期範圍依月份切分
+
+    Returns:
+        list: (區塊開始日期, 區塊結束日期) 列表，第一與最後一個區塊可能不滿一個月
+    """
+    ranges = []
+    current, end = _parse(start_date), _parse(end_date)
+    while current <= end:
+        next_month = (current.replace(day=1) + timedelta(days=32)).replace(day=1)
+        chunk_end = min(end, next_month - timedelta(days=1))
+        ranges.append((current.strftime(DATE_FORMAT), chunk_end.strftime(DATE_FORMAT)))
+        current = next_month
+    return ranges
+
+
+def chunk_ranges(start_date, end_date, bytes_per_day=0, budget_mb=None):
+    """
+    以月為單位切分日期範圍，單月的估計記憶體超過上限時再細分為較少天數的區塊
+
+    Args:
+        start_date (str): 開始日期 (YYYY-MM-DD)
+        end_date (str): 結束日期 (YYYY-MM-DD)
+        bytes_per_day (int): 每天資料的估計記憶體（位元組），0 表示不細分
+        budget_mb (float): 記憶體上限 (MB)，None 表示依環境變數
+
+    Returns:
+        list: (區塊開始日期, 區塊結束日期) 列表
+    """
+    months = month_ranges(start_date, end_date)
+    if bytes_per_day <= 0:
+        return months
+    max_days = max(1, memory_budget(budget_mb) // int(bytes_per_day))
+    ranges = []
+    for month_start, month_end in months:
+        current, end = _parse(month_start), _parse(month_end)
+        while current <= end:
+            chunk_end = min(end, current + timedelta(days=max_days - 1))
+            ranges.append((current.strftime(DATE_FORMAT), chunk_end.strftime(DATE_FORMAT)))
+            current = chunk_end + timedelta(days=1)
+    return ranges
+
+
+def _estimate_file_bytes(paths):
+    """以範圍內最大的檔案估計每天的資料量（取樣頻率可能隨時間改變）"""
+    sizes = []
+    for path in paths:
+        try:
+            sizes.append(os.path.getsize(path))
+        except OSError:
+            continue
+    return max(sizes) * PARSED_BYTES_PER_FILE_BYTE if sizes else 0
+
+
+def _sample_dates(dates, count=8):
+    """等距抽樣的日期（估計每日資料量用，不逐一檢查所有檔案）"""
+    if len(dates) <= count:
+        return dates
+    step = (len(dates) - 1) / (count - 1)
+    return [dates[int(round(i * step))] for i in range(count)]
+
+
+def gpu_sample_path(data_dir, node, gpu_index, date_str):
+    return os.path.join(data_dir, node, date_str, f"gpu{gpu_index}_{date_str}.csv")
+
+
+def _read_sample_arrays(path):
+    """
+    Returns:
+        tuple: (timestamp, usage, vram) float64 陣列，舊版檔案沒有 VRAM 欄位時為 NaN
+    """
+    if HAS_PANDAS:
+        from gpu_csv_reader import read_gpu_csv
+        df = read_gpu_csv(path, parse_datetime=False)
+        usage = df['usage'].to_numpy(dtype=np.float64)
+        vram = df['vram'].to_numpy(dtype=np.float64) if 'vram' in df.columns else np.full(len(df), np.nan)
+        return df['timestamp'].to_numpy(dtype=np.float64), usage, vram
+    from columnar_csv import read_gpu_columns
+    arrays = read_gpu_columns(path).numpy()
+    return arrays['timestamp'], arrays['usage'], arrays['vram']
+
+
+def iter_gpu_samples(data_dir, node, gpu_index, start_date, end_date, budget_mb=None):
+    """
+    逐區塊讀取單一 GPU 的原始樣本
+
+    Args:
+        data_dir (str): 資料目錄
+        node (str): 節點名稱
+        gpu_index (int): GPU 索引
+        start_date (str): 開始日期 (YYYY-MM-DD)
+        end_date (str): 結束日期 (YYYY-MM-DD)
+        budget_mb (float): 記憶體上限 (MB)，None 表示依環境變數
+
+    Yields:
+        SampleChunk: 每個區塊的樣本，沒有任何資料的區塊不回傳
+    """
+    dates = date_strings(start_date, end_date)
+    bytes_per_day = _estimate_file_bytes(
+        gpu_sample_path(data_dir, node, gpu_index, date_str) for date_str in _sample_dates(dates))
+    for chunk_start, chunk_end in chunk_ranges(start_date, end_date, bytes_per_day, budget_mb):
+        parts = []
+        for date_str in date_strings(chunk_start, chunk_end):
+            path = gpu_sample_path(data_dir, node, gpu_index, date_str)
+            if os.path.exists(path):
+                parts.append(_read_sample_arrays(path))
+        if not parts:
+            continue
+        timestamp, usage, vram = (np.concatenate(columns) for columns in zip(*parts))
+        order = np.argsort(timestamp, kind='stable')
+        yield SampleChunk(chunk_start, chunk_end, timestamp[order], usage[order], vram[order])
+
+
+def iter_heatmap_chunks(data_dir, nodes, start_date, end_date, gpu_indices=range(8), budget_mb=None):
+    """
+    逐區塊建構每日平均熱力圖資料（不寫入每日平均檔快取，讀過的分區不會累積在記憶體中）
+
+    Yields:
+        HeatmapData: 每個區塊的逐日資料
+    """
+    from heatmap_data import build_heatmap_data
+
+    nodes, gpu_indices = list(nodes), list(gpu_indices)
+    bytes_per_day = len(nodes) * len(gpu_indices) * HEATMAP_BYTES_PER_CELL
+    for chunk_start, chunk_end in chunk_ranges(start_date, end_date, bytes_per_day, budget_mb):
+        yield build_heatmap_data(data_dir, nodes, chunk_start, chunk_end, gpu_indices, cache=False)
+
+
+def fold_downsampled(chunks, n_out, total_days, method=None, layers=('usage', 'vram')):
+    """
+    逐區塊降採樣後串接：每個區塊依其天數佔整個範圍的比例分配點數，
+    記憶體只需容納一個區塊與輸出點
+
+    每個欄位各自依本身的數值選點（不沿用使用率的索引，VRAM 的峰值才不會遺漏），
+    因此各欄位保留的時間點不同。
+
+    Args:
+        chunks (iterable): iter_gpu_samples() 的區塊
+        n_out (int): 整個範圍的目標點數
+        total_days (int): 整個範圍的天數
+        method (str): 降採樣方法，None 表示依環境變數 GPU_DOWNSAMPLE
+        layers (tuple): 要降採樣的欄位 ('usage' 與/或 'vram')
+
+    Returns:
+        dict: 欄位名稱 -> (timestamp, 數值) 陣列，沒有資料時為 None
+    """
+    from downsample import downsample_indices
+
+    kept = {layer: [] for layer in layers}
+    for chunk in chunks:
+        days = (_parse(chunk.end_date) - _parse(chunk.start_date)).days + 1
+        share = max(3, int(round(n_out * days / max(total_days, 1))))
+        for layer in layers:
+            values = getattr(chunk, layer)
+            indices = downsample_indices(chunk.timestamp, values, share, method)
+            kept[layer].append((chunk.timestamp[indices], values[indices]))
+    if not layers or not kept[layers[0]]:
+        return None
+    return {layer: tuple(np.concatenate([part[i] for part in parts]) for i in range(2))
+            for layer, parts in kept.items()}
+
+
+def fold_heatmap_data(data_dir, nodes, start_date, end_date, gpu_indices=range(8), freq='auto', budget_mb=None):
+    """
+    逐區塊讀取每日平均檔並彙整為週或月欄位，結果與
+    aggregate_columns(build_heatmap_data(...), freq) 相同，但不建構完整的逐日矩陣
+
+    Args:
+        data_dir (str): 資料目錄
+        nodes (list): 節點名稱列表
+        start_date (str): 開始日期 (YYYY-MM-DD)
+        end_date (str): 結束日期 (YYYY-MM-DD)
+        gpu_indices (iterable): GPU 索引
+        freq (str): 'auto'、'D'、'W' 或 'M'
+        budget_mb (float): 記憶體上限 (MB)，None 表示依環境變數
+
+    Returns:
+        HeatmapData: 彙整後的熱力圖資料
+    """
+    from heatmap_data import HeatmapData, choose_freq
+
+    nodes, gpu_indices = list(nodes), list(gpu_indices)
+    dates = date_strings(start_date, end_date)
+    if freq == 'auto':
+        freq = choose_freq(len(dates))
+    chunks = iter_heatmap_chunks(data_dir, nodes, start_date, end_date, gpu_indices, budget_mb)
+    if freq == 'D':
+        parts = list(chunks)
+        return HeatmapData(nodes, gpu_indices, dates, *(np.hstack([getattr(part, layer) for part in parts])
+                                                        for layer in ('usage', 'vram', 'users')))
+
+    if freq == 'W':
+        keys = [(day - timedelta(days=day.weekday())).strftime(DATE_FORMAT) for day in map(_parse, dates)]
+    elif freq == 'M':
+        keys = [date_str[:7] for date_str in dates]
+    else:
+        raise ValueError(f"未知的彙整粒度: {freq}")
+    labels = list(dict.fromkeys(keys))
+    bucket_of = {label: col for col, label in enumerate(labels)}
+    date_bucket = np.array([bucket_of[key] for key in keys])
+
+    rows = len(nodes) * len(gpu_indices)
+    sums = {layer: np.zeros((rows, len(labels))) for layer in ('usage', 'vram')}
+    counts = {layer: np.zeros((rows, len(labels))) for layer in ('usage', 'vram')}
+    users = np.full((rows, len(labels)), '', dtype=object)
+    offset = 0
+    for chunk in chunks:
+        buckets = date_bucket[offset:offset + len(chunk.dates)]
+        offset += len(chunk.dates)
+        for layer in ('usage', 'vram'):
+            matrix = getattr(chunk, layer)
+            present = ~np.isnan(matrix)
+            np.add.at(sums[layer].T, buckets, np.where(present, matrix, 0.0).T)
+            np.add.at(counts[layer].T, buckets, present.T.astype(float))
+        # 使用者取期間內最後出現者：依日期順序覆寫
+        for col, bucket in enumerate(buckets):
+            named = chunk.users[:, col] != ''
+            users[named, bucket] = chunk.users[named, col]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        usage, vram = (np.where(counts[layer] > 0, sums[layer] / counts[layer], np.nan) for layer in ('usage', 'vram'))
+    return HeatmapData(nodes, gpu_indices, labels, usage, vram, users, freq)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+輕量欄式 CSV 讀取模組（不依賴 pandas）
+
+每日平均檔（average_{date}.csv）與每 GPU 樣本檔（gpu{idx}_{date}.csv）都只有數行到
+一百多行，為了讀這些檔案載入 pandas 的時間遠比讀檔本身久。這裡只用標準函式庫：
+數值欄位存成 array('d')（無效值為 NaN），字串欄位以 sys.intern 共用同一份字串，
+需要向量運算時可透過 numpy() 取得不複製資料的 NumPy 視圖（有安裝 NumPy 時）。
+
+使用方式:
+    columns = read_average_columns('data/colab-gpu1/2025-05-23/average_2025-05-23.csv')
+    for gpu, usage, user in zip(columns.gpu, columns.usage, columns.user):
+        ...
+    arrays = columns.numpy()      # {'usage': ndarray, 'vram': ndarray, ...}
+"""
+
+import sys
+import csv
+from array import array
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+NAN = float('nan')
+
+# 邏輯欄位 -> 可接受的欄位名稱（新版、舊版與英文欄位）
+AVERAGE_ALIASES = {
+    'gpu': ('GPU編號', 'GPU卡號', 'gpu', 'gpu_id', 'GPU'),
+    'usage': ('平均GPU使用率(%)', '平均使用率(%)', 'usage', 'gpu_usage', 'GPU使用率', '平均GPU使用率'),
+    'vram': ('平均VRAM使用率(%)', 'vram_usage', 'vram', 'VRAM使用率', '平均VRAM使用率'),
+    'user': ('使用者', 'user', 'username', '使用者名稱'),
+}
+
+SUMMARY_ROW = '全部平均'
+
+# 每 GPU 樣本檔的欄位位置（時間戳,日期時間,GPU使用率(%),VRAM使用率(%)）
+GPU_TIMESTAMP_COLUMN = 0
+GPU_USAGE_COLUMN = 2
+GPU_VRAM_COLUMN = 3
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return NAN
+
+
+class AverageColumns:
+    """每日平均檔的欄式內容"""
+
+    __slots__ = ('gpu', 'usage', 'vram', 'user', 'missing')
+
+    def __init__(self, missing=()):
+        self.gpu = []               # GPU 編號字串（interned）
+        self.usage = array('d')     # 平均 GPU 使用率，無效值為 NaN
+        self.vram = array('d')      # 平均 VRAM 使用率，無效值為 NaN
+        self.user = []              # 使用者名稱（interned），缺欄位時為空字串
+        self.missing = tuple(missing)
+
+    def __len__(self):
+        return len(self.gpu)
+
+    def numpy(self):
+        """
+        Returns:
+            dict: usage/vram 為共用記憶體的 float64 陣列，gpu/user 為 object 陣列；未安裝 NumPy 時為 None
+        """
+        if not HAS_NUMPY:
+            return None
+        return {
+            'gpu': np.array(self.gpu, dtype=object),
+            'usage': np.frombuffer(self.usage, dtype=np.float64),
+            'vram': np.frombuffer(self.vram, dtype=np.float64),
+            'user': np.array(self.user, dtype=object),
+        }
+
+
+class GPUSampleColumns:
+    """每 GPU 樣本檔的欄式內容"""
+
+    __slots__ = ('timestamp', 'usage', 'vram')
+
+    def __init__(self):
+        self.timestamp = array('d')
+        self.usage = array('d')
+        self.vram = array('d')
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def numpy(self):
+        """
+        Returns:
+            dict: timestamp/usage/vram 的 float64 視圖；未安裝 NumPy 時為 None
+        """
+        if not HAS_NUMPY:
+            return None
+        return {name: np.frombuffer(getattr(self, name), dtype=np.float64)
+                for name in self.__slots__}
+
+
+def resolve_columns(header, aliases=None):
+    """
+    找出各邏輯欄位在標頭中的位置
+
+    Args:
+        header (list): 標頭欄位名稱
+        aliases (dict): 邏輯欄位 -> 欄位名稱列表，預設為 AVERAGE_ALIASES
+
+    Returns:
+        dict: 邏輯欄位 -> 欄位索引（找不到的欄位不包含）
+    """
+    names = [h.strip().lstrip('\ufeff') for h in header]
+    positions = {}
+    for logical, candidates in (aliases or AVERAGE_ALIASES).items():
+        for name in candidates:
+            if name in names:
+                positions[logical] = names.index(name)
+                break
+    return positions
+
+
+def read_average_columns(file_path, aliases=None, skip_summary=True):
+    """
+    讀取每日平均檔為欄式資料
+
+    Args:
+        file_path (str): average_{date}.csv 路徑
+        aliases (dict): 邏輯欄位 -> 欄位名稱列表，預設為 AVERAGE_ALIASES
+        skip_summary (bool): 是否略過「全部平均」列
+
+    Returns:
+        AverageColumns: 欄式資料；missing 為找不到的邏輯欄位。檔案為空時沒有任何列
+    """
+    intern = sys.intern
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return AverageColumns()
+        positions = resolve_columns(header, aliases)
+        columns = AverageColumns(missing=[name for name in ('gpu', 'usage', 'vram', 'user')
+                                          if name not in positions])
+        gpu_col = positions.get('gpu', 0)
+        usage_col = positions.get('usage')
+        vram_col = positions.get('vram')
+        user_col = positions.get('user')
+
+        for row in reader:
+            if not row:
+                continue
+            width = len(row)
+            gpu = row[gpu_col].strip() if gpu_col < width else ''
+            if skip_summary and SUMMARY_ROW in gpu:
+                continue
+            columns.gpu.append(intern(gpu))
+            columns.usage.append(_to_float(row[usage_col]) if usage_col is not None and usage_col < width else NAN)
+            columns.vram.append(_to_float(row[vram_col]) if vram_col is not None and vram_col < width else NAN)
+            columns.user.append(intern(row[user_col].strip()) if user_col is not None and user_col < width else '')
+    return columns
+
+
+def read_gpu_columns(file_path):
+    """
+    讀取每 GPU 樣本檔為欄式資料（有無標頭皆可，舊版沒有 VRAM 欄位時為 NaN）
+
+    Args:
+        file_path (str): gpu{idx}_{date}.csv 路徑
+
+    Returns:
+        GPUSampleColumns: 欄式資料，時間戳無法解析的列會被略過
+    """
+    columns = GPUSampleColumns()
+    timestamp, usage, vram = columns.timestamp, columns.usage, columns.vram
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.reader(f):
+            if len(row) <= GPU_USAGE_COLUMN:
+                continue
+            try:
+                ts = float(row[GPU_TIMESTAMP_COLUMN])
+            except ValueError:
+                continue  # 標頭或損壞的列
+            timestamp.append(ts)
+            usage.append(_to_float(row[GPU_USAGE_COLUMN]))
+            vram.append(_to_float(row[GPU_VRAM_COLUMN]) if len(row) > GPU_VRAM_COLUMN else NAN)
+    return columns
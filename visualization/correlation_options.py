@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GPU 相關性分析的預設值與命令列參數
+
+gpu_correlation.py 與 gpu_monitor.py correlation 共用。只依賴標準函式庫，
+gpu_monitor.py 建立命令列（例如 --help）時不需要載入 NumPy 與分析模組。
+"""
+
+# 時間解析度（分鐘）；60 使用每小時快取，其他值需整除一天
+DEFAULT_RESOLUTION = 60
+# 使用率超過此值的時段視為忙碌
+DEFAULT_BUSY_THRESHOLD = 10.0
+# 分群門檻：群內平均相關係數至少為此值
+DEFAULT_MIN_CORRELATION = 0.5
+# 報告列出的高相關配對數
+DEFAULT_TOP_PAIRS = 10
+
+
+def add_analysis_arguments(parser):
+    """gpu_correlation.py 與 gpu_monitor.py correlation 共用的參數"""
+    parser.add_argument('--nodes', help='以逗號分隔的節點名稱，all 表示資料目錄中的所有節點 (預設: colab-gpu1~4)')
+    parser.add_argument('--resolution', type=int, default=DEFAULT_RESOLUTION,
+                        help=f'時間解析度（分鐘，需整除 1440），預設 {DEFAULT_RESOLUTION}')
+    parser.add_argument('--busy-threshold', type=float, default=DEFAULT_BUSY_THRESHOLD,
+                        help=f'使用率超過此值視為忙碌 (%%)，預設 {DEFAULT_BUSY_THRESHOLD:g}')
+    parser.add_argument('--min-corr', type=float, default=DEFAULT_MIN_CORRELATION,
+                        help=f'分群的群內平均相關係數下限，預設 {DEFAULT_MIN_CORRELATION:g}')
+    parser.add_argument('--pairs', type=int, default=DEFAULT_TOP_PAIRS,
+                        help=f'列出的高相關配對數，預設 {DEFAULT_TOP_PAIRS}')
+
+
+def check_analysis_arguments(args):
+    """
+    Returns:
+        str: 參數錯誤訊息，沒有錯誤時為 None
+    """
+    if args.resolution <= 0 or 1440 % args.resolution:
+        return "--resolution 必須為整除 1440 的正整數（例如 10、30、60）"
+    if not -1 <= args.min_corr <= 1:
+        return "--min-corr 必須介於 -1 與 1 之間"
+    return None
+
+
+def parse_nodes(value):
+    return [node.strip() for node in value.split(',') if node.strip()] if value else None
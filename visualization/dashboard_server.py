@@ -0,0 +1,837 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本機 GPU 儀表板伺服器
+
+以 JSON 提供節點趨勢、單一 GPU 時間序列、熱力圖矩陣與使用者活動，並附一個
+以 canvas 繪圖的頁面，任意日期範圍都能即時互動檢視，不必等批次產生 PNG。
+
+資料來源都是已預先彙整的檔案：
+- 每日: data/<節點>/<日期>/average_{date}.csv；原始分區已被保留政策移除的日期
+  改讀 data/rollups/daily/<節點>/daily_<YYYY>.csv
+- 每小時: trend_stats.partition_hours 的每小時加總（gpu{idx}_{date}.csv，原始分區
+  已移除時改讀 data/rollups/hourly/<節點>/hourly_<YYYY-MM>.csv），與趨勢統計共用快取
+
+每個回應的 ETag 由「端點 + 參數 + 輸入檔案的大小與修改時間」計算，
+資料未變動時直接回傳 304 或行程內快取的內容，只有新資料寫入後才重新計算。
+
+端點:
+    GET /                                                   互動圖表頁面
+    GET /api/meta                                           節點、GPU 與可用日期範圍
+    GET /api/nodes?start=&end=&layer=usage|vram             各節點每日平均
+    GET /api/gpu?node=&gpu=&start=&end=&layer=&resolution=day|hour|auto&points=
+                                                            單一 GPU 時間序列（points: 降採樣的目標點數）
+    GET /api/heatmap?start=&end=&layer=&freq=auto|D|W|M     [節點·GPU, 日期] 矩陣
+    GET /api/users?start=&end=                              使用者活動摘要
+
+未指定 start/end 時使用最近 30 天的可用資料。
+
+使用範例:
+    python3 dashboard_server.py --data-dir ../data --port 8050
+    python3 ../gpu_monitor.py --data-dir ./data serve --port 8050
+"""
+
+import os
+import csv
+import gzip
+import json
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+
+from heatmap_data import build_heatmap_data, aggregate_columns, FREQ_CHOICES
+from trend_stats import partition_hours, TAIWAN_OFFSET
+from downsample import downsample_indices
+
+NODES = ['colab-gpu1', 'colab-gpu2', 'colab-gpu3', 'colab-gpu4']
+GPU_INDICES = list(range(8))
+LAYERS = ('usage', 'vram')
+RESOLUTIONS = ('auto', 'day', 'hour')
+INACTIVE_USERS = ('未使用', '未知')
+
+DATE_FORMAT = '%Y-%m-%d'
+EPOCH = datetime(1970, 1, 1)
+DEFAULT_RANGE_DAYS = 30
+# 單一請求可查詢的最長天數，避免一次掃描過多分區
+MAX_RANGE_DAYS = 3660
+# resolution=auto 時，區間不超過此天數使用每小時資料
+AUTO_HOURLY_DAYS = 14
+# points 參數的下限
+MIN_POINTS = 10
+# 回應內容超過此大小且用戶端接受時以 gzip 壓縮
+GZIP_MIN_BYTES = 1024
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8050
+DEFAULT_CACHE_SIZE = 256
+
+# 與 scripts/retention_policy.py 的彙總檔欄位相同
+DAILY_ROLLUP_COLUMNS = {'date': 0, 'gpu': 1, 'usage': 2, 'vram': 3, 'user': 7}
+
+
+class RequestError(ValueError):
+    """請求參數錯誤，回應 400"""
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _gpu_label_index(label):
+    """'GPU[3]' -> 3，無法解析時為 None"""
+    digits = ''.join(ch for ch in label if ch.isdigit())
+    return int(digits) if digits else None
+
+
+def _json_values(values, digits=2):
+    """數值序列轉為 JSON 列表，NaN 轉為 null"""
+    return [None if np.isnan(value) else round(float(value), digits) for value in values]
+
+
+def _date_strings(start_date, end_date):
+    start = datetime.strptime(start_date, DATE_FORMAT)
+    days = (datetime.strptime(end_date, DATE_FORMAT) - start).days
+    return [(start + timedelta(days=offset)).strftime(DATE_FORMAT) for offset in range(days + 1)]
+
+
+def _stat_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return '-'
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class DashboardStore:
+    """儀表板資料層：讀取預先彙整的檔案並快取序列化後的回應"""
+
+    def __init__(self, data_dir="../data", cache_size=DEFAULT_CACHE_SIZE, nodes=None, gpu_indices=None):
+        """
+        Args:
+            data_dir (str): 資料目錄
+            cache_size (int): 行程內快取的回應數量上限
+            nodes (list): 節點名稱列表，預設為所有節點
+            gpu_indices (list): GPU 索引列表，預設為 0-7
+        """
+        self.data_dir = data_dir
+        self.rollup_dir = os.path.join(data_dir, 'rollups')
+        self.nodes = list(nodes or NODES)
+        self.gpu_indices = list(GPU_INDICES if gpu_indices is None else gpu_indices)
+        self.cache_size = cache_size
+        self._responses = OrderedDict()   # ETag -> JSON bytes
+        self._rollups = {}                # path -> (signature, rows)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # 檔案與指紋
+    # ------------------------------------------------------------------
+
+    def _partition_dir(self, node, date_str):
+        return os.path.join(self.data_dir, node, date_str)
+
+    def _average_path(self, node, date_str):
+        return os.path.join(self._partition_dir(node, date_str), f"average_{date_str}.csv")
+
+    def _daily_rollup_path(self, node, date_str):
+        return os.path.join(self.rollup_dir, 'daily', node, f"daily_{date_str[:4]}.csv")
+
+    def _hourly_rollup_path(self, node, date_str):
+        return os.path.join(self.rollup_dir, 'hourly', node, f"hourly_{date_str[:7]}.csv")
+
+    def _read_rollup(self, path, columns):
+        """
+        讀取每日彙總檔，結果依檔案快取
+
+        Returns:
+            dict: (日期, GPU 索引) -> (使用率, VRAM 使用率, 使用者)
+        """
+        signature = _stat_signature(path)
+        cached = self._rollups.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        rows = {}
+        if signature != '-':
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                for row in reader:
+                    if len(row) <= max(columns.values()):
+                        continue
+                    gpu_index = _gpu_label_index(row[columns['gpu']])
+                    if gpu_index is None:
+                        continue
+                    rows[(row[columns['date']], gpu_index)] = (_to_float(row[columns['usage']]),
+                                                               _to_float(row[columns['vram']]),
+                                                               row[columns['user']].strip())
+        self._rollups[path] = (signature, rows)
+        return rows
+
+    def _daily_sources(self, node, date_str):
+        """每日資料實際使用的檔案：有平均檔時用平均檔，否則用每日彙總"""
+        average_path = self._average_path(node, date_str)
+        if os.path.exists(average_path):
+            return average_path
+        return self._daily_rollup_path(node, date_str)
+
+    def _hourly_sources(self, node, gpu_index, date_str):
+        gpu_path = os.path.join(self._partition_dir(node, date_str), f"gpu{gpu_index}_{date_str}.csv")
+        if os.path.exists(gpu_path):
+            return gpu_path
+        return self._hourly_rollup_path(node, date_str)
+
+    def fingerprint(self, paths):
+        """
+        以檔案大小與修改時間計算資料指紋
+
+        Args:
+            paths (iterable): 輸入檔案路徑（重複路徑只計算一次）
+
+        Returns:
+            str: sha1 十六進位字串
+        """
+        sha = hashlib.sha1()
+        for path in sorted(set(paths)):
+            sha.update(f"{path}={_stat_signature(path)}\n".encode('utf-8'))
+        return sha.hexdigest()
+
+    # ------------------------------------------------------------------
+    # 日期範圍
+    # ------------------------------------------------------------------
+
+    def available_dates(self):
+        """
+        Returns:
+            list: 原始分區與每日彙總中所有出現過的日期（已排序）
+        """
+        dates = set()
+        for node in self.nodes:
+            node_dir = os.path.join(self.data_dir, node)
+            if os.path.isdir(node_dir):
+                dates.update(name for name in os.listdir(node_dir)
+                             if len(name) == 10 and name[4] == '-' and name[7] == '-')
+            rollup_dir = os.path.join(self.rollup_dir, 'daily', node)
+            if os.path.isdir(rollup_dir):
+                for name in os.listdir(rollup_dir):
+                    if name.startswith('daily_') and name.endswith('.csv'):
+                        path = os.path.join(rollup_dir, name)
+                        dates.update(date_str for date_str, _ in self._read_rollup(path, DAILY_ROLLUP_COLUMNS))
+        return sorted(dates)
+
+    def resolve_range(self, start_date=None, end_date=None):
+        """
+        檢查日期參數；未指定時使用最近 DEFAULT_RANGE_DAYS 天的可用資料
+
+        Returns:
+            tuple: (開始日期, 結束日期)
+        """
+        if not end_date:
+            available = self.available_dates()
+            end_date = available[-1] if available else datetime.now().strftime(DATE_FORMAT)
+        try:
+            end = datetime.strptime(end_date, DATE_FORMAT)
+            start = (datetime.strptime(start_date, DATE_FORMAT) if start_date
+                     else end - timedelta(days=DEFAULT_RANGE_DAYS - 1))
+        except ValueError:
+            raise RequestError("日期格式錯誤，請使用 YYYY-MM-DD")
+        if start > end:
+            raise RequestError("開始日期不能晚於結束日期")
+        if (end - start).days + 1 > MAX_RANGE_DAYS:
+            raise RequestError(f"日期範圍不能超過 {MAX_RANGE_DAYS} 天")
+        return start.strftime(DATE_FORMAT), end.strftime(DATE_FORMAT)
+
+    # ------------------------------------------------------------------
+    # 資料
+    # ------------------------------------------------------------------
+
+    def daily_data(self, start_date, end_date):
+        """
+        [節點·GPU, 日期] 的每日資料；沒有平均檔的分區由每日彙總補上
+
+        Returns:
+            HeatmapData: 熱力圖資料
+        """
+        data = build_heatmap_data(self.data_dir, self.nodes, start_date, end_date, self.gpu_indices)
+        gpu_offset = {gpu_index: i for i, gpu_index in enumerate(self.gpu_indices)}
+        for node_pos, node in enumerate(self.nodes):
+            base = node_pos * len(self.gpu_indices)
+            for col, date_str in enumerate(data.dates):
+                if os.path.exists(self._average_path(node, date_str)):
+                    continue
+                rollup = self._read_rollup(self._daily_rollup_path(node, date_str), DAILY_ROLLUP_COLUMNS)
+                for (row_date, gpu_index), (usage, vram, user) in rollup.items():
+                    offset = gpu_offset.get(gpu_index)
+                    if row_date != date_str or offset is None:
+                        continue
+                    data.usage[base + offset, col] = usage
+                    data.vram[base + offset, col] = vram
+                    data.users[base + offset, col] = user
+        return data
+
+    def hourly_series(self, node, gpu_index, start_date, end_date):
+        """
+        單一 GPU 的每小時平均
+
+        每個分區的每小時加總與筆數由 trend_stats.partition_hours 提供（原始檔或每小時
+        彙總，並共用趨勢統計的快取），只列出有資料的小時。
+
+        Returns:
+            tuple: (小時起點時間戳列表, 使用率列表, VRAM 使用率列表)
+        """
+        timestamps, usage, vram = [], [], []
+        for date_str in _date_strings(start_date, end_date):
+            hours = partition_hours(self.data_dir, node, date_str)
+            if hours is None:
+                continue
+            offsets = np.flatnonzero(hours.gpus == gpu_index)
+            if not len(offsets):
+                continue
+            usage_sum, usage_count, vram_sum, vram_count = hours.stack[:, offsets[0]]
+            present = np.flatnonzero((usage_count > 0) | (vram_count > 0))
+            # 分區日期為台灣時間，當日 00:00 的時間戳加上小時數即為各小時起點
+            day_start = int((datetime.strptime(date_str, DATE_FORMAT) - EPOCH).total_seconds()) - TAIWAN_OFFSET
+            timestamps.extend(int(day_start + hour * 3600) for hour in present)
+            for sums, counts, target in ((usage_sum, usage_count, usage), (vram_sum, vram_count, vram)):
+                target.extend(np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)[present])
+        return timestamps, usage, vram
+
+    # ------------------------------------------------------------------
+    # 端點
+    # ------------------------------------------------------------------
+
+    def _daily_paths(self, start_date, end_date):
+        return [self._daily_sources(node, date_str)
+                for node in self.nodes for date_str in _date_strings(start_date, end_date)]
+
+    def nodes_payload(self, start_date, end_date, layer):
+        data = self.daily_data(start_date, end_date)
+        matrix = getattr(data, layer)
+        series = {}
+        for node_pos, node in enumerate(self.nodes):
+            rows = matrix[node_pos * len(self.gpu_indices):(node_pos + 1) * len(self.gpu_indices)]
+            present = ~np.isnan(rows)
+            counts = present.sum(axis=0)
+            means = np.where(counts > 0, np.where(present, rows, 0.0).sum(axis=0) / np.maximum(counts, 1), np.nan)
+            series[node] = _json_values(means)
+        return {'start': start_date, 'end': end_date, 'layer': layer, 'dates': data.dates, 'series': series}
+
+    def gpu_payload(self, node, gpu_index, start_date, end_date, layer, resolution, points=None):
+        if resolution == 'auto':
+            days = len(_date_strings(start_date, end_date))
+            resolution = 'hour' if days <= AUTO_HOURLY_DAYS else 'day'
+        payload = {'node': node, 'gpu': gpu_index, 'start': start_date, 'end': end_date,
+                   'layer': layer, 'resolution': resolution}
+        if resolution == 'hour':
+            timestamps, usage, vram = self.hourly_series(node, gpu_index, start_date, end_date)
+            values = np.asarray(usage if layer == 'usage' else vram, dtype=np.float64)
+            if points and len(values) > points:
+                # 只回傳畫得出差異的點數，長區間的傳輸與繪製時間不隨資料量成長
+                indices = downsample_indices(timestamps, values, points)
+                timestamps, values = [timestamps[i] for i in indices], values[indices]
+            payload.update(timestamps=timestamps, values=_json_values(values))
+            return payload
+        data = self.daily_data(start_date, end_date)
+        row = self.nodes.index(node) * len(self.gpu_indices) + self.gpu_indices.index(gpu_index)
+        payload.update(dates=data.dates, values=_json_values(getattr(data, layer)[row]),
+                       users=[user or None for user in data.users[row]])
+        return payload
+
+    def heatmap_payload(self, start_date, end_date, layer, freq):
+        data = aggregate_columns(self.daily_data(start_date, end_date), freq)
+        return {'start': start_date, 'end': end_date, 'layer': layer, 'freq': data.freq,
+                'columns': data.dates,
+                'rows': [{'node': node, 'gpu': gpu_index} for node in data.nodes for gpu_index in data.gpu_indices],
+                'values': [_json_values(row, 1) for row in getattr(data, layer)]}
+
+    def users_payload(self, start_date, end_date):
+        data = self.daily_data(start_date, end_date)
+        stats = {}
+        for row in range(data.users.shape[0]):
+            node = data.nodes[row // len(data.gpu_indices)]
+            for col, user in enumerate(data.users[row]):
+                if not user or user in INACTIVE_USERS:
+                    continue
+                entry = stats.setdefault(user, {'user': user, 'gpu_days': 0, 'usage': [], 'vram': [],
+                                                'nodes': set(), 'first': data.dates[col], 'last': data.dates[col]})
+                entry['gpu_days'] += 1
+                entry['nodes'].add(node)
+                entry['last'] = max(entry['last'], data.dates[col])
+                entry['first'] = min(entry['first'], data.dates[col])
+                for name in LAYERS:
+                    value = getattr(data, name)[row, col]
+                    if not np.isnan(value):
+                        entry[name].append(value)
+
+        users = []
+        for entry in stats.values():
+            for name in LAYERS:
+                values = entry[name]
+                entry[f"mean_{name}"] = round(float(np.mean(values)), 2) if values else None
+                del entry[name]
+            entry['nodes'] = sorted(entry['nodes'])
+            users.append(entry)
+        users.sort(key=lambda entry: (-entry['gpu_days'], entry['user']))
+        return {'start': start_date, 'end': end_date, 'users': users}
+
+    def meta_payload(self):
+        available = self.available_dates()
+        return {'nodes': self.nodes, 'gpus': self.gpu_indices, 'layers': list(LAYERS),
+                'freqs': list(FREQ_CHOICES), 'first_date': available[0] if available else None,
+                'last_date': available[-1] if available else None, 'days': len(available)}
+
+    def _choice(self, params, name, choices, default):
+        value = params.get(name, default)
+        if value not in choices:
+            raise RequestError(f"{name} 必須為 {', '.join(str(choice) for choice in choices)} 之一")
+        return value
+
+    def plan(self, endpoint, params):
+        """
+        解析請求：檢查參數並列出輸入檔案，但尚未計算內容
+
+        Args:
+            endpoint (str): 端點名稱，例如 'nodes'
+            params (dict): 查詢參數（每個名稱一個值）
+
+        Returns:
+            tuple: (快取鍵, 輸入檔案列表, 產生回應內容的函數)
+        """
+        if endpoint == 'meta':
+            node_dirs = [os.path.join(self.data_dir, node) for node in self.nodes]
+            rollup_dir = os.path.join(self.rollup_dir, 'daily')
+            rollup_files = [os.path.join(rollup_dir, node, name)
+                            for node in self.nodes if os.path.isdir(os.path.join(rollup_dir, node))
+                            for name in os.listdir(os.path.join(rollup_dir, node))]
+            return 'meta', node_dirs + rollup_files, self.meta_payload
+
+        start_date, end_date = self.resolve_range(params.get('start'), params.get('end'))
+        if endpoint == 'users':
+            return (f"users|{start_date}|{end_date}", self._daily_paths(start_date, end_date),
+                    lambda: self.users_payload(start_date, end_date))
+
+        layer = self._choice(params, 'layer', LAYERS, 'usage')
+        if endpoint == 'nodes':
+            return (f"nodes|{start_date}|{end_date}|{layer}", self._daily_paths(start_date, end_date),
+                    lambda: self.nodes_payload(start_date, end_date, layer))
+        if endpoint == 'heatmap':
+            freq = self._choice(params, 'freq', FREQ_CHOICES, 'auto')
+            return (f"heatmap|{start_date}|{end_date}|{layer}|{freq}", self._daily_paths(start_date, end_date),
+                    lambda: self.heatmap_payload(start_date, end_date, layer, freq))
+        if endpoint == 'gpu':
+            node = self._choice(params, 'node', self.nodes, self.nodes[0])
+            try:
+                gpu_index = int(params.get('gpu', self.gpu_indices[0]))
+            except ValueError:
+                raise RequestError("gpu 必須為整數")
+            if gpu_index not in self.gpu_indices:
+                raise RequestError(f"gpu 必須為 {', '.join(map(str, self.gpu_indices))} 之一")
+            resolution = self._choice(params, 'resolution', RESOLUTIONS, 'auto')
+            try:
+                points = int(params['points']) if params.get('points') else None
+            except ValueError:
+                raise RequestError("points 必須為整數")
+            if points is not None and points < MIN_POINTS:
+                raise RequestError(f"points 不能小於 {MIN_POINTS}")
+            dates = _date_strings(start_date, end_date)
+            paths = [self._daily_sources(node, date_str) for date_str in dates]
+            if resolution != 'day':
+                paths += [self._hourly_sources(node, gpu_index, date_str) for date_str in dates]
+            return (f"gpu|{node}|{gpu_index}|{start_date}|{end_date}|{layer}|{resolution}|{points}", paths,
+                    lambda: self.gpu_payload(node, gpu_index, start_date, end_date, layer, resolution, points))
+        raise KeyError(endpoint)
+
+    def respond(self, endpoint, params):
+        """
+        取得端點的 ETag 與 JSON 內容（資料未變動時直接使用快取）
+
+        Returns:
+            tuple: (ETag, 產生 JSON 內容的函數)；ETag 相符時可不呼叫該函數直接回應 304
+        """
+        key, paths, build = self.plan(endpoint, params)
+        etag = '"' + hashlib.sha1(f"{key}|{self.fingerprint(paths)}".encode('utf-8')).hexdigest()[:20] + '"'
+
+        def body():
+            with self._lock:
+                cached = self._responses.get(etag)
+                if cached is not None:
+                    self._responses.move_to_end(etag)
+                    self.hits += 1
+                    return cached
+            payload = json.dumps(build(), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            with self._lock:
+                self.misses += 1
+                self._responses[etag] = payload
+                while len(self._responses) > self.cache_size:
+                    self._responses.popitem(last=False)
+            return payload
+
+        return etag, body
+
+
+class DashboardRequestHandler(BaseHTTPRequestHandler):
+    """儀表板 HTTP 請求處理"""
+
+    server_version = 'GPUDashboard/1.0'
+    quiet = False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path in ('/', '/index.html'):
+            self._send(200, DASHBOARD_PAGE.encode('utf-8'), 'text/html; charset=utf-8')
+            return
+        if not url.path.startswith('/api/'):
+            self._send_error(404, f"找不到路徑: {url.path}")
+            return
+
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            etag, body = self.server.store.respond(url.path[len('/api/'):], params)
+        except KeyError:
+            self._send_error(404, f"未知的端點: {url.path}")
+            return
+        except RequestError as e:
+            self._send_error(400, str(e))
+            return
+
+        if etag in (tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            return
+        try:
+            payload = body()
+        except Exception as e:
+            self._send_error(500, f"產生資料時發生錯誤: {e}")
+            return
+        self._send(200, payload, 'application/json; charset=utf-8', {'ETag': etag, 'Cache-Control': 'no-cache'})
+
+    def _send(self, status, payload, content_type, headers=None):
+        if len(payload) >= GZIP_MIN_BYTES and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            payload = gzip.compress(payload, compresslevel=5)
+            headers = dict(headers or {}, **{'Content-Encoding': 'gzip'})
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('Vary', 'Accept-Encoding')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error(self, status, message):
+        payload = json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+        self._send(status, payload, 'application/json; charset=utf-8')
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def create_server(data_dir="../data", host=DEFAULT_HOST, port=DEFAULT_PORT, cache_size=DEFAULT_CACHE_SIZE,
+                  quiet=False):
+    """
+    建立儀表板伺服器（尚未開始處理請求）
+
+    Args:
+        data_dir (str): 資料目錄
+        host (str): 監聽位址，預設只接受本機連線
+        port (int): 連接埠，0 表示由系統指定
+        cache_size (int): 行程內快取的回應數量上限
+        quiet (bool): 是否不輸出每個請求的記錄
+
+    Returns:
+        ThreadingHTTPServer: 伺服器，store 屬性為 DashboardStore
+    """
+    handler = type('Handler', (DashboardRequestHandler,), {'quiet': quiet})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.store = DashboardStore(data_dir, cache_size)
+    return server
+
+
+def serve(data_dir="../data", host=DEFAULT_HOST, port=DEFAULT_PORT, cache_size=DEFAULT_CACHE_SIZE, quiet=False):
+    """
+    啟動儀表板伺服器，直到 Ctrl+C 為止
+
+    Returns:
+        int: 結束碼
+    """
+    if not os.path.isdir(data_dir):
+        print(f"錯誤: 資料目錄不存在: {data_dir}")
+        return 1
+    try:
+        server = create_server(data_dir, host, port, cache_size, quiet)
+    except OSError as e:
+        print(f"錯誤: 無法監聽 {host}:{port}: {e}")
+        return 1
+
+    bound_host, bound_port = server.server_address[:2]
+    print(f"GPU 儀表板: http://{bound_host}:{bound_port}/  (資料目錄: {data_dir}，按 Ctrl+C 結束)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        store = server.store
+        print(f"\n儀表板已關閉（回應快取命中 {store.hits} 次、重新計算 {store.misses} 次）")
+    return 0
+
+
+def add_server_arguments(parser):
+    """
+    為 argparse 命令列加入伺服器參數 --host、--port、--cache-size 與 --quiet
+
+    Args:
+        parser (argparse.ArgumentParser): 命令列解析器
+    """
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'監聽位址 (預設: {DEFAULT_HOST}，僅限本機)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'連接埠 (預設: {DEFAULT_PORT})')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE,
+                        help=f'行程內快取的回應數量上限 (預設: {DEFAULT_CACHE_SIZE})')
+    parser.add_argument('--quiet', action='store_true', help='不輸出每個請求的記錄')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='本機 GPU 儀表板伺服器（JSON API 與互動圖表頁面）')
+    parser.add_argument('--data-dir', default='../data', help='資料目錄路徑，預設為 ../data')
+    add_server_arguments(parser)
+    args = parser.parse_args(argv)
+    return serve(args.data_dir, args.host, args.port, args.cache_size, args.quiet)
+
+
+DASHBOARD_PAGE = r"""<!DOCTYPE html>
+<html lang="zh-Hant">
+<head>
+<meta charset="utf-8">
+<title>GPU 使用率儀表板</title>
+<style>
+  body { font-family: "Noto Sans CJK TC", "Microsoft JhengHei", "PingFang TC", sans-serif; margin: 16px; color: #222; }
+  #controls { display: flex; flex-wrap: wrap; gap: 8px; align-items: center; margin-bottom: 12px; }
+  #controls label { font-size: 14px; }
+  canvas { border: 1px solid #ddd; width: 100%; height: 560px; }
+  #status { font-size: 13px; color: #666; margin-top: 6px; }
+  #tooltip { position: absolute; pointer-events: none; background: rgba(0,0,0,.75); color: #fff;
+             font-size: 12px; padding: 4px 6px; border-radius: 3px; display: none; white-space: pre; }
+</style>
+</head>
+<body>
+<h2>GPU 使用率儀表板</h2>
+<div id="controls">
+  <label>檢視 <select id="view">
+    <option value="nodes">節點趨勢</option>
+    <option value="gpu">單一 GPU</option>
+    <option value="heatmap">熱力圖</option>
+    <option value="users">使用者活動</option>
+  </select></label>
+  <label>開始 <input type="date" id="start"></label>
+  <label>結束 <input type="date" id="end"></label>
+  <label>指標 <select id="layer"><option value="usage">GPU 使用率</option><option value="vram">VRAM 使用率</option></select></label>
+  <label class="gpu-only">節點 <select id="node"></select></label>
+  <label class="gpu-only">GPU <select id="gpu"></select></label>
+  <label class="gpu-only">解析度 <select id="resolution">
+    <option value="auto">自動</option><option value="hour">每小時</option><option value="day">每日</option>
+  </select></label>
+  <label class="heatmap-only">彙整 <select id="freq">
+    <option value="auto">自動</option><option value="D">每日</option><option value="W">每週</option><option value="M">每月</option>
+  </select></label>
+</div>
+<canvas id="chart"></canvas>
+<div id="status"></div>
+<div id="tooltip"></div>
+<script>
+const COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f'];
+const $ = id => document.getElementById(id);
+const canvas = $('chart'), ctx = canvas.getContext('2d');
+const PAD = {left: 56, right: 150, top: 20, bottom: 56};
+let hitTest = () => null;
+
+async function api(path, params) {
+  const query = new URLSearchParams(params).toString();
+  const started = performance.now();
+  const response = await fetch(`/api/${path}?${query}`);
+  const data = await response.json();
+  if (!response.ok) throw new Error(data.error || response.statusText);
+  $('status').textContent = `${path}: ${Math.round(performance.now() - started)} ms`;
+  return data;
+}
+
+function resize() {
+  const ratio = window.devicePixelRatio || 1;
+  canvas.width = canvas.clientWidth * ratio;
+  canvas.height = canvas.clientHeight * ratio;
+  ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+  ctx.clearRect(0, 0, canvas.clientWidth, canvas.clientHeight);
+  ctx.font = '12px sans-serif';
+  return {w: canvas.clientWidth - PAD.left - PAD.right, h: canvas.clientHeight - PAD.top - PAD.bottom};
+}
+
+function axes(size, labels, maxY) {
+  ctx.strokeStyle = '#999'; ctx.fillStyle = '#333';
+  ctx.beginPath(); ctx.moveTo(PAD.left, PAD.top); ctx.lineTo(PAD.left, PAD.top + size.h);
+  ctx.lineTo(PAD.left + size.w, PAD.top + size.h); ctx.stroke();
+  for (let i = 0; i <= 5; i++) {
+    const y = PAD.top + size.h - size.h * i / 5;
+    ctx.fillText((maxY * i / 5).toFixed(0), 8, y + 4);
+    ctx.strokeStyle = '#eee'; ctx.beginPath(); ctx.moveTo(PAD.left, y); ctx.lineTo(PAD.left + size.w, y); ctx.stroke();
+  }
+  const step = Math.max(1, Math.ceil(labels.length / 12));
+  labels.forEach((label, i) => {
+    if (i % step) return;
+    const x = PAD.left + (labels.length > 1 ? size.w * i / (labels.length - 1) : size.w / 2);
+    ctx.save(); ctx.translate(x, PAD.top + size.h + 12); ctx.rotate(-Math.PI / 6);
+    ctx.fillText(label, -40, 10); ctx.restore();
+  });
+}
+
+function lineChart(labels, series) {
+  const size = resize();
+  axes(size, labels, 100);
+  const xAt = i => PAD.left + (labels.length > 1 ? size.w * i / (labels.length - 1) : size.w / 2);
+  const yAt = v => PAD.top + size.h - size.h * Math.min(v, 100) / 100;
+  series.forEach((s, k) => {
+    ctx.strokeStyle = COLORS[k % COLORS.length]; ctx.lineWidth = 1.5; ctx.beginPath();
+    let drawing = false;
+    s.values.forEach((v, i) => {
+      if (v === null) { drawing = false; return; }
+      drawing ? ctx.lineTo(xAt(i), yAt(v)) : ctx.moveTo(xAt(i), yAt(v));
+      drawing = true;
+    });
+    ctx.stroke();
+    ctx.fillStyle = ctx.strokeStyle;
+    ctx.fillRect(PAD.left + size.w + 12, PAD.top + 18 * k, 12, 12);
+    ctx.fillStyle = '#333'; ctx.fillText(s.name, PAD.left + size.w + 30, PAD.top + 18 * k + 10);
+  });
+  hitTest = (x) => {
+    const i = Math.round((x - PAD.left) / size.w * (labels.length - 1));
+    if (i < 0 || i >= labels.length) return null;
+    return [labels[i]].concat(series.map(s => `${s.name}: ${s.values[i] === null ? '-' : s.values[i] + '%'}`
+      + (s.users && s.users[i] ? ` (${s.users[i]})` : ''))).join('\n');
+  };
+}
+
+function heatColor(v) {
+  if (v === null) return '#f4f4f4';
+  const t = Math.max(0, Math.min(1, v / 100));
+  return `rgb(${Math.round(255 - 40 * t)},${Math.round(245 - 200 * t)},${Math.round(200 - 180 * t)})`;
+}
+
+function heatmap(data) {
+  const size = resize();
+  const rows = data.rows.length, cols = data.columns.length;
+  const cw = size.w / Math.max(cols, 1), ch = size.h / Math.max(rows, 1);
+  data.values.forEach((row, r) => row.forEach((v, c) => {
+    ctx.fillStyle = heatColor(v);
+    ctx.fillRect(PAD.left + c * cw, PAD.top + r * ch, Math.ceil(cw), Math.ceil(ch));
+  }));
+  ctx.fillStyle = '#333';
+  const rowStep = Math.max(1, Math.ceil(rows / 32));
+  data.rows.forEach((row, r) => { if (r % rowStep === 0) ctx.fillText(`${row.node.slice(-4)} G${row.gpu}`, 4, PAD.top + r * ch + ch / 2 + 4); });
+  const colStep = Math.max(1, Math.ceil(cols / 12));
+  data.columns.forEach((label, c) => {
+    if (c % colStep) return;
+    ctx.save(); ctx.translate(PAD.left + c * cw, PAD.top + size.h + 12); ctx.rotate(-Math.PI / 6);
+    ctx.fillText(label, -40, 10); ctx.restore();
+  });
+  hitTest = (x, y) => {
+    const c = Math.floor((x - PAD.left) / cw), r = Math.floor((y - PAD.top) / ch);
+    if (c < 0 || c >= cols || r < 0 || r >= rows) return null;
+    const v = data.values[r][c];
+    return `${data.rows[r].node} GPU[${data.rows[r].gpu}]\n${data.columns[c]}: ${v === null ? '-' : v + '%'}`;
+  };
+}
+
+function usersChart(data) {
+  const size = resize();
+  const users = data.users.slice(0, 30);
+  const maxDays = Math.max(1, ...users.map(u => u.gpu_days));
+  const bw = size.w / Math.max(users.length, 1);
+  axes(size, [], maxDays);
+  users.forEach((u, i) => {
+    const h = size.h * u.gpu_days / maxDays;
+    ctx.fillStyle = COLORS[i % COLORS.length];
+    ctx.fillRect(PAD.left + i * bw + 2, PAD.top + size.h - h, bw - 4, h);
+    ctx.save(); ctx.translate(PAD.left + i * bw + bw / 2, PAD.top + size.h + 12); ctx.rotate(-Math.PI / 6);
+    ctx.fillStyle = '#333'; ctx.fillText(u.user, -30, 10); ctx.restore();
+  });
+  ctx.fillStyle = '#333'; ctx.fillText('GPU·天', 8, PAD.top - 6);
+  hitTest = (x) => {
+    const u = users[Math.floor((x - PAD.left) / bw)];
+    if (!u) return null;
+    return `${u.user}\nGPU·天: ${u.gpu_days}\n平均使用率: ${u.mean_usage ?? '-'}%\n平均 VRAM: ${u.mean_vram ?? '-'}%\n`
+      + `節點: ${u.nodes.join(', ')}\n${u.first} ~ ${u.last}`;
+  };
+}
+
+async function render() {
+  const view = $('view').value;
+  document.querySelectorAll('.gpu-only').forEach(el => el.style.display = view === 'gpu' ? '' : 'none');
+  document.querySelectorAll('.heatmap-only').forEach(el => el.style.display = view === 'heatmap' ? '' : 'none');
+  const range = {start: $('start').value, end: $('end').value};
+  const layer = $('layer').value;
+  try {
+    if (view === 'nodes') {
+      const data = await api('nodes', {...range, layer});
+      lineChart(data.dates, Object.entries(data.series).map(([name, values]) => ({name, values})));
+    } else if (view === 'gpu') {
+      const data = await api('gpu', {...range, layer, node: $('node').value, gpu: $('gpu').value,
+                                     resolution: $('resolution').value, points: Math.max(10, Math.round(canvas.clientWidth))});
+      const labels = data.resolution === 'hour'
+        ? data.timestamps.map(ts => new Date((ts + 8 * 3600) * 1000).toISOString().slice(5, 16).replace('T', ' '))
+        : data.dates;
+      lineChart(labels, [{name: `${data.node} GPU[${data.gpu}]`, values: data.values, users: data.users}]);
+    } else if (view === 'heatmap') {
+      heatmap(await api('heatmap', {...range, layer, freq: $('freq').value}));
+    } else {
+      usersChart(await api('users', range));
+    }
+  } catch (e) {
+    resize(); hitTest = () => null;
+    $('status').textContent = `錯誤: ${e.message}`;
+  }
+}
+
+canvas.addEventListener('mousemove', e => {
+  const rect = canvas.getBoundingClientRect();
+  const text = hitTest(e.clientX - rect.left, e.clientY - rect.top);
+  const tip = $('tooltip');
+  if (!text) { tip.style.display = 'none'; return; }
+  tip.textContent = text; tip.style.display = 'block';
+  tip.style.left = (e.pageX + 12) + 'px'; tip.style.top = (e.pageY + 12) + 'px';
+});
+canvas.addEventListener('mouseleave', () => $('tooltip').style.display = 'none');
+
+(async () => {
+  const meta = await api('meta', {});
+  meta.nodes.forEach(n => $('node').add(new Option(n, n)));
+  meta.gpus.forEach(g => $('gpu').add(new Option(`GPU[${g}]`, g)));
+  if (meta.last_date) {
+    const end = new Date(meta.last_date), start = new Date(end.getTime() - 29 * 86400000);
+    $('end').value = meta.last_date;
+    const first = meta.first_date;
+    $('start').value = start.toISOString().slice(0, 10) < first ? first : start.toISOString().slice(0, 10);
+  }
+  document.querySelectorAll('select, input').forEach(el => el.addEventListener('change', render));
+  window.addEventListener('resize', render);
+  render();
+})();
+</script>
+</body>
+</html>
+"""
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+時間序列降採樣模組
+
+時間序列圖把每一筆樣本都交給 ax.plot，數個月或更高頻率的資料每條線就有數十萬點，
+繪製緩慢且線條糊成一片。輸出圖片的寬度只有數千像素，超過的點畫不出差異，
+這裡依圖表寬度與輸出 DPI 決定目標點數，只保留足以呈現形狀的點：
+
+- lttb (預設): Largest-Triangle-Three-Buckets，每個區段保留與前後點構成最大三角形的點，
+  保留趨勢與轉折
+- minmax: 每個像素區段保留最小值與最大值，所有尖峰與低谷都會出現在圖上
+
+資料點數不超過目標點數時原樣回傳，因此短區間的圖表與過去完全相同。
+缺值 (NaN) 造成的斷線會保留：每段連續資料分別降採樣，段與段之間保留一個 NaN 點。
+
+降採樣方法選擇順序: 呼叫參數 > 環境變數 GPU_DOWNSAMPLE (lttb / minmax / off) > lttb
+
+使用方式:
+    fig, ax = plt.subplots(figsize=(15, 8))
+    plot_timeline(ax, data['datetime'], data['usage'], linewidth=1.5)
+
+    x, y = downsample_for_axes(ax, df['datetime'], df['vram_usage'])
+    ax.plot(x, y)
+    ax.fill_between(x, y, alpha=0.3)
+"""
+
+import os
+
+import numpy as np
+
+from render_profiles import get_profile
+
+DOWNSAMPLE_ENV = 'GPU_DOWNSAMPLE'
+METHODS = ('lttb', 'minmax', 'off')
+DEFAULT_METHOD = 'lttb'
+
+# 每個像素欄保留的點數：LTTB 每像素一點即可呈現形狀，minmax 每個區段固定兩點
+POINTS_PER_PIXEL = 1
+# 目標點數下限，避免極小的圖表把資料壓得過度
+MIN_POINTS = 200
+
+
+def get_method(method=None):
+    """
+    取得降採樣方法
+
+    Args:
+        method (str): 指定方法，None 表示依環境變數 GPU_DOWNSAMPLE
+
+    Returns:
+        str: 'lttb'、'minmax' 或 'off'
+    """
+    method = (method or os.environ.get(DOWNSAMPLE_ENV) or DEFAULT_METHOD).lower()
+    if method in ('0', 'false', 'no', 'none'):
+        method = 'off'
+    if method not in METHODS:
+        print(f"警告: 未知的降採樣方法 {method}，改用 {DEFAULT_METHOD}")
+        method = DEFAULT_METHOD
+    return method
+
+
+def target_points(ax, dpi=None):
+    """
+    依座標軸在輸出圖片中的像素寬度計算目標點數
+
+    Args:
+        ax (matplotlib.axes.Axes): 座標軸
+        dpi (float): 輸出 DPI，None 表示目前輸出設定檔的 DPI
+
+    Returns:
+        int: 目標點數
+    """
+    fig = ax.get_figure()
+    dpi = dpi or get_profile().dpi
+    width_px = ax.get_position().width * fig.get_figwidth() * dpi
+    return max(MIN_POINTS, int(width_px * POINTS_PER_PIXEL))
+
+
+def _as_numeric(x):
+    """時間軸轉為可計算面積的 float 陣列（datetime 以奈秒表示）"""
+    values = np.asarray(x)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    if values.dtype == object:
+        # datetime.datetime / pandas.Timestamp 的 object 陣列
+        return np.array([value.timestamp() for value in values], dtype=np.float64)
+    return values.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets 降採樣
+
+    Args:
+        x (numpy.ndarray): 遞增的數值時間軸
+        y (numpy.ndarray): 數值（不可含 NaN）
+        n_out (int): 目標點數（至少 3）
+
+    Returns:
+        numpy.ndarray: 保留的點索引（遞增，含首尾兩點）
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # 首尾之外的點平均分成 n_out - 2 個區段
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # 下一個區段的平均點（最後一個區段以最後一點代替）
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+            next_x, next_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        px, py = x[previous], y[previous]
+        areas = np.abs((px - next_x) * (y[start:end] - py) - (px - x[start:end]) * (next_y - py))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def minmax_indices(x, y, n_out):
+    """
+    每個區段保留最小值與最大值
+
+    Args:
+        x (numpy.ndarray): 遞增的數值時間軸
+        y (numpy.ndarray): 數值（不可含 NaN）
+        n_out (int): 目標點數（每個區段兩點）
+
+    Returns:
+        numpy.ndarray: 保留的點索引（遞增，含首尾兩點）
+    """
+    n = len(y)
+    buckets = n_out // 2
+    if n_out >= n or buckets < 1:
+        return np.arange(n)
+
+    # 依時間而非樣本數切分區段，讓每個區段對應相同的像素寬度
+    edges = np.searchsorted(x, np.linspace(x[0], x[-1], buckets + 1)[1:-1])
+    starts = np.unique(np.concatenate(([0], edges)))
+    starts = starts[starts < n]
+    bucket_of = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+
+    def first_match(extremes):
+        # 每個區段中第一個等於該區段極值的點
+        positions = np.flatnonzero(y == extremes[bucket_of])
+        _, first = np.unique(bucket_of[positions], return_index=True)
+        return positions[first]
+
+    mins = first_match(np.minimum.reduceat(y, starts))
+    maxs = first_match(np.maximum.reduceat(y, starts))
+    return np.unique(np.concatenate((mins, maxs, [0, n - 1])))
+
+
+_METHOD_FUNCTIONS = {'lttb': lttb_indices, 'minmax': minmax_indices}
+
+
+def downsample_indices(x, y, n_out, method=None):
+    """
+    降採樣並保留 NaN 斷線
+
+    Args:
+        x: 時間軸（datetime 或數值），需遞增
+        y: 數值，NaN 表示缺值
+        n_out (int): 目標點數
+        method (str): 'lttb'、'minmax' 或 'off'，None 表示依環境變數
+
+    Returns:
+        numpy.ndarray: 保留的點索引（遞增）
+    """
+    method = get_method(method)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if method == 'off' or n <= n_out:
+        return np.arange(n)
+    x = _as_numeric(x)
+
+    valid = ~np.isnan(y)
+    if valid.all():
+        return _METHOD_FUNCTIONS[method](x, y, n_out)
+
+    # 每段連續資料依長度分配點數，段與段之間保留一個 NaN 讓線條斷開
+    change = np.flatnonzero(np.diff(valid.astype(np.int8))) + 1
+    bounds = np.concatenate(([0], change, [n]))
+    total_valid = int(valid.sum())
+    kept = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if not valid[start]:
+            kept.append(np.array([start]))
+            continue
+        share = max(3, int(round(n_out * (end - start) / max(total_valid, 1))))
+        kept.append(start + _METHOD_FUNCTIONS[method](x[start:end], y[start:end], share))
+    return np.concatenate(kept)
+
+
+def downsample_xy(x, y, n_out, method=None):
+    """
+    降採樣後的 (x, y)，型別與輸入相同（pandas Series 保留其索引與 dtype）
+
+    Returns:
+        tuple: (x, y)
+    """
+    if len(y) <= n_out:
+        return x, y
+    indices = downsample_indices(x, y, n_out, method)
+    if len(indices) == len(y):
+        return x, y
+    return _take(x, indices), _take(y, indices)
+
+
+def _take(values, indices):
+    if hasattr(values, 'iloc'):
+        return values.iloc[indices]
+    if isinstance(values, np.ndarray):
+        return values[indices]
+    return [values[i] for i in indices]
+
+
+def downsample_for_axes(ax, x, y, method=None, dpi=None):
+    """
+    依座標軸的輸出寬度降採樣
+
+    Args:
+        ax (matplotlib.axes.Axes): 要繪製的座標軸
+        x: 時間軸
+        y: 數值
+        method (str): 降採樣方法，None 表示依環境變數
+        dpi (float): 輸出 DPI，None 表示目前輸出設定檔的 DPI
+
+    Returns:
+        tuple: (x, y)
+    """
+    return downsample_xy(x, y, target_points(ax, dpi), method)
+
+
+def plot_timeline(ax, x, y, *args, method=None, **kwargs):
+    """
+    降採樣後呼叫 ax.plot，參數與 ax.plot 相同
+
+    Returns:
+        list: ax.plot 回傳的 Line2D 列表
+    """
+    x, y = downsample_for_axes(ax, x, y, method)
+    return ax.plot(x, y, *args, **kwargs)
@@ -4,68 +4,170 @@
 字體配置模組
 
 此模組提供中文字體的配置功能，確保圖表中的中文文字能正確顯示。
+匯入本模組不會載入 matplotlib；繪圖模組使用這裡的延遲 pyplot，
+第一次繪圖時才匯入 matplotlib 並套用字體。
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
 import os
 import sys
+import json
 from pathlib import Path
 
-def setup_chinese_font():
+from lazy_imports import lazy_import
+
+# 嘗試不同的中文字體列表（按優先順序）
+CHINESE_FONTS = [
+    'Noto Sans CJK TC',      # Ubuntu/Debian 繁體中文（優先）
+    'Noto Sans CJK SC',      # Ubuntu/Debian 簡體中文
+    'Noto Sans CJK JP',      # Ubuntu/Debian 日文
+    'Noto Sans CJK KR',      # Ubuntu/Debian 韓文
+    'Noto Sans',             # 基本 Noto Sans
+    'Source Han Sans TC',    # 思源黑體繁體
+    'Source Han Sans SC',    # 思源黑體簡體
+    'Microsoft YaHei',       # Windows
+    'PingFang SC',           # macOS
+    'SimHei',                # Windows 預設
+    'WenQuanYi Micro Hei',   # Linux 常見中文字體
+    'WenQuanYi Zen Hei',     # Linux 常見中文字體
+    'DejaVu Sans',           # 最後備用
+    'Arial Unicode MS',      # 最後備用
+]
+
+FALLBACK_FONT = 'DejaVu Sans'
+
+# 字體選擇結果的快取檔（設為 off 可停用）
+FONT_CACHE_ENV = 'GPU_FONT_CACHE'
+
+# 本行程已選定的字體
+_selected_font = None
+
+
+def font_cache_path():
     """
-    設定中文字體配置，確保圖表中的中文文字能正確顯示
+    Returns:
+        Path: 字體快取檔路徑；停用快取時為 None
     """
-    # 嘗試不同的中文字體列表（按優先順序）
-    chinese_fonts = [
-        'Noto Sans CJK TC',      # Ubuntu/Debian 繁體中文（優先）
-        'Noto Sans CJK SC',      # Ubuntu/Debian 簡體中文
-        'Noto Sans CJK JP',      # Ubuntu/Debian 日文
-        'Noto Sans CJK KR',      # Ubuntu/Debian 韓文
-        'Noto Sans',             # 基本 Noto Sans
-        'Source Han Sans TC',    # 思源黑體繁體
-        'Source Han Sans SC',    # 思源黑體簡體
-        'Microsoft YaHei',       # Windows
-        'PingFang SC',           # macOS
-        'SimHei',                # Windows 預設
-        'WenQuanYi Micro Hei',   # Linux 常見中文字體
-        'WenQuanYi Zen Hei',     # Linux 常見中文字體
-        'DejaVu Sans',           # 最後備用
-        'Arial Unicode MS',      # 最後備用
-    ]
-    
+    env_value = os.environ.get(FONT_CACHE_ENV)
+    if env_value:
+        return None if env_value.lower() == 'off' else Path(env_value)
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(cache_home) / 'gpu_monitor' / 'font_config.json'
+
+
+def _fontlist_signature():
+    """
+    matplotlib 字體清單快取（fontlist-*.json）的修改時間；字體清單重建後快取即失效
+
+    Returns:
+        list: [檔名, mtime_ns] 列表
+    """
+    import matplotlib
+
+    cache_dir = Path(matplotlib.get_cachedir())
+    signature = []
+    for fontlist in sorted(cache_dir.glob('fontlist-*.json')):
+        try:
+            signature.append([fontlist.name, fontlist.stat().st_mtime_ns])
+        except OSError:
+            continue
+    return signature
+
+
+def _load_cached_font(matplotlib_version):
+    """
+    讀取上次選定的字體（matplotlib 版本與字體清單未變且字體檔仍存在時才有效）
+
+    Returns:
+        str: 字體名稱；快取無效時為 None
+    """
+    path = font_cache_path()
+    if path is None:
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('matplotlib_version') != matplotlib_version:
+        return None
+    if cached.get('fontlist') != _fontlist_signature():
+        return None
+    if cached.get('font') not in CHINESE_FONTS or not os.path.exists(cached.get('path') or ''):
+        return None
+    return cached['font']
+
+
+def _save_cached_font(matplotlib_version, font, font_path):
+    path = font_cache_path()
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'matplotlib_version': matplotlib_version, 'font': font, 'path': font_path,
+                       'fontlist': _fontlist_signature()}, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # 快取只是加速用，無法寫入時下次重新偵測即可
+
+
+def _detect_font(matplotlib_version):
+    """
+    掃描已安裝的字體，選出第一個可用的中文字體並寫入快取
+
+    Returns:
+        str: 字體名稱
+    """
+    import matplotlib.font_manager as fm
+
     # 檢查可用的字體
-    available_fonts = [f.name for f in fm.fontManager.ttflist]
-    
+    available_fonts = {}
+    for f in fm.fontManager.ttflist:
+        available_fonts.setdefault(f.name, f.fname)
+
     # 尋找第一個可用的中文字體
-    selected_font = None
-    for font in chinese_fonts:
+    for font in CHINESE_FONTS:
         if font in available_fonts:
-            selected_font = font
+            _save_cached_font(matplotlib_version, font, available_fonts[font])
+            return font
+    # 沒有找到時不寫入快取，之後安裝的字體下次即可被偵測到
+    return None
+
+
+def setup_chinese_font():
+    """
+    設定中文字體配置，確保圖表中的中文文字能正確顯示
+
+    字體選擇在每個行程只偵測一次，並快取於 font_cache_path()，之後的行程
+    直接使用快取結果；每次呼叫都會重新套用 rcParams。
+
+    Returns:
+        str: 使用的字體名稱
+    """
+    global _selected_font
+    import matplotlib
+
+    if _selected_font is None:
+        font = _load_cached_font(matplotlib.__version__) or _detect_font(matplotlib.__version__)
+        if font:
             print(f"[字體配置] 使用字體: {font}")
-            break
-    
-    if not selected_font:
-        # 如果沒有找到理想的字體，使用系統預設
-        print("[字體配置] 警告: 未找到理想的中文字體，使用系統預設")
-        selected_font = 'DejaVu Sans'
-    
+        else:
+            # 如果沒有找到理想的字體，使用系統預設
+            print("[字體配置] 警告: 未找到理想的中文字體，使用系統預設")
+            font = FALLBACK_FONT
+        _selected_font = font
+
     # 設定 matplotlib 字體配置
-    plt.rcParams['font.sans-serif'] = [selected_font] + chinese_fonts
-    plt.rcParams['axes.unicode_minus'] = False  # 解決負號顯示問題
-    plt.rcParams['font.size'] = 10
-    
-    # 確保字體配置生效
-    try:
-        # 重新設定字體配置
-        plt.rcParams['font.sans-serif'] = [selected_font] + chinese_fonts
-        plt.rcParams['axes.unicode_minus'] = False
-        plt.rcParams['font.size'] = 10
-    except Exception as e:
-        print(f"[字體配置] 警告: 字體配置過程中出現問題: {e}")
-        pass
-    
-    return selected_font
+    matplotlib.rcParams['font.sans-serif'] = [_selected_font] + CHINESE_FONTS
+    matplotlib.rcParams['axes.unicode_minus'] = False  # 解決負號顯示問題
+    matplotlib.rcParams['font.size'] = 10
+    return _selected_font
+
+
+# 延遲載入的 pyplot：第一次使用時才匯入並套用中文字體
+pyplot = lazy_import('matplotlib.pyplot', on_load=lambda module: setup_chinese_font())
+
 
 def get_font_family():
     """
@@ -74,7 +176,8 @@ def get_font_family():
     Returns:
         str: 字體系列名稱
     """
-    return plt.rcParams['font.sans-serif'][0]
+    import matplotlib
+    return matplotlib.rcParams['font.sans-serif'][0]
 
 def test_chinese_display():
     """
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨 GPU / 跨節點相關性與同時忙碌分析
+
+把日期範圍內所有 GPU 的使用率對齊成 [GPU, 時間] 矩陣，各以一次矩陣乘法算出：
+- 相關係數矩陣：每列標準化（缺值以該列平均補上，貢獻為 0）後 Z·Zᵀ
+- 同時忙碌矩陣：忙碌指示矩陣 B（使用率超過門檻為 1）的 B·Bᵀ，即兩張 GPU 同時忙碌的時段數，
+  再換算為 Jaccard 係數（同時忙碌 / 任一忙碌）
+行為相近的 GPU 以平均連結法（UPGMA，距離 = 1 - 相關係數）分群，矩陣依樹狀圖葉序重新排列，
+多 GPU 任務與互相競爭的 GPU 會聚成對角線上的區塊。
+
+時間解析度預設為 1 小時，直接使用 trend_stats 依分區快取的每小時資料；
+指定較細的解析度（例如 10 分鐘）時改為直接讀取原始樣本。
+整個分析只有一次依合併次數的迴圈（分群），數百張 GPU、數個月的資料可在數秒內完成。
+
+使用範例:
+    python3 gpu_correlation.py 2025-09-01 2025-09-30 --data-dir ../data --plots-dir ../plots
+    python3 gpu_correlation.py 2025-09-01 2025-09-07 --resolution 10 --min-corr 0.6
+    python3 gpu_correlation.py 2025-06-01 2025-09-30 --nodes all --busy-threshold 20
+"""
+
+import os
+import re
+import argparse
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from font_config import pyplot as plt
+from lazy_imports import lazy_import
+from render_profiles import save_figure, add_profile_argument, set_profile
+from columnar_csv import read_gpu_columns
+from trend_stats import build_hourly_cube, display_ljust, TAIWAN_OFFSET
+from correlation_options import (DEFAULT_RESOLUTION, DEFAULT_BUSY_THRESHOLD, DEFAULT_MIN_CORRELATION,
+                                 DEFAULT_TOP_PAIRS, add_analysis_arguments, check_analysis_arguments, parse_nodes)
+
+mdates = lazy_import('matplotlib.dates')
+mpatches = lazy_import('matplotlib.patches')
+
+NODES = ['colab-gpu1', 'colab-gpu2', 'colab-gpu3', 'colab-gpu4']
+GPU_INDICES = list(range(8))
+DATE_FORMAT = '%Y-%m-%d'
+DATE_DIR_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# GPU 數不超過此值時標示每列名稱
+MAX_TICK_LABELS = 64
+# 時間軸圖中最多顯示的群數（依大小排序）
+MAX_TIMELINE_CLUSTERS = 12
+
+# usage: [GPU, 時間] 平均使用率，缺資料為 NaN；labels / row_nodes 與列對應
+GPUActivity = namedtuple('GPUActivity', ['labels', 'row_nodes', 'row_gpus', 'start_date', 'end_date',
+                                         'resolution', 'usage'])
+
+# correlation / coactive / jaccard: [GPU, GPU]；order: 葉序；clusters: 每列的群編號（依葉序由 0 起算）
+CorrelationResult = namedtuple('CorrelationResult', ['correlation', 'coactive', 'jaccard', 'busy',
+                                                     'order', 'clusters'])
+
+
+def discover_nodes(data_dir):
+    """
+    Returns:
+        list: 資料目錄中含有日期分區的節點目錄（已排序）
+    """
+    nodes = []
+    if not os.path.isdir(data_dir):
+        return nodes
+    for name in sorted(os.listdir(data_dir)):
+        path = os.path.join(data_dir, name)
+        if os.path.isdir(path) and any(DATE_DIR_PATTERN.match(entry) for entry in os.listdir(path)):
+            nodes.append(name)
+    return nodes
+
+
+def _date_strings(start_date, end_date):
+    start = datetime.strptime(start_date, DATE_FORMAT)
+    days = (datetime.strptime(end_date, DATE_FORMAT) - start).days
+    return [(start + timedelta(days=offset)).strftime(DATE_FORMAT) for offset in range(days + 1)]
+
+
+def _raw_bins(data_dir, nodes, dates, gpu_indices, resolution):
+    """以原始樣本建構 [節點·GPU, 日期·每日格數] 的加總與筆數"""
+    per_day = 1440 // resolution
+    shape = (len(nodes) * len(gpu_indices), len(dates) * per_day)
+    sums = np.zeros(shape)
+    counts = np.zeros(shape)
+    for node_pos, node in enumerate(nodes):
+        for day, date_str in enumerate(dates):
+            partition = os.path.join(data_dir, node, date_str)
+            if not os.path.isdir(partition):
+                continue
+            for gpu_pos, gpu_index in enumerate(gpu_indices):
+                path = os.path.join(partition, f"gpu{gpu_index}_{date_str}.csv")
+                if not os.path.exists(path):
+                    continue
+                arrays = read_gpu_columns(path).numpy()
+                present = ~np.isnan(arrays['usage'])
+                if not present.any():
+                    continue
+                seconds = (arrays['timestamp'][present].astype(np.int64) + TAIWAN_OFFSET) % 86400
+                bins = day * per_day + seconds // (resolution * 60)
+                row = node_pos * len(gpu_indices) + gpu_pos
+                sums[row] += np.bincount(bins, weights=arrays['usage'][present], minlength=shape[1])
+                counts[row] += np.bincount(bins, minlength=shape[1])
+    return sums, counts
+
+
+def build_activity_matrix(data_dir, nodes, start_date, end_date, gpu_indices=GPU_INDICES,
+                          resolution=DEFAULT_RESOLUTION):
+    """
+    建構對齊的 [GPU, 時間] 使用率矩陣，沒有任何資料的 GPU 不列入
+
+    Args:
+        data_dir (str): 資料目錄
+        nodes (list): 節點名稱列表
+        start_date (str): 開始日期 (YYYY-MM-DD)
+        end_date (str): 結束日期 (YYYY-MM-DD)
+        gpu_indices (iterable): GPU 索引
+        resolution (int): 時間解析度（分鐘），60 使用每小時快取
+
+    Returns:
+        GPUActivity: 使用率矩陣與列標籤
+    """
+    nodes = list(nodes)
+    gpu_indices = list(gpu_indices)
+    if resolution == 60:
+        cube = build_hourly_cube(data_dir, nodes, start_date, end_date, gpu_indices)
+        rows = len(nodes) * len(gpu_indices)
+        sums = cube.usage_sum.reshape(rows, -1)
+        counts = cube.usage_count.reshape(rows, -1)
+    else:
+        sums, counts = _raw_bins(data_dir, nodes, _date_strings(start_date, end_date), gpu_indices, resolution)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        usage = np.where(counts > 0, sums / counts, np.nan)
+
+    keep = counts.sum(axis=1) > 0
+    row_nodes = np.repeat(nodes, len(gpu_indices))[keep]
+    row_gpus = np.tile(gpu_indices, len(nodes))[keep]
+    labels = [f"{node}:{gpu_index}" for node, gpu_index in zip(row_nodes, row_gpus)]
+    return GPUActivity(labels, list(row_nodes), list(row_gpus), start_date, end_date, resolution, usage[keep])
+
+
+def correlation_matrix(usage):
+    """
+    相關係數矩陣（一次矩陣乘法）
+
+    每列減去平均、除以標準差與 sqrt(有效筆數)，缺值補 0，使對角線恰為 1；
+    兩列重疊的有效時段較少時，相關係數會依比例縮小。沒有變化的列與其他列的相關為 0。
+
+    Args:
+        usage (numpy.ndarray): [GPU, 時間]，缺資料為 NaN
+
+    Returns:
+        numpy.ndarray: [GPU, GPU] 相關係數
+    """
+    present = ~np.isnan(usage)
+    count = present.sum(axis=1)
+    filled = np.where(present, usage, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = filled.sum(axis=1) / count
+        centered = np.where(present, usage - mean[:, None], 0.0)
+        scale = np.sqrt((centered * centered).sum(axis=1))
+        z = np.where(scale[:, None] > 0, centered / scale[:, None], 0.0)
+    correlation = z @ z.T
+    np.fill_diagonal(correlation, 1.0)
+    return np.clip(correlation, -1.0, 1.0)
+
+
+def coactivity_matrix(usage, busy_threshold=DEFAULT_BUSY_THRESHOLD):
+    """
+    同時忙碌矩陣（一次矩陣乘法）
+
+    Args:
+        usage (numpy.ndarray): [GPU, 時間]，缺資料視為不忙碌
+        busy_threshold (float): 使用率超過此值視為忙碌 (%)
+
+    Returns:
+        tuple: (同時忙碌時段數 [GPU, GPU]、Jaccard 係數 [GPU, GPU]、各 GPU 忙碌時段數 [GPU])
+    """
+    with np.errstate(invalid='ignore'):
+        busy = (usage > busy_threshold).astype(float)
+    coactive = busy @ busy.T
+    counts = np.diag(coactive).copy()
+    union = counts[:, None] + counts[None, :] - coactive
+    with np.errstate(invalid='ignore', divide='ignore'):
+        jaccard = np.where(union > 0, coactive / union, 0.0)
+    return coactive, jaccard, counts
+
+
+def average_linkage(distance, cut):
+    """
+    平均連結法（UPGMA）階層分群，以 Lance-Williams 公式向量化更新距離
+
+    Args:
+        distance (numpy.ndarray): [n, n] 對稱距離矩陣
+        cut (float): 群間平均距離超過此值時不再合併（決定分群結果）
+
+    Returns:
+        tuple: (樹狀圖葉序 [n]、每個項目的群編號 [n]，群依葉序由 0 起算)
+    """
+    n = len(distance)
+    if n == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    dist = np.array(distance, dtype=float)
+    np.fill_diagonal(dist, np.inf)
+    size = np.ones(n)
+    members = [[i] for i in range(n)]
+    groups = None
+
+    for _ in range(n - 1):
+        flat = int(np.argmin(dist))
+        i, j = divmod(flat, n)
+        height = dist[i, j]
+        if groups is None and height > cut:
+            # 平均連結的合併高度單調遞增，第一次超過門檻時的各群即為分群結果
+            groups = [list(group) for group in members if group]
+        merged = (size[i] * dist[i] + size[j] * dist[j]) / (size[i] + size[j])
+        dist[i] = merged
+        dist[:, i] = merged
+        dist[j] = np.inf
+        dist[:, j] = np.inf
+        dist[i, i] = np.inf
+        size[i] += size[j]
+        members[i] = members[i] + members[j]
+        members[j] = []
+
+    order = np.array(next(group for group in members if group), dtype=int)
+    if groups is None:
+        groups = [list(order)]
+    position = np.empty(n, dtype=int)
+    position[order] = np.arange(n)
+    clusters = np.empty(n, dtype=int)
+    for label, group in enumerate(sorted(groups, key=lambda group: position[group].min())):
+        clusters[group] = label
+    return order, clusters
+
+
+def analyze(activity, busy_threshold=DEFAULT_BUSY_THRESHOLD, min_correlation=DEFAULT_MIN_CORRELATION):
+    """
+    計算相關係數、同時忙碌矩陣與分群
+
+    Args:
+        activity (GPUActivity): 使用率矩陣
+        busy_threshold (float): 忙碌門檻 (%)
+        min_correlation (float): 群內平均相關係數下限
+
+    Returns:
+        CorrelationResult: 分析結果
+    """
+    correlation = correlation_matrix(activity.usage)
+    coactive, jaccard, busy = coactivity_matrix(activity.usage, busy_threshold)
+    order, clusters = average_linkage(1.0 - correlation, 1.0 - min_correlation)
+    return CorrelationResult(correlation, coactive, jaccard, busy, order, clusters)
+
+
+def top_pairs(result, count=DEFAULT_TOP_PAIRS):
+    """
+    Returns:
+        list: 相關係數最高的 (列 i, 列 j, 相關係數) 配對
+    """
+    upper_i, upper_j = np.triu_indices(len(result.correlation), k=1)
+    values = result.correlation[upper_i, upper_j]
+    picked = np.argsort(values, kind='stable')[::-1][:count]
+    return [(int(upper_i[k]), int(upper_j[k]), float(values[k])) for k in picked]
+
+
+def cluster_summary(activity, result):
+    """
+    Returns:
+        list: 多於一張 GPU 的群: (顯示編號, 列索引陣列, 群內平均相關係數, 群內平均 Jaccard)，依大小排序，
+        顯示編號由 1 起算
+    """
+    summary = []
+    for label in np.unique(result.clusters):
+        rows = np.flatnonzero(result.clusters == label)
+        if len(rows) < 2:
+            continue
+        block = np.ix_(rows, rows)
+        pairs = len(rows) * (len(rows) - 1)
+        mean_corr = (result.correlation[block].sum() - len(rows)) / pairs
+        mean_jaccard = (result.jaccard[block].sum() - np.trace(result.jaccard[block])) / pairs
+        summary.append((rows, float(mean_corr), float(mean_jaccard)))
+    summary.sort(key=lambda item: (-len(item[0]), -item[1]))
+    return [(number, rows, mean_corr, mean_jaccard)
+            for number, (rows, mean_corr, mean_jaccard) in enumerate(summary, start=1)]
+
+
+def node_correlation(activity):
+    """
+    節點間的相關係數：各節點所有 GPU 的平均使用率序列
+
+    Returns:
+        tuple: (節點列表, [節點, 節點] 相關係數)
+    """
+    nodes = list(dict.fromkeys(activity.row_nodes))
+    row_nodes = np.array(activity.row_nodes)
+    present = ~np.isnan(activity.usage)
+    filled = np.where(present, activity.usage, 0.0)
+    # 以一次矩陣乘法把 GPU 列彙整為節點列
+    membership = (row_nodes[None, :] == np.array(nodes)[:, None]).astype(float)
+    sums = membership @ filled
+    counts = membership @ present
+    with np.errstate(invalid='ignore', divide='ignore'):
+        series = np.where(counts > 0, sums / counts, np.nan)
+    return nodes, correlation_matrix(series)
+
+
+def print_report(activity, result, pairs=DEFAULT_TOP_PAIRS):
+    hours_per_bin = activity.resolution / 60.0
+    print("\n=== GPU 相關性與同時忙碌分析 ===")
+    print(f"分析期間: {activity.start_date} 至 {activity.end_date}，{len(activity.labels)} 張 GPU，"
+          f"時間解析度 {activity.resolution} 分鐘")
+
+    print("\n相關性最高的 GPU 配對:")
+    for i, j, value in top_pairs(result, pairs):
+        print(f"  {display_ljust(activity.labels[i], 16)} ↔ {display_ljust(activity.labels[j], 16)} "
+              f"相關 {value:+.2f}  同時忙碌 {result.coactive[i, j] * hours_per_bin:7.1f} 小時  "
+              f"Jaccard {result.jaccard[i, j]:.2f}")
+
+    summary = cluster_summary(activity, result)
+    print(f"\n行為相近的 GPU 群組 ({len(summary)} 群):")
+    for label, rows, mean_corr, mean_jaccard in summary[:MAX_TIMELINE_CLUSTERS]:
+        names = ', '.join(activity.labels[row] for row in rows[:8]) + (' ...' if len(rows) > 8 else '')
+        cross_node = len({activity.row_nodes[row] for row in rows}) > 1
+        print(f"  群 {label}: {len(rows)} 張 GPU{'（跨節點）' if cross_node else ''}，"
+              f"平均相關 {mean_corr:.2f}，平均 Jaccard {mean_jaccard:.2f}")
+        print(f"    {names}")
+
+    nodes, node_corr = node_correlation(activity)
+    if 1 < len(nodes) <= 8:
+        print("\n節點間相關係數:")
+        print(" " * 14 + "".join(f"{node:>12}" for node in nodes))
+        for node, row in zip(nodes, node_corr):
+            print(f"  {node:<12}" + "".join(f"{value:12.2f}" for value in row))
+
+
+def _cluster_boxes(ax, clusters, order_clusters):
+    """在重新排列的矩陣對角線上框出多於一張 GPU 的群"""
+    bounds = np.flatnonzero(np.diff(order_clusters)) + 1
+    starts = np.concatenate([[0], bounds])
+    stops = np.concatenate([bounds, [len(order_clusters)]])
+    for start, stop in zip(starts, stops):
+        if stop - start < 2:
+            continue
+        ax.add_patch(mpatches.Rectangle((start - 0.5, start - 0.5), stop - start, stop - start,
+                                        fill=False, edgecolor='black', linewidth=1.2))
+
+
+def plot_correlation(activity, result, save_path, busy_threshold=DEFAULT_BUSY_THRESHOLD):
+    """
+    單張圖表：依分群排序的相關係數矩陣、同時忙碌 (Jaccard) 矩陣與各群忙碌比例時間軸
+
+    Returns:
+        str: 實際輸出的檔案路徑
+    """
+    order = result.order
+    labels = [activity.labels[row] for row in order]
+    order_clusters = result.clusters[order]
+    count = len(order)
+
+    fig = plt.figure(figsize=(20, 14))
+    grid = fig.add_gridspec(2, 2, height_ratios=[3, 1.3], hspace=0.3, wspace=0.25)
+    ax_corr = fig.add_subplot(grid[0, 0])
+    ax_co = fig.add_subplot(grid[0, 1])
+    ax_time = fig.add_subplot(grid[1, :])
+
+    panels = ((ax_corr, result.correlation, 'RdBu_r', (-1, 1), '相關係數'),
+              (ax_co, result.jaccard, 'viridis', (0, 1), f'同時忙碌 Jaccard (使用率 > {busy_threshold:g}%)'))
+    for ax, matrix, cmap, (vmin, vmax), title in panels:
+        image = ax.imshow(matrix[np.ix_(order, order)], cmap=cmap, vmin=vmin, vmax=vmax,
+                          interpolation='nearest', aspect='equal')
+        fig.colorbar(image, ax=ax, fraction=0.046, pad=0.04)
+        _cluster_boxes(ax, result.clusters, order_clusters)
+        ax.set_title(title, fontsize=13, fontweight='bold')
+        if count <= MAX_TICK_LABELS:
+            fontsize = 8 if count <= 32 else 5
+            ax.set_xticks(range(count))
+            ax.set_yticks(range(count))
+            ax.set_xticklabels(labels, rotation=90, fontsize=fontsize)
+            ax.set_yticklabels(labels, fontsize=fontsize)
+        else:
+            ax.set_xticks([])
+            ax.set_yticks([])
+            ax.set_xlabel(f'{count} 張 GPU（依分群排序）')
+
+    # 時間軸：各群在每個時段的忙碌比例（第一列為全部 GPU）
+    with np.errstate(invalid='ignore'):
+        busy = (activity.usage > busy_threshold).astype(float)
+    summary = cluster_summary(activity, result)[:MAX_TIMELINE_CLUSTERS]
+    rows = [busy.mean(axis=0)] + [busy[members].mean(axis=0) for _, members, _, _ in summary]
+    row_labels = ['全部 GPU'] + [f"群 {label} ({len(members)})" for label, members, _, _ in summary]
+    start = mdates.date2num(datetime.strptime(activity.start_date, DATE_FORMAT))
+    end = mdates.date2num(datetime.strptime(activity.end_date, DATE_FORMAT) + timedelta(days=1))
+    image = ax_time.imshow(np.vstack(rows), cmap='magma', vmin=0, vmax=1, aspect='auto',
+                           interpolation='nearest', extent=[start, end, len(rows) - 0.5, -0.5])
+    fig.colorbar(image, ax=ax_time, fraction=0.02, pad=0.01, label='忙碌比例')
+    ax_time.set_yticks(range(len(rows)))
+    ax_time.set_yticklabels(row_labels, fontsize=9)
+    ax_time.xaxis_date()
+    ax_time.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d'))
+    plt.setp(ax_time.xaxis.get_majorticklabels(), rotation=45)
+    ax_time.set_title('各群忙碌比例時間軸', fontsize=13, fontweight='bold')
+
+    fig.suptitle(f'GPU 相關性與同時忙碌分析\n期間: {activity.start_date} 至 {activity.end_date}，'
+                 f'{count} 張 GPU，{len(summary)} 個群組，解析度 {activity.resolution} 分鐘',
+                 fontsize=16, fontweight='bold')
+
+    save_path = save_figure(save_path, fig)
+    plt.close(fig)
+    return save_path
+
+
+def run_correlation_analysis(start_date, end_date, data_dir="../data", plots_dir="../plots", nodes=None,
+                             gpu_indices=GPU_INDICES, resolution=DEFAULT_RESOLUTION,
+                             busy_threshold=DEFAULT_BUSY_THRESHOLD, min_correlation=DEFAULT_MIN_CORRELATION,
+                             pairs=DEFAULT_TOP_PAIRS):
+    """
+    建構矩陣、分析並輸出報告與圖表
+
+    Args:
+        nodes (list): 節點列表，None 為預設的 4 個節點，['all'] 為資料目錄中的所有節點
+
+    Returns:
+        str: 圖表路徑，沒有資料時為 None
+    """
+    if nodes is None:
+        nodes = NODES
+    elif list(nodes) == ['all']:
+        nodes = discover_nodes(data_dir)
+    if not nodes:
+        print(f"在 {data_dir} 中找不到任何節點資料")
+        return None
+    activity = build_activity_matrix(data_dir, nodes, start_date, end_date, gpu_indices, resolution)
+    if len(activity.labels) < 2:
+        print(f"期間 {start_date} 至 {end_date} 內有資料的 GPU 少於 2 張，無法分析相關性")
+        return None
+
+    result = analyze(activity, busy_threshold, min_correlation)
+    print_report(activity, result, pairs)
+
+    os.makedirs(plots_dir, exist_ok=True)
+    save_path = os.path.join(plots_dir, f'gpu_correlation_{start_date}_to_{end_date}.png')
+    save_path = plot_correlation(activity, result, save_path, busy_threshold)
+    print(f"GPU 相關性分析圖已保存至: {save_path}")
+    return save_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='跨 GPU / 跨節點相關性與同時忙碌分析',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('使用範例:')[1],
+    )
+    parser.add_argument('start_date', help='開始日期 (YYYY-MM-DD)')
+    parser.add_argument('end_date', help='結束日期 (YYYY-MM-DD)')
+    parser.add_argument('--data-dir', default='../data', help='資料目錄路徑')
+    parser.add_argument('--plots-dir', default='../plots', help='圖表輸出目錄')
+    add_analysis_arguments(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    if args.profile:
+        set_profile(args.profile)
+
+    try:
+        _date_strings(args.start_date, args.end_date)
+    except ValueError:
+        print("錯誤: 日期格式錯誤，請使用 YYYY-MM-DD")
+        return 1
+    error = check_analysis_arguments(args)
+    if error or args.start_date > args.end_date:
+        print(f"錯誤: {error or '開始日期不能晚於結束日期'}")
+        return 1
+
+    path = run_correlation_analysis(args.start_date, args.end_date, args.data_dir, args.plots_dir,
+                                    parse_nodes(args.nodes), resolution=args.resolution,
+                                    busy_threshold=args.busy_threshold, min_correlation=args.min_corr,
+                                    pairs=args.pairs)
+    return 0 if path else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+每 GPU 時間序列 CSV 讀取模組
+
+統一讀取 gpu{index}_{date}.csv，支援兩種檔案格式（schema）：
+- v1: 舊版無標頭，3 欄 (時間戳, 日期時間, GPU使用率)
+- v2: write_gpu_csv / daily_gpu_log.sh 產生的中文標頭，4 欄
+      (時間戳,日期時間,GPU使用率(%),VRAM使用率(%))
+
+每個檔案只偵測一次格式並快取（以修改時間與大小判斷是否失效），
+讀取時只取需要的欄位、指定固定型別，並直接由時間戳計算時間，
+不再逐列解析日期字串。
+"""
+
+import os
+import csv
+from collections import namedtuple
+from datetime import timedelta
+
+from lazy_imports import lazy_import, module_available
+
+pd = lazy_import('pandas')
+
+# 與 python/daily_gpu_log.py 相同：檔案中的日期時間為台灣時間 (UTC+8)
+TAIWAN_UTC_OFFSET = timedelta(hours=8)
+
+GPUCSVSchema = namedtuple('GPUCSVSchema', ['version', 'has_header', 'columns'])
+
+# columns: 邏輯欄位名稱 -> 檔案中的欄位索引
+SCHEMA_V1 = GPUCSVSchema('v1', False, {'timestamp': 0, 'datetime': 1, 'usage': 2})
+SCHEMA_V2 = GPUCSVSchema('v2', True, {'timestamp': 0, 'datetime': 1, 'usage': 2, 'vram': 3})
+SCHEMA_V2_HEADERLESS = GPUCSVSchema('v2-headerless', False, {'timestamp': 0, 'datetime': 1, 'usage': 2, 'vram': 3})
+
+V2_HEADER_FIRST_COLUMN = '時間戳'
+
+COLUMN_DTYPES = {'timestamp': 'int64', 'usage': 'float64', 'vram': 'float64'}
+
+# path -> (mtime_ns, size, schema)
+_schema_cache = {}
+
+# 只檢查是否安裝，不在匯入時載入 pyarrow
+_DEFAULT_ENGINE = 'pyarrow' if module_available('pyarrow') else 'c'
+
+
+def detect_schema(file_path):
+    """
+    偵測檔案格式版本，結果依檔案快取
+
+    Args:
+        file_path (str): CSV 檔案路徑
+
+    Returns:
+        GPUCSVSchema: 檔案格式，若檔案為空則返回 None
+    """
+    stat = os.stat(file_path)
+    cached = _schema_cache.get(file_path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        first_row = next(csv.reader(f), None)
+
+    if not first_row:
+        schema = None
+    elif first_row[0].strip().lstrip('﻿') == V2_HEADER_FIRST_COLUMN:
+        schema = SCHEMA_V2
+    elif len(first_row) >= 4:
+        schema = SCHEMA_V2_HEADERLESS
+    else:
+        schema = SCHEMA_V1
+
+    _schema_cache[file_path] = (stat.st_mtime_ns, stat.st_size, schema)
+    return schema
+
+
+def clear_schema_cache():
+    """清除格式偵測快取"""
+    _schema_cache.clear()
+
+
+def _read_columns(file_path, schema, wanted, engine):
+    indices = [schema.columns[name] for name in wanted]
+    return pd.read_csv(
+        file_path,
+        header=0 if schema.has_header else None,
+        usecols=indices,
+        dtype={index: COLUMN_DTYPES[name] for name, index in zip(wanted, indices)},
+        engine=engine,
+    )
+
+
+def _cast_columns(df):
+    # pyarrow 引擎不套用以欄位索引指定的 dtype，寬鬆模式也由內容推斷型別：統一轉為固定型別
+    mismatched = {name: COLUMN_DTYPES[name] for name in df.columns if df[name].dtype != COLUMN_DTYPES[name]}
+    return df.astype(mismatched) if mismatched else df
+
+
+def _empty_columns(schema, wanted):
+    # 只有標頭列、沒有資料列的檔案：pandas 無法把以索引指定的 dtype 對應到欄位
+    # (IndexError)，直接建立具正確型別的空表，欄位順序與 usecols 相同
+    names = [name for _, name in sorted((schema.columns[name], name) for name in wanted)]
+    return pd.DataFrame({name: pd.Series(dtype=COLUMN_DTYPES[name]) for name in names})
+
+
+def read_gpu_csv(file_path, columns=('usage', 'vram'), parse_datetime=True, engine=None):
+    """
+    讀取單一 GPU 的時間序列 CSV
+
+    Args:
+        file_path (str): CSV 檔案路徑
+        columns (tuple): 需要的數值欄位 ('usage' 與/或 'vram')；檔案沒有的欄位會略過
+        parse_datetime (bool): 是否由時間戳產生 datetime 欄位（台灣時間）
+        engine (str): pandas 讀取引擎，預設有 pyarrow 時使用 pyarrow
+
+    Returns:
+        pandas.DataFrame: 包含 timestamp、(datetime)、以及要求的數值欄位
+    """
+    schema = detect_schema(file_path)
+    if not schema:
+        return pd.DataFrame(columns=['timestamp', 'datetime'] + list(columns))
+
+    wanted = ['timestamp'] + [name for name in columns if name in schema.columns]
+    # usecols 依檔案欄位順序回傳，重新命名為邏輯欄位
+    names = [name for _, name in sorted((schema.columns[name], name) for name in wanted)]
+    engine = engine or _DEFAULT_ENGINE
+    try:
+        df = _cast_columns(_read_columns(file_path, schema, wanted, engine).set_axis(names, axis=1))
+    except IndexError:
+        df = _empty_columns(schema, wanted)
+    except ValueError:
+        # 檔案中有非數值內容（例如 N/A 或截斷的列）時，改用寬鬆模式逐欄轉換
+        indices = [schema.columns[name] for name in wanted]
+        df = pd.read_csv(file_path, header=0 if schema.has_header else None, usecols=indices)
+        df.columns = names
+        df = df.apply(pd.to_numeric, errors='coerce')
+        df = _cast_columns(df.dropna(subset=['timestamp']))
+
+    if parse_datetime:
+        df.insert(1, 'datetime', pd.to_datetime(df['timestamp'], unit='s') + TAIWAN_UTC_OFFSET)
+    return df
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共用的 GPU 資料集
+
+一次載入日期範圍內所有節點的每日平均檔（average_{date}.csv），
+提供 GPU 使用率、VRAM 使用率與使用者三個維度的 [節點·GPU, 日期] 矩陣，
+讓同一批報表中的每張圖表共用同一份資料，不再各自重複讀取相同的檔案。
+
+使用方式:
+    dataset = GPUDataset('../data', '2025-05-23', '2025-05-26')
+    quick_nodes_trend('2025-05-23', '2025-05-26', dataset=dataset)
+    quick_gpu_heatmap('2025-05-23', '2025-05-26', dataset=dataset)
+"""
+
+import os
+
+import numpy as np
+
+from lazy_imports import lazy_import
+from heatmap_data import build_heatmap_data, aggregate_columns
+from chunked_reader import fold_heatmap_data
+
+pd = lazy_import('pandas')
+
+NODES = ['colab-gpu1', 'colab-gpu2', 'colab-gpu3', 'colab-gpu4']
+GPU_INDICES = list(range(8))
+
+# 不計入活躍使用者的名稱（與各繪圖函數原本的判斷相同）
+INACTIVE_USERS = ('未使用', '未知')
+
+
+class GPUDataset:
+    def __init__(self, data_dir, start_date, end_date, nodes=None, gpu_indices=None):
+        """
+        載入日期範圍內的每日平均資料
+
+        Args:
+            data_dir (str): 資料目錄
+            start_date (str): 開始日期 (YYYY-MM-DD)
+            end_date (str): 結束日期 (YYYY-MM-DD)
+            nodes (list): 節點名稱列表，預設為所有節點
+            gpu_indices (list): GPU 索引列表，預設為 0-7
+        """
+        self.data_dir = data_dir
+        self.start_date = start_date
+        self.end_date = end_date
+        self.nodes = list(nodes or NODES)
+        self.gpu_indices = list(GPU_INDICES if gpu_indices is None else gpu_indices)
+        self.data = build_heatmap_data(data_dir, self.nodes, start_date, end_date, self.gpu_indices)
+        self.date_strs = self.data.dates
+        self.dates = pd.to_datetime(self.date_strs)
+
+    def covers(self, data_dir, start_date, end_date, nodes=None, gpu_indices=None):
+        """
+        是否可直接用於指定的資料目錄、日期範圍、節點與 GPU
+
+        Returns:
+            bool: 是否相符
+        """
+        return (os.path.abspath(data_dir) == os.path.abspath(self.data_dir)
+                and start_date == self.start_date and end_date == self.end_date
+                and (nodes is None or list(nodes) == self.nodes)
+                and (gpu_indices is None or list(gpu_indices) == self.gpu_indices))
+
+    def _rows(self, node):
+        base = self.nodes.index(node) * len(self.gpu_indices)
+        return slice(base, base + len(self.gpu_indices))
+
+    def _row(self, node, gpu_index):
+        return self.nodes.index(node) * len(self.gpu_indices) + self.gpu_indices.index(gpu_index)
+
+    def node_matrix(self, node, layer='usage'):
+        """
+        Args:
+            node (str): 節點名稱
+            layer (str): 'usage'、'vram' 或 'users'
+
+        Returns:
+            numpy.ndarray: [GPU, 日期] 矩陣，缺資料為 NaN（users 為空字串）
+        """
+        return getattr(self.data, layer)[self._rows(node)]
+
+    def gpu_series(self, node, gpu_index, layer='usage'):
+        """
+        Returns:
+            numpy.ndarray: 單一 GPU 每日的數值，缺資料為 NaN（users 為空字串）
+        """
+        return getattr(self.data, layer)[self._row(node, gpu_index)]
+
+    def node_daily_mean(self, node, layer='usage', fill=0.0):
+        """
+        節點每日所有 GPU 的平均值
+
+        Args:
+            node (str): 節點名稱
+            layer (str): 'usage' 或 'vram'
+            fill (float): 當天沒有資料時的填補值
+
+        Returns:
+            numpy.ndarray: 每日平均值
+        """
+        matrix = self.node_matrix(node, layer)
+        present = ~np.isnan(matrix)
+        counts = present.sum(axis=0)
+        sums = np.where(present, matrix, 0.0).sum(axis=0)
+        return np.where(counts > 0, sums / np.maximum(counts, 1), fill)
+
+    def active_users(self, node, col, layer='usage', predicate=None, exclude=INACTIVE_USERS):
+        """
+        某節點某一天的使用者（依 GPU 順序、不重複）
+
+        Args:
+            node (str): 節點名稱
+            col (int): 日期欄位索引（可為負數，-1 表示最後一天）
+            layer (str): predicate 判斷所用的圖層
+            predicate (callable): 數值篩選條件，例如 lambda v: v > 1；None 表示只要有資料即可
+            exclude (tuple): 不計入的使用者名稱
+
+        Returns:
+            list: 使用者名稱
+        """
+        values = self.node_matrix(node, layer)[:, col]
+        users = []
+        for user, value in zip(self.node_matrix(node, 'users')[:, col], values):
+            if not user or user in exclude or np.isnan(value):
+                continue
+            if predicate is not None and not predicate(value):
+                continue
+            if user not in users:
+                users.append(user)
+        return users
+
+
+def ensure_dataset(dataset, data_dir, start_date, end_date, nodes=None, gpu_indices=None):
+    """
+    繪圖函數共用：傳入的資料集相符時直接使用，否則載入新的資料集
+
+    Args:
+        dataset (GPUDataset): 呼叫端提供的資料集，可為 None
+
+    Returns:
+        GPUDataset: 可用的資料集
+    """
+    if dataset is not None and dataset.covers(data_dir, start_date, end_date, nodes, gpu_indices):
+        return dataset
+    return GPUDataset(data_dir, start_date, end_date, nodes, gpu_indices)
+
+
+def heatmap_columns(dataset, data_dir, start_date, end_date, nodes=None, gpu_indices=None, freq='auto'):
+    """
+    熱力圖共用：傳入的資料集相符時直接彙整其欄位，否則逐月分塊讀取並彙整
+    （多年範圍不建構完整的逐日矩陣，記憶體上限見 chunked_reader）
+
+    Args:
+        dataset (GPUDataset): 呼叫端提供的資料集，可為 None
+        freq (str): 'auto'、'D'、'W' 或 'M'
+
+    Returns:
+        HeatmapData: 彙整後的熱力圖資料
+    """
+    if dataset is not None and dataset.covers(data_dir, start_date, end_date, nodes, gpu_indices):
+        return aggregate_columns(dataset.data, freq)
+    return fold_heatmap_data(data_dir, list(nodes or NODES), start_date, end_date,
+                             GPU_INDICES if gpu_indices is None else gpu_indices, freq)
@@ -11,10 +11,6 @@ AMD GPU 使用率趨勢視覺化工具
 5. 熱力圖顯示
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import seaborn as sns
 import numpy as np
 from datetime import datetime, timedelta
 import os
@@ -25,10 +21,22 @@ import warnings
 warnings.filterwarnings('ignore')
 
 # 導入字體配置模組
-from font_config import setup_chinese_font
+from font_config import pyplot as plt
+from lazy_imports import lazy_import
+from render_profiles import save_figure, add_profile_argument, set_profile
+from downsample import plot_timeline, target_points
+from gpu_csv_reader import read_gpu_csv, TAIWAN_UTC_OFFSET
+from heatmap_data import row_keys, layer_frame, heatmap_layout, column_axis_label, title_note
+from chunked_reader import iter_gpu_samples, fold_downsampled, fold_heatmap_data
 
-# 設定中文字體
-setup_chinese_font()
+# 分位數摘要由收集器寫入，模組位於 python/
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+
+# pandas 在第一次讀取資料時、matplotlib 與 seaborn 在第一次繪圖時才載入，中文字體隨 pyplot 一併套用
+pd = lazy_import('pandas')
+mdates = lazy_import('matplotlib.dates')
+sns = lazy_import('seaborn')
 
 class GPUTrendVisualizer:
     def __init__(self, data_dir="../data"):
@@ -88,12 +96,8 @@ class GPUTrendVisualizer:
             return None
             
         try:
-            # 讀取 CSV 數據
-            df = pd.read_csv(file_path, header=None, 
-                           names=['timestamp', 'datetime', 'usage'])
-            df['datetime'] = pd.to_datetime(df['datetime'])
-            df['usage'] = pd.to_numeric(df['usage'], errors='coerce')
-            return df
+            # 讀取 CSV 數據 (自動判斷新舊格式)
+            return read_gpu_csv(file_path)
         except Exception as e:
             print(f"讀取檔案 {file_path} 時發生錯誤: {e}")
             return None
@@ -117,7 +121,9 @@ class GPUTrendVisualizer:
         try:
             df = pd.read_csv(file_path, encoding='utf-8')
             # 處理中文列名
-            if 'GPU卡號' in df.columns and '平均使用率(%)' in df.columns:
+            if 'GPU編號' in df.columns and '平均GPU使用率(%)' in df.columns:
+                df = df.rename(columns={'GPU編號': 'gpu', '平均GPU使用率(%)': 'usage'})
+            elif 'GPU卡號' in df.columns and '平均使用率(%)' in df.columns:
                 df = df.rename(columns={'GPU卡號': 'gpu', '平均使用率(%)': 'usage'})
             elif len(df.columns) == 2:
                 df.columns = ['gpu', 'usage']
@@ -145,27 +151,21 @@ class GPUTrendVisualizer:
         """
         fig, ax = plt.subplots(figsize=(15, 8))
         
-        # 生成日期範圍
-        dates = pd.date_range(start=start_date, end=end_date, freq='D')
-        all_data = []
-        
-        for date in dates:
-            date_str = date.strftime('%Y-%m-%d')
-            data = self.load_gpu_data(node, gpu_id, date_str)
-            if data is not None:
-                all_data.append(data)
+        # 逐月分塊讀取，每個區塊先降採樣到圖表寬度可呈現的點數，記憶體不隨日期範圍成長
+        num_days = len(pd.date_range(start=start_date, end=end_date, freq='D'))
+        folded = fold_downsampled(iter_gpu_samples(self.data_dir, node, gpu_id, start_date, end_date),
+                                  target_points(ax), num_days, layers=('usage',))
         
-        if not all_data:
+        if folded is None:
             print(f"未找到 {node} GPU{gpu_id} 在 {start_date} 至 {end_date} 期間的數據")
+            plt.close(fig)
             return
         
-        # 合併所有數據
-        combined_data = pd.concat(all_data, ignore_index=True)
-        combined_data = combined_data.sort_values('datetime')
+        timestamps, usage = folded['usage']
+        datetimes = pd.to_datetime(timestamps, unit='s') + TAIWAN_UTC_OFFSET
         
         # 繪製趨勢線
-        ax.plot(combined_data['datetime'], combined_data['usage'], 
-                linewidth=1.5, alpha=0.8, color=self.colors[0])
+        plot_timeline(ax, datetimes, usage, linewidth=1.5, alpha=0.8, color=self.colors[0])
         
         # 設定圖表標題和標籤
         ax.set_title(f'{node} GPU {gpu_id} 使用率趨勢\n({start_date} 至 {end_date})', 
@@ -174,8 +174,13 @@ class GPUTrendVisualizer:
         ax.set_ylabel('GPU 使用率 (%)', fontsize=12)
         
         # 格式化 x 軸
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d %H:%M'))
-        ax.xaxis.set_major_locator(mdates.DayLocator(interval=1))
+        if num_days <= 14:
+            ax.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d %H:%M'))
+            ax.xaxis.set_major_locator(mdates.DayLocator(interval=1))
+        else:
+            # 長區間每天一個刻度會產生數百個標籤，改由 matplotlib 選擇刻度間隔
+            ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+            ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
         plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
         
         # 添加網格
@@ -186,7 +191,7 @@ class GPUTrendVisualizer:
         
         # 保存或顯示圖表
         if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            save_path = save_figure(save_path)
             print(f"圖表已保存至: {save_path}")
         else:
             plt.show()
@@ -208,11 +213,11 @@ class GPUTrendVisualizer:
         for i, gpu_id in enumerate(self.gpu_ids):
             data = self.load_gpu_data(node, gpu_id, date)
             if data is not None:
-                ax.plot(data['datetime'], data['usage'], 
-                       label=f'GPU {gpu_id}', 
-                       linewidth=1.5, 
-                       color=self.colors[i % len(self.colors)],
-                       alpha=0.8)
+                plot_timeline(ax, data['datetime'], data['usage'],
+                              label=f'GPU {gpu_id}',
+                              linewidth=1.5,
+                              color=self.colors[i % len(self.colors)],
+                              alpha=0.8)
         
         # 設定圖表
         ax.set_title(f'{node} 所有 GPU 使用率對比\n日期: {date}', 
@@ -232,7 +237,7 @@ class GPUTrendVisualizer:
         plt.tight_layout()
         
         if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            save_path = save_figure(save_path)
             print(f"圖表已保存至: {save_path}")
         else:
             plt.show()
@@ -297,14 +302,14 @@ class GPUTrendVisualizer:
         plt.tight_layout()
         
         if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            save_path = save_figure(save_path)
             print(f"圖表已保存至: {save_path}")
         else:
             plt.show()
         
         plt.close()
     
-    def plot_heatmap(self, start_date, end_date, save_path=None):
+    def plot_heatmap(self, start_date, end_date, save_path=None, freq='auto', annotate=None):
         """
         繪製 GPU 使用率熱力圖
         
@@ -312,60 +317,41 @@ class GPUTrendVisualizer:
             start_date (str): 開始日期
             end_date (str): 結束日期
             save_path (str): 保存路徑
+            freq (str): 欄位彙整 'auto'、'D'、'W' 或 'M'（auto: 長區間自動改為每週/每月平均）
+            annotate (bool): 是否標註數值，None 表示格子數不多時才標註
         """
-        # 收集所有數據
-        all_data = []
-        dates = pd.date_range(start=start_date, end=end_date, freq='D')
+        # 逐月分塊讀取每日平均檔並直接彙整為熱力圖欄位，不建構完整的逐日矩陣
+        data = fold_heatmap_data(self.data_dir, self.nodes, start_date, end_date, freq=freq)
+        index = pd.MultiIndex.from_tuples(
+            [(node, f'GPU {gpu_index}') for node, gpu_index in row_keys(data)], names=['node', 'gpu'])
+        pivot_table = layer_frame(data, 'usage', index)
         
-        for node in self.nodes:
-            for date in dates:
-                date_str = date.strftime('%Y-%m-%d')
-                daily_avg = self.load_daily_average_data(node, date_str)
-                
-                if daily_avg is not None:
-                    for _, row in daily_avg.iterrows():
-                        gpu_num = row['gpu'].replace('gpu', '') if 'gpu' in row['gpu'] else row['gpu']
-                        all_data.append({
-                            'node': node,
-                            'gpu': f'GPU {gpu_num}',
-                            'date': date_str,
-                            'usage': row['usage']
-                        })
-        
-        if not all_data:
+        if pivot_table.empty:
             print("未找到數據進行熱力圖繪製")
             return
         
-        df = pd.DataFrame(all_data)
-        
-        # 創建樞紐表
-        pivot_table = df.pivot_table(
-            values='usage', 
-            index=['node', 'gpu'], 
-            columns='date', 
-            aggfunc='mean'
-        )
-        
-        # 繪製熱力圖
-        fig, ax = plt.subplots(figsize=(max(12, len(dates) * 0.8), max(8, len(pivot_table) * 0.3)))
+        # 繪製熱力圖：尺寸有上限，格子過多時不標註數值
+        layout = heatmap_layout(len(pivot_table), len(pivot_table.columns), 0.8, 0.3, 12, 8, annotate)
+        fig, ax = plt.subplots(figsize=layout.figsize)
         
         sns.heatmap(pivot_table, 
-                   annot=True, 
+                   annot=layout.annotate, 
                    fmt='.2f', 
+                   annot_kws={'size': layout.fontsize},
                    cmap='YlOrRd', 
                    ax=ax,
                    cbar_kws={'label': 'GPU 使用率 (%)'})
         
-        ax.set_title(f'GPU 使用率熱力圖\n({start_date} 至 {end_date})', 
+        ax.set_title(f'GPU 使用率熱力圖{title_note(data)}\n({start_date} 至 {end_date})', 
                     fontsize=16, fontweight='bold')
-        ax.set_xlabel('日期', fontsize=12)
+        ax.set_xlabel(column_axis_label(data), fontsize=12)
         ax.set_ylabel('節點 - GPU', fontsize=12)
         
         plt.setp(ax.get_xticklabels(), rotation=45)
         plt.tight_layout()
         
         if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            save_path = save_figure(save_path)
             print(f"熱力圖已保存至: {save_path}")
         else:
             plt.show()
@@ -443,6 +429,23 @@ class GPUTrendVisualizer:
             ax2.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
                     f'{value:.2f}%', ha='center', va='bottom')
         
+        # 有分位數摘要時標示各節點逐筆樣本的 p95，平均值看不出的突發負載會在此顯現
+        p95 = {}
+        if node_names:
+            try:
+                from quantile_sketch import query_percentiles
+                p95, _ = query_percentiles(self.data_dir, start_date, end_date, nodes=node_names,
+                                           group_by='node', percentiles=(95,))
+            except Exception:
+                p95 = {}
+        if p95:
+            positions = [i for i, node in enumerate(node_names) if node in p95]
+            ax2.scatter(positions, [p95[node_names[i]]['p95'] for i in positions],
+                        marker='_', s=600, linewidths=3, color='black', zorder=3, label='p95 (逐筆樣本)')
+            # 上方留白放圖例，避免蓋住接近 100% 的標記
+            ax2.set_ylim(0, 115)
+            ax2.legend(loc='upper right')
+        
         # 子圖3: GPU 使用率分佈
         ax3 = plt.subplot(2, 2, 3)
         all_gpu_data = []
@@ -493,7 +496,7 @@ class GPUTrendVisualizer:
         plt.tight_layout()
         
         if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            save_path = save_figure(save_path)
             print(f"儀表板已保存至: {save_path}")
         else:
             plt.show()
@@ -513,7 +516,11 @@ def main():
                        choices=['single', 'multi', 'nodes', 'heatmap', 'dashboard', 'all'],
                        default='all', help='圖表類型')
     
+    add_profile_argument(parser)
+    
     args = parser.parse_args()
+    if args.profile:
+        set_profile(args.profile)
     
     # 創建視覺化器
     visualizer = GPUTrendVisualizer(args.data_dir)
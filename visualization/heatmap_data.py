@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+熱力圖資料建構模組
+
+一次掃描每個分區的 average_{date}.csv，直接把數值寫入
+[節點·GPU, 日期] 矩陣，同時產生 GPU 使用率、VRAM 使用率與使用者三個圖層，
+取代逐列 iterrows + pivot_table 以及逐格讀取每 GPU CSV 的作法。
+
+支援兩種每日平均檔格式：
+- 新版: GPU編號,平均GPU使用率(%),平均VRAM使用率(%),使用者
+- 舊版: GPU卡號,平均使用率(%)（沒有 VRAM 與使用者欄位）
+
+欄位名稱的別名由 columnar_csv.AVERAGE_ALIASES 統一處理。
+
+長區間的熱力圖以 heatmap_layout() 決定版面：日期欄自動彙整為週或月、
+格子過多時不標註數值、圖表尺寸設有上限；也可用 tile_ranges()
+把很長的區間切成多張逐日熱力圖。
+"""
+
+import os
+import re
+import csv
+from collections import namedtuple
+
+import numpy as np
+
+from lazy_imports import lazy_import
+from columnar_csv import read_average_columns
+
+pd = lazy_import('pandas')
+
+# usage / vram: float 矩陣，缺資料為 NaN；users: object 矩陣，缺資料為空字串
+# 列順序為 nodes × gpu_indices（節點優先），欄順序為 dates
+# freq: 'D' 逐日；'W' 每欄為一週（標籤為週一日期）；'M' 每欄為一個月（標籤為 YYYY-MM）
+HeatmapData = namedtuple('HeatmapData', ['nodes', 'gpu_indices', 'dates', 'usage', 'vram', 'users', 'freq'],
+                         defaults=('D',))
+
+# 版面設定: 圖表尺寸、是否標註數值、標註字體大小
+HeatmapLayout = namedtuple('HeatmapLayout', ['figsize', 'annotate', 'fontsize'])
+
+# 逐日欄位超過此數量時改為每週，每週欄位仍超過時改為每月
+MAX_HEATMAP_COLUMNS = 62
+# 格子總數超過此數量時不標註數值（每個標註都是一個文字物件）
+ANNOTATION_CELL_LIMIT = 800
+# 圖表尺寸上限（英吋），避免超長區間產生巨大畫布
+MAX_FIGURE_WIDTH = 40
+MAX_FIGURE_HEIGHT = 40
+# tile_ranges() 預設每張的天數
+DEFAULT_TILE_DAYS = 31
+
+FREQ_AXIS_LABELS = {'D': '日期', 'W': '週 (起始日)', 'M': '月份'}
+FREQ_TITLE_NOTES = {'W': '每週平均', 'M': '每月平均'}
+FREQ_CHOICES = ('auto', 'D', 'W', 'M')
+
+GPU_INDEX_PATTERN = re.compile(r'(\d+)')
+
+# path -> (mtime_ns, size, [(gpu_index, usage, vram, user), ...])
+_partition_cache = {}
+
+
+def read_average_rows(file_path, cache=True):
+    """
+    讀取單一每日平均檔，結果依檔案快取（以修改時間與大小判斷是否失效）
+
+    Args:
+        file_path (str): average_{date}.csv 路徑
+        cache (bool): 是否寫入快取（分塊讀取多年範圍時關閉，避免快取隨範圍成長）
+
+    Returns:
+        list: (GPU 索引, GPU 使用率, VRAM 使用率, 使用者) 列表，檔案不存在時為空列表
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return []
+    cached = _partition_cache.get(file_path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    rows = []
+    try:
+        columns = read_average_columns(file_path)
+        for label, usage, vram, user in zip(columns.gpu, columns.usage, columns.vram, columns.user):
+            match = GPU_INDEX_PATTERN.search(label)
+            if not match:
+                continue
+            if user.lower() == 'nan':
+                user = ''
+            rows.append((int(match.group(1)), usage, vram, user))
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        print(f"讀取檔案 {file_path} 時發生錯誤: {e}")
+        rows = []
+
+    if cache:
+        _partition_cache[file_path] = (stat.st_mtime_ns, stat.st_size, rows)
+    return rows
+
+
+def clear_partition_cache():
+    """清除每日平均檔快取"""
+    _partition_cache.clear()
+
+
+def build_heatmap_data(data_dir, nodes, start_date, end_date, gpu_indices=range(8), cache=True):
+    """
+    建構熱力圖矩陣：每個 (節點, 日期) 分區只讀取一次
+
+    Args:
+        data_dir (str): 資料目錄
+        nodes (list): 節點名稱列表
+        start_date (str): 開始日期 (YYYY-MM-DD)
+        end_date (str): 結束日期 (YYYY-MM-DD)
+        gpu_indices (iterable): 要納入的 GPU 索引（average 檔中的 GPU[i]）
+        cache (bool): 是否把讀取的每日平均檔寫入快取
+
+    Returns:
+        HeatmapData: 熱力圖資料
+    """
+    nodes = list(nodes)
+    gpu_indices = list(gpu_indices)
+    dates = [date.strftime('%Y-%m-%d') for date in pd.date_range(start=start_date, end=end_date, freq='D')]
+
+    shape = (len(nodes) * len(gpu_indices), len(dates))
+    usage = np.full(shape, np.nan)
+    vram = np.full(shape, np.nan)
+    users = np.full(shape, '', dtype=object)
+
+    gpu_offset = {gpu_index: i for i, gpu_index in enumerate(gpu_indices)}
+    for node_pos, node in enumerate(nodes):
+        base = node_pos * len(gpu_indices)
+        for col, date_str in enumerate(dates):
+            file_path = os.path.join(data_dir, node, date_str, f"average_{date_str}.csv")
+            for gpu_index, gpu_usage, gpu_vram, user in read_average_rows(file_path, cache):
+                offset = gpu_offset.get(gpu_index)
+                if offset is None:
+                    continue
+                usage[base + offset, col] = gpu_usage
+                vram[base + offset, col] = gpu_vram
+                users[base + offset, col] = user
+
+    return HeatmapData(nodes, gpu_indices, dates, usage, vram, users)
+
+
+def row_keys(data):
+    """
+    Returns:
+        list: 每一列的 (節點, GPU 索引)
+    """
+    return [(node, gpu_index) for node in data.nodes for gpu_index in data.gpu_indices]
+
+
+def latest_users(data):
+    """
+    每一列在期間內最後一次出現的使用者
+
+    Returns:
+        list: 使用者名稱，期間內沒有使用者資訊時為 None
+    """
+    latest = []
+    for row in data.users:
+        names = [name for name in row if name]
+        latest.append(names[-1] if names else None)
+    return latest
+
+
+def user_sets(data):
+    """
+    每一列在期間內出現過的所有使用者
+
+    Returns:
+        list: 使用者名稱集合
+    """
+    return [set(name for name in row if name) for row in data.users]
+
+
+def layer_frame(data, layer, index, drop_empty=True):
+    """
+    將指定圖層轉為 DataFrame（列為 index，欄為日期或週/月標籤）
+
+    Args:
+        data (HeatmapData): 熱力圖資料
+        layer (str): 'usage' 或 'vram'
+        index (list | pandas.Index): 列標籤
+        drop_empty (bool): 是否移除整列或整欄都沒有資料的部分
+
+    Returns:
+        pandas.DataFrame: 圖層資料
+    """
+    df = pd.DataFrame(getattr(data, layer), index=index, columns=column_labels(data))
+    if drop_empty:
+        df = df.dropna(how='all').dropna(axis=1, how='all')
+    return df
+
+
+def choose_freq(num_days, max_columns=MAX_HEATMAP_COLUMNS):
+    """
+    依天數選擇欄位彙整粒度
+
+    Args:
+        num_days (int): 日期範圍的天數
+        max_columns (int): 欄位數上限
+
+    Returns:
+        str: 'D'、'W' 或 'M'
+    """
+    if num_days <= max_columns:
+        return 'D'
+    if num_days <= max_columns * 7:
+        return 'W'
+    return 'M'
+
+
+def aggregate_columns(data, freq='auto'):
+    """
+    將逐日欄位彙整為週或月：數值取期間內有資料日的平均，使用者取期間內最後出現者
+
+    Args:
+        data (HeatmapData): 逐日熱力圖資料
+        freq (str): 'auto'、'D'、'W' 或 'M'
+
+    Returns:
+        HeatmapData: 彙整後的熱力圖資料
+    """
+    if freq == 'auto':
+        freq = choose_freq(len(data.dates))
+    if freq == 'D' or data.freq != 'D' or not data.dates:
+        return data
+
+    days = pd.to_datetime(data.dates)
+    if freq == 'W':
+        keys = (days - pd.to_timedelta(days.weekday, unit='D')).strftime('%Y-%m-%d')
+    elif freq == 'M':
+        keys = days.strftime('%Y-%m')
+    else:
+        raise ValueError(f"未知的彙整粒度: {freq}")
+
+    # 日期連續，同一週/月的欄位必定相鄰，以 reduceat 一次加總
+    keys = list(keys)
+    starts = [0] + [i for i in range(1, len(keys)) if keys[i] != keys[i - 1]]
+    labels = [keys[i] for i in starts]
+
+    def bucket_mean(matrix):
+        present = ~np.isnan(matrix)
+        sums = np.add.reduceat(np.where(present, matrix, 0.0), starts, axis=1)
+        counts = np.add.reduceat(present.astype(int), starts, axis=1)
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+    bounds = starts[1:] + [len(keys)]
+    users = np.full((data.users.shape[0], len(starts)), '', dtype=object)
+    for col, (begin, end) in enumerate(zip(starts, bounds)):
+        for row in range(data.users.shape[0]):
+            names = [name for name in data.users[row, begin:end] if name]
+            if names:
+                users[row, col] = names[-1]
+
+    return data._replace(dates=labels, usage=bucket_mean(data.usage), vram=bucket_mean(data.vram),
+                         users=users, freq=freq)
+
+
+def heatmap_layout(num_rows, num_columns, cell_width=0.8, cell_height=0.4, min_width=12, min_height=10,
+                   annotate=None):
+    """
+    計算熱力圖版面：尺寸隨格子數成長但設有上限，格子過多時不標註數值
+
+    Args:
+        num_rows (int): 列數
+        num_columns (int): 欄數
+        cell_width (float): 每欄寬度（英吋）
+        cell_height (float): 每列高度（英吋）
+        min_width (float): 最小寬度
+        min_height (float): 最小高度
+        annotate (bool): 強制標註與否，None 表示依 ANNOTATION_CELL_LIMIT 自動決定
+
+    Returns:
+        HeatmapLayout: 版面設定
+    """
+    width = min(MAX_FIGURE_WIDTH, max(min_width, num_columns * cell_width))
+    height = min(MAX_FIGURE_HEIGHT, max(min_height, num_rows * cell_height))
+    if annotate is None:
+        annotate = num_rows * num_columns <= ANNOTATION_CELL_LIMIT
+    # 欄位多時縮小標註字體，避免文字重疊
+    fontsize = 8 if num_columns <= 31 else 6
+    return HeatmapLayout((width, height), annotate, fontsize)
+
+
+def column_labels(data, short=False):
+    """
+    欄位標籤
+
+    Args:
+        data (HeatmapData): 熱力圖資料
+        short (bool): 逐日時只顯示月-日
+
+    Returns:
+        list: 欄位標籤
+    """
+    if data.freq == 'D' and short:
+        return [date_str[5:] for date_str in data.dates]
+    if data.freq == 'W':
+        return [f"{date_str}週" for date_str in data.dates]
+    return list(data.dates)
+
+
+def column_axis_label(data):
+    """
+    Returns:
+        str: X 軸標題
+    """
+    return FREQ_AXIS_LABELS.get(data.freq, '日期')
+
+
+def title_note(data):
+    """
+    Returns:
+        str: 標題中的彙整說明，逐日時為空字串
+    """
+    note = FREQ_TITLE_NOTES.get(data.freq)
+    return f" ({note})" if note else ''
+
+
+def add_heatmap_arguments(parser):
+    """
+    為 argparse 命令列加入熱力圖版面參數 --heatmap-freq 與 --tile-days
+
+    Args:
+        parser (argparse.ArgumentParser): 命令列解析器
+    """
+    parser.add_argument('--heatmap-freq', choices=FREQ_CHOICES, default='auto',
+                        help='熱力圖欄位彙整: auto 依天數自動選擇 / D 逐日 / W 每週 / M 每月')
+    parser.add_argument('--tile-days', type=int, default=None,
+                        help='將熱力圖切成每張 N 天的逐日分頁 (預設: 不分頁)')
+
+
+def tile_ranges(start_date, end_date, tile_days=DEFAULT_TILE_DAYS):
+    """
+    將長日期範圍切成連續的小區間，每個區間各自繪製一張逐日熱力圖
+
+    Args:
+        start_date (str): 開始日期 (YYYY-MM-DD)
+        end_date (str): 結束日期 (YYYY-MM-DD)
+        tile_days (int): 每個區間的天數
+
+    Returns:
+        list: (開始日期, 結束日期) 列表
+    """
+    if tile_days < 1:
+        raise ValueError("tile_days 必須為正整數")
+    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    return [(dates[i].strftime('%Y-%m-%d'), dates[min(i + tile_days, len(dates)) - 1].strftime('%Y-%m-%d'))
+            for i in range(0, len(dates), tile_days)]
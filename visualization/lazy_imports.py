@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+延遲匯入模組
+
+matplotlib、seaborn、pandas 的匯入各需要數百毫秒，但查詢、列出使用者、--help
+等純文字命令根本用不到。這裡提供模組代理：第一次存取屬性時才真正匯入，
+並可在載入時執行一次初始化（例如套用中文字體）。
+
+使用方式:
+    plt = lazy_import('matplotlib.pyplot')
+    sns = lazy_import('seaborn')
+    fig, ax = plt.subplots()      # 此時才匯入 matplotlib.pyplot
+"""
+
+import sys
+import types
+import importlib
+import importlib.util
+
+
+class LazyModule(types.ModuleType):
+    """第一次存取屬性時才匯入的模組代理"""
+
+    def __init__(self, name, on_load=None):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_on_load'] = on_load
+
+    def _load(self):
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            # 先記錄模組再執行初始化，初始化中再次存取代理不會重複載入
+            self.__dict__['_lazy_module'] = module
+            on_load = self.__dict__['_lazy_on_load']
+            if on_load is not None:
+                on_load(module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name, on_load=None):
+    """
+    建立延遲匯入的模組代理
+
+    Args:
+        name (str): 模組名稱，例如 'matplotlib.pyplot'
+        on_load (callable): 模組第一次載入後呼叫 on_load(module)，只執行一次
+
+    Returns:
+        LazyModule: 模組代理
+    """
+    return LazyModule(name, on_load)
+
+
+def is_loaded(name):
+    """
+    Returns:
+        bool: 模組是否已被（任何地方）實際匯入
+    """
+    return name in sys.modules
+
+
+def module_available(name):
+    """
+    檢查模組是否已安裝，但不匯入它
+
+    Args:
+        name (str): 模組名稱
+
+    Returns:
+        bool: 可以匯入時為 True
+    """
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+圖表渲染快取
+
+以「圖表類型 + 參數 + 輸入資料分區指紋」計算內容位址 (sha256) 作為快取鍵。
+輸入分區（data/<節點>/<日期>/）沒有變動時直接沿用上次輸出的圖片，
+部分回補資料後重跑報表只會重新繪製受影響的圖表。
+
+快取清單 (manifest) 位於 <plots_dir>/.plot_cache/manifest.json，
+記錄每個快取鍵對應的輸出檔案與其輸入分區。
+
+分區指紋只涵蓋圖表讀取的 gpu{i}_<日期>.csv 與 average_<日期>.csv，
+同一目錄中的摘要、任務等衍生檔案更新時不會使快取失效。
+
+指紋模式 (環境變數 GPU_PLOT_CACHE_HASH):
+- stat (預設): 檔名、大小與修改時間
+- content: 檔案內容的 sha256（較慢，但不受複製/touch 影響）
+
+停用快取: GPU_PLOT_CACHE=0
+
+使用方式:
+    python plot_cache.py list --plots-dir ../plots
+    python plot_cache.py clear --plots-dir ../plots
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from datetime import datetime, timedelta
+
+CACHE_DIR_NAME = '.plot_cache'
+MANIFEST_NAME = 'manifest.json'
+# 快取格式或鍵的組成方式改變時遞增，使舊快取全部失效
+CACHE_VERSION = 1
+
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+# 分區中圖表實際讀取的檔案
+INPUT_FILE_PATTERN = re.compile(r'^(gpu\d+|average)_\d{4}-\d{2}-\d{2}\.csv$')
+
+
+def cache_enabled():
+    """
+    是否啟用圖表快取（環境變數 GPU_PLOT_CACHE=0 可停用）
+
+    Returns:
+        bool: 是否啟用
+    """
+    return os.environ.get('GPU_PLOT_CACHE', '1').lower() not in ('0', 'false', 'no', 'off')
+
+
+def node_dirs(data_dir):
+    """
+    Returns:
+        list: 資料目錄中含有日期分區的節點目錄（已排序），略過 rollups/、user_index/ 等衍生資料
+    """
+    if not os.path.isdir(data_dir):
+        return []
+    nodes = []
+    for name in sorted(os.listdir(data_dir)):
+        path = os.path.join(data_dir, name)
+        if os.path.isdir(path) and any(DATE_PATTERN.match(entry) for entry in os.listdir(path)):
+            nodes.append(name)
+    return nodes
+
+
+def _file_digest(file_path):
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class PlotCache:
+    def __init__(self, plots_dir="../plots", hash_mode=None):
+        """
+        初始化圖表快取
+
+        Args:
+            plots_dir (str): 圖表輸出目錄，快取清單存放於其下的 .plot_cache/
+            hash_mode (str): 'stat' 或 'content'，預設讀取 GPU_PLOT_CACHE_HASH
+        """
+        self.plots_dir = plots_dir
+        self.cache_dir = os.path.join(plots_dir, CACHE_DIR_NAME)
+        self.manifest_path = os.path.join(self.cache_dir, MANIFEST_NAME)
+        self.hash_mode = hash_mode or os.environ.get('GPU_PLOT_CACHE_HASH', 'stat')
+        self.manifest = self._load_manifest()
+        # 同一次執行中分區指紋只計算一次
+        self._partition_digests = {}
+        self._source_digests = {}
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != CACHE_VERSION:
+                return {}
+            return manifest.get('entries', {})
+        except (OSError, ValueError) as e:
+            print(f"警告: 無法讀取圖表快取清單 {self.manifest_path}: {e}")
+            return {}
+
+    def save(self):
+        """寫回快取清單（先寫暫存檔再取代）"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'entries': self.manifest}, f,
+                      ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def partition_fingerprint(self, partition_dir):
+        """
+        計算單一資料分區 (data/<節點>/<日期>) 的指紋，只計入 gpu 樣本檔與平均檔
+
+        Args:
+            partition_dir (str): 分區目錄
+
+        Returns:
+            str: 指紋，分區不存在時為 'missing'
+        """
+        if partition_dir in self._partition_digests:
+            return self._partition_digests[partition_dir]
+
+        if not os.path.isdir(partition_dir):
+            digest = 'missing'
+        else:
+            sha = hashlib.sha256()
+            for name in sorted(os.listdir(partition_dir)):
+                file_path = os.path.join(partition_dir, name)
+                if not INPUT_FILE_PATTERN.match(name) or not os.path.isfile(file_path):
+                    continue
+                if self.hash_mode == 'content':
+                    sha.update(f"{name}:{_file_digest(file_path)}\n".encode('utf-8'))
+                else:
+                    stat = os.stat(file_path)
+                    sha.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode('utf-8'))
+            digest = sha.hexdigest()
+
+        self._partition_digests[partition_dir] = digest
+        return digest
+
+    def source_fingerprint(self, module_name):
+        """
+        繪圖程式碼的指紋，程式修改後快取自動失效
+
+        繪圖函數會呼叫同目錄下的其他模組（VRAMMonitor、分析器等），
+        因此以 visualization/ 下所有 .py 檔計算。
+        """
+        if module_name not in self._source_digests:
+            source_dir = os.path.dirname(os.path.abspath(__file__))
+            sha = hashlib.sha256(module_name.encode('utf-8'))
+            for name in sorted(os.listdir(source_dir)):
+                if name.endswith('.py'):
+                    sha.update(f"{name}:{_file_digest(os.path.join(source_dir, name))}\n".encode('utf-8'))
+            self._source_digests[module_name] = sha.hexdigest()
+        return self._source_digests[module_name]
+
+    def job_inputs(self, job):
+        """
+        推算圖表工作所依賴的資料分區
+
+        參數中的日期字串決定日期範圍（一個日期為單日，兩個為區間），
+        參數中出現的節點名稱決定節點範圍，否則為資料目錄下的所有節點。
+
+        Args:
+            job (PlotJob): 圖表工作
+
+        Returns:
+            list: 分區的相對路徑 (<節點>/<日期>) 列表
+        """
+        data_dir = job.kwargs.get('data_dir', '../data')
+        values = list(job.args) + list(job.kwargs.values())
+        dates = [v for v in values if isinstance(v, str) and DATE_PATTERN.match(v)]
+        if not dates:
+            return []
+
+        start = datetime.strptime(min(dates), '%Y-%m-%d')
+        end = datetime.strptime(max(dates), '%Y-%m-%d')
+        date_strs = []
+        current = start
+        while current <= end:
+            date_strs.append(current.strftime('%Y-%m-%d'))
+            current += timedelta(days=1)
+
+        all_nodes = node_dirs(data_dir)
+        nodes = [v for v in values if isinstance(v, str) and v in all_nodes] or all_nodes
+        return [f"{node}/{date_str}" for node in nodes for date_str in date_strs]
+
+    def job_key(self, job, module_name, extra=None):
+        """
+        計算圖表工作的快取鍵與輸入指紋
+
+        Args:
+            job (PlotJob): 圖表工作
+            module_name (str): 繪圖模組名稱
+            extra (dict): 其他會影響輸出的設定
+
+        Returns:
+            tuple: (快取鍵, {分區: 指紋})
+        """
+        data_dir = job.kwargs.get('data_dir', '../data')
+        inputs = {partition: self.partition_fingerprint(os.path.join(data_dir, partition))
+                  for partition in self.job_inputs(job)}
+        payload = {
+            'version': CACHE_VERSION,
+            'plot': f"{module_name}.{job.func}",
+            'source': self.source_fingerprint(module_name),
+            'args': list(job.args),
+            'kwargs': job.kwargs,
+            'extra': extra or {},
+            'inputs': inputs,
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest(), inputs
+
+    def lookup(self, key):
+        """
+        查詢快取
+
+        Args:
+            key (str): 快取鍵
+
+        Returns:
+            str: 仍然有效的輸出檔案路徑，否則為 None
+        """
+        entry = self.manifest.get(key)
+        if not entry:
+            return None
+        output = entry.get('output')
+        if not output or not os.path.exists(output):
+            return None
+        stat = os.stat(output)
+        # 輸出檔已被其他執行覆寫時不可沿用
+        if stat.st_size != entry.get('output_size') or stat.st_mtime_ns != entry.get('output_mtime_ns'):
+            return None
+        return output
+
+    def record(self, key, job, module_name, output, inputs):
+        """
+        記錄一次成功的繪圖結果
+
+        Args:
+            key (str): 快取鍵
+            job (PlotJob): 圖表工作
+            module_name (str): 繪圖模組名稱
+            output (str): 輸出檔案路徑
+            inputs (dict): {分區: 指紋}
+        """
+        if not output or not os.path.exists(output):
+            return
+        # 同一輸出檔只保留最新的快取項目
+        for old_key in [k for k, v in self.manifest.items() if v.get('output') == output and k != key]:
+            del self.manifest[old_key]
+        stat = os.stat(output)
+        self.manifest[key] = {
+            'output': output,
+            'output_size': stat.st_size,
+            'output_mtime_ns': stat.st_mtime_ns,
+            'plot': f"{module_name}.{job.func}",
+            'name': job.name,
+            'params': {'args': list(job.args), 'kwargs': job.kwargs},
+            'inputs': inputs,
+            'rendered_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+
+    def clear(self):
+        """清除所有快取項目（不刪除圖片）"""
+        self.manifest = {}
+        self.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='圖表渲染快取管理')
+    parser.add_argument('action', choices=['list', 'clear'], help='list: 列出快取項目 / clear: 清除快取')
+    parser.add_argument('--plots-dir', default='../plots', help='圖表輸出目錄')
+    args = parser.parse_args()
+
+    cache = PlotCache(args.plots_dir)
+    if args.action == 'clear':
+        cache.clear()
+        print(f"已清除圖表快取: {cache.manifest_path}")
+        return 0
+
+    if not cache.manifest:
+        print("圖表快取為空")
+        return 0
+    for key, entry in sorted(cache.manifest.items(), key=lambda item: item[1].get('output', '')):
+        valid = cache.lookup(key) is not None
+        print(f"{'✓' if valid else '✗'} {entry.get('output')}  [{entry.get('plot')}] "
+              f"輸入分區 {len(entry.get('inputs', {}))} 個，繪製於 {entry.get('rendered_at')}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+平行圖表排程器
+
+將彼此獨立的圖表工作分派到多個行程同時繪製。每個 worker 行程在啟動時
+只載入一次繪圖模組（含 matplotlib 與中文字體設定），之後重複使用，
+整批圖表的耗時約等於最慢的那一張，而不是全部相加。
+
+呼叫端已載入的 GPUDataset 可透過 run_plot_jobs(dataset=...) 交給 worker：
+Linux 預設以 fork 建立行程，子行程直接繼承記憶體中的資料；其他啟動方式
+則在每個 worker 啟動時傳送一次，而不是每張圖表各自重新讀取每日平均檔。
+
+使用方式:
+    python plot_scheduler.py report 2025-05-23 2025-05-26
+    python plot_scheduler.py quick 2025-05-23 2025-05-26 --workers 4
+    python plot_scheduler.py vram 2025-05-23 2025-05-26 --no-users
+    python plot_scheduler.py report 2025-05-23 2025-05-26 --no-cache
+    python plot_scheduler.py quick 2025-05-23 2025-05-26 --profile preview
+
+輸入資料未變動的圖表會直接沿用上次的輸出（見 plot_cache.py）。
+"""
+
+import os
+import sys
+import time
+import argparse
+import inspect
+import importlib
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from plot_cache import PlotCache, cache_enabled
+from render_profiles import get_profile, add_profile_argument, set_profile
+
+# 圖表工作: func 為繪圖模組中的函數名稱（字串，才能傳給子行程）
+PlotJob = namedtuple('PlotJob', ['name', 'func', 'args', 'kwargs'])
+PlotResult = namedtuple('PlotResult', ['name', 'path', 'seconds', 'error', 'cached'], defaults=(False,))
+
+DEFAULT_PLOT_MODULE = 'quick_gpu_trend_plots'
+NODES = ['colab-gpu1', 'colab-gpu2', 'colab-gpu3', 'colab-gpu4']
+
+# worker 行程內已載入的繪圖模組與共用資料集
+_plot_module = None
+_shared_dataset = None
+
+
+def default_workers():
+    """
+    取得預設的 worker 數量（環境變數 GPU_PLOT_WORKERS，否則為 CPU 數量）
+
+    Returns:
+        int: worker 數量
+    """
+    env_value = os.environ.get('GPU_PLOT_WORKERS')
+    if env_value:
+        try:
+            return max(1, int(env_value))
+        except ValueError:
+            print(f"警告: GPU_PLOT_WORKERS={env_value} 不是有效的整數，改用 CPU 數量")
+    return os.cpu_count() or 1
+
+
+def _init_worker(module_name, dataset=None):
+    """worker 初始化：設定非互動式後端、載入繪圖模組（字體只設定一次）並保存共用資料集"""
+    global _plot_module, _shared_dataset
+    import matplotlib
+    matplotlib.use('Agg')
+    _plot_module = importlib.import_module(module_name)
+    _shared_dataset = dataset
+
+
+def _job_kwargs(func, job):
+    # 繪圖函數接受 dataset 時帶入共用資料集；範圍不符時由 ensure_dataset 自行載入
+    if _shared_dataset is None or 'dataset' in job.kwargs:
+        return job.kwargs
+    if 'dataset' not in inspect.signature(func).parameters:
+        return job.kwargs
+    return dict(job.kwargs, dataset=_shared_dataset)
+
+
+def _run_job(job):
+    """在 worker 中執行單一圖表工作並計時"""
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    try:
+        func = getattr(_plot_module, job.func)
+        path = func(*job.args, **_job_kwargs(func, job))
+        error = None
+    except Exception as e:
+        path, error = None, str(e)
+    finally:
+        # 避免未關閉的 figure 在長壽的 worker 中累積
+        plt.close('all')
+    return PlotResult(job.name, path, time.perf_counter() - start, error)
+
+
+def run_plot_jobs(jobs, workers=None, module_name=DEFAULT_PLOT_MODULE, use_cache=None, dataset=None):
+    """
+    執行一批圖表工作
+
+    Args:
+        jobs (list): PlotJob 列表
+        workers (int): 行程數量，None 表示使用 default_workers()；1 表示在目前行程依序執行
+        module_name (str): 提供繪圖函數的模組名稱
+        use_cache (bool): 是否沿用輸入未變動的圖表，None 表示依 GPU_PLOT_CACHE 設定
+        dataset (GPUDataset): 已載入的資料集，交給每個 worker 共用，None 表示各圖表自行載入
+
+    Returns:
+        list: 依工作順序排列的 PlotResult 列表
+    """
+    if not jobs:
+        return []
+
+    wall_start = time.perf_counter()
+    results = [None] * len(jobs)
+
+    # 先查快取，只把需要重新繪製的工作送進行程池
+    caches, cache_keys = {}, {}
+    if use_cache is None:
+        use_cache = cache_enabled()
+    if use_cache:
+        # 輸出設定檔會改變圖片內容與副檔名，需納入快取鍵
+        extra = {'profile': get_profile().name}
+        for i, job in enumerate(jobs):
+            plots_dir = job.kwargs.get('plots_dir', '../plots')
+            cache = caches.setdefault(plots_dir, PlotCache(plots_dir))
+            key, inputs = cache.job_key(job, module_name, extra)
+            cache_keys[i] = (cache, key, inputs)
+            cached_path = cache.lookup(key)
+            if cached_path:
+                results[i] = PlotResult(job.name, cached_path, 0.0, None, True)
+                _print_result(results[i])
+
+    pending = [i for i in range(len(jobs)) if results[i] is None]
+    workers = min(workers or default_workers(), len(pending)) if pending else 0
+
+    if pending and workers <= 1:
+        _init_worker(module_name, dataset)
+        for i in pending:
+            results[i] = _run_job(jobs[i])
+            _print_result(results[i])
+    elif pending:
+        print(f"以 {workers} 個行程平行繪製 {len(pending)} 張圖表...")
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(module_name, dataset)) as executor:
+            futures = {executor.submit(_run_job, jobs[i]): i for i in pending}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    # worker 行程異常結束（例如記憶體不足）
+                    results[i] = PlotResult(jobs[i].name, None, 0.0, str(e))
+                _print_result(results[i])
+
+    if use_cache:
+        for i in pending:
+            if not results[i].error:
+                cache, key, inputs = cache_keys[i]
+                cache.record(key, jobs[i], module_name, results[i].path, inputs)
+        for cache in caches.values():
+            cache.save()
+
+    print_timing_report(results, time.perf_counter() - wall_start)
+    return results
+
+
+def _print_result(result):
+    if result.cached:
+        print(f"↺ {result.name} 輸入未變動，沿用快取: {result.path}")
+    elif result.error:
+        print(f"✗ {result.name} 失敗 ({result.seconds:.2f}s): {result.error}")
+    else:
+        print(f"✓ {result.name} ({result.seconds:.2f}s)")
+
+
+def print_timing_report(results, wall_seconds):
+    """
+    顯示每張圖表的耗時
+
+    Args:
+        results (list): PlotResult 列表
+        wall_seconds (float): 整批工作的實際耗時
+    """
+    print("\n" + "=" * 50)
+    print("圖表繪製耗時")
+    print("=" * 50)
+    for result in sorted(results, key=lambda r: r.seconds, reverse=True):
+        status = "失敗" if result.error else ("快取" if result.cached else "完成")
+        print(f"  {result.name:<40} {result.seconds:8.2f}s  {status}")
+    total = sum(r.seconds for r in results)
+    print("-" * 50)
+    print(f"  各圖表耗時總和: {total:.2f}s")
+    print(f"  實際耗時:       {wall_seconds:.2f}s")
+    cached = sum(1 for r in results if r.cached)
+    if cached:
+        print(f"  沿用快取圖表數: {cached}")
+    failed = sum(1 for r in results if r.error)
+    if failed:
+        print(f"  失敗圖表數:     {failed}")
+    print("=" * 50)
+
+
+def report_plot_jobs(start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True):
+    """
+    完整報表圖組（run_internal.sh plots）：節點趨勢、各節點 GPU、各 GPU 跨節點、使用者摘要
+
+    Returns:
+        list: PlotJob 列表
+    """
+    common = {'data_dir': data_dir, 'plots_dir': plots_dir}
+    jobs = [PlotJob('nodes_trend', 'quick_nodes_trend', (start_date, end_date),
+                    dict(common, show_users=show_users))]
+    for node in NODES:
+        jobs.append(PlotJob(f'{node}_all_gpus', 'quick_single_node_gpus', (node, start_date, end_date),
+                            dict(common, show_users=show_users)))
+    for gpu_index in range(8):
+        jobs.append(PlotJob(f'gpu{gpu_index}_across_nodes', 'quick_gpu_across_nodes',
+                            (gpu_index, start_date, end_date), dict(common, show_users=show_users)))
+    jobs.append(PlotJob('user_activity_summary', 'quick_user_activity_summary', (start_date, end_date), common))
+    return jobs
+
+
+def quick_plot_jobs(start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True,
+                    vram_available=True):
+    """
+    generate_all_quick_plots 的圖組
+
+    Returns:
+        list: PlotJob 列表
+    """
+    common = {'data_dir': data_dir, 'plots_dir': plots_dir}
+    with_users = dict(common, show_users=show_users)
+    jobs = [
+        PlotJob('nodes_trend', 'quick_nodes_trend', (start_date, end_date), with_users),
+        PlotJob('colab-gpu1_all_gpus', 'quick_single_node_gpus', ('colab-gpu1', start_date, end_date), with_users),
+        PlotJob('gpu0_across_nodes', 'quick_gpu_across_nodes', (0, start_date, end_date), with_users),
+    ]
+    if show_users:
+        jobs.append(PlotJob('user_activity_summary', 'quick_user_activity_summary', (start_date, end_date), common))
+    jobs.append(PlotJob('nodes_stacked_utilization', 'quick_nodes_stacked_utilization',
+                        (start_date, end_date), with_users))
+    jobs.append(PlotJob('gpu_heatmap', 'quick_gpu_heatmap', (start_date, end_date), with_users))
+    if vram_available:
+        if show_users:
+            jobs.append(PlotJob('vram_user_activity_summary', 'quick_vram_user_activity_summary',
+                                (start_date, end_date), common))
+        jobs.append(PlotJob('vram_nodes_comparison_with_users', 'quick_vram_nodes_comparison_with_users',
+                            (start_date, end_date), with_users))
+    return jobs
+
+
+def vram_plot_jobs(start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True):
+    """
+    generate_all_vram_plots 的圖組
+
+    Returns:
+        list: PlotJob 列表
+    """
+    common = {'data_dir': data_dir, 'plots_dir': plots_dir}
+    with_users = dict(common, show_users=show_users)
+    jobs = [
+        PlotJob('vram_nodes_comparison_with_users', 'quick_vram_nodes_comparison_with_users',
+                (start_date, end_date), with_users),
+        PlotJob('vram_nodes_stacked_utilization', 'quick_nodes_vram_stacked_utilization',
+                (start_date, end_date), with_users),
+        PlotJob('vram_heatmap', 'quick_vram_heatmap', (start_date, end_date), with_users),
+    ]
+    if show_users:
+        jobs.append(PlotJob('vram_user_activity_summary', 'quick_vram_user_activity_summary',
+                            (start_date, end_date), common))
+    jobs.append(PlotJob('vram_gpu1_across_nodes', 'quick_vram_nodes_comparison',
+                        (start_date, end_date), dict(common, gpu_id=1)))
+    return jobs
+
+
+JOB_SETS = {
+    'report': report_plot_jobs,
+    'quick': quick_plot_jobs,
+    'vram': vram_plot_jobs,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='平行繪製 GPU 圖表')
+    parser.add_argument('job_set', choices=sorted(JOB_SETS), help='圖組: report / quick / vram')
+    parser.add_argument('start_date', help='開始日期 (YYYY-MM-DD)')
+    parser.add_argument('end_date', help='結束日期 (YYYY-MM-DD)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='行程數量 (預設: GPU_PLOT_WORKERS 或 CPU 數量)')
+    parser.add_argument('--data-dir', default='../data', help='資料目錄')
+    parser.add_argument('--plots-dir', default='../plots', help='輸出目錄')
+    parser.add_argument('--no-users', action='store_true', help='不顯示使用者資訊')
+    parser.add_argument('--no-cache', action='store_true', help='忽略圖表快取，全部重新繪製')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    if args.profile:
+        set_profile(args.profile)
+
+    from gpu_dataset import GPUDataset
+
+    jobs = JOB_SETS[args.job_set](args.start_date, args.end_date, args.data_dir, args.plots_dir,
+                                  show_users=not args.no_users)
+    # 每日平均資料只讀取一次，所有 worker 共用
+    dataset = GPUDataset(args.data_dir, args.start_date, args.end_date)
+    results = run_plot_jobs(jobs, args.workers, use_cache=False if args.no_cache else None, dataset=dataset)
+    return 1 if any(r.error for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
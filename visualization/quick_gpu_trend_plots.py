@@ -7,19 +7,20 @@
 專門針對 data 資料夾中的數據格式優化
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
 import glob
 
 # 導入字體配置模組
-from font_config import setup_chinese_font
+from font_config import setup_chinese_font, pyplot as plt
+from lazy_imports import lazy_import
+from render_profiles import save_figure
+from gpu_dataset import ensure_dataset, INACTIVE_USERS
 
-# 設定中文字體
-setup_chinese_font()
+# pandas 在第一次讀取資料時、matplotlib 與 seaborn 在第一次繪圖時才載入，中文字體隨 pyplot 一併套用
+pd = lazy_import('pandas')
+mdates = lazy_import('matplotlib.dates')
 
 def load_gpu_data_with_users(avg_file):
     """
@@ -94,7 +95,7 @@ def get_user_info_for_node(node, date_str, data_dir="../data"):
     
     return user_info
 
-def quick_nodes_trend(start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True):
+def quick_nodes_trend(start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True, dataset=None):
     """
     快速繪製各節點 GPU 平均使用率趨勢對比
     
@@ -104,6 +105,7 @@ def quick_nodes_trend(start_date, end_date, data_dir="../data", plots_dir="../pl
         data_dir (str): 資料目錄
         plots_dir (str): 輸出目錄
         show_users (bool): 是否在圖表中顯示使用者資訊
+        dataset (GPUDataset): 已載入的資料集，None 表示自行載入
         
     Returns:
         str: 保存的圖片路徑
@@ -118,48 +120,23 @@ def quick_nodes_trend(start_date, end_date, data_dir="../data", plots_dir="../pl
     fig_height = 10 if show_users else 8
     fig, ax = plt.subplots(figsize=(15, fig_height))
     
-    # 生成日期範圍
-    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    dataset = ensure_dataset(dataset, data_dir, start_date, end_date)
+    dates = dataset.dates
     
     # 存儲使用者資訊用於顯示
     user_info_text = []
     
     for i, node in enumerate(nodes):
-        node_data = []
-        node_dates = []
+        # 沒有資料的日期為0，這樣線就會連起來
+        node_data = dataset.node_daily_mean(node)
         
-        for date in dates:
-            date_str = date.strftime('%Y-%m-%d')
-            avg_file = os.path.join(data_dir, node, date_str, f"average_{date_str}.csv")
-            
-            daily_avg = 0  # 預設為0，這樣線就會連起來
-            
-            if os.path.exists(avg_file):
-                df = load_gpu_data_with_users(avg_file)
-                if df is not None:
-                    # 過濾掉 "全部平均" 行並計算平均值
-                    gpu_data = df[~df['gpu'].str.contains('全部平均', na=False)]
-                    avg_usage = pd.to_numeric(gpu_data['usage'], errors='coerce').mean()
-                    
-                    if not np.isnan(avg_usage):
-                        daily_avg = avg_usage
-                        
-                        # 收集使用者資訊（僅最後一天）
-                        if show_users and date == dates[-1]:
-                            users = []
-                            for _, row in gpu_data.iterrows():
-                                user = row.get('user', '未知')
-                                if user and user not in ['未使用', '未知']:
-                                    users.append(user)
-                            if users:
-                                unique_users = list(set(users))
-                                user_info_text.append(f"{node}: {', '.join(unique_users)}")
-            
-            # 總是添加數據點，即使是0也要添加
-            node_data.append(daily_avg)
-            node_dates.append(date)
+        # 收集使用者資訊（僅最後一天）
+        if show_users and len(dates):
+            users = dataset.active_users(node, -1)
+            if users:
+                user_info_text.append(f"{node}: {', '.join(users)}")
         
-        if node_data:
+        if len(node_data):
             ax.plot(dates, node_data,  # 使用完整的dates而不是node_dates
                    label=node, 
                    marker='o', 
@@ -194,13 +171,14 @@ def quick_nodes_trend(start_date, end_date, data_dir="../data", plots_dir="../pl
     # 根據 show_users 參數決定檔名
     suffix = "_with_users" if show_users else "_without_users"
     save_path = os.path.join(plots_dir, f'nodes_trend_{start_date}_to_{end_date}{suffix}.png')
-    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    save_path = save_figure(save_path)
     print(f"節點趨勢圖已保存至: {save_path}")
     plt.close()
     
     return save_path
 
-def quick_single_node_gpus(node, start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True):
+def quick_single_node_gpus(node, start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True,
+                           dataset=None):
     """
     快速繪製單一節點所有 GPU 的使用率趨勢
     
@@ -211,6 +189,7 @@ def quick_single_node_gpus(node, start_date, end_date, data_dir="../data", plots
         data_dir (str): 資料目錄
         plots_dir (str): 輸出目錄
         show_users (bool): 是否在圖表中顯示使用者資訊
+        dataset (GPUDataset): 已載入的資料集，None 表示自行載入
         
     Returns:
         str: 保存的圖片路徑
@@ -225,38 +204,24 @@ def quick_single_node_gpus(node, start_date, end_date, data_dir="../data", plots
     fig_height = 12 if show_users else 10
     fig, ax = plt.subplots(figsize=(15, fig_height))
     
-    # 生成日期範圍
-    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    dataset = ensure_dataset(dataset, data_dir, start_date, end_date)
     
     # 存儲使用者資訊
     gpu_user_info = {}
     
     for i, gpu_index in enumerate(gpu_indices):
-        gpu_data = []
-        gpu_dates = []
-        
-        for date in dates:
-            date_str = date.strftime('%Y-%m-%d')
-            avg_file = os.path.join(data_dir, node, date_str, f"average_{date_str}.csv")
-            
-            if os.path.exists(avg_file):
-                df = load_gpu_data_with_users(avg_file)
-                if df is not None:
-                    # 尋找特定 GPU 的數據
-                    gpu_row = df[df['gpu'] == f'GPU[{gpu_index}]']
-                    if not gpu_row.empty:
-                        usage = pd.to_numeric(gpu_row['usage'].iloc[0], errors='coerce')
-                        if not np.isnan(usage):
-                            gpu_data.append(usage)
-                            gpu_dates.append(date)
-                            
-                            # 收集使用者資訊（最後一天）
-                            if show_users and date == dates[-1]:
-                                user = gpu_row['user'].iloc[0] if 'user' in gpu_row.columns else '未知'
-                                if user and user not in ['未使用', '未知']:
-                                    gpu_user_info[f'GPU[{gpu_index}]'] = user
-        
-        if gpu_data:
+        series = dataset.gpu_series(node, gpu_index)
+        present = ~np.isnan(series)
+        gpu_data = series[present]
+        gpu_dates = dataset.dates[present]
+        
+        # 收集使用者資訊（最後一天）
+        if show_users and len(series) and present[-1]:
+            user = dataset.gpu_series(node, gpu_index, 'users')[-1]
+            if user and user not in INACTIVE_USERS:
+                gpu_user_info[f'GPU[{gpu_index}]'] = user
+        
+        if len(gpu_data):
             # 構建標籤，包含使用者資訊（如果有的話）
             label = f'GPU[{gpu_index}]'
             if show_users and f'GPU[{gpu_index}]' in gpu_user_info:
@@ -296,13 +261,14 @@ def quick_single_node_gpus(node, start_date, end_date, data_dir="../data", plots
     plt.tight_layout()
     
     save_path = os.path.join(plots_dir, f'{node}_all_gpus_{start_date}_to_{end_date}.png')
-    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    save_path = save_figure(save_path)
     print(f"{node} 所有 GPU 趨勢圖已保存至: {save_path}")
     plt.close()
     
     return save_path
 
-def quick_gpu_across_nodes(gpu_index, start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True):
+def quick_gpu_across_nodes(gpu_index, start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True,
+                           dataset=None):
     """
     快速繪製特定 GPU 跨所有節點的使用率對比
     
@@ -313,6 +279,7 @@ def quick_gpu_across_nodes(gpu_index, start_date, end_date, data_dir="../data",
         data_dir (str): 資料目錄
         plots_dir (str): 輸出目錄
         show_users (bool): 是否在圖表中顯示使用者資訊
+        dataset (GPUDataset): 已載入的資料集，None 表示自行載入
         
     Returns:
         str: 保存的圖片路徑
@@ -326,38 +293,24 @@ def quick_gpu_across_nodes(gpu_index, start_date, end_date, data_dir="../data",
     fig_height = 10 if show_users else 8
     fig, ax = plt.subplots(figsize=(15, fig_height))
     
-    # 生成日期範圍
-    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    dataset = ensure_dataset(dataset, data_dir, start_date, end_date)
     
     # 存儲使用者資訊
     node_user_info = {}
     
     for i, node in enumerate(nodes):
-        node_data = []
-        node_dates = []
-        
-        for date in dates:
-            date_str = date.strftime('%Y-%m-%d')
-            avg_file = os.path.join(data_dir, node, date_str, f"average_{date_str}.csv")
-            
-            if os.path.exists(avg_file):
-                df = load_gpu_data_with_users(avg_file)
-                if df is not None:
-                    # 尋找特定 GPU 的數據
-                    gpu_row = df[df['gpu'] == f'GPU[{gpu_index}]']
-                    if not gpu_row.empty:
-                        usage = pd.to_numeric(gpu_row['usage'].iloc[0], errors='coerce')
-                        if not np.isnan(usage):
-                            node_data.append(usage)
-                            node_dates.append(date)
-                            
-                            # 收集使用者資訊（最後一天）
-                            if show_users and date == dates[-1]:
-                                user = gpu_row['user'].iloc[0] if 'user' in gpu_row.columns else '未知'
-                                if user and user not in ['未使用', '未知']:
-                                    node_user_info[node] = user
-        
-        if node_data:
+        series = dataset.gpu_series(node, gpu_index)
+        present = ~np.isnan(series)
+        node_data = series[present]
+        node_dates = dataset.dates[present]
+        
+        # 收集使用者資訊（最後一天）
+        if show_users and len(series) and present[-1]:
+            user = dataset.gpu_series(node, gpu_index, 'users')[-1]
+            if user and user not in INACTIVE_USERS:
+                node_user_info[node] = user
+        
+        if len(node_data):
             # 構建標籤，包含使用者資訊（如果有的話）
             label = node
             if show_users and node in node_user_info:
@@ -397,13 +350,14 @@ def quick_gpu_across_nodes(gpu_index, start_date, end_date, data_dir="../data",
     plt.tight_layout()
     
     save_path = os.path.join(plots_dir, f'gpu{gpu_index}_across_nodes_{start_date}_to_{end_date}.png')
-    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    save_path = save_figure(save_path)
     print(f"GPU[{gpu_index}] 跨節點趨勢圖已保存至: {save_path}")
     plt.close()
     
     return save_path
 
-def quick_nodes_stacked_utilization(start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True):
+def quick_nodes_stacked_utilization(start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True,
+                                    dataset=None):
     """
     繪製各節點 GPU 使用率累積的堆疊區域圖
     按節點分層顯示使用率累積情況，更清楚地展示各節點的貢獻
@@ -414,6 +368,7 @@ def quick_nodes_stacked_utilization(start_date, end_date, data_dir="../data", pl
         data_dir (str): 資料目錄
         plots_dir (str): 輸出目錄
         show_users (bool): 是否在圖表中顯示使用者資訊
+        dataset (GPUDataset): 已載入的資料集，None 表示自行載入
         
     Returns:
         str: 保存的圖片路徑
@@ -427,9 +382,8 @@ def quick_nodes_stacked_utilization(start_date, end_date, data_dir="../data", pl
     fig_height = 12 if show_users else 10
     fig, ax = plt.subplots(figsize=(18, fig_height))
     
-    # 生成日期範圍
-    dates = pd.date_range(start=start_date, end=end_date, freq='D')
-    date_list = [date.strftime('%Y-%m-%d') for date in dates]
+    dataset = ensure_dataset(dataset, data_dir, start_date, end_date)
+    date_list = dataset.date_strs
     
     # 存儲各節點的使用率數據
     node_data = {}  # {node: [daily_avg_usage]}
@@ -437,43 +391,12 @@ def quick_nodes_stacked_utilization(start_date, end_date, data_dir="../data", pl
     
     # 收集各節點的平均使用率數據
     for node in nodes:
-        node_usage_data = []
-        node_user_info[node] = {}
-        
-        for date in dates:
-            date_str = date.strftime('%Y-%m-%d')
-            avg_file = os.path.join(data_dir, node, date_str, f"average_{date_str}.csv")
-            
-            daily_avg = 0
-            active_users = []
-            
-            if os.path.exists(avg_file):
-                df = load_gpu_data_with_users(avg_file)
-                if df is not None:
-                    # 過濾掉 "全部平均" 行並計算節點平均使用率
-                    gpu_data = df[~df['gpu'].str.contains('全部平均', na=False)]
-                    
-                    if not gpu_data.empty:
-                        # 計算該節點當日的平均GPU使用率
-                        usage_values = pd.to_numeric(gpu_data['usage'], errors='coerce')
-                        daily_avg = usage_values.mean()
-                        
-                        if np.isnan(daily_avg):
-                            daily_avg = 0
-                        
-                        # 收集使用者資訊
-                        if show_users:
-                            for _, row in gpu_data.iterrows():
-                                user = row.get('user', '未知')
-                                usage = pd.to_numeric(row.get('usage', 0), errors='coerce')
-                                if user and user not in ['未使用', '未知'] and usage > 1:
-                                    if user not in active_users:
-                                        active_users.append(user)
-            
-            node_usage_data.append(daily_avg)
-            node_user_info[node][date_str] = active_users
-        
-        node_data[node] = node_usage_data
+        node_data[node] = dataset.node_daily_mean(node)
+        # 只計算有實際使用率的 GPU (>1%)
+        node_user_info[node] = {
+            date_str: dataset.active_users(node, col, predicate=lambda usage: usage > 1) if show_users else []
+            for col, date_str in enumerate(date_list)
+        }
     
     # 繪製堆疊區域圖
     bottom = np.zeros(len(date_list))
@@ -548,13 +471,13 @@ def quick_nodes_stacked_utilization(start_date, end_date, data_dir="../data", pl
     plt.tight_layout()
     
     save_path = os.path.join(plots_dir, f'nodes_stacked_utilization_{start_date}_to_{end_date}.png')
-    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    save_path = save_figure(save_path)
     print(f"各節點累積使用率堆疊區域圖已保存至: {save_path}")
     plt.close()
     
     return save_path
 
-def quick_user_activity_summary(start_date, end_date, data_dir="../data", plots_dir="../plots"):
+def quick_user_activity_summary(start_date, end_date, data_dir="../data", plots_dir="../plots", dataset=None):
     """
     生成使用者活動摘要圖表
     
@@ -563,12 +486,14 @@ def quick_user_activity_summary(start_date, end_date, data_dir="../data", plots_
         end_date (str): 結束日期 (YYYY-MM-DD)
         data_dir (str): 資料目錄
         plots_dir (str): 輸出目錄
+        dataset (GPUDataset): 已載入的資料集，None 表示自行載入
         
     Returns:
         str: 保存的圖片路徑
     """
     nodes = ['colab-gpu1', 'colab-gpu2', 'colab-gpu3', 'colab-gpu4']
-    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    dataset = ensure_dataset(dataset, data_dir, start_date, end_date)
+    dates = dataset.dates
     
     os.makedirs(plots_dir, exist_ok=True)
     
@@ -576,30 +501,20 @@ def quick_user_activity_summary(start_date, end_date, data_dir="../data", plots_
     user_activity = {}  # {user: {date: gpu_count}}
     daily_totals = {}   # {date: total_active_gpus}
     
-    for date in dates:
-        date_str = date.strftime('%Y-%m-%d')
+    for col, date_str in enumerate(dataset.date_strs):
         daily_totals[date_str] = 0
         
         for node in nodes:
-            avg_file = os.path.join(data_dir, node, date_str, f"average_{date_str}.csv")
-            df = load_gpu_data_with_users(avg_file)
-            
-            if df is not None:
-                # 處理非"全部平均"的行
-                gpu_data = df[~df['gpu'].str.contains('全部平均', na=False)]
-                
-                for _, row in gpu_data.iterrows():
-                    user = row.get('user', '未知')
-                    usage = pd.to_numeric(row.get('usage', 0), errors='coerce')
-                    
-                    # 只計算有實際使用率的 GPU (>1%)
-                    if user and user not in ['未使用', '未知'] and usage > 1:
-                        if user not in user_activity:
-                            user_activity[user] = {}
-                        if date_str not in user_activity[user]:
-                            user_activity[user][date_str] = 0
-                        user_activity[user][date_str] += 1
-                        daily_totals[date_str] += 1
+            usage_column = dataset.node_matrix(node)[:, col]
+            for user, usage in zip(dataset.node_matrix(node, 'users')[:, col], usage_column):
+                # 只計算有實際使用率的 GPU (>1%)
+                if user and user not in INACTIVE_USERS and usage > 1:
+                    if user not in user_activity:
+                        user_activity[user] = {}
+                    if date_str not in user_activity[user]:
+                        user_activity[user][date_str] = 0
+                    user_activity[user][date_str] += 1
+                    daily_totals[date_str] += 1
     
     if not user_activity:
         print("未找到使用者活動數據")
@@ -649,7 +564,7 @@ def quick_user_activity_summary(start_date, end_date, data_dir="../data", plots_
     plt.tight_layout()
     
     save_path = os.path.join(plots_dir, f'user_activity_summary_{start_date}_to_{end_date}.png')
-    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    save_path = save_figure(save_path)
     print(f"使用者活動摘要圖已保存至: {save_path}")
     plt.close()
     
@@ -681,7 +596,8 @@ def get_available_dates(data_dir="../data"):
     
     return sorted(list(dates))
 
-def generate_all_quick_plots(start_date=None, end_date=None, data_dir="../data", plots_dir="../plots", show_users=True):
+def generate_all_quick_plots(start_date=None, end_date=None, data_dir="../data", plots_dir="../plots", show_users=True, workers=1, use_cache=False,
+                             dataset=None):
     """
     生成所有常用的 GPU 使用率趨勢圖
     
@@ -691,6 +607,9 @@ def generate_all_quick_plots(start_date=None, end_date=None, data_dir="../data",
         data_dir (str): 資料目錄
         plots_dir (str): 輸出目錄
         show_users (bool): 是否在圖表中顯示使用者資訊
+        workers (int): 平行繪圖的行程數量，1 表示依序繪製
+        use_cache (bool): 是否沿用輸入資料未變動的圖表（見 plot_cache.py）
+        dataset (GPUDataset): 已載入的資料集（平行繪製時交給各 worker 共用），None 表示自行載入
         
     Returns:
         list: 生成的圖片路徑列表
@@ -706,56 +625,69 @@ def generate_all_quick_plots(start_date=None, end_date=None, data_dir="../data",
         end_date = available_dates[-1]
         print(f"自動選擇日期範圍: {start_date} 至 {end_date}")
     
+    if (workers and workers > 1) or use_cache:
+        from plot_scheduler import run_plot_jobs, quick_plot_jobs
+        jobs = quick_plot_jobs(start_date, end_date, data_dir, plots_dir, show_users, VRAM_AVAILABLE)
+        results = run_plot_jobs(jobs, workers, use_cache=use_cache, dataset=dataset)
+        generated_plots = [r.path for r in results if r.path]
+        print(f"所有圖表已生成完成！共 {len(generated_plots)} 張圖片")
+        print(f"保存位置: {plots_dir}")
+        return generated_plots
+    
     generated_plots = []
     
     print("=" * 50)
     print("GPU 使用率趨勢圖生成")
     print("=" * 50)
     
+    # 整批圖表共用同一份資料，每個每日平均檔只讀取一次
+    dataset = ensure_dataset(dataset, data_dir, start_date, end_date)
+    
     # 1. 各節點趨勢對比
     print("1. 生成各節點趨勢對比圖...")
-    plot_path = quick_nodes_trend(start_date, end_date, data_dir, plots_dir, show_users)
+    plot_path = quick_nodes_trend(start_date, end_date, data_dir, plots_dir, show_users, dataset=dataset)
     generated_plots.append(plot_path)
     
     # 2. 第一個節點的所有 GPU 趨勢
     print("\n2. 生成 colab-gpu1 所有 GPU 趨勢圖...")
-    plot_path = quick_single_node_gpus('colab-gpu1', start_date, end_date, data_dir, plots_dir, show_users)
+    plot_path = quick_single_node_gpus('colab-gpu1', start_date, end_date, data_dir, plots_dir, show_users, dataset=dataset)
     generated_plots.append(plot_path)
     
     # 3. GPU[0] 跨節點對比
     print("\n3. 生成 GPU[0] 跨節點趨勢圖...")
-    plot_path = quick_gpu_across_nodes(0, start_date, end_date, data_dir, plots_dir, show_users)
+    plot_path = quick_gpu_across_nodes(0, start_date, end_date, data_dir, plots_dir, show_users, dataset=dataset)
     generated_plots.append(plot_path)
     
     # 4. 使用者活動摘要（如果啟用使用者資訊）
     if show_users:
         print("\n4. 生成使用者活動摘要圖...")
-        plot_path = quick_user_activity_summary(start_date, end_date, data_dir, plots_dir)
+        plot_path = quick_user_activity_summary(start_date, end_date, data_dir, plots_dir, dataset=dataset)
         if plot_path:
             generated_plots.append(plot_path)
     
     # 5. 🔥 各節點 GPU 使用率累積堆疊視圖（新功能）
     print("\n5. 生成各節點 GPU 使用率累積堆疊視圖...")
-    plot_path = quick_nodes_stacked_utilization(start_date, end_date, data_dir, plots_dir, show_users)
+    plot_path = quick_nodes_stacked_utilization(start_date, end_date, data_dir, plots_dir, show_users, dataset=dataset)
     generated_plots.append(plot_path)
     
     # 6. GPU 使用率熱力圖
     print("\n6. 生成 GPU 使用率熱力圖...")
-    plot_path = quick_gpu_heatmap(start_date, end_date, data_dir, plots_dir, show_users)
+    plot_path = quick_gpu_heatmap(start_date, end_date, data_dir, plots_dir, show_users, dataset=dataset)
     if plot_path:
         generated_plots.append(plot_path)
     
     # 7. VRAM 使用者活動摘要（如果啟用使用者資訊且 VRAM 可用）
     if show_users and VRAM_AVAILABLE:
         print("\n7. 生成 VRAM 使用者活動摘要...")
-        plot_path = quick_vram_user_activity_summary(start_date, end_date, data_dir, plots_dir)
+        plot_path = quick_vram_user_activity_summary(start_date, end_date, data_dir, plots_dir, dataset=dataset)
         if plot_path:
             generated_plots.append(plot_path)
     
     # 8. VRAM 節點對比圖（包含使用者資訊）
     if VRAM_AVAILABLE:
         print(f"\n8. 生成 VRAM 節點對比圖（{'包含' if show_users else '不包含'}使用者資訊）...")
-        plot_path = quick_vram_nodes_comparison_with_users(start_date, end_date, data_dir, plots_dir, show_users=show_users)
+        plot_path = quick_vram_nodes_comparison_with_users(start_date, end_date, data_dir, plots_dir, show_users=show_users,
+                                                           dataset=dataset)
         if plot_path:
             generated_plots.append(plot_path)
     
@@ -799,7 +731,8 @@ def quick_vram_nodes_comparison(start_date, end_date, data_dir="../data", plots_
     monitor = VRAMMonitor(data_dir, plots_dir)
     return monitor.plot_nodes_vram_comparison(start_date, end_date, gpu_id)
 
-def quick_vram_heatmap(start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True):
+def quick_vram_heatmap(start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True, freq='auto',
+                       dataset=None):
     """
     快速繪製 VRAM 使用率熱力圖（包含使用者資訊）
     
@@ -809,6 +742,8 @@ def quick_vram_heatmap(start_date, end_date, data_dir="../data", plots_dir="../p
         data_dir (str): 資料目錄
         plots_dir (str): 輸出目錄
         show_users (bool): 是否顯示使用者資訊
+        freq (str): 欄位彙整 'auto'、'D'、'W' 或 'M'
+        dataset (GPUDataset): 已載入的資料集，None 表示自行載入
         
     Returns:
         str: 保存的圖片路徑
@@ -818,7 +753,7 @@ def quick_vram_heatmap(start_date, end_date, data_dir="../data", plots_dir="../p
         return None
         
     monitor = VRAMMonitor(data_dir, plots_dir)
-    return monitor.plot_vram_heatmap(start_date, end_date, show_users)
+    return monitor.plot_vram_heatmap(start_date, end_date, show_users, freq=freq, dataset=dataset)
 
 def quick_vram_timeline(node, gpu_id, date, data_dir="../data", plots_dir="../plots"):
     """
@@ -841,7 +776,7 @@ def quick_vram_timeline(node, gpu_id, date, data_dir="../data", plots_dir="../pl
     monitor = VRAMMonitor(data_dir, plots_dir)
     return monitor.plot_vram_usage_timeline(node, gpu_id, date)
 
-def quick_vram_user_activity_summary(start_date, end_date, data_dir="../data", plots_dir="../plots"):
+def quick_vram_user_activity_summary(start_date, end_date, data_dir="../data", plots_dir="../plots", dataset=None):
     """
     快速繪製 VRAM 使用者活動摘要圖表
     
@@ -850,6 +785,7 @@ def quick_vram_user_activity_summary(start_date, end_date, data_dir="../data", p
         end_date (str): 結束日期 (YYYY-MM-DD)
         data_dir (str): 資料目錄
         plots_dir (str): 輸出目錄
+        dataset (GPUDataset): 已載入的資料集，None 表示自行載入
         
     Returns:
         str: 保存的圖片路徑
@@ -859,9 +795,10 @@ def quick_vram_user_activity_summary(start_date, end_date, data_dir="../data", p
         return None
         
     monitor = VRAMMonitor(data_dir, plots_dir)
-    return monitor.plot_vram_user_activity_summary(start_date, end_date)
+    return monitor.plot_vram_user_activity_summary(start_date, end_date, dataset=dataset)
 
-def quick_vram_nodes_comparison_with_users(start_date, end_date, data_dir="../data", plots_dir="../plots", gpu_id=None, show_users=True):
+def quick_vram_nodes_comparison_with_users(start_date, end_date, data_dir="../data", plots_dir="../plots", gpu_id=None, show_users=True,
+                                           dataset=None):
     """
     快速繪製 VRAM 節點對比圖（包含使用者資訊）
     
@@ -872,6 +809,7 @@ def quick_vram_nodes_comparison_with_users(start_date, end_date, data_dir="../da
         plots_dir (str): 輸出目錄
         gpu_id (int): 指定 GPU ID，若為 None 則使用所有 GPU 平均
         show_users (bool): 是否顯示使用者資訊
+        dataset (GPUDataset): 已載入的資料集，None 表示自行載入
         
     Returns:
         str: 保存的圖片路徑
@@ -881,9 +819,10 @@ def quick_vram_nodes_comparison_with_users(start_date, end_date, data_dir="../da
         return None
         
     monitor = VRAMMonitor(data_dir, plots_dir)
-    return monitor.plot_vram_nodes_comparison_with_users(start_date, end_date, gpu_id, show_users)
+    return monitor.plot_vram_nodes_comparison_with_users(start_date, end_date, gpu_id, show_users, dataset=dataset)
 
-def quick_gpu_heatmap(start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True):
+def quick_gpu_heatmap(start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True, freq='auto',
+                      dataset=None):
     """
     生成 GPU 使用率熱力圖（包含使用者資訊）
     
@@ -893,6 +832,8 @@ def quick_gpu_heatmap(start_date, end_date, data_dir="../data", plots_dir="../pl
         data_dir (str): 資料目錄
         plots_dir (str): 輸出目錄
         show_users (bool): 是否顯示使用者資訊
+        freq (str): 欄位彙整 'auto'、'D'、'W' 或 'M'
+        dataset (GPUDataset): 已載入的資料集，None 表示自行載入
         
     Returns:
         str: 保存的圖片路徑
@@ -900,16 +841,36 @@ def quick_gpu_heatmap(start_date, end_date, data_dir="../data", plots_dir="../pl
     try:
         from advanced_gpu_trend_analyzer import GPUUsageTrendAnalyzer
         analyzer = GPUUsageTrendAnalyzer(data_dir, plots_dir)
-        analyzer.plot_heatmap(start_date, end_date, show_users=show_users)
-        
-        suffix = '_with_users' if show_users else ''
-        save_path = os.path.join(plots_dir, f'heatmap_{start_date}_to_{end_date}{suffix}.png')
-        return save_path
+        return analyzer.plot_heatmap(start_date, end_date, show_users=show_users, freq=freq, dataset=dataset)
     except ImportError as e:
         print(f"無法導入 advanced_gpu_trend_analyzer: {e}")
         return None
 
-def generate_all_vram_plots(start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True):
+
+def quick_gpu_correlation(start_date, end_date, data_dir="../data", plots_dir="../plots", nodes=None,
+                          resolution=60, busy_threshold=10.0, min_correlation=0.5):
+    """
+    生成跨 GPU / 跨節點相關性與同時忙碌分析圖（依分群排序的相關矩陣、Jaccard 矩陣與各群時間軸）
+    
+    Args:
+        start_date (str): 開始日期 (YYYY-MM-DD)
+        end_date (str): 結束日期 (YYYY-MM-DD)
+        data_dir (str): 資料目錄
+        plots_dir (str): 輸出目錄
+        nodes (list): 節點列表，None 為預設節點，['all'] 為資料目錄中的所有節點
+        resolution (int): 時間解析度（分鐘）
+        busy_threshold (float): 使用率超過此值視為忙碌 (%)
+        min_correlation (float): 分群的群內平均相關係數下限
+        
+    Returns:
+        str: 保存的圖片路徑
+    """
+    from gpu_correlation import run_correlation_analysis
+    return run_correlation_analysis(start_date, end_date, data_dir, plots_dir, nodes, resolution=resolution,
+                                    busy_threshold=busy_threshold, min_correlation=min_correlation)
+
+def generate_all_vram_plots(start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True, workers=1, use_cache=False,
+                            dataset=None):
     """
     生成所有 VRAM 相關圖表
     
@@ -919,6 +880,9 @@ def generate_all_vram_plots(start_date, end_date, data_dir="../data", plots_dir=
         data_dir (str): 資料目錄
         plots_dir (str): 輸出目錄
         show_users (bool): 是否在圖表中顯示使用者資訊
+        workers (int): 平行繪圖的行程數量，1 表示依序繪製
+        use_cache (bool): 是否沿用輸入資料未變動的圖表（見 plot_cache.py）
+        dataset (GPUDataset): 已載入的資料集（平行繪製時交給各 worker 共用），None 表示自行載入
         
     Returns:
         list: 生成的圖表路徑列表
@@ -926,6 +890,12 @@ def generate_all_vram_plots(start_date, end_date, data_dir="../data", plots_dir=
     if not VRAM_AVAILABLE:
         print("VRAM 監控功能不可用")
         return []
+    
+    if (workers and workers > 1) or use_cache:
+        from plot_scheduler import run_plot_jobs, vram_plot_jobs
+        results = run_plot_jobs(vram_plot_jobs(start_date, end_date, data_dir, plots_dir, show_users), workers,
+                                use_cache=use_cache, dataset=dataset)
+        return [r.path for r in results if r.path]
         
     print("==================================================")
     print(f"VRAM 使用量圖表生成（{'包含' if show_users else '不包含'}使用者資訊）")
@@ -934,28 +904,32 @@ def generate_all_vram_plots(start_date, end_date, data_dir="../data", plots_dir=
     generated_plots = []
     
     try:
+        # 整批圖表共用同一份資料，每個每日平均檔只讀取一次
+        dataset = ensure_dataset(dataset, data_dir, start_date, end_date)
+        
         # 1. 節點 VRAM 對比圖（包含使用者資訊控制）
         print(f"1. 生成各節點 VRAM 對比圖（{'包含' if show_users else '不包含'}使用者資訊）...")
-        path = quick_vram_nodes_comparison_with_users(start_date, end_date, data_dir, plots_dir, show_users=show_users)
+        path = quick_vram_nodes_comparison_with_users(start_date, end_date, data_dir, plots_dir, show_users=show_users,
+                                                      dataset=dataset)
         if path:
             generated_plots.append(path)
         
         # 2. VRAM 使用率堆疊區域圖
         print(f"\n2. 生成各節點 VRAM 使用率堆疊區域圖（{'包含' if show_users else '不包含'}使用者資訊）...")
-        path = quick_nodes_vram_stacked_utilization(start_date, end_date, data_dir, plots_dir, show_users)
+        path = quick_nodes_vram_stacked_utilization(start_date, end_date, data_dir, plots_dir, show_users, dataset=dataset)
         if path:
             generated_plots.append(path)
         
         # 3. VRAM 熱力圖（包含使用者資訊控制）
         print(f"\n3. 生成 VRAM 使用率熱力圖（{'包含' if show_users else '不包含'}使用者資訊）...")
-        path = quick_vram_heatmap(start_date, end_date, data_dir, plots_dir, show_users=show_users)
+        path = quick_vram_heatmap(start_date, end_date, data_dir, plots_dir, show_users=show_users, dataset=dataset)
         if path:
             generated_plots.append(path)
         
         # 4. 使用者活動摘要圖（僅在啟用使用者資訊時）
         if show_users:
             print("\n4. 生成 VRAM 使用者活動摘要圖...")
-            path = quick_vram_user_activity_summary(start_date, end_date, data_dir, plots_dir)
+            path = quick_vram_user_activity_summary(start_date, end_date, data_dir, plots_dir, dataset=dataset)
             if path:
                 generated_plots.append(path)
         
@@ -982,13 +956,15 @@ if __name__ == '__main__':
     直接執行此腳本將生成所有常用的 GPU 趨勢圖
     """
     import sys
+    from plot_scheduler import default_workers
+    from plot_cache import cache_enabled
     
     if len(sys.argv) > 1:
         # 有命令列參數，支援簡單的參數輸入
         if len(sys.argv) >= 3:
             start_date = sys.argv[1]
             end_date = sys.argv[2]
-            generate_all_quick_plots(start_date, end_date)
+            generate_all_quick_plots(start_date, end_date, workers=default_workers(), use_cache=cache_enabled())
         else:
             print("使用方式:")
             print("  python quick_gpu_trend_plots.py")
@@ -1004,12 +980,13 @@ if __name__ == '__main__':
             print(f"日期範圍: {available_dates[0]} 至 {available_dates[-1]}")
             
             # 生成所有圖表
-            generate_all_quick_plots()
+            generate_all_quick_plots(workers=default_workers(), use_cache=cache_enabled())
         else:
             print("未找到任何可用的 GPU 數據")
             print("請確認 './data' 目錄中包含正確格式的數據檔案")
 
-def quick_nodes_vram_stacked_utilization(start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True):
+def quick_nodes_vram_stacked_utilization(start_date, end_date, data_dir="../data", plots_dir="../plots", show_users=True,
+                                         dataset=None):
     """
     生成各節點 VRAM 使用率累積堆疊區域圖
     
@@ -1019,6 +996,7 @@ def quick_nodes_vram_stacked_utilization(start_date, end_date, data_dir="../data
         data_dir (str): 資料目錄路徑
         plots_dir (str): 圖表輸出目錄路徑
         show_users (bool): 是否顯示使用者資訊
+        dataset (GPUDataset): 已載入的資料集，None 表示自行載入
         
     Returns:
         str: 生成的圖片檔案路徑
@@ -1027,16 +1005,8 @@ def quick_nodes_vram_stacked_utilization(start_date, end_date, data_dir="../data
         # 設定中文字體
         setup_chinese_font()
         
-        # 生成日期列表
-        start = datetime.strptime(start_date, '%Y-%m-%d')
-        end = datetime.strptime(end_date, '%Y-%m-%d')
-        dates = []
-        current = start
-        while current <= end:
-            dates.append(current)
-            current += timedelta(days=1)
-        
-        date_list = [date.strftime('%Y-%m-%d') for date in dates]
+        dataset = ensure_dataset(dataset, data_dir, start_date, end_date)
+        date_list = dataset.date_strs
         nodes = ['colab-gpu1', 'colab-gpu2', 'colab-gpu3', 'colab-gpu4']
         
         # 收集各節點的 VRAM 數據
@@ -1046,66 +1016,22 @@ def quick_nodes_vram_stacked_utilization(start_date, end_date, data_dir="../data
         # 節點顏色配置
         node_colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4']
         
-        # 收集各節點的平均 VRAM 使用率數據
+        # 收集各節點的平均 VRAM 使用率數據（沒有 VRAM 資料的日期為 0）
         for node in nodes:
-            node_vram_data = []
-            node_user_info[node] = {}
+            node_data[node] = dataset.node_daily_mean(node, 'vram')
             
-            for date in dates:
-                date_str = date.strftime('%Y-%m-%d')
-                avg_file = os.path.join(data_dir, node, date_str, f"average_{date_str}.csv")
-                
-                daily_avg = 0
-                active_users = []
-                
-                if os.path.exists(avg_file):
-                    df = load_gpu_data_with_users(avg_file)
-                    if df is not None:
-                        # 檢查是否有 VRAM 列
-                        has_vram_data = 'vram' in df.columns or '平均VRAM使用率(%)' in df.columns
-                        
-                        if has_vram_data:
-                            # 確保使用正確的列名
-                            if '平均VRAM使用率(%)' in df.columns:
-                                df = df.rename(columns={'平均VRAM使用率(%)': 'vram'})
-                            
-                            # 過濾掉 "全部平均" 行並計算節點平均 VRAM 使用率
-                            gpu_data = df[~df['gpu'].str.contains('全部平均', na=False)]
-                            
-                            if not gpu_data.empty:
-                                # 計算該節點當日的平均 VRAM 使用率
-                                vram_values = pd.to_numeric(gpu_data['vram'], errors='coerce')
-                                # 過濾掉 NaN 值
-                                vram_values = vram_values.dropna()
-                                
-                                if len(vram_values) > 0:
-                                    daily_avg = vram_values.mean()
-                                    if pd.isna(daily_avg):
-                                        daily_avg = 0  # NaN轉為0
-                                else:
-                                    daily_avg = 0
-                                
-                                # 收集使用者資訊（所有有 VRAM 使用的用戶）
-                                if show_users:
-                                    for _, row in gpu_data.iterrows():
-                                        user = row.get('user', '未知')
-                                        vram_usage = pd.to_numeric(row.get('vram', 0), errors='coerce')
-                                        # 只收集有實際 VRAM 使用的使用者（>= 0.1%）
-                                        if user and user not in ['未使用', '未知'] and not pd.isna(vram_usage) and vram_usage >= 0.1:
-                                            if user not in active_users:
-                                                active_users.append(user)
-                
-                node_vram_data.append(daily_avg)
-                # 將當天的使用者資訊存儲
-                node_user_info[node][date_str] = active_users.copy()
+            # 只收集有實際 VRAM 使用的使用者（>= 0.1%）
+            node_user_info[node] = {
+                date_str: (dataset.active_users(node, col, 'vram', predicate=lambda vram: vram >= 0.1)
+                           if show_users else [])
+                for col, date_str in enumerate(date_list)
+            }
             
             # 將所有日期的使用者合併到節點資訊中
             all_node_users = set()
             for date_users in node_user_info[node].values():
                 all_node_users.update(date_users)
-            node_user_info[node]['all_users'] = list(all_node_users)
-            
-            node_data[node] = node_vram_data
+            node_user_info[node]['all_users'] = sorted(all_node_users)
         
         # 創建堆疊區域圖
         fig, ax = plt.subplots(figsize=(15, 10))
@@ -1204,7 +1130,7 @@ def quick_nodes_vram_stacked_utilization(start_date, end_date, data_dir="../data
         # 根據 show_users 參數決定檔名
         suffix = "_with_users" if show_users else "_without_users"
         save_path = os.path.join(plots_dir, f'nodes_vram_stacked_utilization_{start_date}_to_{end_date}{suffix}.png')
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        save_path = save_figure(save_path)
         print(f"各節點 VRAM 累積使用率堆疊區域圖已保存至: {save_path}")
         plt.close()
         
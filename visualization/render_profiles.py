@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+圖表輸出設定檔 (render profiles)
+
+所有圖表統一透過 save_figure() 輸出，依設定檔決定解析度、版面裁切與檔案格式：
+- preview:        低解析度、不做 tight bbox 的額外版面計算，供互動檢視
+- dashboard:      中解析度、壓縮 PNG，供網頁儀表板
+- dashboard-webp: 同 dashboard，但輸出 WebP（Pillow 不支援時退回 PNG）
+- print:          300 DPI PNG（預設，與過去輸出相同）
+- vector:         向量 PDF，供列印或排版
+
+設定檔選擇順序: set_profile() / 命令列 --profile > 環境變數 GPU_PLOT_PROFILE > print
+"""
+
+import os
+import time
+from collections import namedtuple
+
+from lazy_imports import lazy_import
+
+# 只在存檔時才需要 pyplot
+plt = lazy_import('matplotlib.pyplot')
+
+RenderProfile = namedtuple('RenderProfile', ['name', 'dpi', 'bbox_inches', 'format', 'save_kwargs'])
+
+PROFILES = {
+    'preview': RenderProfile('preview', 72, None, 'png', {'pil_kwargs': {'compress_level': 1}}),
+    'dashboard': RenderProfile('dashboard', 110, 'tight', 'png', {'pil_kwargs': {'optimize': True}}),
+    'dashboard-webp': RenderProfile('dashboard-webp', 110, 'tight', 'webp', {'pil_kwargs': {'quality': 80}}),
+    'print': RenderProfile('print', 300, 'tight', 'png', {}),
+    'vector': RenderProfile('vector', 300, 'tight', 'pdf', {}),
+}
+
+DEFAULT_PROFILE = 'print'
+PROFILE_ENV = 'GPU_PLOT_PROFILE'
+
+# 本行程中每次輸出的紀錄: (路徑, 設定檔, 秒數, 位元組)
+RenderRecord = namedtuple('RenderRecord', ['path', 'profile', 'seconds', 'size'])
+render_log = []
+
+
+def set_profile(name):
+    """
+    設定目前使用的輸出設定檔（同時寫入環境變數，讓平行繪圖的子行程沿用）
+
+    Args:
+        name (str): 設定檔名稱
+    """
+    if name not in PROFILES:
+        raise ValueError(f"未知的輸出設定檔: {name}（可用: {', '.join(PROFILES)}）")
+    os.environ[PROFILE_ENV] = name
+
+
+def get_profile(name=None):
+    """
+    取得輸出設定檔
+
+    Args:
+        name (str): 指定設定檔名稱，None 表示目前使用中的設定檔
+
+    Returns:
+        RenderProfile: 輸出設定檔
+    """
+    name = name or os.environ.get(PROFILE_ENV) or DEFAULT_PROFILE
+    if name not in PROFILES:
+        print(f"警告: 未知的輸出設定檔 {name}，改用 {DEFAULT_PROFILE}")
+        name = DEFAULT_PROFILE
+    profile = PROFILES[name]
+    if profile.format == 'webp' and not _webp_supported():
+        profile = profile._replace(format='png', save_kwargs={'pil_kwargs': {'optimize': True}})
+    return profile
+
+
+def _webp_supported():
+    try:
+        from PIL import features
+        return features.check('webp')
+    except ImportError:
+        return False
+
+
+def add_profile_argument(parser):
+    """
+    為 argparse 命令列加入 --profile 參數
+
+    Args:
+        parser (argparse.ArgumentParser): 命令列解析器
+    """
+    parser.add_argument('--profile', choices=sorted(PROFILES), default=None,
+                        help=f'圖表輸出設定檔 (預設: ${PROFILE_ENV} 或 {DEFAULT_PROFILE})')
+
+
+def save_figure(save_path, fig=None, profile=None):
+    """
+    依輸出設定檔儲存圖表，並顯示耗時與檔案大小
+
+    Args:
+        save_path (str): 輸出路徑，副檔名會依設定檔格式調整
+        fig (matplotlib.figure.Figure): 要儲存的圖表，None 表示目前的圖表
+        profile (str): 指定設定檔名稱，None 表示目前使用中的設定檔
+
+    Returns:
+        str: 實際輸出的檔案路徑
+    """
+    profile = get_profile(profile)
+    root, ext = os.path.splitext(str(save_path))
+    if ext.lower().lstrip('.') != profile.format:
+        save_path = f"{root}.{profile.format}"
+
+    fig = fig or plt.gcf()
+    start = time.perf_counter()
+    fig.savefig(save_path, dpi=profile.dpi, bbox_inches=profile.bbox_inches,
+                format=profile.format, **profile.save_kwargs)
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(save_path)
+
+    render_log.append(RenderRecord(save_path, profile.name, elapsed, size))
+    print(f"[輸出設定 {profile.name}] {os.path.basename(save_path)}: {elapsed:.2f}s, {size / 1024:.1f} KB")
+    return save_path
@@ -0,0 +1,690 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+向量化趨勢統計模組
+
+在 [節點, GPU, 時間] 陣列上沿最後一軸一次算完所有序列的統計量，不再逐日、逐 GPU 迴圈：
+- rolling_mean(): 移動平均（以累加和計算，NaN 不計入）
+- ewma(): 指數加權移動平均（分段閉式解，NaN 時沿用先前權重）
+- period_delta(): 週對週變化（本期移動平均減上一期）
+- trend_fit(): 最小平方法趨勢斜率、截距與 R²（缺值以遮罩處理）
+- hour_weekday_profile(): 星期 × 小時的季節性輪廓
+
+每小時資料由 build_hourly_cube() 建構為 [節點, GPU, 日期, 24] 的加總與筆數陣列。
+每個 (節點, 日期) 分區的結果存於 data/trend_cache/<節點>/<日期>.npz，
+以分區內 gpu*.csv 的檔名、大小與修改時間判斷是否失效；原始檔已被保留政策
+壓縮時改讀 data/rollups/hourly 的每小時彙總。多年資料第二次之後只需讀取快取檔。
+
+停用磁碟快取: GPU_TREND_CACHE=0
+
+使用範例:
+    python3 trend_stats.py 2025-01-01 2025-12-31 --data-dir ../data
+    python3 trend_stats.py 2025-01-01 2025-12-31 --by gpu --window 14
+    python3 trend_stats.py 2025-01-01 2025-12-31 --profile
+"""
+
+import os
+import re
+import csv
+import math
+import argparse
+import unicodedata
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from columnar_csv import read_gpu_columns
+
+NODES = ['colab-gpu1', 'colab-gpu2', 'colab-gpu3', 'colab-gpu4']
+GPU_INDICES = list(range(8))
+DATE_FORMAT = '%Y-%m-%d'
+
+DEFAULT_WINDOW = 7
+DEFAULT_EWMA_SPAN = 7
+HOURS = 24
+# 時間戳轉為台灣時間的小時
+TAIWAN_OFFSET = 8 * 3600
+WEEKDAY_NAMES = ['週一', '週二', '週三', '週四', '週五', '週六', '週日']
+
+CACHE_DIRNAME = 'trend_cache'
+GPU_FILE_PATTERN = re.compile(r'^gpu(\d+)_(\d{4}-\d{2}-\d{2})\.csv$')
+# 每小時彙總: 時間戳,日期時間,GPU編號,平均GPU使用率(%),平均VRAM使用率(%),最大GPU使用率(%),樣本數
+HOURLY_ROLLUP_COLUMNS = {'timestamp': 0, 'datetime': 1, 'gpu': 2, 'usage': 3, 'vram': 4, 'count': 6}
+GPU_LABEL_PATTERN = re.compile(r'(\d+)')
+
+# ewma() 分段長度的上限：衰減因子的 -n 次方不超過 1e150，避免溢位
+EWMA_SCALE_LIMIT = 150 * math.log(10)
+
+# 每個分區的每小時統計，stack 形狀為 [4, GPU, 24]：使用率加總、使用率筆數、VRAM 加總、VRAM 筆數
+PartitionHours = namedtuple('PartitionHours', ['signature', 'gpus', 'stack'])
+
+# 各陣列形狀為 [節點, GPU, 日期, 24]
+HourlyCube = namedtuple('HourlyCube', ['nodes', 'gpu_indices', 'dates',
+                                       'usage_sum', 'usage_count', 'vram_sum', 'vram_count'])
+
+# 各欄位為長度等於序列數的陣列；斜率單位為「每天」
+TrendFit = namedtuple('TrendFit', ['slope', 'intercept', 'r2', 'count'])
+
+# summarize_series() 的結果，各欄位為長度等於序列數的陣列
+TrendSummary = namedtuple('TrendSummary', ['mean', 'last', 'rolling', 'ewma', 'delta', 'slope_per_week',
+                                           'r2', 'days'])
+
+# 分區目錄 -> PartitionHours
+_partition_cache = {}
+# 每小時彙總檔 -> (簽章, {日期: PartitionHours})
+_rollup_cache = {}
+
+
+def disk_cache_enabled():
+    """
+    是否使用磁碟快取（環境變數 GPU_TREND_CACHE=0 可停用）
+
+    Returns:
+        bool: 是否啟用
+    """
+    return os.environ.get('GPU_TREND_CACHE', '1').lower() not in ('0', 'false', 'no', 'off')
+
+
+def clear_trend_cache():
+    """清除行程內的分區快取（不刪除磁碟快取）"""
+    _partition_cache.clear()
+    _rollup_cache.clear()
+
+
+# ---------------------------------------------------------------------------
+# 向量化統計（皆沿最後一軸計算，前面的軸可為任意形狀）
+# ---------------------------------------------------------------------------
+
+def _masked(values):
+    values = np.asarray(values, dtype=float)
+    present = ~np.isnan(values)
+    return np.where(present, values, 0.0), present
+
+
+def rolling_mean(values, window=DEFAULT_WINDOW, min_periods=1):
+    """
+    尾端對齊的移動平均：第 t 個值為 [t-window+1, t] 內有資料的平均
+
+    Args:
+        values (numpy.ndarray): [..., 時間] 陣列，缺資料為 NaN
+        window (int): 視窗長度
+        min_periods (int): 視窗內至少需要的資料筆數，不足時為 NaN
+
+    Returns:
+        numpy.ndarray: 與輸入同形狀的移動平均
+    """
+    filled, present = _masked(values)
+    pad = [(0, 0)] * (filled.ndim - 1) + [(1, 0)]
+    sums = np.pad(np.cumsum(filled, axis=-1), pad)
+    counts = np.pad(np.cumsum(present, axis=-1), pad)
+    # 第 t 個視窗為累加和的 [max(t+1-window, 0), t+1) 區段
+    stop = np.arange(1, filled.shape[-1] + 1)
+    start = np.maximum(stop - window, 0)
+    window_sums = sums[..., stop] - sums[..., start]
+    window_counts = counts[..., stop] - counts[..., start]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(window_counts >= max(min_periods, 1), window_sums / window_counts, np.nan)
+
+
+def ewma(values, span=DEFAULT_EWMA_SPAN, alpha=None):
+    """
+    指數加權移動平均（與 pandas ewm(adjust=True, ignore_na=False) 相同的權重）
+
+    分段計算閉式解 y_t = Σ d^(t-i)·x_i / Σ d^(t-i)，每段內以累加和一次完成，
+    段與段之間只傳遞分子與分母，因此整條序列只需 O(時間 / 分段長度) 次陣列運算。
+
+    Args:
+        values (numpy.ndarray): [..., 時間] 陣列，缺資料為 NaN
+        span (float): 平滑跨度，alpha = 2 / (span + 1)
+        alpha (float): 直接指定平滑係數，優先於 span
+
+    Returns:
+        numpy.ndarray: 與輸入同形狀的 EWMA，序列開頭尚無資料時為 NaN
+    """
+    alpha = 2.0 / (span + 1.0) if alpha is None else float(alpha)
+    filled, present = _masked(values)
+    decay = 1.0 - alpha
+    length = filled.shape[-1]
+    result = np.full(filled.shape, np.nan)
+    if length == 0:
+        return result
+    if decay <= 0:
+        # alpha = 1：直接沿用最近一筆有資料的值
+        index = np.where(present, np.arange(length), -1)
+        index = np.maximum.accumulate(index, axis=-1)
+        picked = np.take_along_axis(filled, np.maximum(index, 0), axis=-1)
+        return np.where(index >= 0, picked, np.nan)
+
+    block = max(1, int(EWMA_SCALE_LIMIT / -math.log(decay)))
+    numerator = np.zeros(filled.shape[:-1])
+    denominator = np.zeros(filled.shape[:-1])
+    for start in range(0, length, block):
+        stop = min(start + block, length)
+        steps = np.arange(1, stop - start + 1)
+        grow = decay ** -steps          # d^(-k)
+        shrink = decay ** steps         # d^k
+        num = shrink * (numerator[..., None] + np.cumsum(filled[..., start:stop] * grow, axis=-1))
+        den = shrink * (denominator[..., None] + np.cumsum(present[..., start:stop] * grow, axis=-1))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[..., start:stop] = np.where(den > 0, num / den, np.nan)
+        numerator, denominator = num[..., -1], den[..., -1]
+    return result
+
+
+def shift(values, periods):
+    """
+    沿最後一軸往後平移 periods 格，前端補 NaN
+
+    Returns:
+        numpy.ndarray: 平移後的陣列
+    """
+    values = np.asarray(values, dtype=float)
+    result = np.full(values.shape, np.nan)
+    if periods < values.shape[-1]:
+        result[..., periods:] = values[..., :values.shape[-1] - periods]
+    return result
+
+
+def period_delta(values, period=DEFAULT_WINDOW):
+    """
+    週對週（period 對 period）變化：本期移動平均減上一期移動平均
+
+    Args:
+        values (numpy.ndarray): [..., 時間] 陣列
+        period (int): 期間長度，每日資料用 7 即為週對週
+
+    Returns:
+        numpy.ndarray: 與輸入同形狀的變化量（百分點），前 period 個位置為 NaN
+    """
+    current = rolling_mean(values, period)
+    return current - shift(current, period)
+
+
+def trend_fit(values, x=None):
+    """
+    沿最後一軸的線性最小平方法，缺值不計入
+
+    Args:
+        values (numpy.ndarray): [..., 時間] 陣列
+        x (numpy.ndarray): 各時間點的座標，預設為 0, 1, 2, ...
+
+    Returns:
+        TrendFit: 斜率（每單位 x）、截距（x=0 時）、R² 與資料筆數，有效資料少於 2 筆時為 NaN
+    """
+    filled, present = _masked(values)
+    x = np.arange(filled.shape[-1], dtype=float) if x is None else np.asarray(x, dtype=float)
+    xs = np.where(present, x, 0.0)
+    count = present.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = xs.sum(axis=-1) / count
+        mean_y = filled.sum(axis=-1) / count
+        dx = np.where(present, x - mean_x[..., None], 0.0)
+        dy = np.where(present, filled - mean_y[..., None], 0.0)
+        sxx = (dx * dx).sum(axis=-1)
+        sxy = (dx * dy).sum(axis=-1)
+        syy = (dy * dy).sum(axis=-1)
+        slope = np.where((count >= 2) & (sxx > 0), sxy / sxx, np.nan)
+        intercept = mean_y - slope * mean_x
+        r2 = np.where(syy > 0, sxy * sxy / (sxx * syy), np.where(count >= 2, 1.0, np.nan))
+    return TrendFit(slope, intercept, np.where(np.isnan(slope), np.nan, r2), count)
+
+
+def nan_mean(values, axis):
+    """
+    忽略 NaN 的平均，全為 NaN 時回傳 NaN 而不發出警告
+
+    Returns:
+        numpy.ndarray: 平均值
+    """
+    filled, present = _masked(values)
+    counts = present.sum(axis=axis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, filled.sum(axis=axis) / counts, np.nan)
+
+
+def last_valid(values):
+    """
+    Returns:
+        numpy.ndarray: 每條序列最後一個非 NaN 的值，沒有資料時為 NaN
+    """
+    values = np.asarray(values, dtype=float)
+    present = ~np.isnan(values)
+    if values.shape[-1] == 0:
+        return np.full(values.shape[:-1], np.nan)
+    index = values.shape[-1] - 1 - np.argmax(present[..., ::-1], axis=-1)
+    picked = np.take_along_axis(values, index[..., None], axis=-1)[..., 0]
+    return np.where(present.any(axis=-1), picked, np.nan)
+
+
+def summarize_series(series, window=DEFAULT_WINDOW, span=DEFAULT_EWMA_SPAN):
+    """
+    一次計算多條每日序列的期間平均、移動平均、EWMA、週變化與趨勢
+
+    Args:
+        series (numpy.ndarray): [序列, 日期] 每日數值，缺資料為 NaN
+        window (int): 移動平均與週變化的視窗天數
+        span (float): EWMA 跨度（天）
+
+    Returns:
+        TrendSummary: 各欄位為長度等於序列數的陣列（rolling / ewma / delta 為最後一天的值）
+    """
+    series = np.atleast_2d(np.asarray(series, dtype=float))
+    fit = trend_fit(series)
+    return TrendSummary(
+        mean=nan_mean(series, axis=-1),
+        last=last_valid(series),
+        rolling=last_valid(rolling_mean(series, window)),
+        ewma=last_valid(ewma(series, span)),
+        delta=period_delta(series, window)[..., -1] if series.shape[-1] else np.full(len(series), np.nan),
+        slope_per_week=fit.slope * 7,
+        r2=fit.r2,
+        days=fit.count,
+    )
+
+
+def daily_cube(data, layer='usage'):
+    """
+    將熱力圖資料的 [節點·GPU, 日期] 矩陣轉為 [節點, GPU, 日期]（不複製資料）
+
+    Args:
+        data (HeatmapData): build_heatmap_data() 或 GPUDataset.data
+        layer (str): 'usage' 或 'vram'
+
+    Returns:
+        numpy.ndarray: [節點, GPU, 日期] 陣列
+    """
+    return getattr(data, layer).reshape(len(data.nodes), len(data.gpu_indices), len(data.dates))
+
+
+def weekday_indices(dates):
+    """
+    Returns:
+        numpy.ndarray: 每個日期的星期（0 = 週一）
+    """
+    return np.array([datetime.strptime(date_str, DATE_FORMAT).weekday() for date_str in dates], dtype=int)
+
+
+def hour_weekday_profile(sums, counts, dates):
+    """
+    星期 × 小時的季節性輪廓：以 one-hot 星期矩陣做一次 einsum 彙整
+
+    Args:
+        sums (numpy.ndarray): [..., 日期, 24] 每小時數值加總
+        counts (numpy.ndarray): [..., 日期, 24] 每小時樣本數
+        dates (list): 日期字串列表
+
+    Returns:
+        tuple: (平均 [..., 7, 24]，沒有樣本的格子為 NaN；樣本數 [..., 7, 24])
+    """
+    onehot = np.eye(7)[weekday_indices(dates)] if len(dates) else np.zeros((0, 7))
+    profile_sums = np.einsum('...dh,dw->...wh', sums, onehot)
+    profile_counts = np.einsum('...dh,dw->...wh', counts, onehot)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(profile_counts > 0, profile_sums / profile_counts, np.nan), profile_counts
+
+
+# ---------------------------------------------------------------------------
+# 每小時資料（依分區快取）
+# ---------------------------------------------------------------------------
+
+def _date_strings(start_date, end_date):
+    start = datetime.strptime(start_date, DATE_FORMAT)
+    days = (datetime.strptime(end_date, DATE_FORMAT) - start).days
+    return [(start + timedelta(days=offset)).strftime(DATE_FORMAT) for offset in range(days + 1)]
+
+
+def _gpu_files(partition, date_str):
+    """
+    Returns:
+        list: 分區內的 (GPU 索引, 檔名, 簽章字串)，依 GPU 索引排序
+    """
+    try:
+        names = os.listdir(partition)
+    except OSError:
+        return []
+    files = []
+    for name in names:
+        match = GPU_FILE_PATTERN.match(name)
+        if not match or match.group(2) != date_str:
+            continue
+        try:
+            stat = os.stat(os.path.join(partition, name))
+        except OSError:
+            continue
+        files.append((int(match.group(1)), name, f"{name}:{stat.st_size}:{stat.st_mtime_ns}"))
+    return sorted(files)
+
+
+def _hour_stack(gpu_count):
+    return np.zeros((4, gpu_count, HOURS))
+
+
+def _accumulate_hours(stack, offset, timestamps, usage, vram):
+    hours = ((timestamps.astype(np.int64) + TAIWAN_OFFSET) // 3600) % HOURS
+    for row, values in ((0, usage), (2, vram)):
+        present = ~np.isnan(values)
+        stack[row, offset] += np.bincount(hours, weights=np.where(present, values, 0.0), minlength=HOURS)
+        stack[row + 1, offset] += np.bincount(hours, weights=present, minlength=HOURS)
+
+
+def _cache_path(data_dir, node, date_str):
+    return os.path.join(data_dir, CACHE_DIRNAME, node, f"{date_str}.npz")
+
+
+def _read_cache_file(path, signature):
+    try:
+        with np.load(path) as cached:
+            if str(cached['signature']) != signature:
+                return None
+            return PartitionHours(signature, cached['gpus'], cached['stack'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _write_cache_file(path, hours):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp.npz'
+        np.savez_compressed(tmp_path, signature=np.array(hours.signature), gpus=hours.gpus, stack=hours.stack)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"警告: 無法寫入趨勢快取 {path}: {e}")
+
+
+def _rollup_hours(data_dir, node, date_str):
+    """
+    由每小時彙總檔取得分區的每小時統計（原始檔已被保留政策壓縮時使用）
+
+    Returns:
+        PartitionHours: 該日的統計，彙總檔中沒有該日時為 None
+    """
+    path = os.path.join(data_dir, 'rollups', 'hourly', node, f"hourly_{date_str[:7]}.csv")
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+    cached = _rollup_cache.get(path)
+    if cached is None or cached[0] != signature:
+        rows = {}
+        columns = HOURLY_ROLLUP_COLUMNS
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if len(row) <= max(columns.values()):
+                    continue
+                match = GPU_LABEL_PATTERN.search(row[columns['gpu']])
+                try:
+                    timestamp = int(row[columns['timestamp']])
+                    count = float(row[columns['count']])
+                except ValueError:
+                    continue
+                if not match:
+                    continue
+                rows.setdefault(row[columns['datetime']][:10], []).append(
+                    (int(match.group(1)), timestamp, row[columns['usage']], row[columns['vram']], count))
+        days = {}
+        for day, day_rows in rows.items():
+            gpus = np.array(sorted({row[0] for row in day_rows}), dtype=int)
+            offsets = {gpu_index: i for i, gpu_index in enumerate(gpus)}
+            stack = _hour_stack(len(gpus))
+            for gpu_index, timestamp, usage, vram, count in day_rows:
+                hour = ((timestamp + TAIWAN_OFFSET) // 3600) % HOURS
+                for row_index, value in ((0, usage), (2, vram)):
+                    try:
+                        value = float(value)
+                    except ValueError:
+                        continue
+                    if not np.isnan(value):
+                        stack[row_index, offsets[gpu_index], hour] += value * count
+                        stack[row_index + 1, offsets[gpu_index], hour] += count
+            days[day] = PartitionHours(f"rollup:{signature}", gpus, stack)
+        cached = _rollup_cache[path] = (signature, days)
+    return cached[1].get(date_str)
+
+
+def partition_hours(data_dir, node, date_str, use_disk_cache=None):
+    """
+    單一 (節點, 日期) 分區的每小時加總與筆數
+
+    依序使用行程內快取、磁碟快取（簽章相符時）、原始 gpu*.csv，
+    原始檔不存在時改用每小時彙總。
+
+    Args:
+        data_dir (str): 資料目錄
+        node (str): 節點名稱
+        date_str (str): 日期 (YYYY-MM-DD)
+        use_disk_cache (bool): 是否讀寫 data/trend_cache，None 表示依環境變數
+
+    Returns:
+        PartitionHours: 分區統計，沒有任何資料時為 None
+    """
+    partition = os.path.join(data_dir, node, date_str)
+    files = _gpu_files(partition, date_str)
+    if not files:
+        return _rollup_hours(data_dir, node, date_str)
+
+    signature = '|'.join(entry[2] for entry in files)
+    cached = _partition_cache.get(partition)
+    if cached is not None and cached.signature == signature:
+        return cached
+
+    if use_disk_cache is None:
+        use_disk_cache = disk_cache_enabled()
+    cache_path = _cache_path(data_dir, node, date_str)
+    hours = _read_cache_file(cache_path, signature) if use_disk_cache else None
+    if hours is None:
+        stack = _hour_stack(len(files))
+        for offset, (_, name, _) in enumerate(files):
+            arrays = read_gpu_columns(os.path.join(partition, name)).numpy()
+            if len(arrays['timestamp']):
+                _accumulate_hours(stack, offset, arrays['timestamp'], arrays['usage'], arrays['vram'])
+        hours = PartitionHours(signature, np.array([entry[0] for entry in files], dtype=int), stack)
+        if use_disk_cache:
+            _write_cache_file(cache_path, hours)
+    _partition_cache[partition] = hours
+    return hours
+
+
+def build_hourly_cube(data_dir, nodes, start_date, end_date, gpu_indices=GPU_INDICES, use_disk_cache=None):
+    """
+    建構 [節點, GPU, 日期, 24] 的每小時加總與筆數
+
+    Args:
+        data_dir (str): 資料目錄
+        nodes (list): 節點名稱列表
+        start_date (str): 開始日期 (YYYY-MM-DD)
+        end_date (str): 結束日期 (YYYY-MM-DD)
+        gpu_indices (iterable): GPU 索引
+        use_disk_cache (bool): 是否讀寫磁碟快取，None 表示依環境變數
+
+    Returns:
+        HourlyCube: 每小時資料
+    """
+    nodes = list(nodes)
+    gpu_indices = list(gpu_indices)
+    dates = _date_strings(start_date, end_date)
+    stack = np.zeros((4, len(nodes), len(gpu_indices), len(dates), HOURS))
+    wanted = np.array(gpu_indices, dtype=int)
+
+    for node_pos, node in enumerate(nodes):
+        for day, date_str in enumerate(dates):
+            hours = partition_hours(data_dir, node, date_str, use_disk_cache)
+            if hours is None or not len(hours.gpus):
+                continue
+            # 分區內的 GPU 對應到要求的 GPU 順序
+            match = (hours.gpus[:, None] == wanted[None, :])
+            source, target = np.nonzero(match)
+            stack[:, node_pos, target, day] = hours.stack[:, source]
+
+    return HourlyCube(nodes, gpu_indices, dates, stack[0], stack[1], stack[2], stack[3])
+
+
+def hourly_daily_means(cube, layer='usage'):
+    """
+    由每小時資料計算以樣本數加權的每日平均
+
+    Returns:
+        numpy.ndarray: [節點, GPU, 日期]，沒有樣本時為 NaN
+    """
+    sums = getattr(cube, f"{layer}_sum").sum(axis=-1)
+    counts = getattr(cube, f"{layer}_count").sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def fleet_profile(cube, layer='usage', nodes=None):
+    """
+    多個節點合併的星期 × 小時輪廓
+
+    Args:
+        cube (HourlyCube): 每小時資料
+        layer (str): 'usage' 或 'vram'
+        nodes (list): 要納入的節點，None 表示全部
+
+    Returns:
+        tuple: (平均 [7, 24]，樣本數 [7, 24])
+    """
+    rows = slice(None) if nodes is None else [cube.nodes.index(node) for node in nodes]
+    sums = getattr(cube, f"{layer}_sum")[rows].sum(axis=(0, 1))
+    counts = getattr(cube, f"{layer}_count")[rows].sum(axis=(0, 1))
+    return hour_weekday_profile(sums, counts, cube.dates)
+
+
+def peak_cells(profile, top=3, lowest=False):
+    """
+    Returns:
+        list: 輪廓中最高（或最低）的 (星期, 小時, 平均值)
+    """
+    flat = profile.ravel()
+    valid = np.flatnonzero(~np.isnan(flat))
+    order = valid[np.argsort(flat[valid], kind='stable')]
+    picked = order[:top] if lowest else order[::-1][:top]
+    return [(int(i // HOURS), int(i % HOURS), float(flat[i])) for i in picked]
+
+
+# ---------------------------------------------------------------------------
+# 命令列
+# ---------------------------------------------------------------------------
+
+def display_ljust(text, width):
+    """
+    依終端機顯示寬度靠左對齊（中日韓全形字元佔兩格）
+
+    Returns:
+        str: 補空白後的字串
+    """
+    wide = sum(1 for char in text if unicodedata.east_asian_width(char) in ('W', 'F'))
+    return text + ' ' * max(width - len(text) - wide, 0)
+
+
+def _format(value, spec='6.2f', signed=False):
+    if value is None or np.isnan(value):
+        return '--'.rjust(int(spec.split('.')[0]) if '.' in spec else 6)
+    return format(value, ('+' if signed else '') + spec)
+
+
+def series_table(data, by, layer='usage'):
+    """
+    依分組將每日資料整理成 [序列, 日期] 矩陣
+
+    Args:
+        data (HeatmapData): 每日資料
+        by (str): 'fleet'、'node' 或 'gpu'
+
+    Returns:
+        tuple: (序列標籤列表, [序列, 日期] 陣列)
+    """
+    cube = daily_cube(data, layer)
+    if by == 'gpu':
+        labels = [f"{node} GPU[{gpu_index}]" for node in data.nodes for gpu_index in data.gpu_indices]
+        return labels, cube.reshape(-1, cube.shape[-1])
+    node_series = nan_mean(cube, axis=1)
+    fleet = nan_mean(cube.reshape(-1, cube.shape[-1]), axis=0)
+    if by == 'node':
+        return list(data.nodes) + ['全部節點'], np.vstack([node_series, fleet[None, :]])
+    return ['全部節點'], fleet[None, :]
+
+
+def print_trend_table(labels, summary, window):
+    print(f"{display_ljust('序列', 24)}{'期間平均':>9}{f'{window}日平均':>9}{'EWMA':>8}{'週變化':>9}{'趨勢(%/週)':>12}{'R²':>6}{'天數':>6}")
+    print("-" * 86)
+    for i, label in enumerate(labels):
+        print(f"{display_ljust(label, 24)}{_format(summary.mean[i], '9.2f')}{_format(summary.rolling[i], '9.2f')}"
+              f"{_format(summary.ewma[i], '8.2f')}{_format(summary.delta[i], '9.2f', True)}"
+              f"{_format(summary.slope_per_week[i], '12.2f', True)}{_format(summary.r2[i], '6.2f')}"
+              f"{int(summary.days[i]):>6}")
+
+
+def print_profile(profile):
+    print("星期 × 小時平均使用率 (%)：")
+    print("      " + "".join(f"{hour:>4}" for hour in range(HOURS)))
+    for weekday, row in enumerate(profile):
+        cells = "".join('   -' if np.isnan(value) else f"{value:4.0f}" for value in row)
+        print(f"{WEEKDAY_NAMES[weekday]}  {cells}")
+    peaks = ', '.join(f"{WEEKDAY_NAMES[w]} {h:02d}:00 ({v:.1f}%)" for w, h, v in peak_cells(profile))
+    quiet = ', '.join(f"{WEEKDAY_NAMES[w]} {h:02d}:00 ({v:.1f}%)" for w, h, v in peak_cells(profile, lowest=True))
+    if peaks:
+        print(f"尖峰時段: {peaks}")
+        print(f"離峰時段: {quiet}")
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description='GPU 使用率移動平均、週變化、趨勢斜率與時段輪廓')
+    parser.add_argument('start_date', help='開始日期 (YYYY-MM-DD)')
+    parser.add_argument('end_date', help='結束日期 (YYYY-MM-DD)')
+    parser.add_argument('--data-dir', default='../data', help='資料目錄路徑')
+    parser.add_argument('--by', choices=('fleet', 'node', 'gpu'), default='node', help='分組方式 (預設: node)')
+    parser.add_argument('--metric', choices=('usage', 'vram'), default='usage', help='統計指標 (預設: usage)')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, help=f'移動平均天數 (預設: {DEFAULT_WINDOW})')
+    parser.add_argument('--span', type=float, default=DEFAULT_EWMA_SPAN,
+                        help=f'EWMA 跨度天數 (預設: {DEFAULT_EWMA_SPAN})')
+    parser.add_argument('--profile', action='store_true', help='另外顯示星期 × 小時輪廓（讀取每小時資料）')
+    parser.add_argument('--no-cache', action='store_true', help='不讀寫 data/trend_cache 磁碟快取')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    try:
+        if args.start_date > args.end_date:
+            raise ValueError
+        _date_strings(args.start_date, args.end_date)
+    except ValueError:
+        print("錯誤: 日期格式錯誤或開始日期晚於結束日期，請使用 YYYY-MM-DD")
+        return 1
+    if args.window < 1 or args.span < 1:
+        print("錯誤: --window 與 --span 必須至少為 1")
+        return 1
+    if not os.path.isdir(args.data_dir):
+        print(f"錯誤: 找不到資料目錄: {args.data_dir}")
+        return 1
+
+    from heatmap_data import build_heatmap_data
+
+    data = build_heatmap_data(args.data_dir, NODES, args.start_date, args.end_date, GPU_INDICES)
+    labels, series = series_table(data, args.by, args.metric)
+    summary = summarize_series(series, args.window, args.span)
+
+    print(f"\n=== GPU {'使用率' if args.metric == 'usage' else 'VRAM 使用率'}趨勢統計 ===")
+    print(f"分析期間: {args.start_date} 至 {args.end_date}（{len(data.dates)} 天）")
+    print(f"週變化: 最近 {args.window} 天平均減前 {args.window} 天平均；趨勢: 最小平方法斜率")
+    print("")
+    print_trend_table(labels, summary, args.window)
+
+    if args.profile:
+        cube = build_hourly_cube(args.data_dir, NODES, args.start_date, args.end_date, GPU_INDICES,
+                                 use_disk_cache=False if args.no_cache else None)
+        profile, counts = fleet_profile(cube, args.metric)
+        print("")
+        if counts.sum() > 0:
+            print_profile(profile)
+        else:
+            print("期間內沒有每小時資料（原始檔與每小時彙總皆不存在）")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -7,23 +7,27 @@ AMD GPU VRAM 使用量監控與視覺化工具
 支援多節點環境和多種圖表類型
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import seaborn as sns
 import numpy as np
 from datetime import datetime, timedelta
 import os
 import glob
-import requests
 import json
 from pathlib import Path
 
 # 導入字體配置模組
-from font_config import setup_chinese_font
+from font_config import pyplot as plt
+from lazy_imports import lazy_import
+from render_profiles import save_figure
+from downsample import downsample_for_axes
+from gpu_csv_reader import read_gpu_csv
+from gpu_dataset import ensure_dataset, heatmap_columns
+from heatmap_data import (user_sets, heatmap_layout, column_labels,
+                          column_axis_label, title_note, tile_ranges, add_heatmap_arguments, DEFAULT_TILE_DAYS)
 
-# 設定中文字體
-setup_chinese_font()
+# pandas 在第一次讀取資料時、matplotlib 與 seaborn 在第一次繪圖時才載入，中文字體隨 pyplot 一併套用
+pd = lazy_import('pandas')
+mdates = lazy_import('matplotlib.dates')
+sns = lazy_import('seaborn')
 
 class VRAMMonitor:
     def __init__(self, data_dir=None, plots_dir=None):
@@ -162,24 +166,17 @@ class VRAMMonitor:
                 print(f"找不到 CSV 檔案: {csv_file}")
                 return pd.DataFrame()
                 
-            # 讀取 CSV 檔案
-            df = pd.read_csv(csv_file)
+            # 讀取 CSV 檔案 (只讀取 VRAM 欄位，datetime 由時間戳計算)
+            df = read_gpu_csv(csv_file, columns=('vram',))
             
-            # 檢查必要的欄位
-            if 'VRAM使用率(%)' not in df.columns:
+            # 檢查必要的欄位 (舊版 3 欄格式沒有 VRAM 資料)
+            if 'vram' not in df.columns:
                 print(f"CSV 檔案中沒有 VRAM使用率(%) 欄位: {csv_file}")
                 return pd.DataFrame()
-                
-            if '日期時間' not in df.columns:
-                print(f"CSV 檔案中沒有 日期時間 欄位: {csv_file}")
-                return pd.DataFrame()
-            
-            # 轉換時間格式
-            df['datetime'] = pd.to_datetime(df['日期時間'])
-            df['vram_usage'] = df['VRAM使用率(%)']
             
             # 只保留需要的欄位
-            result_df = df[['datetime', 'vram_usage']].copy()
+            result_df = df[['datetime']].copy()
+            result_df['vram_usage'] = df['vram']
             result_df = result_df.dropna()
             
             print(f"成功從 {csv_file} 載入 {len(result_df)} 筆 VRAM 資料")
@@ -238,10 +235,11 @@ class VRAMMonitor:
             
         fig, ax = plt.subplots(1, 1, figsize=(15, 8))
         
-        # VRAM 使用率圖表
-        ax.plot(df['datetime'], df['vram_usage'], label=f'{node} GPU {gpu_id} VRAM 使用率', 
+        # VRAM 使用率圖表（點數超過圖表像素寬度時降採樣，折線與填色使用相同的點）
+        times, vram_usage = downsample_for_axes(ax, df['datetime'], df['vram_usage'])
+        ax.plot(times, vram_usage, label=f'{node} GPU {gpu_id} VRAM 使用率',
                 color='#1f77b4', linewidth=2)
-        ax.fill_between(df['datetime'], df['vram_usage'], alpha=0.3, color='#1f77b4')
+        ax.fill_between(times, vram_usage, alpha=0.3, color='#1f77b4')
         
         ax.set_title(f'{node} GPU {gpu_id} VRAM 使用率時間序列 - {date_str}', fontsize=16, fontweight='bold')
         ax.set_xlabel('時間', fontsize=12)
@@ -259,7 +257,7 @@ class VRAMMonitor:
         
         if save_plot:
             save_path = os.path.join(self.plots_dir, f'{node}_gpu{gpu_id}_vram_{date_str}.png')
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            save_path = save_figure(save_path)
             plt.close()
             print(f"VRAM 使用量圖表已保存至: {save_path}")
             return save_path
@@ -303,9 +301,9 @@ class VRAMMonitor:
                     
                     if os.path.exists(csv_file):
                         try:
-                            df = pd.read_csv(csv_file)
-                            if not df.empty and 'VRAM使用率(%)' in df.columns:
-                                avg_percent = df['VRAM使用率(%)'].mean()
+                            df = read_gpu_csv(csv_file, columns=('vram',), parse_datetime=False)
+                            if not df.empty and 'vram' in df.columns:
+                                avg_percent = df['vram'].mean()
                                 daily_vram_percent.append(avg_percent)
                                 # 假設 VRAM 總量為 80GB (MI250X)，計算使用量
                                 avg_used = avg_percent * 80 / 100
@@ -362,13 +360,13 @@ class VRAMMonitor:
         
         gpu_suffix = f"_gpu{gpu_id}" if gpu_id is not None else "_all_gpus"
         save_path = os.path.join(self.plots_dir, f'nodes_vram_comparison{gpu_suffix}_{start_date}_to_{end_date}.png')
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        save_path = save_figure(save_path)
         plt.close()
         
         print(f"節點 VRAM 對比圖已保存至: {save_path}")
         return save_path
 
-    def plot_vram_heatmap(self, start_date, end_date, show_users=True):
+    def plot_vram_heatmap(self, start_date, end_date, show_users=True, freq='auto', annotate=None, dataset=None):
         """
         繪製 VRAM 使用率熱力圖（包含使用者資訊）
         
@@ -376,101 +374,63 @@ class VRAMMonitor:
             start_date (str): 開始日期
             end_date (str): 結束日期
             show_users (bool): 是否顯示使用者資訊
+            freq (str): 欄位彙整 'auto'、'D'、'W' 或 'M'（auto: 長區間自動改為每週/每月平均）
+            annotate (bool): 是否標註數值，None 表示格子數不多時才標註
+            dataset (GPUDataset): 已載入的資料集，None 表示自行載入
         """
-        dates = pd.date_range(start=start_date, end=end_date, freq='D')
+        # 每個分區的 average 檔只讀取一次，VRAM 日平均與使用者資訊同時取得
+        gpu_indices = [gpu_id // 8 for gpu_id in self.gpu_ids]
+        data = heatmap_columns(dataset, self.data_dir, start_date, end_date, self.nodes, gpu_indices, freq)
+        vram_array = np.nan_to_num(data.vram, nan=0.0)
         
-        # 創建數據矩陣和使用者資訊
-        vram_data = []
         row_labels = []
-        user_info = {}  # 儲存每個GPU的使用者資訊
-        
-        for node in self.nodes:
-            for gpu_id in self.gpu_ids:
-                daily_usage = []
-                gpu_key = f"{node}_GPU{gpu_id}"
-                
-                for date in dates:
-                    date_str = date.strftime('%Y-%m-%d')
-                    # 使用原始 CSV 檔案，不是 vram 特定檔案
-                    csv_file = os.path.join(self.data_dir, node, date_str, f"gpu{gpu_id}_{date_str}.csv")
-                    
-                    if os.path.exists(csv_file):
-                        try:
-                            df = pd.read_csv(csv_file)
-                            if not df.empty and 'VRAM使用率(%)' in df.columns:
-                                avg_usage = df['VRAM使用率(%)'].mean()
-                                daily_usage.append(avg_usage)
-                            else:
-                                daily_usage.append(0)
-                        except:
-                            daily_usage.append(0)
-                    else:
-                        daily_usage.append(0)
-                    
-                    # 收集使用者資訊（從 average 檔案）
-                    if show_users:
-                        avg_file = os.path.join(self.data_dir, node, date_str, f"average_{date_str}.csv")
-                        if os.path.exists(avg_file):
-                            try:
-                                avg_df = pd.read_csv(avg_file)
-                                if not avg_df.empty and '使用者' in avg_df.columns and 'GPU編號' in avg_df.columns:
-                                    # 找到對應的 GPU 編號
-                                    gpu_row = avg_df[avg_df['GPU編號'] == f'GPU[{gpu_id // 8}]']
-                                    if not gpu_row.empty and not pd.isna(gpu_row['使用者'].iloc[0]):
-                                        user = gpu_row['使用者'].iloc[0]
-                                        if gpu_key not in user_info:
-                                            user_info[gpu_key] = set()
-                                        user_info[gpu_key].add(user)
-                            except Exception as e:
-                                pass  # 忽略讀取錯誤
-                
-                vram_data.append(daily_usage)
-                
-                # 創建包含使用者資訊的標籤
-                if show_users and gpu_key in user_info and len(user_info[gpu_key]) > 0:
-                    users_str = ', '.join(sorted(user_info[gpu_key])[:3])  # 最多顯示3個使用者
-                    if len(user_info[gpu_key]) > 3:
-                        users_str += f" (+{len(user_info[gpu_key])-3})"
-                    row_labels.append(f"{node}\nGPU {gpu_id}\n[{users_str}]")
-                else:
-                    row_labels.append(f"{node}\nGPU {gpu_id}")
+        row_users = user_sets(data) if show_users else [set()] * len(vram_array)
+        row_gpus = [(node, gpu_id) for node in self.nodes for gpu_id in self.gpu_ids]
+        for (node, gpu_id), users in zip(row_gpus, row_users):
+            # 創建包含使用者資訊的標籤
+            if users:
+                users_str = ', '.join(sorted(users)[:3])  # 最多顯示3個使用者
+                if len(users) > 3:
+                    users_str += f" (+{len(users)-3})"
+                row_labels.append(f"{node}\nGPU {gpu_id}\n[{users_str}]")
+            else:
+                row_labels.append(f"{node}\nGPU {gpu_id}")
         
-        if not vram_data:
+        if not row_labels:
             print("沒有可用的 VRAM 數據來生成熱力圖")
             return None
             
-        # 創建熱力圖
-        fig, ax = plt.subplots(figsize=(max(len(dates), 12), max(len(row_labels), 10)))
-        
-        vram_array = np.array(vram_data)
+        # 創建熱力圖：尺寸有上限，格子過多時不標註數值
+        columns = column_labels(data, short=True)
+        layout = heatmap_layout(len(row_labels), len(columns), 1.0, 1.0, 12, 10, annotate)
+        fig, ax = plt.subplots(figsize=layout.figsize)
         
         # 創建熱力圖
         im = ax.imshow(vram_array, cmap='YlOrRd', aspect='auto', vmin=0, vmax=100)
         
         # 設定軸標籤
-        ax.set_xticks(range(len(dates)))
-        ax.set_xticklabels([date.strftime('%m-%d') for date in dates], rotation=45)
+        ax.set_xticks(range(len(columns)))
+        ax.set_xticklabels(columns, rotation=45)
         ax.set_yticks(range(len(row_labels)))
         ax.set_yticklabels(row_labels)
         
-        # 添加數值標籤
-        for i in range(len(row_labels)):
-            for j in range(len(dates)):
-                if vram_array[i, j] > 0:
-                    text = ax.text(j, i, f'{vram_array[i, j]:.1f}%',
-                                 ha="center", va="center", color="black" if vram_array[i, j] < 50 else "white",
-                                 fontsize=8)
+        # 添加數值標籤（只處理有數值的格子）
+        if layout.annotate:
+            for i, j in zip(*np.nonzero(vram_array > 0)):
+                ax.text(j, i, f'{vram_array[i, j]:.1f}%',
+                        ha="center", va="center", color="black" if vram_array[i, j] < 50 else "white",
+                        fontsize=layout.fontsize)
         
         # 添加色彩條
         cbar = ax.figure.colorbar(im, ax=ax)
         cbar.ax.set_ylabel('VRAM 使用率 (%)', rotation=-90, va="bottom", fontsize=12)
         
         # 設定標題
-        title = f'GPU VRAM 使用率熱力圖\n期間: {start_date} 至 {end_date}'
+        title = f'GPU VRAM 使用率熱力圖{title_note(data)}\n期間: {start_date} 至 {end_date}'
         if show_users:
             title += '\n(包含使用者資訊)'
         ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
-        ax.set_xlabel('日期', fontsize=12)
+        ax.set_xlabel(column_axis_label(data), fontsize=12)
         ax.set_ylabel('節點 & GPU', fontsize=12)
         
         plt.tight_layout()
@@ -480,15 +440,33 @@ class VRAMMonitor:
         if show_users:
             filename += '_with_users'
         save_path = os.path.join(self.plots_dir, f'{filename}.png')
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        save_path = save_figure(save_path)
         plt.close()
         
         print(f"VRAM 熱力圖已保存至: {save_path}")
         return save_path
+    
+    def plot_vram_heatmap_tiles(self, start_date, end_date, tile_days=DEFAULT_TILE_DAYS, show_users=True):
+        """
+        將長日期範圍切成多張逐日 VRAM 熱力圖，每張最多 tile_days 天
         
-        return save_path
+        Args:
+            start_date (str): 開始日期
+            end_date (str): 結束日期
+            tile_days (int): 每張熱力圖的天數
+            show_users (bool): 是否顯示使用者資訊
+            
+        Returns:
+            list: 各分頁的圖片路徑
+        """
+        paths = []
+        for tile_start, tile_end in tile_ranges(start_date, end_date, tile_days):
+            path = self.plot_vram_heatmap(tile_start, tile_end, show_users, freq='D')
+            if path:
+                paths.append(path)
+        return paths
     
-    def plot_vram_user_activity_summary(self, start_date, end_date, save_plot=True):
+    def plot_vram_user_activity_summary(self, start_date, end_date, save_plot=True, dataset=None):
         """
         繪製 VRAM 使用者活動摘要圖表
         
@@ -496,32 +474,29 @@ class VRAMMonitor:
             start_date (str): 開始日期 (YYYY-MM-DD)
             end_date (str): 結束日期 (YYYY-MM-DD)
             save_plot (bool): 是否保存圖表
+            dataset (GPUDataset): 已載入的資料集，None 表示自行載入
             
         Returns:
             str: 保存的圖片路徑
         """
         # 收集所有節點的使用者 VRAM 資訊
         all_user_data = []
-        dates = pd.date_range(start=start_date, end=end_date, freq='D')
+        dataset = ensure_dataset(dataset, self.data_dir, start_date, end_date, self.nodes)
         
         for node in self.nodes:
-            for date in dates:
-                date_str = date.strftime('%Y-%m-%d')
-                user_info = self.get_vram_user_info_for_node(node, date_str)
-                
-                csv_file = os.path.join(self.data_dir, node, date_str, f"average_{date_str}.csv")
-                df = self.load_vram_data_with_users(csv_file)
-                
-                if df is not None:
-                    for _, row in df.iterrows():
-                        if pd.notna(row['user']) and row['user'] != '未使用':
-                            all_user_data.append({
-                                'node': node,
-                                'gpu': f"GPU[{row['gpu_id']}]",
-                                'date': date_str,
-                                'user': row['user'],
-                                'vram_usage': row['vram_usage']
-                            })
+            vram = dataset.node_matrix(node, 'vram')
+            users = dataset.node_matrix(node, 'users')
+            for col, date_str in enumerate(dataset.date_strs):
+                for row, gpu_index in enumerate(dataset.gpu_indices):
+                    user = users[row, col]
+                    if user and user != '未使用':
+                        all_user_data.append({
+                            'node': node,
+                            'gpu': f"GPU[{gpu_index}]",
+                            'date': date_str,
+                            'user': user,
+                            'vram_usage': vram[row, col]
+                        })
         
         if not all_user_data:
             print("未找到使用者 VRAM 資料")
@@ -587,7 +562,7 @@ class VRAMMonitor:
         
         if save_plot:
             save_path = os.path.join(self.plots_dir, f'vram_user_activity_summary_{start_date}_to_{end_date}.png')
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            save_path = save_figure(save_path)
             print(f"VRAM 使用者活動摘要圖已保存至: {save_path}")
             
         plt.show()
@@ -595,7 +570,7 @@ class VRAMMonitor:
         
         return save_path if save_plot else None
     
-    def plot_vram_nodes_comparison_with_users(self, start_date, end_date, gpu_id=None, show_users=True):
+    def plot_vram_nodes_comparison_with_users(self, start_date, end_date, gpu_id=None, show_users=True, dataset=None):
         """
         繪製各節點 VRAM 使用量對比圖（包含使用者資訊）
         
@@ -604,50 +579,36 @@ class VRAMMonitor:
             end_date (str): 結束日期
             gpu_id (int): 特定 GPU ID，None 表示使用所有 GPU 平均
             show_users (bool): 是否顯示使用者資訊
+            dataset (GPUDataset): 已載入的資料集，None 表示自行載入
             
         Returns:
             str: 保存的圖片路徑
         """
-        dates = pd.date_range(start=start_date, end=end_date, freq='D')
+        dataset = ensure_dataset(dataset, self.data_dir, start_date, end_date, self.nodes)
+        dates = dataset.dates
         all_data = []
         user_summary = {}
         
         for node in self.nodes:
-            node_data = []
-            for date in dates:
-                date_str = date.strftime('%Y-%m-%d')
-                
-                # 獲取使用者資訊
-                if show_users:
-                    user_info = self.get_vram_user_info_for_node(node, date_str)
-                    for gpu, user in user_info.items():
-                        if user not in user_summary:
-                            user_summary[user] = 0
-                        user_summary[user] += 1
-                
-                # 載入 VRAM 資料
-                csv_file = os.path.join(self.data_dir, node, date_str, f"average_{date_str}.csv")
-                df = self.load_vram_data_with_users(csv_file)
-                
-                if df is not None and not df.empty:
-                    if gpu_id is not None:
-                        # 特定 GPU
-                        gpu_data = df[df['gpu_id'] == gpu_id]
-                        if not gpu_data.empty:
-                            node_data.append(gpu_data['vram_usage'].iloc[0])
-                        else:
-                            node_data.append(0)  # 沒找到該GPU數據，用0填充
-                    else:
-                        # 所有 GPU 平均
-                        avg_usage = df['vram_usage'].mean()
-                        if pd.isna(avg_usage):
-                            node_data.append(0)  # NaN也用0填充
-                        else:
-                            node_data.append(avg_usage)
-                else:
-                    node_data.append(0)  # 沒有資料就用0填充
+            # 獲取使用者資訊
+            if show_users:
+                users = dataset.node_matrix(node, 'users')
+                for col in range(len(dates)):
+                    for user in users[:, col]:
+                        if user and user != '未使用':
+                            user_summary[user] = user_summary.get(user, 0) + 1
             
-            all_data.append(node_data)
+            # 沒有資料就用0填充
+            if gpu_id is not None and gpu_id in dataset.gpu_indices:
+                # 特定 GPU
+                node_data = np.nan_to_num(dataset.gpu_series(node, gpu_id, 'vram'), nan=0.0)
+            elif gpu_id is not None:
+                node_data = np.zeros(len(dates))
+            else:
+                # 所有 GPU 平均
+                node_data = dataset.node_daily_mean(node, 'vram')
+            
+            all_data.append(list(node_data))
         
         # 繪製圖表
         fig, ax = plt.subplots(figsize=(14, 8))
@@ -687,7 +648,7 @@ class VRAMMonitor:
             suffix = '_with_users' if show_users else ''
             save_path = os.path.join(self.plots_dir, f'vram_nodes_comparison_all_gpus_{start_date}_to_{end_date}{suffix}.png')
         
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        save_path = save_figure(save_path)
         print(f"VRAM 節點對比圖已保存至: {save_path}")
         
         plt.show()
@@ -728,6 +689,7 @@ if __name__ == "__main__":
     parser.add_argument('--end-date', type=str, help='結束日期')
     parser.add_argument('--plot-type', type=str, choices=['timeline', 'comparison', 'heatmap'], 
                        default='timeline', help='圖表類型')
+    add_heatmap_arguments(parser)
     
     args = parser.parse_args()
     
@@ -740,7 +702,10 @@ if __name__ == "__main__":
     elif args.plot_type == 'comparison' and args.start_date and args.end_date:
         monitor.plot_nodes_vram_comparison(args.start_date, args.end_date, args.gpu)
     elif args.plot_type == 'heatmap' and args.start_date and args.end_date:
-        monitor.plot_vram_heatmap(args.start_date, args.end_date)
+        if args.tile_days:
+            monitor.plot_vram_heatmap_tiles(args.start_date, args.end_date, args.tile_days)
+        else:
+            monitor.plot_vram_heatmap(args.start_date, args.end_date, freq=args.heatmap_freq)
     else:
         print("請提供正確的參數組合")
         parser.print_help()